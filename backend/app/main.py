@@ -5,11 +5,15 @@ Handles pipeline execution requests from frontend.
 """
 import os
 import sys
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_mcp import FastApiMCP
 from app.routes import router
+from app.utils import is_loadtest_mode, monitor_event_loop_lag
+from pipeline.chain_pool import get_chain_pool
+from pipeline.tracing import configure_tracing_from_env
 
 # Configure logging
 logging.basicConfig(
@@ -59,6 +63,21 @@ async def startup_event():
     else:
         logger.warning("  VERCEL_BLOB_READ_WRITE_TOKEN: Not set (PDF downloads will fail)")
 
+    # Build stage chains once so the first run doesn't pay construction cost
+    try:
+        get_chain_pool().warm()
+    except Exception as e:
+        logger.warning(f"Chain pool warm-up failed, chains will be built on first run: {e}")
+
+    # Span exporters (OTLP collector / JSONL file) if configured
+    configure_tracing_from_env()
+
+    # Event loop lag histogram on /metrics (keep a reference so it isn't collected)
+    app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+    if is_loadtest_mode():
+        logger.warning("LOADTEST_MODE enabled: accepting http://localhost blob URLs")
+
     logger.info("Startup complete - API ready to accept requests")
     logger.info("=" * 60)
 
@@ -105,7 +124,8 @@ mcp = FastApiMCP(
         "check_environment",
         # Debug & introspection tools
         "list_all_runs",
-        "get_stage_output"
+        "get_stage_output",
+        "get_run_metrics"
     ]
 )
 
@@ -1,5 +1,5 @@
 """Pydantic Models for Request/Response Schemas"""
-from typing import Optional, Literal, Dict, Any
+from typing import Optional, Literal, Dict, Any, List, Union
 from pydantic import BaseModel, Field
 
 
@@ -8,6 +8,14 @@ class RunPipelineRequest(BaseModel):
     blob_url: str = Field(..., description="Vercel Blob URL of uploaded PDF")
     brand_id: str = Field(..., description="Brand identifier (e.g., 'lactalis-canada')")
     run_id: Optional[str] = Field(None, description="Pre-generated run ID from frontend (prevents race condition)")
+    force_recompute: bool = Field(False, description="Run Stages 1-3 even if a near-identical document is in the semantic cache")
+    selected_track: int = Field(1, ge=1, le=2, description="Stage 1 track explored by the main branch")
+    dual_track: Optional[bool] = Field(None, description="Also run the other track as a sibling branch (default: DUAL_TRACK_MODE)")
+    deadline_s: Optional[float] = Field(None, gt=0, description="End-to-end run deadline in seconds (default: PIPELINE_DEADLINE_S)")
+    model_routes: Optional[Dict[str, Union[str, List[str]]]] = Field(
+        None,
+        description="Per-run model routing, e.g. {\"stage1\": [\"openai/gpt-4o-mini\", \"deepseek/deepseek-chat\"]}"
+    )
 
 
 class RunPipelineResponse(BaseModel):
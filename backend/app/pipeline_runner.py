@@ -11,7 +11,7 @@ import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import requests
 from pypdf import PdfReader
@@ -21,6 +21,13 @@ from pipeline.stages.stage2_signal_amplification import Stage2Chain
 from pipeline.stages.stage3_general_translation import Stage3Chain
 from pipeline.stages.stage4_brand_contextualization import Stage4Chain
 from pipeline.stages.stage5_opportunity_generation import Stage5Chain
+from pipeline.dag import STAGE_NODES, STAGE_TITLES, NodeEvent, build_stage_dag
+from pipeline.deadlines import current_deadline, run_deadline
+from pipeline.instrumentation import RunMetrics, begin_run, current_run, end_run, span
+from pipeline.semantic_cache import get_semantic_cache
+from pipeline.text_condenser import read_pdf_text
+from pipeline.track_branches import add_track_branches, branch_track, dual_track_enabled
+from pipeline.tracing import trace_headers
 from pipeline.utils import load_research_data
 from app.prisma_client import PrismaAPIClient
 
@@ -34,16 +41,14 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         pdf_path: Path to PDF file
 
     Returns:
-        Extracted text content
+        Extracted text content, condensed unless INPUT_CONDENSE=false
+        (cached by content hash under INPUT_TEXT_CACHE_DIR)
 
     Raises:
         Exception: If PDF reading fails
     """
     try:
-        reader = PdfReader(pdf_path)
-        text_content = ""
-        for page in reader.pages:
-            text_content += page.extract_text()
+        text_content = read_pdf_text(pdf_path, reader=PdfReader)
 
         logger.info(f"Extracted {len(text_content)} characters from PDF")
         return text_content
@@ -75,6 +80,60 @@ def save_stage_output(run_id: str, stage_num: int, output: Any) -> None:
     logger.info(f"Saved stage {stage_num} output for run {run_id}")
 
 
+def save_track_branch(run_id: str, selected_track: int, branch: Dict[str, Any]) -> None:
+    """Save a sibling track branch under track-N/ and update tracks.json.
+
+    A completed branch gets stage_N_output.json files for Stages 2-5 plus
+    branch.json (markdown opportunities and stage outputs) for the UI.
+    """
+    output_dir = get_output_dir(run_id)
+    track = branch["track"]
+
+    if branch["status"] == "completed":
+        branch_dir = output_dir / f"track-{track}"
+        branch_dir.mkdir(parents=True, exist_ok=True)
+        for stage_num in range(2, 6):
+            with open(branch_dir / f"stage_{stage_num}_output.json", "w") as f:
+                json.dump(branch[f"stage{stage_num}"], f, indent=2)
+        with open(branch_dir / "branch.json", "w") as f:
+            json.dump(track_branch_payload(branch), f, indent=2)
+
+    manifest_file = output_dir / "tracks.json"
+    manifest = {"selectedTrack": selected_track, "tracks": {str(selected_track): {"status": "main"}}}
+    if manifest_file.exists():
+        manifest = json.loads(manifest_file.read_text())
+    manifest["tracks"][str(track)] = {
+        "status": branch["status"],
+        "reason": branch["reason"],
+        "costUsd": branch["cost_usd"],
+    }
+    manifest_file.write_text(json.dumps(manifest, indent=2))
+
+    logger.info(f"[{run_id}] Track {track} branch {branch['status']}")
+
+
+def track_branch_payload(branch: Dict[str, Any]) -> Dict[str, Any]:
+    """Frontend shape of a track branch (same fields as the main run)."""
+    payload = {
+        "track": branch["track"],
+        "status": branch["status"],
+        "reason": branch["reason"],
+        "costUsd": branch["cost_usd"],
+    }
+    if branch["status"] == "completed":
+        payload["opportunities"] = convert_opportunities_to_markdown(branch["stage5"].get("opportunities", []))
+        payload["stageOutputs"] = {f"stage{n}": branch[f"stage{n}"] for n in range(2, 6)}
+    return payload
+
+
+def save_run_metrics(run_id: str, metrics: RunMetrics) -> None:
+    """Save run timing, token and cost metrics to metrics.json."""
+    try:
+        metrics.export_json(get_output_dir(run_id) / "metrics.json")
+    except OSError as e:
+        logger.warning(f"[{run_id}] Failed to save run metrics: {e}")
+
+
 def transform_stage1_output(stage1_result: Dict[str, Any]) -> Dict[str, str]:
     """Transform Stage 1 output to match API schema.
 
@@ -207,6 +266,7 @@ def call_completion_webhook(
     webhook_secret = os.getenv("WEBHOOK_SECRET", "dev-secret-123")
 
     # Prepare completion payload
+    metrics = current_run()
     completion_data = {
         "status": "COMPLETED",
         "completedAt": datetime.utcnow().isoformat() + "Z",
@@ -220,16 +280,20 @@ def call_completion_webhook(
             "stage5": stage5_result
         }
     }
+    if metrics is not None:
+        completion_data["metrics"] = metrics.to_dict(include_spans=False)
 
     try:
         logger.info(f"[{run_id}] Calling completion webhook: {frontend_url}/api/pipeline/{run_id}/complete")
 
-        response = requests.post(
-            f"{frontend_url}/api/pipeline/{run_id}/complete",
-            json=completion_data,
-            headers={"X-Webhook-Secret": webhook_secret},
-            timeout=30
-        )
+        with span("completion_webhook", kind="http") as attrs:
+            response = requests.post(
+                f"{frontend_url}/api/pipeline/{run_id}/complete",
+                json=completion_data,
+                headers={"X-Webhook-Secret": webhook_secret, **trace_headers()},
+                timeout=30
+            )
+            attrs["status_code"] = response.status_code
 
         if response.ok:
             logger.info(f"[{run_id}] Successfully notified frontend of completion")
@@ -246,147 +310,170 @@ def call_completion_webhook(
         logger.error(f"[{run_id}] Unexpected error calling webhook: {e}")
 
 
+def load_brand_research(brand_profile: Dict[str, Any]) -> str:
+    """Load research data for a brand (empty string if missing).
+
+    YAML files use the 'brand_name' field, converted to filename format.
+    """
+    brand_name = brand_profile.get("brand_name", "Unknown")
+    brand_id = brand_name.lower().replace(" ", "-")
+    research_data = load_research_data(brand_id)
+    if not research_data:
+        logger.warning(f"No research data found for brand {brand_id}, using empty string")
+        research_data = ""
+    return research_data
+
+
 def execute_pipeline_background(
     run_id: str,
     pdf_path: str,
-    brand_profile: Dict[str, Any]
+    brand_profile: Dict[str, Any],
+    force_recompute: bool = False,
+    selected_track: int = 1,
+    dual_track: Optional[bool] = None,
+    deadline_s: Optional[float] = None
 ) -> None:
     """Execute the 5-stage pipeline in background.
 
     Now uses Prisma API client to write status updates to database.
 
+    In dual-track mode Stages 2-5 run on selected_track, and the other
+    track runs as a sibling branch saved under track-N/ (it never fails
+    the run; status updates and the completion webhook only track the main
+    branch, which is reported as soon as its Stage 5 completes).
+
+    LLM calls share the run's deadline and retry budget; stage status
+    updates carry the time left before the deadline.
+
     Args:
         run_id: Unique run identifier
         pdf_path: Path to PDF file
         brand_profile: Brand profile data from YAML
+        force_recompute: Skip the semantic cache for Stages 1-3
+        selected_track: Stage 1 track explored by the main branch
+        dual_track: Run both tracks (default: DUAL_TRACK_MODE)
+        deadline_s: End-to-end deadline (default: PIPELINE_DEADLINE_S)
     """
     logger.info(f"Starting pipeline execution for run {run_id}")
     start_time = time.time()  # Track pipeline duration
 
     # Initialize Prisma API client
     prisma_client = PrismaAPIClient()
-    current_stage = 1  # Track stage for error handling
-
-    try:
-        # Initialize pipeline stages in Prisma (stage 1 = PROCESSING)
-        prisma_client.initialize_pipeline_stages(run_id)
-
-        # Extract text from PDF
-        logger.info(f"[{run_id}] Extracting text from PDF")
-        input_text = extract_text_from_pdf(pdf_path)
-
-        # Stage 1: Input Processing
-        logger.info(f"[{run_id}] Starting Stage 1: Input Processing")
-        current_stage = 1
-        # Already marked as PROCESSING in initialize_pipeline_stages
-
-        stage1 = Stage1Chain()
-        stage1_result = stage1.run(input_text)
-
-        # Save raw output locally
-        save_stage_output(run_id, 1, stage1_result)
-
-        # Mark stage 1 as completed in Prisma
-        prisma_client.mark_stage_complete(run_id, 1, stage1_result)
 
-        # Extract stage1 output text for Stage 2
-        stage1_output_text = stage1_result.get("stage1_output", "")
-
-        # Stage 2: Signal Amplification
-        logger.info(f"[{run_id}] Starting Stage 2: Signal Amplification")
-        current_stage = 2
-        prisma_client.mark_stage_processing(run_id, 2)
-
-        stage2 = Stage2Chain()
-        stage2_result = stage2.run(stage1_output_text)
-
-        save_stage_output(run_id, 2, stage2_result)
-        prisma_client.mark_stage_complete(run_id, 2, stage2_result)
-
-        # Extract stage2 output text for Stage 3
-        stage2_output_text = stage2_result.get("stage2_output", "")
-
-        # Stage 3: General Translation
-        logger.info(f"[{run_id}] Starting Stage 3: General Translation")
-        current_stage = 3
-        prisma_client.mark_stage_processing(run_id, 3)
-
-        stage3 = Stage3Chain()
-        stage3_result = stage3.run(stage1_output_text, stage2_output_text)
-
-        save_stage_output(run_id, 3, stage3_result)
-        prisma_client.mark_stage_complete(run_id, 3, stage3_result)
-
-        # Extract stage3 output text for Stage 4
-        stage3_output_text = stage3_result.get("stage3_output", "")
-
-        # Load research data for brand (returns empty string if missing)
-        # Note: YAML files use 'brand_name' field, convert to filename format
-        brand_name = brand_profile.get("brand_name", "Unknown")
-        brand_id = brand_name.lower().replace(" ", "-")
-        research_data = load_research_data(brand_id)
-        if not research_data:
-            logger.warning(f"No research data found for brand {brand_id}, using empty string")
-            research_data = ""
-
-        # Stage 4: Brand Contextualization
-        logger.info(f"[{run_id}] Starting Stage 4: Brand Contextualization")
-        current_stage = 4
-        prisma_client.mark_stage_processing(run_id, 4)
-
-        stage4 = Stage4Chain()
-        stage4_result = stage4.run(stage3_output_text, brand_profile, research_data)
-
-        save_stage_output(run_id, 4, stage4_result)
-        prisma_client.mark_stage_complete(run_id, 4, stage4_result)
-
-        # Extract stage4 output text for Stage 5
-        stage4_output_text = stage4_result.get("stage4_output", "")
-
-        # Extract brand name and input source for Stage 5
-        brand_name = brand_profile.get("company_name", "Unknown Brand")
-        input_source = Path(pdf_path).stem  # Get filename without extension
-
-        # Stage 5: Opportunity Generation
-        logger.info(f"[{run_id}] Starting Stage 5: Opportunity Generation")
-        current_stage = 5
-        prisma_client.mark_stage_processing(run_id, 5)
-
-        stage5 = Stage5Chain()
-        stage5_result = stage5.run(stage4_output_text, brand_name, input_source)
+    metrics: Optional[RunMetrics] = None  # Set by begin_run() inside the try
+    current_stage = 1  # Track stage for error handling
 
-        save_stage_output(run_id, 5, stage5_result)
+    def remaining_s() -> Optional[float]:
+        deadline = current_deadline()
+        return deadline.remaining() if deadline is not None else None
+
+    def on_start(name: str) -> None:
+        nonlocal current_stage
+        if name == "stage23":  # Fused Stages 2+3: Stage 2 is processing during the call
+            name = "stage2"
+        if name not in STAGE_NODES:
+            return
+        current_stage = int(name[-1])
+        logger.info(f"[{run_id}] Starting Stage {current_stage}: {STAGE_TITLES[name]}")
+        if current_stage > 1:  # Stage 1 is marked PROCESSING by initialize_pipeline_stages
+            prisma_client.mark_stage_processing(run_id, current_stage, remaining_s())
+
+    stage_results: Dict[str, Any] = {}
+
+    def on_complete(event: NodeEvent) -> None:
+        if branch_track(event.name) is not None:
+            try:
+                save_track_branch(run_id, selected_track, event.value)
+            except (OSError, ValueError) as e:
+                logger.warning(f"[{run_id}] Failed to save {event.name} branch: {e}")
+            return
+        if event.name not in STAGE_NODES:
+            return
+        stage_num = int(event.name[-1])
+        stage_results[event.name] = event.value
+        save_stage_output(run_id, stage_num, event.value)
+        if stage_num == 1 and event.value.get("semantic_cache"):
+            # Reported with the run's metrics (metrics.json, completion webhook)
+            metrics.annotations["semantic_cache"] = event.value["semantic_cache"]
+            logger.info(f"[{run_id}] {event.value['semantic_cache']['note']}")
+        if stage_num < 5:
+            prisma_client.mark_stage_complete(run_id, stage_num, event.value, remaining_s())
+            return
 
         # Extract opportunities and convert to markdown format for frontend
-        raw_opportunities = stage5_result.get("opportunities", [])
+        raw_opportunities = event.value.get("opportunities", [])
         opportunities_with_markdown = convert_opportunities_to_markdown(raw_opportunities)
         opportunities_output = {"opportunities": opportunities_with_markdown}
 
         # Mark stage 5 as completed (auto-marks PipelineRun as COMPLETED)
         # Save opportunities_output (with markdown) instead of stage5_result
-        prisma_client.mark_stage_complete(run_id, 5, opportunities_output)
-
-        logger.info(f"Pipeline execution completed successfully for run {run_id}")
+        prisma_client.mark_stage_complete(run_id, 5, opportunities_output, remaining_s())
 
-        # Call completion webhook to notify frontend
+        # Notify the frontend now rather than after dag.run(), so a
+        # still-running track branch doesn't delay the main result; branches
+        # are served from track-N/ once saved
+        logger.info(f"Pipeline main branch completed for run {run_id}")
         call_completion_webhook(
             run_id=run_id,
             start_time=start_time,
             opportunities=opportunities_with_markdown,
-            stage1_result=stage1_result,
-            stage2_result=stage2_result,
-            stage3_result=stage3_result,
-            stage4_result=stage4_result,
-            stage5_result=stage5_result
+            stage1_result=stage_results["stage1"],
+            stage2_result=stage_results["stage2"],
+            stage3_result=stage_results["stage3"],
+            stage4_result=stage_results["stage4"],
+            stage5_result=event.value
         )
 
+    try:
+        metrics = begin_run(run_id)  # Per-stage timing, tokens and cost
+
+        # Initialize pipeline stages in Prisma (stage 1 = PROCESSING)
+        prisma_client.initialize_pipeline_stages(run_id)
+
+        # Extract text from PDF
+        logger.info(f"[{run_id}] Extracting text from PDF")
+        input_text = extract_text_from_pdf(pdf_path)
+
+        # Stages 1-5 (Stages 1-3 served from the semantic cache for
+        # near-identical documents; research loads alongside Stages 1-3)
+        factories = (Stage1Chain, Stage2Chain, Stage3Chain, Stage4Chain, Stage5Chain)
+        dual_track = dual_track_enabled(dual_track)
+        dag = build_stage_dag(
+            factories,
+            get_semantic_cache(),
+            force_recompute,
+            cache_source=run_id,
+            track=selected_track if dual_track else None
+        )
+        dag.add("research_data", lambda: load_brand_research(brand_profile))
+        if dual_track:
+            add_track_branches(dag, factories, selected_track)
+        with run_deadline(deadline_s):
+            dag.run(
+                {
+                    "input_text": input_text,
+                    "brand_profile": brand_profile,
+                    "brand_name": brand_profile.get("company_name", "Unknown Brand"),
+                    "input_source": Path(pdf_path).stem  # Filename without extension
+                },
+                on_start=on_start,
+                on_complete=on_complete
+            )
+        logger.info(f"Pipeline execution completed successfully for run {run_id}")
+
     except Exception as e:
         logger.error(f"Pipeline execution failed for run {run_id}: {str(e)}", exc_info=True)
+        if metrics is not None:
+            metrics.mark_failed(str(e))
 
         # Mark current stage as failed in Prisma (auto-marks PipelineRun as FAILED)
         prisma_client.mark_stage_failed(run_id, current_stage, str(e))
 
     finally:
+        if metrics is not None:
+            end_run(metrics)
+            save_run_metrics(run_id, metrics)
+
         # Cleanup PDF
         if os.path.exists(pdf_path):
             try:
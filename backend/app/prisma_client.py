@@ -11,6 +11,9 @@ from datetime import datetime
 
 import requests
 
+from pipeline.instrumentation import span
+from pipeline.tracing import trace_headers
+
 logger = logging.getLogger(__name__)
 
 # Retry configuration
@@ -48,7 +51,8 @@ class PrismaAPIClient:
         stage_name: str,
         status: str,
         output: Optional[str] = None,
-        completed_at: Optional[str] = None
+        completed_at: Optional[str] = None,
+        remaining_s: Optional[float] = None
     ) -> bool:
         """Update stage status in Prisma via Next.js API.
 
@@ -59,6 +63,7 @@ class PrismaAPIClient:
             status: Status - "PROCESSING", "COMPLETED", "FAILED", "CANCELLED"
             output: Stage output data (JSON string or markdown)
             completed_at: ISO timestamp (optional, auto-generated if COMPLETED)
+            remaining_s: Seconds left before the run's deadline (optional)
 
         Returns:
             True if update successful, False otherwise
@@ -78,47 +83,56 @@ class PrismaAPIClient:
         elif status == "COMPLETED":
             payload["completedAt"] = datetime.utcnow().isoformat() + "Z"
 
-        # Retry logic with exponential backoff
-        for attempt in range(MAX_RETRIES):
-            try:
-                logger.info(
-                    f"[{run_id}] Updating stage {stage_number} to {status} via Prisma API (attempt {attempt + 1}/{MAX_RETRIES})"
-                )
-
-                response = self.session.post(url, json=payload, timeout=30)
+        # Time left before the run's deadline, for the progress UI
+        if remaining_s is not None:
+            payload["deadlineRemainingMs"] = int(max(0.0, remaining_s) * 1000)
 
-                if response.ok:
+        # Retry logic with exponential backoff (timed as a single span)
+        with span("prisma.stage_update", kind="http", stage_number=stage_number, status=status) as attrs:
+            for attempt in range(MAX_RETRIES):
+                attrs["retries"] = attempt
+                try:
                     logger.info(
-                        f"[{run_id}] Successfully updated stage {stage_number} in Prisma"
+                        f"[{run_id}] Updating stage {stage_number} to {status} via Prisma API (attempt {attempt + 1}/{MAX_RETRIES})"
+                    )
+
+                    response = self.session.post(
+                        url, json=payload, headers=trace_headers(), timeout=30
                     )
-                    return True
+                    attrs["status_code"] = response.status_code
+
+                    if response.ok:
+                        logger.info(
+                            f"[{run_id}] Successfully updated stage {stage_number} in Prisma"
+                        )
+                        return True
+                    else:
+                        logger.error(
+                            f"[{run_id}] Prisma API error: {response.status_code} - {response.text}"
+                        )
+                        # Don't retry on 4xx client errors (except 429 rate limit)
+                        if 400 <= response.status_code < 500 and response.status_code != 429:
+                            logger.error(f"[{run_id}] Client error, not retrying")
+                            return False
+
+                except requests.exceptions.Timeout:
+                    logger.error(f"[{run_id}] Prisma API timeout after 30s")
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"[{run_id}] Failed to call Prisma API: {e}")
+                except Exception as e:
+                    logger.error(f"[{run_id}] Unexpected error calling Prisma API: {e}")
+
+                # If not the last attempt, wait before retrying
+                if attempt < MAX_RETRIES - 1:
+                    delay = min(INITIAL_RETRY_DELAY * (2 ** attempt), MAX_RETRY_DELAY)
+                    logger.warning(
+                        f"[{run_id}] Retrying stage {stage_number} update in {delay:.1f}s..."
+                    )
+                    time.sleep(delay)
                 else:
                     logger.error(
-                        f"[{run_id}] Prisma API error: {response.status_code} - {response.text}"
+                        f"[{run_id}] Failed to update stage {stage_number} after {MAX_RETRIES} attempts"
                     )
-                    # Don't retry on 4xx client errors (except 429 rate limit)
-                    if 400 <= response.status_code < 500 and response.status_code != 429:
-                        logger.error(f"[{run_id}] Client error, not retrying")
-                        return False
-
-            except requests.exceptions.Timeout:
-                logger.error(f"[{run_id}] Prisma API timeout after 30s")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"[{run_id}] Failed to call Prisma API: {e}")
-            except Exception as e:
-                logger.error(f"[{run_id}] Unexpected error calling Prisma API: {e}")
-
-            # If not the last attempt, wait before retrying
-            if attempt < MAX_RETRIES - 1:
-                delay = min(INITIAL_RETRY_DELAY * (2 ** attempt), MAX_RETRY_DELAY)
-                logger.warning(
-                    f"[{run_id}] Retrying stage {stage_number} update in {delay:.1f}s..."
-                )
-                time.sleep(delay)
-            else:
-                logger.error(
-                    f"[{run_id}] Failed to update stage {stage_number} after {MAX_RETRIES} attempts"
-                )
 
         return False
 
@@ -160,7 +174,8 @@ class PrismaAPIClient:
         self,
         run_id: str,
         stage_number: int,
-        output_data: Any
+        output_data: Any,
+        remaining_s: Optional[float] = None
     ) -> bool:
         """Mark a stage as completed with output data.
 
@@ -168,6 +183,7 @@ class PrismaAPIClient:
             run_id: Pipeline run identifier
             stage_number: Stage number (1-5)
             output_data: Stage output (will be JSON-stringified if dict)
+            remaining_s: Seconds left before the run's deadline (optional)
 
         Returns:
             True if update successful, False otherwise
@@ -193,7 +209,8 @@ class PrismaAPIClient:
             stage_number=stage_number,
             stage_name=stage_names.get(stage_number, f"Stage {stage_number}"),
             status="COMPLETED",
-            output=output_str
+            output=output_str,
+            remaining_s=remaining_s
         )
 
     def mark_stage_failed(
@@ -231,13 +248,15 @@ class PrismaAPIClient:
     def mark_stage_processing(
         self,
         run_id: str,
-        stage_number: int
+        stage_number: int,
+        remaining_s: Optional[float] = None
     ) -> bool:
         """Mark a stage as currently processing.
 
         Args:
             run_id: Pipeline run identifier
             stage_number: Stage number (1-5)
+            remaining_s: Seconds left before the run's deadline (optional)
 
         Returns:
             True if update successful, False otherwise
@@ -255,5 +274,6 @@ class PrismaAPIClient:
             stage_number=stage_number,
             stage_name=stage_names.get(stage_number, f"Stage {stage_number}"),
             status="PROCESSING",
-            output=""
+            output="",
+            remaining_s=remaining_s
         )
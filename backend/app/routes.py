@@ -4,15 +4,18 @@ Implementation for pipeline execution and status endpoints.
 """
 import os
 import json
+import contextvars
 import logging
 import time
 from pathlib import Path
 from threading import Thread
 from typing import Dict, Any
+from urllib.parse import urlparse
 
 import requests
 import yaml
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from app.models import (
     RunPipelineRequest,
     RunPipelineResponse,
@@ -20,6 +23,11 @@ from app.models import (
     HealthResponse
 )
 from app.pipeline_runner import execute_pipeline_background
+from app.utils import LOADTEST_BLOB_HOSTS, is_loadtest_mode
+from pipeline.dag import STAGE_NODES
+from pipeline.instrumentation import REGISTRY, span
+from pipeline.model_routing import parse_route_overrides, route_overrides
+from pipeline.tracing import run_trace, trace_headers
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +43,15 @@ def generate_run_id() -> str:
 
 
 def validate_blob_url(url: str) -> bool:
-    """Validate blob URL is from Vercel Blob storage."""
+    """Validate blob URL is from Vercel Blob storage.
+
+    With LOADTEST_MODE=true, plain-HTTP localhost URLs are also accepted so
+    load tests can serve PDFs from a local blob stand-in.
+    """
+    if is_loadtest_mode():
+        parsed = urlparse(url)
+        if parsed.scheme == "http" and parsed.hostname in LOADTEST_BLOB_HOSTS:
+            return True
     return url.startswith("https://") and "blob.vercel-storage.com" in url
 
 
@@ -56,7 +72,9 @@ def download_pdf_from_blob(blob_url: str, run_id: str) -> str:
 
     try:
         logger.info(f"Downloading PDF from {blob_url}")
-        response = requests.get(blob_url, timeout=30)
+        with span("blob_download", kind="http") as attrs:
+            response = requests.get(blob_url, headers=trace_headers(), timeout=30)
+            attrs["status_code"] = response.status_code
         response.raise_for_status()
 
         # Validate file size (max 25MB)
@@ -210,23 +228,42 @@ async def run_pipeline(request: RunPipelineRequest):
             detail="Invalid blob URL. Must be HTTPS URL from blob.vercel-storage.com"
         )
 
+    # Validate per-run model routes
+    model_routes = parse_route_overrides(request.model_routes)
+    unknown_stages = sorted(set(model_routes) - set(STAGE_NODES))
+    if unknown_stages:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown stage in model_routes: {', '.join(unknown_stages)}"
+        )
+
     # Use frontend-provided run_id or generate new one
     run_id = request.run_id or generate_run_id()
     logger.info(f"Pipeline run_id: {run_id} {'(frontend-provided)' if request.run_id else '(backend-generated)'}")
 
-    # Download PDF
-    pdf_path = download_pdf_from_blob(request.blob_url, run_id)
-
-    # Load brand profile
-    brand_profile = load_brand_profile(request.brand_id)
-
-    # Start background execution
-    thread = Thread(
-        target=execute_pipeline_background,
-        args=(run_id, pdf_path, brand_profile),
-        daemon=True
-    )
-    thread.start()
+    # Trace the request under the run's trace id; the background thread
+    # inherits this context so its spans join the same trace (and its LLM
+    # calls use the run's model routes)
+    with run_trace(run_id), route_overrides(model_routes), \
+            span("POST /run", kind="server", run_id=run_id, brand_id=request.brand_id):
+        # Download PDF
+        pdf_path = download_pdf_from_blob(request.blob_url, run_id)
+
+        # Load brand profile
+        brand_profile = load_brand_profile(request.brand_id)
+
+        # Start background execution
+        context = contextvars.copy_context()
+        thread = Thread(
+            target=context.run,
+            args=(
+                execute_pipeline_background, run_id, pdf_path, brand_profile,
+                request.force_recompute, request.selected_track, request.dual_track,
+                request.deadline_s
+            ),
+            daemon=True
+        )
+        thread.start()
 
     logger.info(f"Started pipeline execution for run {run_id}")
 
@@ -474,3 +511,83 @@ async def get_stage_output(run_id: str, stage_num: int):
             status_code=500,
             detail=f"Error reading stage output: {str(e)}"
         )
+
+
+@router.get("/runs/{run_id}/tracks/{track_num}", operation_id="get_track_branch")
+async def get_track_branch(run_id: str, track_num: int):
+    """Get Stages 2-5 of a run's sibling track branch (dual-track mode)
+
+    Lets the UI switch to the track the user did not select without
+    starting a new run. Returns 404 while the branch is still running or
+    if it was skipped (see status in tracks.json).
+    """
+    if track_num not in (1, 2):
+        raise HTTPException(
+            status_code=400,
+            detail="Track number must be 1 or 2"
+        )
+
+    run_dir = Path("/tmp/runs") / run_id
+    branch_file = run_dir / f"track-{track_num}" / "branch.json"
+
+    if not branch_file.exists():
+        manifest_file = run_dir / "tracks.json"
+        detail = f"Track {track_num} branch not found for run '{run_id}'"
+        if manifest_file.exists():
+            try:
+                entry = json.loads(manifest_file.read_text()).get("tracks", {}).get(str(track_num), {})
+                if entry.get("status"):
+                    detail += f" (status: {entry['status']}{', ' + entry['reason'] if entry.get('reason') else ''})"
+            except json.JSONDecodeError:
+                pass
+        raise HTTPException(status_code=404, detail=detail)
+
+    try:
+        with open(branch_file, "r") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        logger.error(f"Corrupted track branch for {run_id}/track-{track_num}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Track {track_num} branch file corrupted"
+        )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, operation_id="get_metrics")
+async def get_metrics():
+    """Prometheus metrics for pipeline runs
+
+    Exposes stage/LLM latency histograms, token and estimated cost
+    counters, retry and error counts in Prometheus text format.
+    """
+    return PlainTextResponse(
+        REGISTRY.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/debug/runs/{run_id}/metrics", operation_id="get_run_metrics")
+async def get_run_metrics(run_id: str):
+    """Get timing, token and cost breakdown for a pipeline run
+
+    Returns per-stage wall time, LLM calls, token counts, estimated cost
+    and retries, plus every recorded span (LLM calls, PDF extraction,
+    Prisma updates, webhook).
+    """
+    metrics_file = Path("/tmp/runs") / run_id / "metrics.json"
+
+    if not metrics_file.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Metrics not found for run '{run_id}'. Run may still be in progress."
+        )
+
+    try:
+        with open(metrics_file, "r") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        logger.error(f"Corrupted metrics for {run_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Run metrics file corrupted"
+        )
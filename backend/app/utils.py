@@ -2,10 +2,23 @@
 
 Helper functions for file management, cleanup, etc.
 """
+import asyncio
 import os
 import shutil
+import time
 from pathlib import Path
 
+from pipeline.instrumentation import REGISTRY
+
+
+# Plain-HTTP blob hosts accepted in load-test mode (local blob stand-in)
+LOADTEST_BLOB_HOSTS = frozenset({"127.0.0.1", "localhost"})
+
+
+def is_loadtest_mode() -> bool:
+    """Whether LOADTEST_MODE=true (never enable in production)."""
+    return os.getenv("LOADTEST_MODE", "false").lower() == "true"
+
 
 def cleanup_temp_file(file_path: str) -> None:
     """
@@ -59,3 +72,21 @@ def ensure_run_directory(run_id: str) -> Path:
     run_dir = Path(f"tmp/runs/{run_id}")
     run_dir.mkdir(parents=True, exist_ok=True)
     return run_dir
+
+
+async def monitor_event_loop_lag(interval_s: float = 0.25) -> None:
+    """
+    Record how late the event loop wakes up from a sleep
+
+    Lag grows when a request handler blocks the loop (e.g. a synchronous
+    download inside an async route). Exposed on /metrics as
+    api_event_loop_lag_seconds.
+
+    Args:
+        interval_s: Sleep between samples in seconds
+    """
+    while True:
+        scheduled = time.perf_counter()
+        await asyncio.sleep(interval_s)
+        lag = max(0.0, time.perf_counter() - scheduled - interval_s)
+        REGISTRY.observe("api_event_loop_lag_seconds", lag, "Event loop wake-up delay")
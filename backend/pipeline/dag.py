@@ -0,0 +1,376 @@
+"""
+Declarative stage DAG executor.
+
+Each node names the values it needs (other nodes or context keys) and the
+executor runs every node whose inputs are ready, concurrently, on a thread
+pool. Scheduling, timing, spans, reuse of precomputed values and
+checkpointing live here once instead of in every pipeline entry point;
+entry points only add their own nodes (loaders, renderers) and hooks
+(saving, status updates).
+
+build_stage_dag() declares the five pipeline stages:
+
+    input_text ─> semantic_cache_lookup ─┐
+    input_text ─────────────────────────>├─> stage1 ─> stage2 ─> stage3 ─> stage4 ─> stage5
+                                         │                      brand_profile ─┘       │
+                                         │                      research_data ─┘       │
+                                         │                                brand_name ──┤
+                                         └─> semantic_cache_store         input_source ┘
+
+Brand loaders run alongside Stages 1-3 instead of after them. In fused
+mode (STAGE23_FUSED) a stage23 node makes one call for Stages 2 and 3,
+and the stage2 and stage3 nodes just pass its two outputs on.
+
+Usage:
+    dag = build_stage_dag(factories)
+    dag.add("brand_profile", lambda: load_brand_profile(brand_id))
+    result = dag.run({"input_text": text, ...}, on_complete=save)
+    opportunities = result.values["stage5"]["opportunities"]
+"""
+
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from .chain_pool import get_chain_pool
+from .instrumentation import span
+from .stages.stage1_input_processing import Stage1Chain
+from .stages.stage23_fused_analysis import create_stage23_chain, fused_stages_enabled
+
+
+STAGE_NODES = ("stage1", "stage2", "stage3", "stage4", "stage5")
+
+STAGE_TITLES = {
+    "stage1": "Input Processing and Inspiration Identification",
+    "stage2": "Signal Amplification and Trend Extraction",
+    "stage3": "General Translation to Universal Lessons",
+    "stage4": "Brand Contextualization with Research Data",
+    "stage5": "Opportunity Generation Chain",
+}
+
+
+@dataclass
+class Node:
+    """A unit of work; fn is called with its inputs as keyword arguments."""
+    name: str
+    fn: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    checkpoint: bool = False
+
+
+@dataclass
+class NodeEvent:
+    """Passed to on_complete hooks."""
+    name: str
+    value: Any
+    elapsed: float
+    reused: bool = False  # Loaded from a checkpoint instead of computed
+
+
+@dataclass
+class DAGResult:
+    values: Dict[str, Any]
+    timings: Dict[str, float] = field(default_factory=dict)
+    reused: Set[str] = field(default_factory=set)
+
+
+class NodeFailed(Exception):
+    """A node raised; str() is the original error message."""
+
+    def __init__(self, node: str, error: BaseException):
+        super().__init__(str(error))
+        self.node = node
+        self.error = error
+
+
+class StageDAG:
+    """A set of nodes executed in dependency order."""
+
+    def __init__(self, nodes: Iterable[Node] = ()):
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            self._add_node(node)
+
+    def _add_node(self, node: Node) -> None:
+        if node.name in self.nodes:
+            raise ValueError(f"Duplicate DAG node: {node.name}")
+        self.nodes[node.name] = node
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        checkpoint: bool = False
+    ) -> "StageDAG":
+        """Add a node; returns self for chaining."""
+        self._add_node(Node(name, fn, tuple(inputs), checkpoint))
+        return self
+
+    def _plan(self, targets: Iterable[str], available: Set[str]) -> Set[str]:
+        """Nodes needed for targets, stopping at values already available."""
+        needed: Set[str] = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name in available:
+                continue
+            if name not in self.nodes:
+                raise ValueError(f"DAG input '{name}' is neither a node nor a context value")
+            needed.add(name)
+            stack.extend(self.nodes[name].inputs)
+        return needed
+
+    def run(
+        self,
+        context: Optional[Dict[str, Any]] = None,
+        targets: Optional[Iterable[str]] = None,
+        precomputed: Optional[Dict[str, Any]] = None,
+        on_start: Optional[Callable[[str], None]] = None,
+        on_complete: Optional[Callable[[NodeEvent], None]] = None,
+        checkpoint_dir: Optional[Path] = None,
+        resume: bool = False,
+        max_workers: int = 4
+    ) -> DAGResult:
+        """Execute the nodes needed for targets (default: all nodes).
+
+        Hooks run on the calling thread, in completion order; a node's
+        on_complete always runs before any node depending on it starts.
+
+        Args:
+            context: External input values (e.g. input_text)
+            targets: Nodes whose values are wanted
+            precomputed: Node values to use instead of running the node
+            on_start: Called with the node name before it is scheduled
+            on_complete: Called with a NodeEvent when a node finishes
+            checkpoint_dir: Directory for JSON checkpoints of nodes marked
+                checkpoint=True
+            resume: Reuse checkpoints already in checkpoint_dir
+            max_workers: Maximum nodes running at once
+
+        Returns:
+            DAGResult with all values, per-node timings and reused node names
+
+        Raises:
+            NodeFailed: If a node raises (after running nodes finish)
+            ValueError: For unknown inputs or cycles
+        """
+        values: Dict[str, Any] = {**(context or {}), **(precomputed or {})}
+        result = DAGResult(values)
+        pending = self._plan(targets if targets is not None else self.nodes, set(values))
+
+        if checkpoint_dir and resume:
+            for name in sorted(pending):
+                if self.nodes[name].checkpoint and (Path(checkpoint_dir) / f"{name}.json").exists():
+                    values[name] = json.loads((Path(checkpoint_dir) / f"{name}.json").read_text(encoding="utf-8"))
+                    result.reused.add(name)
+            pending -= result.reused
+            pending = self._plan(targets if targets is not None else self.nodes, set(values)) & pending
+            for name in sorted(result.reused):
+                logging.info(f"DAG: {name} restored from checkpoint")
+                if on_complete:
+                    on_complete(NodeEvent(name, values[name], 0.0, reused=True))
+
+        running: Dict[Any, Tuple[str, float]] = {}
+        failure: Optional[NodeFailed] = None
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dag") as executor:
+            while pending or running:
+                if failure is None:
+                    ready = sorted(
+                        name for name in pending
+                        if all(dep in values for dep in self.nodes[name].inputs)
+                    )
+                    for name in ready:
+                        pending.discard(name)
+                        if on_start:
+                            on_start(name)
+                        node = self.nodes[name]
+                        kwargs = {dep: values[dep] for dep in node.inputs}
+                        future = executor.submit(contextvars.copy_context().run, self._execute, node, kwargs)
+                        running[future] = (name, time.perf_counter())
+
+                if not running:
+                    if pending and failure is None:
+                        raise ValueError(f"DAG has a cycle among: {', '.join(sorted(pending))}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, started = running.pop(future)
+                    try:
+                        values[name] = future.result()
+                    except Exception as e:
+                        if failure is None:
+                            failure = NodeFailed(name, e)
+                        continue
+
+                    elapsed = time.perf_counter() - started
+                    result.timings[name] = elapsed
+                    if checkpoint_dir and self.nodes[name].checkpoint:
+                        self._save_checkpoint(Path(checkpoint_dir), name, values[name])
+                    if on_complete and failure is None:
+                        try:
+                            on_complete(NodeEvent(name, values[name], elapsed))
+                        except Exception as e:
+                            failure = NodeFailed(name, e)
+
+        if failure is not None:
+            raise failure from failure.error
+        return result
+
+    @staticmethod
+    def _execute(node: Node, kwargs: Dict[str, Any]) -> Any:
+        with span(f"dag.{node.name}", node=node.name):
+            return node.fn(**kwargs)
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_dir: Path, name: str, value: Any) -> None:
+        try:
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            path = checkpoint_dir / f"{name}.json"
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"DAG: could not checkpoint {name}: {e}")
+
+
+def run_fused_stages(chain: Callable[[int], Any], stage1_text: str) -> Dict[str, Any]:
+    """Run Stages 2 and 3 as one fused call on a Stage 1 output.
+
+    Falls back to the separate Stage 2 and Stage 3 chains if the fused
+    response can't be split.
+
+    Args:
+        chain: Returns the pooled chain for a stage number
+        stage1_text: Stage 1 output (or one track of it)
+
+    Returns:
+        Dictionary with stage2_output and stage3_output keys
+    """
+    try:
+        return get_chain_pool().get(create_stage23_chain).run(stage1_text)
+    except ValueError as e:
+        logging.warning(f"Fused Stages 2+3 failed ({e}), running them separately")
+        stage2_output = chain(2).run(stage1_text).get("stage2_output", "")
+        stage3_output = chain(3).run(stage1_text, stage2_output).get("stage3_output", "")
+        return {"stage2_output": stage2_output, "stage3_output": stage3_output}
+
+
+def build_stage_dag(
+    factories: Sequence[Callable[[], Any]],
+    semantic_cache=None,
+    force_recompute: bool = False,
+    cache_source: str = "",
+    track: Optional[int] = None,
+    fused: Optional[bool] = None
+) -> StageDAG:
+    """Declare the five pipeline stages.
+
+    Stage nodes return the stage's result dict (e.g. {"stage1_output": ...}).
+    Entry points supply input_text, brand_profile, research_data,
+    brand_name and input_source as context values or loader nodes.
+
+    Args:
+        factories: Five chain factories (classes or create_stageN_chain
+            functions) borrowed from the shared chain pool
+        semantic_cache: Optional SemanticStageCache for Stages 1-3
+        force_recompute: Skip the semantic cache lookup
+        cache_source: Run label stored with new cache entries
+        track: Run Stages 2-3 on this Stage 1 track only (dual-track
+            mode); cached Stages 2-3 cover both tracks, so only Stage 1
+            is served from the semantic cache
+        fused: Run Stages 2 and 3 as one call (default: STAGE23_FUSED)
+    """
+    if len(factories) != 5:
+        raise ValueError("build_stage_dag needs one chain factory per stage")
+
+    def chain(stage_num: int):
+        return get_chain_pool().get(factories[stage_num - 1])
+
+    def stage1_text(stage1) -> str:
+        output = stage1.get("stage1_output", "")
+        return output if track is None else Stage1Chain.track_output(output, track)
+
+    def cached(hit, stage_num: int) -> Dict[str, Any]:
+        key = f"stage{stage_num}_output"
+        return {key: hit.outputs[key], "semantic_cache": hit.provenance()}
+
+    def lookup(input_text):
+        if semantic_cache is None:
+            return None
+        try:
+            return semantic_cache.lookup(input_text, force_recompute)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Semantic cache lookup failed, running Stages 1-3: {e}")
+            return None
+
+    def stage1(input_text, semantic_cache_lookup):
+        if semantic_cache_lookup:
+            return cached(semantic_cache_lookup, 1)
+        return chain(1).run(input_text)
+
+    def stage2(stage1, semantic_cache_lookup):
+        if semantic_cache_lookup and track is None:
+            return cached(semantic_cache_lookup, 2)
+        return chain(2).run(stage1_text(stage1))
+
+    def stage3(stage1, stage2, semantic_cache_lookup):
+        if semantic_cache_lookup and track is None:
+            return cached(semantic_cache_lookup, 3)
+        return chain(3).run(stage1_text(stage1), stage2.get("stage2_output", ""))
+
+    def stage23(stage1, semantic_cache_lookup):
+        if semantic_cache_lookup and track is None:
+            return {**cached(semantic_cache_lookup, 2), **cached(semantic_cache_lookup, 3)}
+        return run_fused_stages(chain, stage1_text(stage1))
+
+    def fused_part(stage_num: int):
+        def part(stage23):
+            keys = (f"stage{stage_num}_output", "semantic_cache")
+            return {key: value for key, value in stage23.items() if key in keys}
+        return part
+
+    def store(input_text, stage1, stage2, stage3, semantic_cache_lookup):
+        if semantic_cache is None or semantic_cache_lookup or track is not None:
+            return False
+        try:
+            semantic_cache.store(input_text, {
+                "stage1_output": stage1.get("stage1_output", ""),
+                "stage2_output": stage2.get("stage2_output", ""),
+                "stage3_output": stage3.get("stage3_output", ""),
+            }, source=cache_source)
+            return True
+        except (OSError, ValueError) as e:
+            logging.warning(f"Failed to store Stages 1-3 in semantic cache: {e}")
+            return False
+
+    def stage4(stage3, brand_profile, research_data):
+        return chain(4).run(stage3.get("stage3_output", ""), brand_profile, research_data)
+
+    def stage5(stage4, brand_name, input_source):
+        return chain(5).run(stage4.get("stage4_output", ""), brand_name, input_source)
+
+    dag = (
+        StageDAG()
+        .add("semantic_cache_lookup", lookup, ["input_text"])
+        .add("stage1", stage1, ["input_text", "semantic_cache_lookup"], checkpoint=True)
+    )
+    if fused_stages_enabled(fused):
+        dag.add("stage23", stage23, ["stage1", "semantic_cache_lookup"])
+        dag.add("stage2", fused_part(2), ["stage23"], checkpoint=True)
+        dag.add("stage3", fused_part(3), ["stage23"], checkpoint=True)
+    else:
+        dag.add("stage2", stage2, ["stage1", "semantic_cache_lookup"], checkpoint=True)
+        dag.add("stage3", stage3, ["stage1", "stage2", "semantic_cache_lookup"], checkpoint=True)
+    return (
+        dag.add("semantic_cache_store", store, ["input_text", "stage1", "stage2", "stage3", "semantic_cache_lookup"])
+        .add("stage4", stage4, ["stage3", "brand_profile", "research_data"], checkpoint=True)
+        .add("stage5", stage5, ["stage4", "brand_name", "input_source"], checkpoint=True)
+    )
@@ -0,0 +1,334 @@
+"""
+Local embeddings for pipeline artifacts.
+
+Encodes Stage 1 inspirations, Stage 3 lessons and Stage 5 opportunities
+into unit-length vectors without LLM calls, so deduplication, retrieval
+and clustering can run locally.
+
+Embedders:
+    SentenceTransformerEmbedder  small CPU model (needs sentence-transformers)
+    HashingEmbedder              hashed word/bigram features (numpy only)
+
+get_embedding_service() picks the model named by EMBEDDING_MODEL
+(default all-MiniLM-L6-v2) and falls back to hashing when
+sentence-transformers is not installed or the model cannot be loaded;
+EMBEDDING_MODEL=hashing forces the fallback, and
+get_embedding_service("hashing") asks for it explicitly. Vectors are cached on disk
+by content hash in EMBEDDING_CACHE_DIR (default data/embedding-cache).
+
+Usage:
+    from pipeline.embeddings import get_embedding_service, stage3_lessons
+
+    service = get_embedding_service()
+    vectors = service.encode(stage3_lessons(stage3_output))
+    hits = service.search("loyalty program", vectors, k=3)
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_CACHE_DIR = "data/embedding-cache"
+HASHING_MODEL_ID = "hashing-v1"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and bigrams.
+
+    Deterministic across processes and machines (crc32, not hash()), so
+    cached vectors stay valid.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.model_id = f"{HASHING_MODEL_ID}-{dim}"
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_PATTERN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features)
+            )
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dim, signs)
+        # Sublinear term frequency, keeping each feature's sign
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Small sentence-transformers model on CPU."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, device: str = "cpu"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.model_id = model_name
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return vectors.astype(np.float32)
+
+
+class EmbeddingCache:
+    """Append-only on-disk cache of vectors keyed by content hash.
+
+    One JSONL file per model (hash + base64 float32 vector per line).
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], model_id: str):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id)
+        self.path = Path(cache_dir) / f"{slug}.jsonl"
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._vectors[record["h"]] = np.frombuffer(base64.b64decode(record["v"]), dtype=np.float32)
+                except (ValueError, KeyError):
+                    continue  # Partially written line
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self._vectors.get(key)
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            new = {k: v for k, v in items.items() if k not in self._vectors}
+            if not new:
+                return
+            self._vectors.update(new)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for key, vector in new.items():
+                    encoded = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+                    f.write(json.dumps({"h": key, "v": encoded}) + "\n")
+
+
+class EmbeddingService:
+    """Batch encoding with a content-hash cache and similarity search.
+
+    Args:
+        embedder: HashingEmbedder or SentenceTransformerEmbedder
+        cache_dir: Directory for cached vectors, or None to disable
+    """
+
+    def __init__(self, embedder=None, cache_dir: Optional[Union[str, Path]] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.cache = EmbeddingCache(cache_dir, self.embedder.model_id) if cache_dir else None
+
+    @property
+    def model_id(self) -> str:
+        return self.embedder.model_id
+
+    @property
+    def dim(self) -> int:
+        return self.embedder.dim
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        """Encode texts to an (n, dim) float32 matrix of unit vectors.
+
+        Cached texts are not re-encoded; the rest are encoded in batches
+        of batch_size and added to the cache.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        keys = [EmbeddingCache.key(t) for t in texts]
+
+        missing: Dict[str, List[int]] = {}
+        for row, key in enumerate(keys):
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                vectors[row] = cached
+            else:
+                missing.setdefault(key, []).append(row)
+
+        if missing:
+            pending = list(missing)
+            first_rows = [missing[key][0] for key in pending]
+            encoded = {}
+            for start in range(0, len(pending), batch_size):
+                batch_rows = first_rows[start:start + batch_size]
+                batch = self.embedder.encode([texts[r] for r in batch_rows], batch_size=batch_size)
+                for key, vector in zip(pending[start:start + batch_size], batch):
+                    encoded[key] = vector
+                    vectors[missing[key]] = vector
+            if self.cache is not None:
+                self.cache.put_many(encoded)
+            logging.debug(f"Embeddings: {len(texts) - sum(map(len, missing.values()))} cached, {len(pending)} encoded")
+
+        return vectors
+
+    def similarity_matrix(self, a: Sequence[str], b: Sequence[str]) -> np.ndarray:
+        """Cosine similarity between every text in a and every text in b."""
+        return self.encode(a) @ self.encode(b).T
+
+    def search(
+        self,
+        query: Union[str, np.ndarray],
+        corpus: Union[Sequence[str], np.ndarray],
+        k: int = 5
+    ) -> List[Tuple[int, float]]:
+        """Return the k most similar corpus entries as (index, cosine) pairs.
+
+        Args:
+            query: Query text or vector
+            corpus: Texts, or an (n, dim) matrix from encode()
+            k: Number of results
+        """
+        query_vector = self.encode([query])[0] if isinstance(query, str) else np.asarray(query, dtype=np.float32)
+        corpus_vectors = corpus if isinstance(corpus, np.ndarray) else self.encode(corpus)
+        if len(corpus_vectors) == 0:
+            return []
+
+        scores = corpus_vectors @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def deduplicate(self, texts: Sequence[str], threshold: float = 0.9) -> List[int]:
+        """Indices of texts to keep, dropping later near-duplicates of earlier ones."""
+        vectors = self.encode(texts)
+        similarity = vectors @ vectors.T
+        kept: List[int] = []
+        for i in range(len(texts)):
+            if not kept or similarity[i, kept].max() < threshold:
+                kept.append(i)
+        return kept
+
+
+# ---------------------------------------------------------------------------
+# Artifact extraction
+# ---------------------------------------------------------------------------
+
+def markdown_sections(markdown: str, level: int = 2) -> List[Tuple[str, str]]:
+    """Split markdown into (heading, body) pairs at headings of the given level."""
+    pattern = re.compile(rf"^{'#' * level} +(.+?)\s*$", re.MULTILINE)
+    matches = list(pattern.finditer(markdown))
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(markdown)
+        body = markdown[match.end():end].strip().rstrip("-").strip()
+        sections.append((match.group(1).strip(), body))
+    return sections
+
+
+def stage1_inspirations(stage1_output: str) -> List[str]:
+    """Inspiration texts from Stage 1 ('## Track N: title' sections)."""
+    sections = markdown_sections(stage1_output)
+    tracks = [s for s in sections if s[0].lower().startswith("track")]
+    return [f"{heading}\n{body}" for heading, body in (tracks or sections)]
+
+
+def stage3_lessons(stage3_output: str) -> List[str]:
+    """Universal lesson texts from Stage 3 ('## N. title' sections)."""
+    sections = markdown_sections(stage3_output)
+    lessons = [s for s in sections if re.match(r"\d+\.", s[0])]
+    return [f"{heading}\n{body}" for heading, body in (lessons or sections)]
+
+
+def stage5_opportunities(opportunities: Sequence[Dict]) -> List[str]:
+    """Opportunity texts (title + description) from Stage 5 results."""
+    return [f"{o.get('title', '')}\n{o.get('description', '')}" for o in opportunities]
+
+
+def load_run_artifacts(run_dir: Union[str, Path]) -> Dict[str, List[str]]:
+    """Read embeddable artifacts from a saved pipeline run directory.
+
+    Returns:
+        {"inspirations": [...], "lessons": [...], "opportunities": [...]}
+        (missing stages give empty lists)
+    """
+    run_dir = Path(run_dir)
+    artifacts = {"inspirations": [], "lessons": [], "opportunities": []}
+
+    stage1_file = run_dir / "stage1" / "inspiration-analysis.md"
+    if stage1_file.exists():
+        artifacts["inspirations"] = stage1_inspirations(stage1_file.read_text(encoding="utf-8"))
+
+    stage3_file = run_dir / "stage3" / "universal-lessons.md"
+    if stage3_file.exists():
+        artifacts["lessons"] = stage3_lessons(stage3_file.read_text(encoding="utf-8"))
+
+    for card in sorted((run_dir / "stage5").glob("opportunity-*.md")):
+        content = card.read_text(encoding="utf-8")
+        title = re.search(r"^# (.+)$", content, re.MULTILINE)
+        description = re.search(r"## Description\n\n(.+?)(?=\n##|$)", content, re.DOTALL)
+        artifacts["opportunities"].append(
+            f"{title.group(1) if title else ''}\n{description.group(1).strip() if description else ''}"
+        )
+
+    return artifacts
+
+
+# ---------------------------------------------------------------------------
+# Shared service
+# ---------------------------------------------------------------------------
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def create_embedder(model_name: Optional[str] = None):
+    """Build the configured embedder, falling back to hashing."""
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    if model_name.startswith("hashing"):
+        return HashingEmbedder()
+
+    try:
+        return SentenceTransformerEmbedder(model_name)
+    except ImportError:
+        logging.info("sentence-transformers not installed; using hashed n-gram embeddings")
+    except Exception as e:
+        logging.warning(f"Could not load embedding model {model_name}: {e}; using hashed n-gram embeddings")
+    return HashingEmbedder()
+
+
+def get_embedding_service(model_name: Optional[str] = None) -> EmbeddingService:
+    """Process-wide EmbeddingService for model_name (default: EMBEDDING_MODEL)."""
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            cache_dir = os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+            service = EmbeddingService(create_embedder(model_name), cache_dir=cache_dir or None)
+            _services[model_name] = service
+            logging.info(f"Embedding service ready: {service.model_id} (cache: {cache_dir or 'disabled'})")
+        return service
@@ -0,0 +1,249 @@
+"""
+Per-stage model routing.
+
+By default every stage uses LLM_MODEL on OpenRouter. A routing file
+(LLM_ROUTING_CONFIG) maps stages to a model and fallback chain, so the
+extraction stages can run on a faster model than Stage 5's creative
+generation. Models can be served by other OpenAI-compatible endpoints,
+e.g. a local vLLM or Ollama server:
+
+    endpoints:
+      local:
+        base_url: http://localhost:11434/v1
+        api_key_env: LOCAL_LLM_API_KEY      # optional
+    stages:
+      stage1:
+        models: [openai/gpt-4o-mini, deepseek/deepseek-chat]
+      stage2:
+        models: [local:qwen2.5:14b, openai/gpt-4o-mini]
+        max_tokens: 2500                    # optional, default from _create_chain
+      stage5:
+        models: [anthropic/claude-sonnet-4.5]
+        temperature: 0.8
+
+A model named "endpoint:model" is served by that endpoint; other names go
+to OpenRouter. When a model fails (after the client's own retries), the
+next model in the chain gets the call. Unlisted stages use LLM_MODEL.
+Each client call runs under call_with_deadline() (timeouts, retries and
+the run's deadline; see pipeline/deadlines.py); once the stage's deadline
+has passed, no fallback is tried.
+
+Routes can be overridden per run (CLI --route, or model_routes on
+POST /run) with route_overrides(); stage chains are pooled, so the route
+is resolved on every call rather than when the chain is built.
+
+scripts/routing_report.py compares per-stage latency and cost by model.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import yaml
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from .deadlines import DeadlineExceeded, call_with_deadline
+from .instrumentation import current_stage, record_retry
+
+
+RouteSpec = Union[str, Sequence[str]]
+
+_overrides: contextvars.ContextVar[Mapping[str, List[str]]] = contextvars.ContextVar(
+    "model_route_overrides", default={}
+)
+
+
+@dataclass
+class Endpoint:
+    """An OpenAI-compatible API (None api_key: no key needed)."""
+    base_url: str
+    api_key: Optional[str] = None
+
+
+@dataclass
+class Route:
+    """Model chain and generation settings for one stage."""
+    stage: str
+    models: List[str]
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+
+@dataclass
+class RoutingConfig:
+    """Stage routes and extra endpoints from a routing file."""
+    routes: Dict[str, Route] = field(default_factory=dict)
+    endpoints: Dict[str, Endpoint] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "RoutingConfig":
+        """Parse a routing YAML file.
+
+        Raises:
+            ValueError: If a stage lists no models
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+
+        endpoints = {
+            name: Endpoint(
+                base_url=spec["base_url"],
+                api_key=os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None
+            )
+            for name, spec in (data.get("endpoints") or {}).items()
+        }
+        config = cls(endpoints=endpoints)
+        for stage, spec in (data.get("stages") or {}).items():
+            models = _as_models(spec.get("models") or spec.get("model"))
+            if not models:
+                raise ValueError(f"Routing for {stage} lists no models")
+            config.routes[stage] = Route(stage, models, spec.get("temperature"), spec.get("max_tokens"))
+        return config
+
+    def route(self, stage: Optional[str], default_model: str) -> Route:
+        """Route for stage, with this run's overrides applied."""
+        override = _overrides.get().get(stage or "")
+        base = self.routes.get(stage or "") or Route(stage or "unattributed", [default_model])
+        if override:
+            return Route(base.stage, list(override), base.temperature, base.max_tokens)
+        return base
+
+
+def _as_models(spec: Optional[RouteSpec]) -> List[str]:
+    if not spec:
+        return []
+    if isinstance(spec, str):
+        return [model.strip() for model in spec.split(",") if model.strip()]
+    return [str(model) for model in spec]
+
+
+def split_model(model: str, endpoints: Mapping[str, Endpoint]) -> Tuple[Optional[Endpoint], str]:
+    """Split "endpoint:model" into (endpoint, model); OpenRouter models give (None, model)."""
+    prefix, _, name = model.partition(":")
+    if name and prefix in endpoints:
+        return endpoints[prefix], name
+    return None, model
+
+
+def parse_route_overrides(values: Union[Sequence[str], Mapping[str, RouteSpec], None]) -> Dict[str, List[str]]:
+    """Normalize overrides from CLI values ("stage1=model-a,model-b") or a mapping.
+
+    Raises:
+        ValueError: For a CLI value without "stage=models"
+    """
+    if not values:
+        return {}
+    if isinstance(values, Mapping):
+        return {stage: _as_models(spec) for stage, spec in values.items() if _as_models(spec)}
+
+    overrides = {}
+    for value in values:
+        stage, sep, models = value.partition("=")
+        if not sep or not _as_models(models):
+            raise ValueError(f"Route override must look like stage1=model[,fallback]: {value!r}")
+        overrides[stage.strip()] = _as_models(models)
+    return overrides
+
+
+@contextmanager
+def route_overrides(overrides: Optional[Mapping[str, List[str]]]) -> Iterator[None]:
+    """Route stages to other models for the calls made inside this block."""
+    token = _overrides.set(dict(overrides or {}))
+    try:
+        yield
+    finally:
+        _overrides.reset(token)
+
+
+_config: Optional[RoutingConfig] = None
+_config_lock = threading.Lock()
+
+# Clients shared by every routed model, keyed by (model, base_url, temperature, max_tokens)
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_routing_config() -> RoutingConfig:
+    """Routing from LLM_ROUTING_CONFIG (empty config if unset)."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            path = os.getenv("LLM_ROUTING_CONFIG")
+            _config = RoutingConfig.load(Path(path)) if path else RoutingConfig()
+            if path:
+                for route in _config.routes.values():
+                    logging.info(f"Model routing: {route.stage} -> {' -> '.join(route.models)}")
+        return _config
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that picks its model per call from the stage's route.
+
+    Attributes:
+        stage: Stage this model serves (default: the current stage)
+        temperature: Default temperature (from the stage's _create_chain)
+        max_tokens: Default max_tokens (from the stage's _create_chain)
+        default_model: Model for stages without a route (LLM_MODEL)
+        client_factory: Builds a client for (model, endpoint, temperature, max_tokens)
+    """
+
+    stage: Optional[str] = None
+    temperature: float = 0.5
+    max_tokens: int = 4000
+    default_model: str
+    client_factory: Callable[..., Any]
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-chat"
+
+    def _client(self, model: str, endpoint: Optional[Endpoint], temperature: float, max_tokens: int) -> Any:
+        key = (model, endpoint.base_url if endpoint else None, temperature, max_tokens)
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = self.client_factory(model, endpoint, temperature, max_tokens)
+            return client
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        config = get_routing_config()
+        route = config.route(self.stage or current_stage(), self.default_model)
+        temperature = route.temperature if route.temperature is not None else self.temperature
+        max_tokens = route.max_tokens or self.max_tokens
+
+        error: Optional[Exception] = None
+        for position, model in enumerate(route.models):
+            endpoint, name = split_model(model, config.endpoints)
+            client = self._client(name, endpoint, temperature, max_tokens)
+            try:
+                result = call_with_deadline(
+                    lambda timeout: client._generate(messages, stop=stop, run_manager=run_manager, timeout=timeout, **kwargs),
+                    f"{route.stage} {model}"
+                )
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                error = error or e
+                if position + 1 < len(route.models):
+                    logging.warning(f"{route.stage}: {model} failed ({e}), falling back to {route.models[position + 1]}")
+                    record_retry("model_fallback", f"{model}: {e}")
+                continue
+            llm_output = dict(result.llm_output or {})
+            llm_output.setdefault("model_name", name)
+            llm_output["routed_model"] = model
+            return ChatResult(generations=result.generations, llm_output=llm_output)
+        raise error
@@ -0,0 +1,279 @@
+"""
+Near-duplicate detection for opportunity cards (MinHash + LSH).
+
+Each opportunity description is reduced to a MinHash signature over word
+shingles. Signatures are split into bands and bucketed, so looking up the
+cards that are likely to be ≥0.8 Jaccard-similar to a new card touches
+only the cards sharing a bucket instead of the whole history.
+
+The index is persisted as append-only JSONL (one card per line with a
+base64 signature). New cards are appended, and refresh() picks up lines
+appended by other processes since the last read, so batch runs and the
+backend can share one history file.
+
+Usage:
+    from pipeline.novelty_index import get_history_index, index_cards
+
+    index = get_history_index("data/novelty-index.jsonl")
+    matches = index.query(description)           # [(key, jaccard), ...]
+    score = index.novelty(description)           # 1.0 = nothing similar seen
+    index_cards(index, [{"path": card_path, "description": description, ...}])
+"""
+
+import base64
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .jsonl_log import AppendOnlyJsonl
+
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16  # 16 bands x 8 rows: candidate threshold ~0.71 Jaccard
+DEFAULT_SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+# Universal hashing modulo a Mersenne prime; a * x stays below 2**62 for
+# 31-bit inputs, so the arithmetic fits in uint64 without overflow
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 31) - 1)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> List[str]:
+    """Word n-gram shingles of normalized text (whole text if shorter than size)."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+class MinHasher:
+    """Compute fixed-length MinHash signatures with numpy."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return a (num_perm,) uint32 signature; all-max for empty text."""
+        values = {zlib.crc32(s.encode("utf-8")) & 0x7FFFFFFF for s in shingles(text, self.shingle_size)}
+        if not values:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+
+        hashed = np.fromiter(values, dtype=np.uint64, count=len(values))
+        permuted = (hashed[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NoveltyIndex:
+    """MinHash LSH index over opportunity descriptions.
+
+    Args:
+        path: Optional JSONL file to load from and append to
+        num_perm: Signature length
+        bands: Number of LSH bands (must divide num_perm)
+    """
+
+    def __init__(self, path: Optional[Path] = None, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+
+        self.path = Path(path) if path else None
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        self.keys: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._count = 0
+        self._buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(bands)]
+        self._lock = threading.Lock()
+        self._log = AppendOnlyJsonl(self.path, "novelty index") if self.path else None
+
+        if self._log:
+            self.refresh()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def get_metadata(self, key: str) -> Dict[str, Any]:
+        """Metadata stored with an indexed card."""
+        return self.metadata[self._positions[key]]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, key: str, signature: np.ndarray, metadata: Dict[str, Any]) -> None:
+        if self._count == len(self._signatures):
+            grown = np.empty((max(64, 2 * self._count), self.hasher.num_perm), dtype=np.uint32)
+            grown[:self._count] = self._signatures[:self._count]
+            self._signatures = grown
+
+        position = self._count
+        self._signatures[position] = signature
+        self._count += 1
+        self.keys.append(key)
+        self.metadata.append(metadata)
+        self._positions[key] = position
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(position)
+
+    def refresh(self) -> int:
+        """Load cards appended to the history file since the last read.
+
+        Returns:
+            Number of cards loaded
+        """
+        if not self._log:
+            return 0
+
+        loaded = 0
+        with self._lock:
+            for record in self._log.read_new():
+                try:
+                    signature = np.frombuffer(base64.b64decode(record["sig"]), dtype=np.uint32)
+                    key = record["key"]
+                except (ValueError, KeyError) as e:
+                    logging.warning(f"Skipping malformed novelty index line: {e}")
+                    continue
+                if key in self._positions or len(signature) != self.hasher.num_perm:
+                    continue
+                self._insert(key, signature, record.get("meta", {}))
+                loaded += 1
+
+        return loaded
+
+    def add(self, key: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Index a card and append it to the history file.
+
+        Returns:
+            False if the key was already indexed
+        """
+        signature = self.hasher.signature(text)
+        metadata = metadata or {}
+
+        with self._lock:
+            if key in self._positions:
+                return False
+            self._insert(key, signature, metadata)
+
+            if self._log:
+                self._log.append({
+                    "key": key,
+                    "sig": base64.b64encode(signature.tobytes()).decode("ascii"),
+                    "meta": metadata,
+                })
+
+        return True
+
+    def query(self, text: str, threshold: float = DEFAULT_THRESHOLD, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return indexed cards with estimated Jaccard similarity >= threshold.
+
+        Only cards sharing at least one LSH bucket with the query are
+        compared, so the cost depends on the number of candidates rather
+        than the size of the history.
+
+        Args:
+            text: Card description
+            threshold: Minimum estimated Jaccard similarity
+            exclude: Optional key to leave out (the card itself)
+
+        Returns:
+            (key, similarity) pairs, most similar first
+        """
+        signature = self.hasher.signature(text)
+        candidates = self._candidates(signature)
+        if exclude in self._positions:
+            candidates.discard(self._positions[exclude])
+        if not candidates:
+            return []
+
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[positions] == signature).mean(axis=1)
+        order = np.argsort(-similarity, kind="stable")
+        return [
+            (self.keys[positions[i]], float(similarity[i]))
+            for i in order if similarity[i] >= threshold
+        ]
+
+    def _candidates(self, signature: np.ndarray) -> set:
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
+
+    def novelty(self, text: str, exclude: Optional[str] = None) -> float:
+        """Novelty versus history: 1 - similarity of the closest LSH candidate.
+
+        Cards that share no bucket with any indexed card score 1.0.
+        """
+        matches = self.query(text, threshold=0.0, exclude=exclude)
+        return 1.0 - matches[0][1] if matches else 1.0
+
+
+def card_key(path: Union[str, Path]) -> str:
+    """History key for a saved opportunity card (its absolute path).
+
+    Stage 5 and scripts/update_novelty_index.py both key cards this way,
+    so each card is indexed once whichever of them sees it first.
+    """
+    return os.path.abspath(path)
+
+
+def index_cards(index: NoveltyIndex, cards: Iterable[Dict[str, Any]]) -> int:
+    """Add saved cards missing from the index; returns the number added.
+
+    Args:
+        index: History index
+        cards: Dicts with path, description, title, brand (brand id) and input_source
+    """
+    added = 0
+    for card in cards:
+        added += index.add(card_key(card["path"]), card["description"], {
+            "title": card["title"],
+            "brand": card["brand"],
+            "input_source": card["input_source"],
+        })
+    return added
+
+
+_indexes: Dict[str, NoveltyIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_history_index(path: Optional[str] = None) -> Optional[NoveltyIndex]:
+    """Return the shared history index for path (default: NOVELTY_INDEX_PATH).
+
+    Returns None when no path is configured. The index is loaded once per
+    process and refreshed with cards appended by other processes.
+    """
+    path = path or os.getenv("NOVELTY_INDEX_PATH")
+    if not path:
+        return None
+
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = NoveltyIndex(Path(path))
+            logging.info(f"Novelty index loaded: {len(index)} cards from {path}")
+            return index
+
+    index.refresh()
+    return index
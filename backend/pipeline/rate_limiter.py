@@ -0,0 +1,341 @@
+"""
+Shared rate limiter for OpenRouter requests.
+
+Concurrent web runs and batch jobs share one OpenRouter key. Without
+coordination, load turns into 429 bursts and failed runs. When
+LLM_RATE_LIMIT_RPM and/or LLM_RATE_LIMIT_TPM are set, create_llm() sends
+every request through a RateLimitedTransport, which:
+
+- waits for a requests/minute and a tokens/minute token bucket (tokens are
+  estimated from the prompt plus max_tokens, then corrected from the
+  response's usage);
+- serves waiting callers in FIFO order, so a long prompt is not starved by
+  a stream of short ones;
+- on a 429 pauses every caller for the Retry-After period and retries the
+  request itself, so a burst costs a short wait instead of a failed stage;
+- never waits past the current stage's deadline (pipeline/deadlines.py):
+  the wait and the Retry-After pauses are outside the request timeout, so
+  a caller that can't be served in time raises DeadlineExceeded instead.
+
+A 429 still returned after these retries is marked so call_with_deadline()
+doesn't retry it again on top.
+
+The buckets are per process by default. Set LLM_RATE_LIMIT_DB to a SQLite
+file to share them across worker processes on the same host (FIFO order
+is then per process; processes take turns through the database lock).
+
+Configuration:
+    LLM_RATE_LIMIT_RPM          Requests per minute (unset: unlimited)
+    LLM_RATE_LIMIT_TPM          Tokens per minute (unset: unlimited)
+    LLM_RATE_LIMIT_DB           SQLite file for cross-process buckets
+    LLM_RATE_LIMIT_MAX_RETRIES  Retries after a 429 (default 5)
+"""
+
+import email.utils
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Optional, Tuple
+
+import httpx
+
+from .deadlines import TRANSPORT_RETRIED_429, DeadlineExceeded, current_deadline
+from .instrumentation import REGISTRY, current_stage, estimate_tokens, record_retry, span
+
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_AFTER_S = 5.0
+
+
+class _LocalBuckets:
+    """In-process bucket state."""
+
+    def __init__(self, rpm: Optional[float], tpm: Optional[float]):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = rpm or 0.0
+        self._tokens = tpm or 0.0
+        self._updated = self._now()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def reserve(self, tokens: int) -> float:
+        """Take a request slot and tokens, or return seconds to wait."""
+        with self._lock:
+            state = (self._requests, self._tokens, self._updated, self._paused_until)
+            wait_s, state = _reserve(self.rpm, self.tpm, state, tokens, self._now())
+            self._requests, self._tokens, self._updated, self._paused_until = state
+            return wait_s
+
+    def adjust(self, tokens: int) -> None:
+        with self._lock:
+            self._tokens -= tokens
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._now() + seconds)
+
+
+class _SQLiteBuckets:
+    """Bucket state in a SQLite row, shared by every process using the file."""
+
+    def __init__(self, path: Path, rpm: Optional[float], tpm: Optional[float]):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        try:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(id INTEGER PRIMARY KEY, requests REAL, tokens REAL, updated REAL, paused_until REAL)"
+            )
+            db.execute(
+                "INSERT OR IGNORE INTO buckets VALUES (1, ?, ?, ?, 0)",
+                (rpm or 0.0, tpm or 0.0, self._now())
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    def _now() -> float:
+        return time.time()  # Comparable across processes
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _update(self, fn) -> float:
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            state = db.execute("SELECT requests, tokens, updated, paused_until FROM buckets WHERE id = 1").fetchone()
+            result, state = fn(state)
+            db.execute(
+                "UPDATE buckets SET requests = ?, tokens = ?, updated = ?, paused_until = ? WHERE id = 1",
+                state
+            )
+            db.execute("COMMIT")
+            return result
+        finally:
+            db.close()
+
+    def reserve(self, tokens: int) -> float:
+        return self._update(lambda state: _reserve(self.rpm, self.tpm, state, tokens, self._now()))
+
+    def adjust(self, tokens: int) -> None:
+        self._update(lambda state: (0.0, (state[0], state[1] - tokens, state[2], state[3])))
+
+    def pause(self, seconds: float) -> None:
+        until = self._now() + seconds
+        self._update(lambda state: (0.0, (state[0], state[1], state[2], max(state[3], until))))
+
+
+def _reserve(
+    rpm: Optional[float],
+    tpm: Optional[float],
+    state: Tuple[float, float, float, float],
+    tokens: int,
+    now: float
+) -> Tuple[float, Tuple[float, float, float, float]]:
+    """Refill both buckets, then take one request and tokens if available.
+
+    Returns:
+        (seconds to wait, 0 if reserved; new state)
+    """
+    requests, available, updated, paused_until = state
+    elapsed = max(0.0, now - updated)
+    if rpm:
+        requests = min(rpm, requests + elapsed * rpm / 60)
+    if tpm:
+        available = min(tpm, available + elapsed * tpm / 60)
+        tokens = min(tokens, tpm)  # A request larger than the bucket waits for a full one
+    state = (requests, available, now, paused_until)
+
+    waits = [paused_until - now]
+    if rpm and requests < 1:
+        waits.append((1 - requests) * 60 / rpm)
+    if tpm and available < tokens:
+        waits.append((tokens - available) * 60 / tpm)
+    wait_s = max(waits)
+    if wait_s > 0:
+        return wait_s, state
+
+    return 0.0, (requests - 1 if rpm else requests, available - tokens if tpm else available, now, paused_until)
+
+
+class RateLimiter:
+    """FIFO-fair requests/minute and tokens/minute limiter.
+
+    Args:
+        rpm: Requests per minute (None: unlimited)
+        tpm: Tokens per minute (None: unlimited)
+        db_path: SQLite file to share the buckets across processes
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None, db_path: Optional[Path] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._buckets = _SQLiteBuckets(db_path, rpm, tpm) if db_path else _LocalBuckets(rpm, tpm)
+        self._queue: Deque[object] = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """Block until this caller's turn and budget come; returns seconds waited.
+
+        Raises:
+            DeadlineExceeded: If the turn can't come within timeout seconds
+        """
+        ticket = object()
+        started = time.monotonic()
+        expires = started + timeout if timeout is not None else None
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    left = expires - time.monotonic() if expires is not None else None
+                    if self._queue[0] is ticket:
+                        wait_s = self._buckets.reserve(tokens)
+                        if wait_s <= 0:
+                            break
+                        if left is not None and wait_s > left:
+                            raise DeadlineExceeded(f"rate limit wait of {wait_s:.1f}s exceeds the {max(0.0, left):.1f}s left")
+                        self._cond.wait(timeout=min(wait_s, 1.0))
+                    else:
+                        if left is not None and left <= 0:
+                            raise DeadlineExceeded("deadline passed while queued for the rate limiter")
+                        self._cond.wait(timeout=left)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+        return time.monotonic() - started
+
+    def adjust(self, tokens: int) -> None:
+        """Charge (or refund, if negative) tokens after the actual usage is known."""
+        if self.tpm and tokens:
+            self._buckets.adjust(tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for seconds (a 429's Retry-After)."""
+        self._buckets.pause(seconds)
+        with self._cond:
+            self._cond.notify_all()
+
+
+def parse_retry_after(response: httpx.Response) -> float:
+    """Seconds from a Retry-After header (delay or HTTP date), with a default."""
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return DEFAULT_RETRY_AFTER_S
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER_S
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Prompt tokens plus max_tokens of a chat completion request."""
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        return 0
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    return estimate_tokens(prompt) + int(body.get("max_tokens") or 0)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """httpx transport metering requests through a RateLimiter."""
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        transport: Optional[httpx.BaseTransport] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES
+    ):
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        estimated = estimate_request_tokens(request)
+        deadline = current_deadline()
+        stage = current_stage()
+        for attempt in range(self.max_retries + 1):
+            left = deadline.stage_remaining(stage) if deadline is not None else None
+            with span("rate_limit_wait", kind="queue", tokens=estimated) as attrs:
+                try:
+                    waited = self.limiter.acquire(estimated, timeout=left)
+                except DeadlineExceeded as e:
+                    raise DeadlineExceeded(f"{stage or 'run'}: {e}") from None
+                attrs["wait_s"] = round(waited, 3)
+            REGISTRY.observe("pipeline_llm_rate_limit_wait_seconds", waited, "Time LLM requests waited for the rate limiter")
+
+            request.read()
+            response = self.transport.handle_request(request)
+            if response.status_code != 429:
+                break
+            if attempt == self.max_retries:
+                response.extensions[TRANSPORT_RETRIED_429] = True
+                break
+
+            retry_after = parse_retry_after(response)
+            response.close()
+            self.limiter.adjust(-estimated)  # Rejected requests use no tokens
+            logging.warning(f"OpenRouter 429: pausing LLM requests for {retry_after:.1f}s")
+            record_retry("rate_limit", f"429, retry after {retry_after:.1f}s")
+            self.limiter.pause(retry_after)
+
+        if response.status_code == 200 and response.headers.get("content-type", "").startswith("application/json"):
+            response.read()
+            try:
+                usage = json.loads(response.content).get("usage") or {}
+                if usage.get("total_tokens"):
+                    self.limiter.adjust(int(usage["total_tokens"]) - estimated)
+            except (ValueError, AttributeError):
+                pass
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def get_rate_limited_http_client() -> Optional[httpx.Client]:
+    """Process-wide HTTP client for LLM calls, or None if no limit is set."""
+    global _http_client
+    rpm = float(os.getenv("LLM_RATE_LIMIT_RPM") or 0) or None
+    tpm = float(os.getenv("LLM_RATE_LIMIT_TPM") or 0) or None
+    if rpm is None and tpm is None:
+        return None
+
+    with _http_client_lock:
+        if _http_client is None:
+            db_path = os.getenv("LLM_RATE_LIMIT_DB")
+            limiter = RateLimiter(rpm, tpm, Path(db_path) if db_path else None)
+            max_retries = int(os.getenv("LLM_RATE_LIMIT_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+            _http_client = httpx.Client(
+                transport=RateLimitedTransport(limiter, max_retries=max_retries),
+                timeout=httpx.Timeout(600.0, connect=10.0)
+            )
+            logging.info(f"LLM rate limit: {rpm or 'unlimited'} requests/min, {tpm or 'unlimited'} tokens/min")
+        return _http_client
@@ -15,6 +15,7 @@ from typing import Dict, Any
 from langchain.chains import LLMChain
 
 from ..prompts.stage1_prompt import get_prompt_template
+from ..instrumentation import instrument_stage
 from ..utils import create_llm
 
 
@@ -44,7 +45,7 @@ class Stage1Chain:
             ValueError: If OpenRouter API key or base URL not configured
         """
         # Create LLM using centralized configuration (model from .env)
-        llm = create_llm(temperature=0.3, max_tokens=2500)
+        llm = create_llm(temperature=0.3, max_tokens=2500, stage="stage1")
 
         # Get prompt template
         prompt = get_prompt_template()
@@ -59,6 +60,7 @@ class Stage1Chain:
         logging.info("Stage 1 chain created successfully")
         return chain
 
+    @instrument_stage("stage1")
     def run(self, input_text: str) -> Dict[str, Any]:
         """Execute Stage 1 chain on input text.
 
@@ -83,11 +85,13 @@ class Stage1Chain:
             logging.error(f"Stage 1 execution failed: {e}", exc_info=True)
             raise
 
-    def save_output(self, output: str, output_dir: Path, selected_track: int = 1) -> Path:
+    @staticmethod
+    def save_output(output: str, output_dir: Path, selected_track: int = 1) -> Path:
         """Save Stage 1 output to markdown and JSON files.
 
         This saves both the full markdown analysis AND a JSON file with
         the top 2 selected tracks for use in the web UI horizontal pipeline.
+        Static so cached outputs can be written without building an LLM client.
 
         Args:
             output: Stage 1 analysis text
@@ -111,13 +115,13 @@ class Stage1Chain:
             logging.info(f"Stage 1 output saved: {output_file}")
 
             # Parse and save JSON for web UI (top 2 tracks only)
-            tracks = self._parse_tracks(output)
+            tracks = Stage1Chain._parse_tracks(output)
             json_file = stage1_dir / "inspirations.json"
 
             json_data = {
                 "selected_track": selected_track,  # Single selected track (1 or 2)
-                "track_1": tracks[0] if len(tracks) > 0 else self._empty_track(1),
-                "track_2": tracks[1] if len(tracks) > 1 else self._empty_track(2),
+                "track_1": tracks[0] if len(tracks) > 0 else Stage1Chain._empty_track(1),
+                "track_2": tracks[1] if len(tracks) > 1 else Stage1Chain._empty_track(2),
                 "completed_at": datetime.now().isoformat()
             }
 
@@ -130,7 +134,8 @@ class Stage1Chain:
             logging.error(f"Failed to save Stage 1 output: {e}")
             raise
 
-    def _parse_tracks(self, output: str) -> list:
+    @staticmethod
+    def _parse_tracks(output: str) -> list:
         """Extract top 2 inspiration tracks from LLM markdown output.
 
         Expected format:
@@ -163,7 +168,38 @@ class Stage1Chain:
 
         return tracks
 
-    def _empty_track(self, track_num: int) -> dict:
+    @staticmethod
+    def track_output(output: str, track_num: int) -> str:
+        """Stage 1 output narrowed to one inspiration track.
+
+        Keeps the analysis outside the "## Track N:" sections and drops the
+        other tracks, so Stages 2-5 can explore a single track. Returns the
+        output unchanged if the track is not found.
+
+        Args:
+            output: Markdown output from LLM
+            track_num: Track to keep (1 or 2)
+
+        Returns:
+            Markdown with only the selected track section
+        """
+        import re
+
+        sections = re.split(r'(?m)^(?=## )', output)
+        track_heading = re.compile(r'## Track (\d+):')
+        kept = []
+        found = False
+        for section in sections:
+            match = track_heading.match(section)
+            if match and int(match.group(1)) != track_num:
+                continue
+            found = found or bool(match)
+            kept.append(section)
+
+        return "".join(kept) if found else output
+
+    @staticmethod
+    def _empty_track(track_num: int) -> dict:
         """Generate empty track placeholder if parsing fails.
 
         Args:
@@ -13,6 +13,7 @@ from typing import Dict, Any
 from langchain.chains import LLMChain
 
 from ..prompts.stage3_prompt import get_prompt_template
+from ..instrumentation import instrument_stage
 from ..utils import create_llm
 
 
@@ -42,7 +43,7 @@ class Stage3Chain:
             ValueError: If OpenRouter API key or base URL not configured
         """
         # Create LLM using centralized configuration (model from .env)
-        llm = create_llm(temperature=0.5, max_tokens=3500)
+        llm = create_llm(temperature=0.5, max_tokens=3500, stage="stage3")
 
         # Get prompt template
         prompt = get_prompt_template()
@@ -57,6 +58,7 @@ class Stage3Chain:
         logging.info("Stage 3 chain created successfully")
         return chain
 
+    @instrument_stage("stage3")
     def run(self, stage1_output: str, stage2_output: str) -> Dict[str, Any]:
         """Execute Stage 3 chain on Stage 1 and Stage 2 outputs.
 
@@ -115,7 +117,8 @@ class Stage3Chain:
             logging.error(f"Stage 3 execution failed: {e}", exc_info=True)
             raise
 
-    def save_output(self, output: str, output_dir: Path) -> Path:
+    @staticmethod
+    def save_output(output: str, output_dir: Path) -> Path:
         """Save Stage 3 output to file.
 
         Args:
@@ -0,0 +1,303 @@
+"""
+Deterministic condensation of extracted input text (runs before Stage 1).
+
+pypdf's extract_text() output for trend reports (Mintel, Trendwatching)
+carries layout noise that the Stage 1 prompt pays for: running headers
+and footers on every page, page numbers, table-of-contents dot leaders,
+words hyphenated across line breaks, repeated pull quotes and runs of
+whitespace. condense_text() removes it without an LLM call:
+
+- lines repeated at the top or bottom of many pages (digits ignored, so
+  "Page 3 of 40" footers match each other) are dropped as headers and
+  footers;
+- bare page numbers at the top or bottom of a page and dot-leader
+  table-of-contents lines are dropped (numbers mid-page, such as years
+  and statistic call-outs, are kept);
+- words split across a line break are rejoined ("innova-/tion" becomes
+  "innovation"); compounds keep their hyphen ("plant-/based" becomes
+  "plant-based"), judged by a short list of compound prefixes and
+  suffixes;
+- paragraphs already seen earlier in the document are dropped;
+- whitespace runs are collapsed.
+
+Every run reports the characters and estimated tokens saved.
+read_pdf_text() extracts a PDF and condenses it, caching both texts under
+INPUT_TEXT_CACHE_DIR keyed by the PDF's content hash, so re-running a
+document skips extraction as well as condensation. INPUT_CONDENSE=false
+sends the raw extracted text to Stage 1 instead.
+
+Usage:
+    input_text = read_pdf_text(pdf_path)     # Condensed, cached
+    result = condense_text(pages)            # result.text, result.stats
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .instrumentation import estimate_tokens, span
+
+
+CONDENSER_VERSION = 2  # Bump when the rules change, so cached texts are redone
+DEFAULT_CACHE_DIR = "data/text-cache"
+
+# A line is a header/footer if it is short, among the first or last
+# HEADER_FOOTER_LINES lines of a page, and there on this many pages
+HEADER_FOOTER_LINES = 3
+MAX_BOILERPLATE_LINE_CHARS = 120
+BOILERPLATE_MIN_PAGES = 3
+BOILERPLATE_PAGE_FRACTION = 0.3
+
+# Shorter repeated paragraphs (headings, labels) are kept
+MIN_DUPLICATE_PARAGRAPH_CHARS = 40
+
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?$", re.IGNORECASE)
+_TOC_LINE = re.compile(r"(?:\.\s?){4,}\s*\d{1,4}$")
+_HYPHEN_BREAK = re.compile(r"(\w[\w-]*)-\n([a-z]\w*)")
+
+# Hyphenated line breaks that are compounds rather than split words:
+# "well-/known", "plant-/based", "better-for-/you" keep the hyphen
+COMPOUND_PREFIXES = frozenset("""
+    all anti co cross cruelty dairy data direct eco ever full gluten half high
+    long low multi next non off on over part plant post pre real ready self
+    short sugar under user well
+""".split())
+COMPOUND_SUFFIXES = frozenset("""
+    based centric driven first focused free friendly known led level made
+    minded oriented owned related scale specific term time wide
+""".split())
+_WHITESPACE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class CondenseStats:
+    """What condensation removed from one document."""
+    original_chars: int = 0
+    condensed_chars: int = 0
+    original_tokens: int = 0
+    condensed_tokens: int = 0
+    boilerplate_lines: int = 0
+    page_numbers: int = 0
+    toc_lines: int = 0
+    hyphenations: int = 0
+    duplicate_paragraphs: int = 0
+
+    @property
+    def chars_saved(self) -> int:
+        return self.original_chars - self.condensed_chars
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.condensed_tokens
+
+    def summary(self) -> str:
+        """One-line report for logs."""
+        percent = 100 * self.chars_saved / self.original_chars if self.original_chars else 0.0
+        return (
+            f"{self.original_chars:,} -> {self.condensed_chars:,} characters (-{percent:.0f}%), "
+            f"~{self.tokens_saved:,} tokens saved ({self.boilerplate_lines} header/footer lines, "
+            f"{self.page_numbers} page numbers, {self.toc_lines} contents lines, "
+            f"{self.hyphenations} split words rejoined, {self.duplicate_paragraphs} duplicate paragraphs)"
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        return {**asdict(self), "chars_saved": self.chars_saved, "tokens_saved": self.tokens_saved}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> "CondenseStats":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+
+@dataclass
+class CondensedText:
+    text: str
+    stats: CondenseStats
+
+
+def condense_enabled(requested: Optional[bool] = None) -> bool:
+    """Whether Stage 1 gets the condensed input text (INPUT_CONDENSE, default on)."""
+    if requested is not None:
+        return requested
+    return os.getenv("INPUT_CONDENSE", "true").lower() != "false"
+
+
+def _line_key(line: str) -> str:
+    return re.sub(r"\d+", "#", " ".join(line.lower().split()))
+
+
+def _edge_lines(page: str) -> List[int]:
+    """Indices of the page's first and last HEADER_FOOTER_LINES non-empty lines."""
+    filled = [i for i, line in enumerate(page.splitlines()) if line.strip()]
+    return sorted(set(filled[:HEADER_FOOTER_LINES] + filled[-HEADER_FOOTER_LINES:]))
+
+
+def _repeated_lines(pages: Sequence[str]) -> set:
+    """Keys of short page-edge lines repeated on enough pages to be headers or footers."""
+    if len(pages) < BOILERPLATE_MIN_PAGES:
+        return set()
+    counts: Counter = Counter()
+    for page in pages:
+        lines = page.splitlines()
+        counts.update({
+            _line_key(lines[i]) for i in _edge_lines(page)
+            if len(lines[i].strip()) <= MAX_BOILERPLATE_LINE_CHARS
+        })
+    threshold = max(BOILERPLATE_MIN_PAGES, math.ceil(BOILERPLATE_PAGE_FRACTION * len(pages)))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def condense_text(text: Union[str, Sequence[str]]) -> CondensedText:
+    """Strip layout noise from extracted text.
+
+    Args:
+        text: Extracted text, or one string per page (needed to detect
+            running headers and footers)
+
+    Returns:
+        CondensedText with the condensed text and what was removed
+    """
+    pages = [text] if isinstance(text, str) else list(text)
+    original = "".join(pages)
+    stats = CondenseStats(original_chars=len(original), original_tokens=estimate_tokens(original))
+    boilerplate = _repeated_lines(pages)
+
+    lines: List[str] = []
+    for page in pages:
+        edges = set(_edge_lines(page))
+        for i, line in enumerate(page.splitlines()):
+            line = _WHITESPACE.sub(" ", line).strip()
+            if not line:
+                lines.append("")
+            elif i in edges and _PAGE_NUMBER.match(line):
+                stats.page_numbers += 1
+            elif i in edges and _line_key(line) in boilerplate:
+                stats.boilerplate_lines += 1
+            elif _TOC_LINE.search(line):
+                stats.toc_lines += 1
+            else:
+                lines.append(line)
+
+    # Pages are joined without a break, so paragraphs and words continue across them
+    joined = "\n".join(lines)
+    def rejoin(match: re.Match) -> str:
+        head, tail = match.groups()
+        if "-" in head or head.lower() in COMPOUND_PREFIXES or tail in COMPOUND_SUFFIXES:
+            return f"{head}-{tail}"
+        stats.hyphenations += 1
+        return head + tail
+
+    joined = _HYPHEN_BREAK.sub(rejoin, joined)
+
+    paragraphs = []
+    seen = set()
+    for paragraph in _PARAGRAPH_BREAK.split(joined):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        key = " ".join(paragraph.lower().split())
+        if len(key) >= MIN_DUPLICATE_PARAGRAPH_CHARS:
+            if key in seen:
+                stats.duplicate_paragraphs += 1
+                continue
+            seen.add(key)
+        paragraphs.append(paragraph)
+
+    condensed = "\n\n".join(paragraphs)
+    stats.condensed_chars = len(condensed)
+    stats.condensed_tokens = estimate_tokens(condensed)
+    return CondensedText(condensed, stats)
+
+
+class TextCache:
+    """Extracted and condensed texts on disk, one JSON file per source file hash."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        return hashlib.sha256(data + f"condenser-v{CONDENSER_VERSION}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.directory / f"{key}.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable text cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{key}.json"
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logging.warning(f"Could not cache extracted text: {e}")
+
+
+def get_text_cache() -> Optional[TextCache]:
+    """Text cache configured from INPUT_TEXT_CACHE_DIR (empty disables it)."""
+    directory = os.getenv("INPUT_TEXT_CACHE_DIR", DEFAULT_CACHE_DIR)
+    return TextCache(directory) if directory else None
+
+
+def read_pdf_text(
+    pdf_path: Union[str, Path],
+    condense: Optional[bool] = None,
+    reader: Optional[Callable[[Any], Any]] = None,
+) -> str:
+    """Extract a PDF's text for Stage 1, condensed and cached.
+
+    Args:
+        pdf_path: PDF file
+        condense: Return the condensed text (default: INPUT_CONDENSE)
+        reader: PdfReader class to extract with (default: pypdf.PdfReader)
+
+    Returns:
+        Condensed text, or the raw extracted text (pages concatenated)
+    """
+    if reader is None:
+        from pypdf import PdfReader as reader
+
+    cache = get_text_cache()
+
+    with span("pdf_extraction", kind="io", source=str(pdf_path)) as attrs:
+        key = TextCache.key(Path(pdf_path).read_bytes())
+        entry = cache.get(key) if cache is not None else None
+        attrs["cached"] = entry is not None
+        if entry is None:
+            pages = [page.extract_text() for page in reader(pdf_path).pages]
+            result = condense_text(pages)
+            entry = {
+                "source": Path(pdf_path).name,
+                "pages": len(pages),
+                "extracted_text": "".join(pages),
+                "condensed_text": result.text,
+                "stats": result.stats.to_dict(),
+            }
+            if cache is not None:
+                cache.put(key, entry)
+        attrs["pages"] = entry["pages"]
+        attrs["characters"] = len(entry["extracted_text"])
+
+        if not condense_enabled(condense):
+            return entry["extracted_text"]
+
+        stats = entry["stats"]
+        attrs["condensed_characters"] = stats["condensed_chars"]
+        attrs["tokens_saved"] = stats["tokens_saved"]
+
+    logging.info(f"Input condensed: {CondenseStats.from_dict(stats).summary()}")
+    return entry["condensed_text"]
@@ -0,0 +1,357 @@
+"""
+OpenTelemetry-compatible trace context and span exporters.
+
+Spans recorded by pipeline.instrumentation carry W3C trace/span ids so a
+run can be followed end to end: the FastAPI /run handler, the background
+thread, each stage, every LLM call and the Prisma/webhook HTTP calls.
+
+The trace id is derived from the run id (see trace_id_for_run), so traces
+can be looked up from the run id alone. Context lives in contextvars and is
+carried into background threads with contextvars.copy_context().
+
+Exporters are configured from the environment (configure_tracing_from_env):
+
+- OTEL_EXPORTER_OTLP_ENDPOINT: OTLP/HTTP JSON collector (e.g. http://localhost:4318)
+- PIPELINE_TRACE_FILE: JSONL file, one OTLP-formatted span per line
+- OTEL_SERVICE_NAME: service.name resource attribute (default: innovation-pipeline)
+
+No OpenTelemetry SDK is required; spans are encoded as OTLP JSON directly.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_SERVICE_NAME = "innovation-pipeline"
+
+# OTLP SpanKind values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# Pipeline span kinds that represent outbound calls / inbound requests
+_CLIENT_KINDS = {"llm", "http"}
+_SERVER_KINDS = {"server"}
+
+# (trace_id, span_id) of the span currently executing in this context;
+# span_id is None when a trace has been activated but no span opened yet
+_current_span: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar("pipeline_current_span", default=None)
+
+
+def trace_id_for_run(run_id: str) -> str:
+    """Derive a stable 128-bit trace id (32 hex chars) from a run id.
+
+    Run ids must be unique per run, or re-runs share one trace.
+    """
+    return hashlib.sha256(run_id.encode("utf-8")).hexdigest()[:32]
+
+
+def new_trace_id() -> str:
+    """Generate a random 128-bit trace id."""
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    """Generate a random 64-bit span id."""
+    return secrets.token_hex(8)
+
+
+def current_span_context() -> Optional[Tuple[str, Optional[str]]]:
+    """Get (trace_id, span_id) of the span executing in this context, if any."""
+    return _current_span.get()
+
+
+def set_span_context(trace_id: str, span_id: str) -> Any:
+    """Make a span current; returns a token for reset_span_context()."""
+    return _current_span.set((trace_id, span_id))
+
+
+def reset_span_context(token: Any) -> None:
+    """Restore the span context that was current before set_span_context()."""
+    _current_span.reset(token)
+
+
+@contextmanager
+def run_trace(run_id: str) -> Iterator[str]:
+    """Activate the run's trace so spans opened inside join it.
+
+    Used where spans start before the run itself (e.g. the /run handler
+    downloading the PDF ahead of the background thread).
+
+    Yields:
+        Trace id for the run
+    """
+    trace_id = trace_id_for_run(run_id)
+    token = _current_span.set((trace_id, None))
+    try:
+        yield trace_id
+    finally:
+        _current_span.reset(token)
+
+
+def traceparent() -> Optional[str]:
+    """W3C traceparent header value for the current span, if any.
+
+    Example:
+        >>> headers = {"traceparent": traceparent()} if traceparent() else {}
+    """
+    context = _current_span.get()
+    if context is None or context[1] is None:
+        return None
+    trace_id, span_id = context
+    return f"00-{trace_id}-{span_id}-01"
+
+
+def trace_headers() -> Dict[str, str]:
+    """HTTP headers propagating the current trace to downstream services."""
+    header = traceparent()
+    return {"traceparent": header} if header else {}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def to_otlp_span(record: Any) -> Dict[str, Any]:
+    """Encode a SpanRecord as an OTLP JSON span.
+
+    Args:
+        record: pipeline.instrumentation.SpanRecord with trace ids set
+
+    Returns:
+        Span dictionary in OTLP/JSON format
+    """
+    start_ns = int(record.started_at * 1e9)
+    end_ns = start_ns + int(record.duration_s * 1e9)
+
+    if record.kind in _CLIENT_KINDS:
+        kind = SPAN_KIND_CLIENT
+    elif record.kind in _SERVER_KINDS:
+        kind = SPAN_KIND_SERVER
+    else:
+        kind = SPAN_KIND_INTERNAL
+
+    attributes = {"pipeline.kind": record.kind, "pipeline.stage": record.stage}
+    attributes.update(record.attributes)
+
+    otlp_span = {
+        "traceId": record.trace_id,
+        "spanId": record.span_id,
+        "name": record.name,
+        "kind": kind,
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(end_ns),
+        "attributes": _otlp_attributes(attributes),
+        # STATUS_CODE_ERROR = 2, STATUS_CODE_UNSET = 0
+        "status": {"code": 2, "message": record.error} if record.error else {"code": 0},
+    }
+    if record.parent_span_id:
+        otlp_span["parentSpanId"] = record.parent_span_id
+    return otlp_span
+
+
+class JsonlSpanExporter:
+    """Append spans to a JSONL file (one OTLP JSON span per line)."""
+
+    def __init__(self, path: Path, service_name: str = DEFAULT_SERVICE_NAME):
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, record: Any) -> None:
+        line = json.dumps({"service.name": self.service_name, **to_otlp_span(record)})
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def flush(self, timeout: float = 5.0) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OtlpHttpSpanExporter:
+    """Batch spans and POST them to an OTLP/HTTP collector as JSON.
+
+    Spans are queued and sent from a daemon thread so exporting never blocks
+    a pipeline stage. Export failures are logged and dropped.
+
+    Attributes:
+        endpoint: Collector traces URL (e.g. http://localhost:4318/v1/traces)
+        max_batch_size: Maximum spans per request
+        schedule_delay_s: Maximum time a span waits before being sent
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = DEFAULT_SERVICE_NAME,
+        max_batch_size: int = 256,
+        schedule_delay_s: float = 2.0,
+        timeout_s: float = 5.0
+    ):
+        if not endpoint.rstrip("/").endswith("/v1/traces"):
+            endpoint = endpoint.rstrip("/") + "/v1/traces"
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.max_batch_size = max_batch_size
+        self.schedule_delay_s = schedule_delay_s
+        self.timeout_s = timeout_s
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=10000)
+        self._flush_requested = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="otlp-span-exporter", daemon=True)
+        self._worker.start()
+
+    def export(self, record: Any) -> None:
+        try:
+            self._idle.clear()
+            self._queue.put_nowait(to_otlp_span(record))
+        except queue.Full:
+            logging.warning("OTLP span queue full - dropping span")
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Send queued spans now and wait (up to timeout) until sent."""
+        self._flush_requested.set()
+        self._idle.wait(timeout)
+
+    def shutdown(self) -> None:
+        self.flush()
+        self._stopped = True
+        self._flush_requested.set()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._flush_requested.wait(self.schedule_delay_s)
+            self._flush_requested.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                self._idle.set()
+                return
+            self._send(batch)
+
+    def _send(self, spans: List[Dict[str, Any]]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "pipeline.instrumentation"},
+                    "spans": spans,
+                }],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
+                response.read()
+        except Exception as e:
+            logging.warning(f"Failed to export {len(spans)} spans to {self.endpoint}: {e}")
+
+
+_exporters: List[Any] = []
+_exporters_lock = threading.Lock()
+_configured = False
+
+
+def add_span_exporter(exporter: Any) -> None:
+    """Register an exporter (any object with export/flush/shutdown)."""
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def clear_span_exporters() -> None:
+    """Shut down and remove all exporters."""
+    global _configured
+    with _exporters_lock:
+        exporters = list(_exporters)
+        _exporters.clear()
+        _configured = False
+    for exporter in exporters:
+        exporter.shutdown()
+
+
+def export_span(record: Any) -> None:
+    """Send a finished span to every registered exporter."""
+    if not _exporters:
+        return
+    for exporter in list(_exporters):
+        try:
+            exporter.export(record)
+        except Exception as e:
+            logging.warning(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+
+def flush_spans(timeout: float = 5.0) -> None:
+    """Flush all exporters (called at the end of each run)."""
+    for exporter in list(_exporters):
+        exporter.flush(timeout)
+
+
+def configure_tracing_from_env() -> int:
+    """Register exporters from environment variables (idempotent).
+
+    Returns:
+        Number of registered exporters
+    """
+    global _configured
+
+    with _exporters_lock:
+        if _configured:
+            return len(_exporters)
+        _configured = True
+
+    service_name = os.getenv("OTEL_SERVICE_NAME", DEFAULT_SERVICE_NAME)
+
+    trace_file = os.getenv("PIPELINE_TRACE_FILE")
+    if trace_file:
+        add_span_exporter(JsonlSpanExporter(Path(trace_file), service_name))
+        logging.info(f"Tracing: writing spans to {trace_file}")
+
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    if endpoint:
+        add_span_exporter(OtlpHttpSpanExporter(endpoint, service_name))
+        logging.info(f"Tracing: exporting spans to OTLP collector {endpoint}")
+
+    return len(_exporters)
@@ -69,6 +69,21 @@ class TestValidateBlobUrl:
         url = ""
         assert validate_blob_url(url) is False
 
+    def test_validate_blob_url_localhost_rejected(self, monkeypatch):
+        """Test local blob stand-in URL is rejected outside load-test mode"""
+        monkeypatch.delenv("LOADTEST_MODE", raising=False)
+        assert validate_blob_url("http://127.0.0.1:8123/blob/input.pdf") is False
+
+    def test_validate_blob_url_localhost_loadtest_mode(self, monkeypatch):
+        """Test LOADTEST_MODE accepts local blob stand-in URLs only"""
+        monkeypatch.setenv("LOADTEST_MODE", "true")
+        assert validate_blob_url("http://127.0.0.1:8123/blob/input.pdf") is True
+        assert validate_blob_url("http://localhost:8123/blob/input.pdf") is True
+        assert validate_blob_url("http://example.com/blob/input.pdf") is False
+        assert validate_blob_url("http://localhost.evil.example/blob/input.pdf") is False
+        assert validate_blob_url("http://127.0.0.1.nip.io/blob/input.pdf") is False
+        assert validate_blob_url("ftp://localhost/blob/input.pdf") is False
+
 
 @pytest.mark.unit
 class TestDownloadPdfFromBlob:
@@ -0,0 +1,413 @@
+"""
+Offline pipeline benchmarks against the deterministic fake LLM.
+
+Measures pipeline overhead (prompting, parsing, file I/O, status callbacks,
+threading) separately from model latency by pointing the pipeline at a
+local FakeLLMServer.
+
+Targets:
+    runner  backend execute_pipeline_background, N runs at a time
+    batch   scripts/run_pipeline.run_batch over the input manifest
+    api     FastAPI app under uvicorn: POST /run -> completion webhook
+    all     every target, each in its own process (default)
+
+The backend and the CLI each ship their own `pipeline` package, so each
+target runs in a separate interpreter.
+
+Usage:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --target runner --runs 40 --concurrency 1,4,8
+    python -m benchmarks.bench_pipeline --latency 0.5 --tokens-per-second 80 --stream
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/bench-20251019-101500.json
+
+Reports are written to benchmarks/results/ as JSON (raw latencies included)
+and printed as a markdown table.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from .fake_llm_server import FakeLLMServer
+from .harness import BenchmarkResult, ResourceSampler, format_table, write_report
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_ROOT / "backend"
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+TARGETS = ("runner", "batch", "api")
+
+
+def prepare_workspace(max_inputs: Optional[int] = None) -> Path:
+    """Create a scratch working directory mirroring the repo data layout.
+
+    Inputs, brand profiles and research are symlinked; the manifest is
+    rewritten with absolute PDF paths. All pipeline outputs land in the
+    workspace instead of the repository.
+
+    Args:
+        max_inputs: Keep only the first N inputs with an available PDF
+
+    Returns:
+        Workspace path
+    """
+    workspace = Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+    data_dir = workspace / "data"
+    data_dir.mkdir()
+    for name in ("brand-profiles", "web-search-setup"):
+        (data_dir / name).symlink_to(REPO_ROOT / "data" / name)
+
+    # load_research_data() defaults to docs/web-search-setup
+    (workspace / "docs").mkdir()
+    (workspace / "docs" / "web-search-setup").symlink_to(REPO_ROOT / "data" / "web-search-setup")
+
+    with open(REPO_ROOT / "data" / "input-manifest.yaml", encoding="utf-8") as f:
+        manifest = yaml.safe_load(f)
+
+    inputs = []
+    for entry in manifest.get("inputs", []):
+        pdf = REPO_ROOT / "data" / "document" / entry["filename"]
+        if pdf.exists():
+            inputs.append({**entry, "file_path": str(pdf)})
+    if max_inputs:
+        inputs = inputs[:max_inputs]
+
+    with open(data_dir / "input-manifest.yaml", "w", encoding="utf-8") as f:
+        yaml.safe_dump({"inputs": inputs}, f)
+
+    return workspace
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_concurrently(
+    func: Any,
+    count: int,
+    concurrency: int
+) -> Tuple[List[float], int, float, ResourceSampler]:
+    """Call func(i) for i in range(count) with a bounded worker pool.
+
+    func returns (latency_s, error); errors are counted, not raised.
+
+    Returns:
+        (successful latencies, error count, wall time, resource sampler)
+    """
+    latencies: List[float] = []
+    errors = 0
+
+    with ResourceSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for latency, error in pool.map(func, range(count)):
+                if error:
+                    errors += 1
+                    logging.warning(f"Request failed: {error}")
+                else:
+                    latencies.append(latency)
+        wall_time = time.perf_counter() - start
+
+    return latencies, errors, wall_time, sampler
+
+
+def bench_runner(args: argparse.Namespace, server: FakeLLMServer, workspace: Path) -> List[BenchmarkResult]:
+    """Benchmark backend execute_pipeline_background directly."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.pipeline_runner import execute_pipeline_background
+
+    with open(workspace / "data" / "brand-profiles" / f"{args.brand}.yaml", encoding="utf-8") as f:
+        brand_profile = yaml.safe_load(f)
+    source_pdf = first_input_pdf(workspace)
+
+    results = []
+    for concurrency in args.concurrency:
+        prefix = f"bench-runner-{os.getpid()}-c{concurrency}"
+
+        def one(index: int) -> Tuple[float, Optional[str]]:
+            run_id = f"{prefix}-{index}"
+            pdf_path = workspace / f"{run_id}.pdf"
+            shutil.copyfile(source_pdf, pdf_path)  # runner deletes the PDF when done
+
+            start = time.perf_counter()
+            execute_pipeline_background(run_id, str(pdf_path), brand_profile)
+            latency = time.perf_counter() - start
+
+            shutil.rmtree(Path("/tmp/runs") / run_id, ignore_errors=True)
+            return latency, server.run_error(run_id)
+
+        latencies, errors, wall_time, sampler = run_concurrently(one, args.runs, concurrency)
+        results.append(make_result(f"runner-c{concurrency}", concurrency, latencies, errors, wall_time, sampler, args))
+    return results
+
+
+def bench_batch(args: argparse.Namespace, server: FakeLLMServer, workspace: Path) -> List[BenchmarkResult]:
+    """Benchmark scripts/run_pipeline.run_batch (sequential by design).
+
+    Scenario latency is Stages 4-5 time plus the cached Stages 1-3 time of
+    its input, i.e. what the scenario would cost run on its own.
+    """
+    sys.path.insert(0, str(REPO_ROOT))
+    from scripts import run_pipeline
+
+    latencies: List[float] = []
+    errors = 0
+    original = run_pipeline.execute_pipeline_stages_4_5
+
+    def timed_stages_4_5(input_id, brand_id, stages_123_result, *rest, **kwargs):
+        nonlocal errors
+        success, metadata = original(input_id, brand_id, stages_123_result, *rest, **kwargs)
+        if success:
+            latencies.append(metadata['total_time'] + sum(stages_123_result['stage_times'].values()))
+        else:
+            errors += 1
+        return success, metadata
+
+    run_pipeline.execute_pipeline_stages_4_5 = timed_stages_4_5
+    with open(workspace / "data" / "input-manifest.yaml", encoding="utf-8") as f:
+        manifest = yaml.safe_load(f)
+
+    try:
+        with ResourceSampler() as sampler:
+            start = time.perf_counter()
+            run_pipeline.run_batch(manifest)
+            wall_time = time.perf_counter() - start
+    finally:
+        run_pipeline.execute_pipeline_stages_4_5 = original
+        # run_batch reconfigures logging per scenario; restore quiet output
+        configure_logging(args.verbose)
+
+    return [make_result("batch", 1, latencies, errors, wall_time, sampler, args)]
+
+
+def bench_api(args: argparse.Namespace, server: FakeLLMServer, workspace: Path) -> List[BenchmarkResult]:
+    """Benchmark the FastAPI app end to end: POST /run until the completion webhook.
+
+    The Vercel Blob download is replaced by a local file copy so only the
+    API, background thread and pipeline are measured.
+    """
+    sys.path.insert(0, str(BACKEND_DIR))
+    import requests
+    import uvicorn
+    from app import routes
+    from app.main import app
+
+    source_pdf = first_input_pdf(workspace)
+
+    def local_download(blob_url: str, run_id: str) -> str:
+        pdf_path = f"/tmp/{run_id}.pdf"
+        shutil.copyfile(source_pdf, pdf_path)
+        return pdf_path
+
+    routes.download_pdf_from_blob = local_download
+
+    port = free_port()
+    uv_server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    uv_thread = threading.Thread(target=uv_server.run, name="uvicorn", daemon=True)
+    uv_thread.start()
+    while not uv_server.started:
+        time.sleep(0.05)
+    api_url = f"http://127.0.0.1:{port}"
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            prefix = f"bench-api-{os.getpid()}-c{concurrency}"
+
+            def one(index: int) -> Tuple[float, Optional[str]]:
+                run_id = f"{prefix}-{index}"
+                start = time.perf_counter()
+                response = requests.post(f"{api_url}/run", json={
+                    "blob_url": "https://benchmark.public.blob.vercel-storage.com/input.pdf",
+                    "brand_id": args.brand,
+                    "run_id": run_id,
+                }, timeout=60)
+                if not response.ok:
+                    return 0.0, f"POST /run {response.status_code}: {response.text[:200]}"
+
+                finished = server.wait_for_completion(run_id, timeout=args.timeout)
+                shutil.rmtree(Path("/tmp/runs") / run_id, ignore_errors=True)
+                if finished is None:
+                    return 0.0, f"run {run_id} did not complete within {args.timeout}s"
+                return finished - start, server.run_error(run_id)
+
+            latencies, errors, wall_time, sampler = run_concurrently(one, args.runs, concurrency)
+            results.append(make_result(f"api-c{concurrency}", concurrency, latencies, errors, wall_time, sampler, args))
+    finally:
+        uv_server.should_exit = True
+        uv_thread.join(timeout=10)
+
+    return results
+
+
+def first_input_pdf(workspace: Path) -> Path:
+    with open(workspace / "data" / "input-manifest.yaml", encoding="utf-8") as f:
+        inputs = yaml.safe_load(f)["inputs"]
+    if not inputs:
+        raise FileNotFoundError("No input PDFs found in data/document/")
+    return Path(inputs[0]["file_path"])
+
+
+def make_result(
+    name: str,
+    concurrency: int,
+    latencies: List[float],
+    errors: int,
+    wall_time: float,
+    sampler: ResourceSampler,
+    args: argparse.Namespace
+) -> BenchmarkResult:
+    return BenchmarkResult(
+        name=name,
+        concurrency=concurrency,
+        latencies_s=latencies,
+        errors=errors,
+        wall_time_s=wall_time,
+        peak_rss_mb=sampler.peak_rss_mb,
+        start_rss_mb=sampler.start_rss_mb,
+        peak_threads=sampler.peak_threads,
+        config={
+            "runs": args.runs,
+            "latency_s": args.latency,
+            "tokens_per_s": args.tokens_per_second,
+            "jitter": args.jitter,
+            "stream": args.stream,
+            "brand": args.brand,
+        },
+    )
+
+
+BENCHMARKS = {
+    "runner": bench_runner,
+    "batch": bench_batch,
+    "api": bench_api,
+}
+
+
+def run_target(args: argparse.Namespace) -> List[BenchmarkResult]:
+    """Run one target in this process against a fresh fake LLM server."""
+    workspace = prepare_workspace(args.inputs)
+    server = FakeLLMServer(
+        latency_s=args.latency,
+        tokens_per_s=args.tokens_per_second,
+        jitter=args.jitter,
+        seed=args.seed,
+    ).start()
+
+    os.environ.update(server.environment())
+    os.environ["LLM_STREAMING"] = "true" if args.stream else "false"
+    os.chdir(workspace)
+
+    try:
+        results = BENCHMARKS[args.target](args, server, workspace)
+        logging.info(f"Fake LLM requests: {server.stats()}")
+        return results
+    finally:
+        server.stop()
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def run_all(args: argparse.Namespace) -> List[BenchmarkResult]:
+    """Run each target in its own interpreter and collect the results."""
+    results = []
+    passthrough = [arg for arg in sys.argv[1:] if arg not in ("--target", "all")]
+
+    for target in TARGETS:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            result_file = Path(tmp.name)
+        command = [
+            sys.executable, "-m", "benchmarks.bench_pipeline",
+            *passthrough, "--target", target, "--result-file", str(result_file),
+        ]
+        logging.info(f"Running {target} benchmark")
+        completed = subprocess.run(command, cwd=REPO_ROOT)
+
+        if completed.returncode != 0 or not result_file.stat().st_size:
+            logging.error(f"{target} benchmark failed (exit code {completed.returncode})")
+        else:
+            for data in json.loads(result_file.read_text())["results"]:
+                data.pop("summary", None)
+                results.append(BenchmarkResult(**data))
+        result_file.unlink(missing_ok=True)
+
+    return results
+
+
+def configure_logging(verbose: bool) -> None:
+    root = logging.getLogger()
+    root.handlers.clear()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO if verbose else logging.WARNING)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark pipeline overhead against a deterministic fake LLM",
+    )
+    parser.add_argument("--target", choices=(*TARGETS, "all"), default="all")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per concurrency level (default: 20)")
+    parser.add_argument(
+        "--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[4],
+        help="Concurrent runs, comma-separated to sweep (default: 4)"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM time to first token in seconds (default: 0.05)")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="Fake LLM generation rate (default: 2000)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fractional latency jitter, e.g. 0.2 (default: 0)")
+    parser.add_argument("--seed", type=int, default=42, help="Jitter random seed (default: 42)")
+    parser.add_argument("--stream", action="store_true", help="Enable LLM_STREAMING (exercises SSE responses)")
+    parser.add_argument("--brand", default="lactalis-canada", help="Brand profile for runner/api targets")
+    parser.add_argument("--inputs", type=int, default=2, help="Inputs used by the batch target (default: 2)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-run completion timeout for the api target")
+    parser.add_argument("--output", type=Path, help="Report path (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Previous report to show deltas against")
+    parser.add_argument("--result-file", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline INFO logs")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    configure_logging(args.verbose)
+
+    if args.target == "all":
+        results = run_all(args)
+    else:
+        results = run_target(args)
+
+    if args.result_file:
+        # Child process of run_all(): hand results back to the parent
+        write_report(results, args.result_file)
+        return 0
+
+    output = args.output or RESULTS_DIR / f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    write_report(results, output)
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(format_table(results, baseline))
+    print(f"\nReport: {output}")
+
+    return 0 if results and all(r.errors == 0 for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
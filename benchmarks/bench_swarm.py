@@ -0,0 +1,127 @@
+"""
+Swarm step benchmark for notebook/latent_ideation.py.
+
+Times one swarm iteration without the encoder and decoder models: every
+agent explores, the queen processes the scores and the new vectors join
+the population. The batched implementation (Swarm.explore, tensor
+SwarmQueen.process_feedback, VectorHistory) is compared with the original
+notebook loop (one SwarmAgent.explore per agent, dict-based queen update,
+torch.cat onto the population).
+
+Usage:
+    python -m benchmarks.bench_swarm
+    python -m benchmarks.bench_swarm --swarm-sizes 20,100,500 --dim 384 --iterations 20
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "notebook"))
+
+from latent_ideation import Swarm, SwarmQueen, VectorHistory
+
+from .harness import percentile, timed
+
+
+class LegacyQueen:
+    """SwarmQueen as it was in the notebook: per-agent dict loops."""
+
+    def __init__(self, num_agents: int, vector_dim: int):
+        self.agent_weights = {i: 1.0 for i in range(num_agents)}
+        self.global_model_vector = torch.zeros(vector_dim)
+        self.previous_avg_score = 0.0
+
+    def process_feedback(self, agent_vectors: Dict[int, torch.Tensor], scores: List[float]) -> None:
+        current_avg_score = sum(scores) / len(scores) if scores else 0
+        reward = current_avg_score - self.previous_avg_score
+        for aid in self.agent_weights:
+            if reward > 0:
+                self.agent_weights[aid] = min(1.5, self.agent_weights[aid] * (1 + reward * 0.1))
+            else:
+                self.agent_weights[aid] = max(0.5, self.agent_weights[aid] * (1 + reward * 0.1))
+
+        self.global_model_vector *= 0.9
+        for i, (aid, vector) in enumerate(agent_vectors.items()):
+            self.global_model_vector += 0.1 * (scores[i] / 5.0) * self.agent_weights[aid] * vector
+        if torch.linalg.norm(self.global_model_vector) > 0:
+            self.global_model_vector /= torch.linalg.norm(self.global_model_vector)
+        self.previous_avg_score = current_avg_score
+
+
+def legacy_explore(alpha: float, noise_scale: float, queen_pool, peer_pool, queen_guidance) -> torch.Tensor:
+    """SwarmAgent.explore as it was in the notebook (one agent per call)."""
+    queen = queen_pool[random.randint(0, len(queen_pool) - 1)]
+    peer = peer_pool[random.randint(0, len(peer_pool) - 1)]
+    primary_direction = alpha * queen + (1 - alpha) * peer
+    guided_direction = 0.8 * primary_direction + 0.2 * queen_guidance
+    return guided_direction + noise_scale * torch.randn_like(guided_direction)
+
+
+def legacy_run(seed_vectors: torch.Tensor, swarm_size: int, iterations: int) -> None:
+    all_vectors = seed_vectors
+    all_scores = [4.0] * len(seed_vectors)
+    queen = LegacyQueen(swarm_size, seed_vectors.shape[1])
+    for _ in range(iterations):
+        top_k = min(5, len(all_vectors))
+        queen_pool = all_vectors[torch.topk(torch.tensor(all_scores), top_k).indices]
+        agent_vectors = {
+            aid: legacy_explore(0.7, 0.05, queen_pool, all_vectors, queen.global_model_vector)
+            for aid in range(swarm_size)
+        }
+        scores = [random.uniform(3.0, 5.0) for _ in range(swarm_size)]
+        queen.process_feedback(agent_vectors, scores)
+        all_vectors = torch.cat([all_vectors, torch.stack(list(agent_vectors.values()))], dim=0)
+        all_scores.extend(scores)
+
+
+def batched_run(seed_vectors: torch.Tensor, swarm_size: int, iterations: int) -> None:
+    swarm = Swarm(swarm_size, seed=0)
+    queen = SwarmQueen(swarm_size, seed_vectors.shape[1], device=torch.device("cpu"))
+    history = VectorHistory(len(seed_vectors) + iterations * swarm_size, seed_vectors.shape[1])
+    history.extend(seed_vectors, [4.0] * len(seed_vectors))
+    for _ in range(iterations):
+        top_k = min(5, history.size)
+        queen_pool = history.vectors[torch.topk(history.scores, top_k).indices]
+        new_vectors = swarm.explore(queen_pool, history.vectors, queen.get_guidance())
+        scores = [random.uniform(3.0, 5.0) for _ in range(swarm_size)]
+        queen.process_feedback(new_vectors, scores)
+        history.extend(new_vectors, scores)
+
+
+def median_time(run: Callable[..., None], repeats: int, *args) -> float:
+    return percentile([timed(run, *args) for _ in range(repeats)], 50)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the batched swarm step with the original per-agent loop")
+    parser.add_argument("--swarm-sizes", default="20,100,500", help="Comma-separated agent counts (default: 20,100,500)")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension (default: 384, all-MiniLM-L6-v2)")
+    parser.add_argument("--iterations", type=int, default=10, help="Swarm iterations per run (default: 10)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per implementation (default: 5)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    random.seed(0)
+    torch.manual_seed(0)
+    seed_vectors = torch.randn(5, args.dim)
+
+    print("| Agents | Loop (ms/iter) | Batched (ms/iter) | Speedup |")
+    print("|---|---|---|---|")
+    for swarm_size in (int(size) for size in args.swarm_sizes.split(",")):
+        legacy = median_time(legacy_run, args.repeats, seed_vectors, swarm_size, args.iterations)
+        batched = median_time(batched_run, args.repeats, seed_vectors, swarm_size, args.iterations)
+        print(
+            f"| {swarm_size} | {legacy / args.iterations * 1000:.2f} | "
+            f"{batched / args.iterations * 1000:.2f} | {legacy / batched:.1f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
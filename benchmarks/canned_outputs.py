@@ -0,0 +1,266 @@
+"""
+Canned stage outputs for the fake LLM server.
+
+Each stage prompt is recognised by a phrase unique to its template and
+answered with a deterministic response shaped like a real model output for
+that stage. Responses are padded to realistic token counts so that parsing,
+file writing and payload sizes match production runs.
+"""
+
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+
+# (stage, phrase unique to that stage's prompt template); first match wins,
+# so the per-pattern Stage 5 prompt is checked before the full one
+STAGE_MARKERS: Tuple[Tuple[str, str], ...] = (
+    ("stage5_card", "Generate exactly ONE retail-ready innovation opportunity"),
+    ("stage23", "Write PART 1 between <stage2> and </stage2>"),
+    ("stage1", "cross-industry pattern recognition and transferable insight extraction"),
+    ("stage2", "Doblin's 10 Types framework"),
+    ("stage3", "Jobs-to-be-Done framework and cross-industry pattern transfer"),
+    ("stage4_lesson", "Translate THIS lesson's mechanism"),
+    ("stage4_merge", "Compare the translations and write ONLY the sections below"),
+    ("stage4", "translating innovation mechanisms into retail-ready brand opportunities"),
+    ("stage5", "generating retail-ready opportunities for immediate execution"),
+)
+
+# Approximate completion sizes (tokens) observed for each stage
+DEFAULT_COMPLETION_TOKENS: Dict[str, int] = {
+    "stage1": 1800,
+    "stage2": 2000,
+    "stage3": 2500,
+    "stage23": 4500,
+    "stage4": 3000,
+    "stage4_lesson": 600,
+    "stage4_merge": 700,
+    "stage5": 3500,
+    "stage5_card": 700,
+    "generic": 200,
+}
+
+_FILLER = (
+    "The mechanism works because it removes a constraint customers had accepted "
+    "as normal, then makes the new behaviour visible and easy to repeat. "
+)
+
+_STAGE_BODIES: Dict[str, str] = {
+    "stage1": """# Inspiration Analysis
+
+## Mechanism 1: Fan-Led Experience Design
+
+**Mechanism Type:** Experience
+
+**What They Did:** Turned every game into interactive theater where fans shape the show.
+
+**Why It Works:** Participation creates ownership and repeat attendance.
+
+## Mechanism 2: Radical Price Transparency
+
+**Mechanism Type:** Business Model
+
+**What They Did:** All-inclusive tickets with no hidden fees.
+
+**Why It Works:** Removing friction at purchase builds trust and word of mouth.
+
+## Extraction Quality Check
+
+{filler}
+""",
+    "stage2": """## Innovation Type Analysis
+
+### Primary Innovation Types Activated
+
+1. **Customer Engagement** - fans co-create the experience.
+2. **Pricing / Profit Model** - simple all-inclusive pricing.
+
+### Secondary Innovation Types
+
+- **Brand** - irreverent identity amplified by social channels.
+
+### Innovation Architecture
+
+{filler}
+""",
+    "stage3": """## Job Architecture Mapping
+
+### Core Jobs Being Served
+
+- Functional: be entertained without planning effort.
+- Emotional: feel part of something joyful.
+
+### Customer Circumstance Analysis
+
+{filler}
+
+### Constraint Elimination Mapping
+
+- Hidden costs removed; dead time between plays eliminated.
+""",
+    "stage4": """## Brand-Specific CPG Translation
+
+### Brand Context Assessment
+
+- Strong retail distribution, established co-packer network, family positioning.
+
+### Mechanism-to-CPG Pattern Mapping
+
+{filler}
+
+### Retail Viability Assessment
+
+- Fits existing shelf sets; co-packer capacity available.
+
+### Top 3 Brand-Specific Opportunities
+
+1. Interactive snack packs with fan-voted flavours.
+2. All-inclusive party bundle at one transparent price.
+3. Limited drops announced through social challenges.
+
+### Risk & Reality Check
+
+- Flavour rotation complexity; retailer slotting fees.
+""",
+    "stage4_lesson": """#### Lesson: Fan-Led Experience Design
+
+**Mechanism → CPG Pattern Translation:**
+- Primary Pattern: Occasion Expansion
+- Example execution: Interactive snack packs with fan-voted flavours.
+
+{filler}
+""",
+    "stage4_merge": """### Brand Context Assessment
+
+- Strong retail distribution, established co-packer network, family positioning.
+
+### Top 3 Brand-Specific Opportunities
+
+1. Interactive snack packs with fan-voted flavours.
+2. All-inclusive party bundle at one transparent price.
+3. Limited drops announced through social challenges.
+
+### Risk & Reality Check
+
+{filler}
+""",
+}
+
+_INNOVATION_TYPES = ("Better-For-You", "Premium", "Convenience", "Format", "Occasion")
+
+_CARD_PATTERN = re.compile(r"for this pattern:\s*\*\*([^*]+)\*\*")
+
+# Distinct concepts, so the Stage 5 duplicate check keeps every card
+_CARD_CONCEPTS: Dict[str, str] = {
+    "Better-For-You": "High-protein cultured cheese crisps with half the sodium.",
+    "Premium": "Cave-aged reserve cheddar wheel with a single-farm origin story.",
+    "Convenience": "Ready-to-drink chocolate milk in a resealable portable bottle.",
+    "Format": "Twist-up butter stick that spreads straight onto warm toast.",
+    "Occasion": "Calming bedtime warm milk blend for evening wind-down routines.",
+}
+
+
+def detect_stage(prompt: str) -> str:
+    """Identify which pipeline stage produced a prompt.
+
+    Args:
+        prompt: Concatenated message contents of the request
+
+    Returns:
+        Stage name ("stage1".."stage5", "stage5_card") or "generic" if unrecognised
+    """
+    for stage, marker in STAGE_MARKERS:
+        if marker in prompt:
+            return stage
+    return "generic"
+
+
+def _filler(chars: int) -> str:
+    chars = max(0, chars)
+    return (_FILLER * (chars // len(_FILLER) + 1))[:chars].strip()
+
+
+def _stage5_output(target_tokens: int) -> str:
+    opportunities = []
+    for number, innovation_type in enumerate(_INNOVATION_TYPES, start=1):
+        opportunities.append({
+            "title": f"Benchmark Opportunity {number}: {innovation_type}",
+            "innovation_type": innovation_type,
+            "description": "",
+            "actionability_items": [
+                "Schedule co-packer visit with a dairy snack facility by Q2",
+                "Conduct pricing study with Target buyers on protein claim",
+                "Source cultured cheese samples from two regional suppliers",
+            ],
+            "visual_description": "Bright resealable pouch in the chilled snack aisle.",
+            "follow_up_prompts": [
+                "How does this compare to the category leader on shelf?",
+                "What's your velocity projection vs category benchmark?",
+            ],
+            "retail_metrics": {
+                "price_point": "$4.99",
+                "target_velocity": "6 units/store/week",
+                "gross_margin": "38%",
+                "launch_timeline": "9 months",
+            },
+        })
+
+    # ~4 characters per token; spread the remaining budget across the cards
+    skeleton = json.dumps({"opportunities": opportunities})
+    description = _filler((target_tokens * 4 - len(skeleton)) // len(opportunities))
+    for opportunity in opportunities:
+        opportunity["description"] = description
+
+    return "```json\n" + json.dumps({"opportunities": opportunities}, indent=2) + "\n```"
+
+
+def _stage5_card_output(target_tokens: int, prompt: str) -> str:
+    match = _CARD_PATTERN.search(prompt)
+    innovation_type = match.group(1).strip() if match else "Format"
+    opportunity = {
+        "title": f"Benchmark {innovation_type} card",
+        "innovation_type": innovation_type,
+        "description": _CARD_CONCEPTS.get(innovation_type, "Benchmark opportunity concept."),
+        "actionability_items": [
+            "Schedule co-packer visit with a dairy snack facility by Q2",
+            "Conduct pricing study with Target buyers on protein claim",
+            "Source cultured cheese samples from two regional suppliers",
+        ],
+        "visual_description": "",
+        "follow_up_prompts": [
+            "How does this compare to the category leader on shelf?",
+            "What's your velocity projection vs category benchmark?",
+        ],
+        "retail_metrics": {"price_point": "$4.99", "launch_timeline": "9 months"},
+    }
+    opportunity["visual_description"] = _filler(target_tokens * 4 - len(json.dumps(opportunity)))
+    return "```json\n" + json.dumps({"opportunity": opportunity}, indent=2) + "\n```"
+
+
+def canned_output(stage: str, completion_tokens: Optional[int] = None, prompt: str = "") -> str:
+    """Build the canned response for a stage.
+
+    Args:
+        stage: Stage name from detect_stage()
+        completion_tokens: Target response size (default: DEFAULT_COMPLETION_TOKENS)
+        prompt: Request prompt (used to pick the pattern of a Stage 5 card)
+
+    Returns:
+        Response text in the format the stage's parser expects
+    """
+    target = completion_tokens or DEFAULT_COMPLETION_TOKENS.get(stage, 200)
+
+    if stage == "stage5":
+        return _stage5_output(target)
+    if stage == "stage23":
+        half = target // 2
+        return (
+            f"<stage2>\n{canned_output('stage2', half)}</stage2>\n\n"
+            f"<stage3>\n{canned_output('stage3', target - half)}</stage3>\n"
+        )
+    if stage == "stage5_card":
+        return _stage5_card_output(target, prompt)
+
+    body = _STAGE_BODIES.get(stage, "Benchmark response.\n\n{filler}\n")
+    used = len(body.replace("{filler}", ""))
+    return body.format(filler=_filler(target * 4 - used))
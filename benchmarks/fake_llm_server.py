@@ -0,0 +1,319 @@
+"""
+Deterministic fake OpenAI-compatible chat-completions server.
+
+Stands in for OpenRouter so pipeline overhead can be measured without
+network or model variance. Also answers the Next.js callbacks the backend
+makes during a run (stage updates and the completion webhook), recording
+completions so drivers can measure end-to-end latency, and serves PDFs in
+place of Vercel Blob for load tests.
+
+Endpoints:
+    POST /v1/chat/completions          canned stage output (JSON or SSE stream)
+    POST /api/pipeline/{id}/stage-update   200 OK, FAILED status ends the run
+    POST /api/pipeline/{id}/complete       200 OK, completion recorded
+    GET  /api/health                       200 OK (backend /health probe)
+    GET  /blob/{name}                      PDF registered with add_blob()
+
+Usage:
+    >>> with FakeLLMServer(latency_s=0.2, tokens_per_s=400) as server:
+    ...     os.environ["OPENROUTER_BASE_URL"] = server.base_url
+    ...     run_pipeline()
+    >>> server.stats()
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from .canned_outputs import canned_output, detect_stage
+
+
+class FakeLLMServer:
+    """Local chat-completions server with configurable latency and token rate.
+
+    Response time for a request is latency_s (time to first token) plus
+    completion_tokens / tokens_per_s, with optional +/- jitter.
+
+    Attributes:
+        latency_s: Time to first token
+        tokens_per_s: Generation rate used to pace the response
+        jitter: Fractional random variation applied to latency (0.1 = +/-10%)
+        completion_tokens: Per-stage response size override (tokens)
+        error_rate: Fraction of LLM requests answered with HTTP 500
+        callback_latency_s: Delay applied to stage-update/complete callbacks
+        blob_latency_s: Delay applied to blob downloads
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.05,
+        tokens_per_s: float = 2000.0,
+        jitter: float = 0.0,
+        completion_tokens: Optional[Dict[str, int]] = None,
+        error_rate: float = 0.0,
+        callback_latency_s: float = 0.0,
+        blob_latency_s: float = 0.0,
+        seed: int = 42,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        self.latency_s = latency_s
+        self.tokens_per_s = tokens_per_s
+        self.jitter = jitter
+        self.completion_tokens = completion_tokens or {}
+        self.error_rate = error_rate
+        self.callback_latency_s = callback_latency_s
+        self.blob_latency_s = blob_latency_s
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._completions: Dict[str, float] = {}
+        self._completion_events: Dict[str, threading.Event] = {}
+        self._failed_runs: Dict[str, str] = {}
+        self._first_callbacks: Dict[str, float] = {}
+        self._blobs: Dict[str, bytes] = {}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Value for OPENROUTER_BASE_URL."""
+        return f"{self.url}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables pointing the pipeline and backend at this server."""
+        return {
+            "OPENROUTER_API_KEY": "benchmark-key",
+            "OPENROUTER_BASE_URL": self.base_url,
+            "LLM_MODEL": "benchmark/fake-model",
+            "FRONTEND_WEBHOOK_URL": self.url,
+            "WEBHOOK_SECRET": "benchmark-secret",
+        }
+
+    def add_blob(self, name: str, data: bytes) -> str:
+        """Serve data at /blob/{name}.
+
+        Returns:
+            Blob URL to pass as blob_url (requires LOADTEST_MODE on the backend)
+        """
+        self._blobs[name] = data
+        return f"{self.url}/blob/{name}"
+
+    def first_callback_at(self, run_id: str) -> Optional[float]:
+        """Arrival time (time.perf_counter()) of run_id's first stage update.
+
+        The backend sends it when the background run starts, so the gap
+        from POST /run to this point is the run's queueing delay.
+        """
+        with self._lock:
+            return self._first_callbacks.get(run_id)
+
+    def wait_for_completion(self, run_id: str, timeout: Optional[float] = None) -> Optional[float]:
+        """Block until run_id completes or reports a FAILED stage.
+
+        Returns:
+            Arrival time (time.perf_counter()), or None on timeout
+            (use run_error() to tell failures from completions)
+        """
+        with self._lock:
+            event = self._completion_events.setdefault(run_id, threading.Event())
+        if not event.wait(timeout):
+            return None
+        return self._completions[run_id]
+
+    def run_error(self, run_id: str) -> Optional[str]:
+        """Error reported by a FAILED stage update for run_id, if any."""
+        with self._lock:
+            return self._failed_runs.get(run_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Request counts by stage / endpoint."""
+        with self._lock:
+            return dict(self._counts)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _response_delay(self, completion_tokens: int) -> Tuple[float, float, bool]:
+        """Get (time to first token, generation time, whether to fail)."""
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter) if self.jitter else 1.0
+            fail = self._random.random() < self.error_rate
+        first_token = self.latency_s * factor
+        return first_token, completion_tokens / self.tokens_per_s, fail
+
+    def _record_completion(self, run_id: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._completions[run_id] = time.perf_counter()
+            if error is not None:
+                self._failed_runs[run_id] = error
+            event = self._completion_events.setdefault(run_id, threading.Event())
+        event.set()
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _read_json(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                path = self.path.split("?")[0]
+                if path == "/api/health":
+                    self._send_json(200, {"status": "ok"})
+                elif path.startswith("/blob/") and path[len("/blob/"):] in server._blobs:
+                    server._count("blob.download")
+                    if server.blob_latency_s:
+                        time.sleep(server.blob_latency_s)
+                    body = server._blobs[path[len("/blob/"):]]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/pdf")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._send_json(404, {"error": f"unknown path {path}"})
+
+            def do_POST(self) -> None:
+                path = self.path.split("?")[0]
+                if path.endswith("/chat/completions"):
+                    self._chat_completion(self._read_json())
+                elif path.startswith("/api/pipeline/"):
+                    self._pipeline_callback(path, self._read_json())
+                else:
+                    self._send_json(404, {"error": f"unknown path {path}"})
+
+            def _pipeline_callback(self, path: str, payload: Dict[str, Any]) -> None:
+                if server.callback_latency_s:
+                    time.sleep(server.callback_latency_s)
+                run_id = path.split("/")[3]
+                with server._lock:
+                    server._first_callbacks.setdefault(run_id, time.perf_counter())
+                if path.endswith("/complete"):
+                    server._count("webhook.complete")
+                    server._record_completion(run_id)
+                else:
+                    server._count("webhook.stage_update")
+                    if payload.get("status") == "FAILED":
+                        server._record_completion(run_id, error=payload.get("output") or "failed")
+                self._send_json(200, {"ok": True})
+
+            def _chat_completion(self, request: Dict[str, Any]) -> None:
+                prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+                stage = detect_stage(prompt)
+                server._count(f"llm.{stage}")
+
+                content = canned_output(stage, server.completion_tokens.get(stage), prompt)
+                prompt_tokens = max(1, len(prompt) // 4)
+                completion_tokens = max(1, len(content) // 4)
+                first_token_s, generation_s, fail = server._response_delay(completion_tokens)
+
+                if fail:
+                    time.sleep(first_token_s)
+                    server._count("llm.error")
+                    self._send_json(500, {"error": {"message": "fake upstream error", "type": "server_error"}})
+                    return
+
+                model = request.get("model", "benchmark/fake-model")
+                completion_id = f"chatcmpl-bench-{time.monotonic_ns()}"
+
+                if request.get("stream"):
+                    self._stream(completion_id, model, content, first_token_s, generation_s)
+                    return
+
+                time.sleep(first_token_s + generation_s)
+                self._send_json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                })
+
+            def _stream(self, completion_id: str, model: str, content: str, first_token_s: float, generation_s: float) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                chunk_count = 20
+                chunk_size = max(1, len(content) // chunk_count + 1)
+                pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+                time.sleep(first_token_s)
+                for index, piece in enumerate(pieces):
+                    if index:
+                        time.sleep(generation_s / len(pieces))
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
@@ -0,0 +1,237 @@
+"""
+Measurement helpers shared by the benchmark drivers.
+
+Collects per-request latencies, samples process resources (RSS, thread
+count and CPU) of this or another process while a workload runs, and writes JSON reports that can be compared
+release over release.
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024
+
+
+def process_usage(pid: int) -> Tuple[float, int]:
+    """(RSS in MB, thread count) of another process, from /proc (Linux only)."""
+    rss_mb, threads = 0.0, 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_mb = int(line.split()[1]) / 1024
+            elif line.startswith("Threads:"):
+                threads = int(line.split()[1])
+    return rss_mb, threads
+
+
+def cpu_seconds(pid: Optional[int] = None) -> float:
+    """User + system CPU time consumed by a process (default: this one)."""
+    if pid is None:
+        times = os.times()
+        return times.user + times.system
+    with open(f"/proc/{pid}/stat") as f:
+        # Fields after the parenthesised command name; utime/stime are 14th/15th
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class ResourceSampler:
+    """Sample RSS, live thread count and CPU use in the background.
+
+    Samples this process by default, or another process (e.g. a uvicorn
+    server under load) when pid is given.
+
+    Example:
+        >>> with ResourceSampler() as sampler:
+        ...     run_workload()
+        >>> sampler.peak_rss_mb, sampler.peak_threads, sampler.cpu_percent
+    """
+
+    def __init__(self, interval_s: float = 0.05, pid: Optional[int] = None):
+        self.interval_s = interval_s
+        self.pid = pid
+        self.start_rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.peak_threads = 0
+        self.cpu_percent = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_cpu = 0.0
+        self._start_time = 0.0
+
+    def _usage(self) -> Tuple[float, int]:
+        if self.pid is None:
+            # Exclude the sampler's own thread
+            return current_rss_mb(), threading.active_count() - 1
+        return process_usage(self.pid)
+
+    def _sample(self) -> None:
+        try:
+            rss_mb, threads = self._usage()
+        except OSError:
+            return  # Sampled process has exited
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self.peak_threads = max(self.peak_threads, threads)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def __enter__(self) -> "ResourceSampler":
+        self.start_rss_mb = self._usage()[0]
+        self._start_cpu = cpu_seconds(self.pid)
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        try:
+            elapsed = time.perf_counter() - self._start_time
+            self.cpu_percent = (cpu_seconds(self.pid) - self._start_cpu) / elapsed * 100 if elapsed else 0.0
+        except OSError:
+            pass
+
+
+@dataclass
+class BenchmarkResult:
+    """Outcome of one benchmark scenario.
+
+    Attributes:
+        name: Scenario name (e.g. "runner")
+        concurrency: Concurrent requests/runs in flight
+        latencies_s: End-to-end latency of each successful request
+        errors: Number of failed requests
+        wall_time_s: Total scenario wall time
+        peak_rss_mb: Resident memory high-water mark
+        start_rss_mb: Resident memory before the workload
+        peak_threads: Highest live thread count observed
+        config: Fake LLM and driver settings used
+    """
+    name: str
+    concurrency: int
+    latencies_s: List[float] = field(default_factory=list)
+    errors: int = 0
+    wall_time_s: float = 0.0
+    peak_rss_mb: float = 0.0
+    start_rss_mb: float = 0.0
+    peak_threads: int = 0
+    config: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        """Throughput, latency percentiles and resource peaks."""
+        completed = len(self.latencies_s)
+        return {
+            "name": self.name,
+            "concurrency": self.concurrency,
+            "requests": completed + self.errors,
+            "errors": self.errors,
+            "wall_time_s": round(self.wall_time_s, 3),
+            "throughput_per_s": round(completed / self.wall_time_s, 3) if self.wall_time_s else 0.0,
+            "latency_p50_s": round(percentile(self.latencies_s, 50), 4),
+            "latency_p95_s": round(percentile(self.latencies_s, 95), 4),
+            "latency_p99_s": round(percentile(self.latencies_s, 99), 4),
+            "latency_max_s": round(max(self.latencies_s, default=0.0), 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "rss_growth_mb": round(self.peak_rss_mb - self.start_rss_mb, 1),
+            "peak_threads": self.peak_threads,
+        }
+
+
+def git_revision() -> str:
+    """Short git revision of the working tree, or "unknown"."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=10, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def write_report(results: List[BenchmarkResult], path: Path) -> Path:
+    """Write results (summaries, raw latencies and config) to a JSON report."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "results": [{"summary": r.summary(), **asdict(r)} for r in results],
+    }
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def format_table(results: List[BenchmarkResult], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Render summaries as a markdown table, with deltas vs a previous report."""
+    previous = {}
+    if baseline:
+        previous = {r["summary"]["name"]: r["summary"] for r in baseline.get("results", [])}
+
+    columns = [
+        ("throughput_per_s", "Throughput/s"),
+        ("latency_p50_s", "p50 (s)"),
+        ("latency_p95_s", "p95 (s)"),
+        ("latency_p99_s", "p99 (s)"),
+        ("peak_rss_mb", "Peak RSS (MB)"),
+        ("peak_threads", "Peak threads"),
+    ]
+
+    lines = [
+        "| Scenario | Conc. | Requests | Errors | " + " | ".join(title for _, title in columns) + " |",
+        "|---|---|---|---|" + "---|" * len(columns),
+    ]
+    for result in results:
+        summary = result.summary()
+        cells = []
+        for key, _ in columns:
+            cell = f"{summary[key]}"
+            before = previous.get(summary["name"], {}).get(key)
+            if before:
+                cell += f" ({(summary[key] - before) / before * 100:+.1f}%)"
+            cells.append(cell)
+        lines.append(
+            f"| {summary['name']} | {summary['concurrency']} | {summary['requests']} | "
+            f"{summary['errors']} | " + " | ".join(cells) + " |"
+        )
+    return "\n".join(lines)
+
+
+def timed(func: Any, *args: Any, **kwargs: Any) -> float:
+    """Call func and return its wall time in seconds."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
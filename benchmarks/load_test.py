@@ -0,0 +1,493 @@
+"""
+Load test for the FastAPI backend: how many concurrent /run requests can
+one process sustain?
+
+Starts the backend under uvicorn as a separate process (LOADTEST_MODE=true)
+and a local stand-in for everything it talks to: the LLM, Vercel Blob
+(PDF download) and the Next.js stage-update/complete endpoints. Concurrency
+is then ramped in steps; each step keeps N runs in flight for a fixed
+duration (closed loop) and records:
+
+- Throughput and end-to-end latency (POST /run until the completion webhook)
+- Queueing delay: POST /run until the run's first stage update
+- POST /run response time (blob download happens inside the request)
+- Event-loop lag, from the backend's api_event_loop_lag_seconds histogram
+  and a client-side /metrics probe
+- Error rate by kind (HTTP error, FAILED stage, timeout)
+- Server RSS, thread count and CPU
+
+The report marks the saturation point: the first step where errors exceed
+the threshold, throughput stops growing, or p95 latency degrades.
+
+Usage:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --steps 1,2,4,8,16,32 --step-duration 120
+    python -m benchmarks.load_test --latency 1.0 --tokens-per-second 60 --stream
+
+Reports are written to benchmarks/results/loadtest-<timestamp>.{json,md}.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+import yaml
+
+from .fake_llm_server import FakeLLMServer
+from .harness import ResourceSampler, git_revision, percentile
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_ROOT / "backend"
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+LAG_METRIC = "api_event_loop_lag_seconds"
+
+
+@dataclass
+class StepResult:
+    """Measurements for one concurrency step.
+
+    Attributes:
+        concurrency: Runs kept in flight
+        latencies_s: End-to-end latency of each completed run
+        queue_delays_s: POST /run until the run's first stage update
+        post_latencies_s: POST /run response time
+        probe_latencies_s: Client-side /metrics response time during the step
+        errors: Failed runs by kind
+        wall_time_s: Step duration including drain
+        loop_lag_mean_s: Mean server event-loop lag during the step
+        loop_lag_over_100ms: Fraction of lag samples above 100ms
+        peak_rss_mb: Server resident memory high-water mark
+        peak_threads: Highest server thread count observed
+        cpu_percent: Average server CPU use (100 = one core)
+    """
+    concurrency: int
+    latencies_s: List[float] = field(default_factory=list)
+    queue_delays_s: List[float] = field(default_factory=list)
+    post_latencies_s: List[float] = field(default_factory=list)
+    probe_latencies_s: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+    wall_time_s: float = 0.0
+    loop_lag_mean_s: float = 0.0
+    loop_lag_over_100ms: float = 0.0
+    peak_rss_mb: float = 0.0
+    peak_threads: int = 0
+    cpu_percent: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        completed = len(self.latencies_s)
+        error_count = sum(self.errors.values())
+        total = completed + error_count
+        return {
+            "concurrency": self.concurrency,
+            "runs": total,
+            "completed": completed,
+            "errors": error_count,
+            "error_rate": round(error_count / total, 4) if total else 0.0,
+            "throughput_per_min": round(completed / self.wall_time_s * 60, 2) if self.wall_time_s else 0.0,
+            "latency_p50_s": round(percentile(self.latencies_s, 50), 3),
+            "latency_p95_s": round(percentile(self.latencies_s, 95), 3),
+            "latency_p99_s": round(percentile(self.latencies_s, 99), 3),
+            "queue_delay_p50_s": round(percentile(self.queue_delays_s, 50), 3),
+            "queue_delay_p95_s": round(percentile(self.queue_delays_s, 95), 3),
+            "post_run_p95_s": round(percentile(self.post_latencies_s, 95), 3),
+            "probe_p95_s": round(percentile(self.probe_latencies_s, 95), 4),
+            "loop_lag_mean_s": round(self.loop_lag_mean_s, 4),
+            "loop_lag_over_100ms": round(self.loop_lag_over_100ms, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "peak_threads": self.peak_threads,
+            "cpu_percent": round(self.cpu_percent, 1),
+        }
+
+
+def find_saturation(
+    summaries: List[Dict[str, Any]],
+    max_error_rate: float = 0.01,
+    min_throughput_gain: float = 0.1,
+    max_latency_factor: float = 2.0
+) -> Dict[str, Any]:
+    """Locate the saturation point on a concurrency ramp.
+
+    A step is saturated when its error rate exceeds max_error_rate, its
+    throughput is less than (1 + min_throughput_gain) x the best earlier
+    step, or its p95 latency exceeds max_latency_factor x the first step's.
+
+    Args:
+        summaries: StepResult.summary() per step, in ramp order
+
+    Returns:
+        Dictionary with max_sustainable_concurrency, saturated_at and reason
+        (saturated_at/reason are None if no step saturated)
+    """
+    result = {"max_sustainable_concurrency": None, "saturated_at": None, "reason": None}
+    if not summaries:
+        return result
+
+    baseline_p95 = summaries[0]["latency_p95_s"]
+    best_throughput = 0.0
+
+    for step in summaries:
+        reason = None
+        if step["error_rate"] > max_error_rate:
+            reason = f"error rate {step['error_rate']:.1%} > {max_error_rate:.1%}"
+        elif best_throughput and step["throughput_per_min"] < best_throughput * (1 + min_throughput_gain):
+            reason = (
+                f"throughput {step['throughput_per_min']}/min did not improve on "
+                f"{best_throughput}/min by {min_throughput_gain:.0%}"
+            )
+        elif baseline_p95 and step["latency_p95_s"] > baseline_p95 * max_latency_factor:
+            reason = f"p95 latency {step['latency_p95_s']}s > {max_latency_factor:g}x {baseline_p95}s"
+
+        if reason:
+            result["saturated_at"] = step["concurrency"]
+            result["reason"] = reason
+            return result
+
+        result["max_sustainable_concurrency"] = step["concurrency"]
+        best_throughput = max(best_throughput, step["throughput_per_min"])
+
+    return result
+
+
+def parse_histogram(metrics_text: str, metric: str) -> Dict[str, float]:
+    """Extract unlabelled histogram buckets, sum and count from /metrics text."""
+    values: Dict[str, float] = {}
+    for line in metrics_text.splitlines():
+        if not line.startswith(metric):
+            continue
+        name, _, value = line.rpartition(" ")
+        if name == f"{metric}_sum":
+            values["sum"] = float(value)
+        elif name == f"{metric}_count":
+            values["count"] = float(value)
+        elif name.startswith(f'{metric}_bucket{{le="'):
+            values[name[len(metric) + len('_bucket{le="'):-2]] = float(value)
+    return values
+
+
+class BackendProcess:
+    """uvicorn serving backend/app.main in a child process."""
+
+    def __init__(self, env: Dict[str, str], log_path: Path, port: int):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.log_path = log_path
+        self._log = open(log_path, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env},
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, timeout: float = 120.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Backend exited during startup, see {self.log_path}:\n{self.log_tail()}")
+            try:
+                if requests.get(f"{self.url}/metrics", timeout=2).ok:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.25)
+        raise TimeoutError(f"Backend not ready after {timeout}s, see {self.log_path}")
+
+    def metrics(self) -> str:
+        return requests.get(f"{self.url}/metrics", timeout=30).text
+
+    def log_tail(self, lines: int = 20) -> str:
+        self._log.flush()
+        return "\n".join(self.log_path.read_text(errors="replace").splitlines()[-lines:])
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self._log.close()
+
+
+def run_step(
+    args: argparse.Namespace,
+    concurrency: int,
+    backend: BackendProcess,
+    llm: FakeLLMServer,
+    blob_url: str
+) -> StepResult:
+    """Keep `concurrency` runs in flight for args.step_duration seconds."""
+    step = StepResult(concurrency=concurrency)
+    errors: Counter = Counter()
+    lock = threading.Lock()
+    stop_probe = threading.Event()
+    deadline = time.perf_counter() + args.step_duration
+
+    def worker(worker_id: int) -> None:
+        sequence = 0
+        while time.perf_counter() < deadline:
+            run_id = f"load-c{concurrency}-w{worker_id}-{sequence}-{os.getpid()}"
+            sequence += 1
+            error = None
+            start = time.perf_counter()
+            try:
+                response = requests.post(f"{backend.url}/run", json={
+                    "blob_url": blob_url, "brand_id": args.brand, "run_id": run_id
+                }, timeout=args.run_timeout)
+                accepted = time.perf_counter()
+                if not response.ok:
+                    error = f"http_{response.status_code}"
+            except requests.RequestException as e:
+                error = type(e).__name__
+
+            finished = None
+            if error is None:
+                finished = llm.wait_for_completion(run_id, timeout=args.run_timeout)
+                if finished is None:
+                    error = "timeout"
+                elif llm.run_error(run_id):
+                    error = "stage_failed"
+
+            first_update = llm.first_callback_at(run_id)
+            with lock:
+                if error:
+                    errors[error] += 1
+                else:
+                    step.latencies_s.append(finished - start)
+                    step.post_latencies_s.append(accepted - start)
+                if first_update is not None:
+                    step.queue_delays_s.append(first_update - start)
+            # Run outputs: /tmp/runs (runner) and data/test-outputs (Stage 5 cards)
+            shutil.rmtree(Path("/tmp/runs") / run_id, ignore_errors=True)
+            shutil.rmtree(BACKEND_DIR / "data" / "test-outputs" / run_id, ignore_errors=True)
+
+    def probe() -> None:
+        while not stop_probe.wait(args.probe_interval):
+            start = time.perf_counter()
+            try:
+                requests.get(f"{backend.url}/metrics", timeout=30)
+                step.probe_latencies_s.append(time.perf_counter() - start)
+            except requests.RequestException:
+                errors["probe_failed"] += 1
+
+    lag_before = parse_histogram(backend.metrics(), LAG_METRIC)
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    probe_thread = threading.Thread(target=probe, daemon=True)
+
+    with ResourceSampler(interval_s=0.25, pid=backend.process.pid) as sampler:
+        start = time.perf_counter()
+        probe_thread.start()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        step.wall_time_s = time.perf_counter() - start
+        stop_probe.set()
+        probe_thread.join()
+
+    lag_after = parse_histogram(backend.metrics(), LAG_METRIC)
+    samples = lag_after.get("count", 0) - lag_before.get("count", 0)
+    if samples:
+        step.loop_lag_mean_s = (lag_after.get("sum", 0) - lag_before.get("sum", 0)) / samples
+        under_100ms = lag_after.get("0.1", 0) - lag_before.get("0.1", 0)
+        step.loop_lag_over_100ms = 1 - under_100ms / samples
+
+    step.errors = dict(errors)
+    step.peak_rss_mb = sampler.peak_rss_mb
+    step.peak_threads = sampler.peak_threads
+    step.cpu_percent = sampler.cpu_percent
+    return step
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Markdown report: step table, saturation verdict and throughput curve."""
+    columns = [
+        ("concurrency", "Conc."),
+        ("runs", "Runs"),
+        ("error_rate", "Err %"),
+        ("throughput_per_min", "Runs/min"),
+        ("latency_p50_s", "p50 (s)"),
+        ("latency_p95_s", "p95 (s)"),
+        ("queue_delay_p95_s", "Queue p95 (s)"),
+        ("post_run_p95_s", "POST p95 (s)"),
+        ("loop_lag_mean_s", "Loop lag (s)"),
+        ("probe_p95_s", "Probe p95 (s)"),
+        ("peak_rss_mb", "RSS (MB)"),
+        ("peak_threads", "Threads"),
+        ("cpu_percent", "CPU %"),
+    ]
+    steps = [s["summary"] for s in report["steps"]]
+
+    lines = [
+        f"# Backend Load Test - {report['generated_at']}",
+        "",
+        f"- Git revision: {report['git_revision']}",
+        f"- Fake LLM: {report['config']['latency_s']}s to first token, "
+        f"{report['config']['tokens_per_s']} tokens/s, streaming={report['config']['stream']}",
+        f"- Step duration: {report['config']['step_duration_s']}s",
+        "",
+        "| " + " | ".join(title for _, title in columns) + " |",
+        "|" + "---|" * len(columns),
+    ]
+    for summary in steps:
+        cells = []
+        for key, _ in columns:
+            value = summary[key]
+            cells.append(f"{value * 100:.1f}" if key == "error_rate" else str(value))
+        lines.append("| " + " | ".join(cells) + " |")
+
+    saturation = report["saturation"]
+    lines += ["", "## Saturation", ""]
+    if saturation["saturated_at"] is None:
+        lines.append(f"No saturation up to concurrency {saturation['max_sustainable_concurrency']}.")
+    else:
+        lines.append(f"- Max sustainable concurrency: {saturation['max_sustainable_concurrency']}")
+        lines.append(f"- Saturated at: {saturation['saturated_at']} ({saturation['reason']})")
+
+    peak = max((s["throughput_per_min"] for s in steps), default=0) or 1
+    lines += ["", "## Throughput Curve", "", "```"]
+    for summary in steps:
+        bar = "#" * int(round(summary["throughput_per_min"] / peak * 40))
+        lines.append(
+            f"{summary['concurrency']:>4} | {bar:<40} {summary['throughput_per_min']:>8}/min"
+            f"  p95 {summary['latency_p95_s']}s"
+        )
+    lines.append("```")
+
+    return "\n".join(lines) + "\n"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def default_pdf() -> Path:
+    with open(REPO_ROOT / "data" / "input-manifest.yaml", encoding="utf-8") as f:
+        for entry in yaml.safe_load(f).get("inputs", []):
+            pdf = REPO_ROOT / "data" / "document" / entry["filename"]
+            if pdf.exists():
+                return pdf
+    raise FileNotFoundError("No input PDFs found in data/document/; pass --pdf")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ramp concurrent /run requests against the backend")
+    parser.add_argument(
+        "--steps", type=lambda v: [int(c) for c in v.split(",")], default=[1, 2, 4, 8, 16],
+        help="Concurrency levels, comma-separated (default: 1,2,4,8,16)"
+    )
+    parser.add_argument("--step-duration", type=float, default=60.0, help="Seconds to keep starting runs per step (default: 60)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM time to first token in seconds (default: 0.5)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Fake LLM generation rate (default: 200)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Fractional latency jitter (default: 0.1)")
+    parser.add_argument("--stream", action="store_true", help="Enable LLM_STREAMING in the backend")
+    parser.add_argument("--callback-latency", type=float, default=0.05, help="Next.js callback delay in seconds (default: 0.05)")
+    parser.add_argument("--blob-latency", type=float, default=0.2, help="Blob download delay in seconds (default: 0.2)")
+    parser.add_argument("--brand", default="lactalis-canada", help="Brand profile id (default: lactalis-canada)")
+    parser.add_argument("--pdf", type=Path, help="PDF served as the uploaded document (default: first manifest input)")
+    parser.add_argument("--run-timeout", type=float, default=600.0, help="Per-run completion timeout (default: 600)")
+    parser.add_argument("--probe-interval", type=float, default=0.5, help="Seconds between /metrics probes (default: 0.5)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate marking saturation (default: 0.01)")
+    parser.add_argument("--abort-error-rate", type=float, default=0.5, help="Stop ramping above this error rate (default: 0.5)")
+    parser.add_argument("--output", type=Path, help="Report path (default: benchmarks/results/loadtest-<timestamp>.json)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
+
+    output = args.output or RESULTS_DIR / f"loadtest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    llm = FakeLLMServer(
+        latency_s=args.latency,
+        tokens_per_s=args.tokens_per_second,
+        jitter=args.jitter,
+        callback_latency_s=args.callback_latency,
+        blob_latency_s=args.blob_latency,
+    ).start()
+    blob_url = llm.add_blob("input.pdf", (args.pdf or default_pdf()).read_bytes())
+
+    backend = BackendProcess(
+        env={
+            **llm.environment(),
+            "LOADTEST_MODE": "true",
+            "LLM_STREAMING": "true" if args.stream else "false",
+            "VERCEL_BLOB_READ_WRITE_TOKEN": "loadtest",
+        },
+        log_path=output.with_suffix(".backend.log"),
+        port=free_port(),
+    )
+
+    steps: List[StepResult] = []
+    try:
+        backend.wait_ready()
+        for concurrency in args.steps:
+            logging.info(f"Step: {concurrency} concurrent runs for {args.step_duration:g}s")
+            step = run_step(args, concurrency, backend, llm, blob_url)
+            steps.append(step)
+            summary = step.summary()
+            logging.info(
+                f"  {summary['completed']} completed, {summary['errors']} errors, "
+                f"{summary['throughput_per_min']} runs/min, p95 {summary['latency_p95_s']}s, "
+                f"queue p95 {summary['queue_delay_p95_s']}s"
+            )
+            if summary["error_rate"] > args.abort_error_rate:
+                logging.warning(f"Error rate {summary['error_rate']:.0%} - stopping ramp")
+                break
+    except (RuntimeError, TimeoutError) as e:
+        logging.error(str(e))
+        return 1
+    finally:
+        backend.stop()
+        llm.stop()
+
+    summaries = [s.summary() for s in steps]
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "config": {
+            "steps": args.steps,
+            "step_duration_s": args.step_duration,
+            "latency_s": args.latency,
+            "tokens_per_s": args.tokens_per_second,
+            "jitter": args.jitter,
+            "stream": args.stream,
+            "callback_latency_s": args.callback_latency,
+            "blob_latency_s": args.blob_latency,
+            "brand": args.brand,
+        },
+        "saturation": find_saturation(summaries, max_error_rate=args.max_error_rate),
+        "steps": [{"summary": summary, **asdict(step)} for summary, step in zip(summaries, steps)],
+    }
+
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    markdown = format_report(report)
+    output.with_suffix(".md").write_text(markdown, encoding="utf-8")
+
+    print(markdown)
+    print(f"Report: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+"""Latent space ideation with Swarm Queen Optimization (importable module).
+
+Components from the Colab notebook (Latent_Space_Product_Ideation_in_Python)
+packaged so they can be imported and run outside Colab:
+
+* `TextEncoder`: Encodes text into latent space embeddings
+* `Swarm`: Generates one idea vector per agent in a single batched tensor op
+* `SwarmAgent`: Single-agent view of the same exploration step
+* `SwarmQueen`: Maintains the global guidance vector and adapts to feedback
+* `VectorHistory`: Fixed-size ring buffer holding the idea population
+* `Projector`: Maps encoder vectors into the decoder's embedding space
+* `LatentToTextDecoder`: Generates text from latent vectors in padded batches
+* `run_latent_sqo_pipeline()`: Orchestrates the entire pipeline
+
+Usage (CPU, small models):
+
+    from latent_ideation import TextEncoder, LatentToTextDecoder, run_latent_sqo_pipeline
+
+    ideas = run_latent_sqo_pipeline(
+        seed_ideas,
+        encoder=TextEncoder(),
+        decoder=LatentToTextDecoder("distilgpt2"),
+        swarm_size=20,
+    )
+"""
+
+import random
+from typing import Callable, List, Optional
+
+import torch
+import torch.nn as nn
+
+
+def default_device() -> torch.device:
+    """GPU if available, otherwise CPU."""
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+# ===========================================
+# Seed Encoder
+# ===========================================
+
+class TextEncoder:
+    """Encodes a list of text strings into latent space vectors."""
+    def __init__(self, model_name='sentence-transformers/all-MiniLM-L6-v2', device=None):
+        from transformers import AutoTokenizer, AutoModel
+
+        self.device = device or default_device()
+        print(f"Loading encoder model: {model_name}...")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).to(self.device)
+        self.model.eval()
+        self.dim = self.model.config.hidden_size
+        print("Encoder loaded.")
+
+    def encode(self, texts: List[str]) -> torch.Tensor:
+        """Encodes a list of texts into a tensor of embeddings."""
+        inputs = self.tokenizer(texts, return_tensors='pt', padding=True, truncation=True).to(self.device)
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            embeddings = outputs.last_hidden_state.mean(dim=1)
+        return embeddings
+
+
+# ===========================================
+# Latent Space Explorer (Swarm Queen)
+# ===========================================
+
+def explore_batch(
+    queen_pool: torch.Tensor,
+    peer_pool: torch.Tensor,
+    queen_guidance: torch.Tensor,
+    alpha: torch.Tensor,
+    noise_scale: torch.Tensor,
+    generator: Optional[torch.Generator] = None
+) -> torch.Tensor:
+    """Generate one new vector per agent as a single (agents x dim) tensor op.
+
+    Each agent picks a random queen and a random peer, moves from the peer
+    towards the queen by its alpha, blends in the queen's global guidance
+    and adds Gaussian noise scaled by its noise_scale.
+
+    Args:
+        queen_pool: (queens, dim) top-scoring vectors
+        peer_pool: (population, dim) all vectors so far
+        queen_guidance: (dim,) global guidance vector
+        alpha: (agents,) queen attraction per agent
+        noise_scale: (agents,) noise magnitude per agent
+        generator: Optional torch.Generator for reproducible runs
+
+    Returns:
+        (agents, dim) tensor of new idea vectors
+    """
+    num_agents = alpha.shape[0]
+    queen_idx = torch.randint(len(queen_pool), (num_agents,), generator=generator).to(queen_pool.device)
+    peer_idx = torch.randint(len(peer_pool), (num_agents,), generator=generator).to(peer_pool.device)
+
+    a = alpha.unsqueeze(1)
+    primary_direction = a * queen_pool[queen_idx] + (1 - a) * peer_pool[peer_idx]
+    guided_direction = 0.8 * primary_direction + 0.2 * queen_guidance
+
+    noise = torch.randn(guided_direction.shape, generator=generator, dtype=guided_direction.dtype)
+    return guided_direction + noise_scale.unsqueeze(1) * noise.to(guided_direction.device)
+
+
+class Swarm:
+    """All agents of the swarm, stored as per-agent parameter tensors."""
+    def __init__(self, size: int, alpha: float = 0.7, noise_scale: float = 0.05, seed: Optional[int] = None):
+        self.size = size
+        self.alpha = torch.full((size,), alpha)
+        self.noise_scale = torch.full((size,), noise_scale)
+        self.generator = torch.Generator().manual_seed(seed) if seed is not None else None
+
+    def explore(self, queen_pool: torch.Tensor, peer_pool: torch.Tensor, queen_guidance: torch.Tensor) -> torch.Tensor:
+        """Returns a (size, dim) tensor: row i is agent i's new vector."""
+        return explore_batch(
+            queen_pool, peer_pool, queen_guidance,
+            self.alpha.to(queen_pool.dtype), self.noise_scale.to(queen_pool.dtype),
+            self.generator
+        )
+
+
+class SwarmAgent:
+    """Represents an agent in the swarm that generates a new idea vector."""
+    def __init__(self, aid: int, alpha: float = 0.7, noise_scale: float = 0.05):
+        self.aid = aid
+        self.alpha = alpha
+        self.noise_scale = noise_scale
+
+    def explore(self, queen_pool: torch.Tensor, peer_pool: torch.Tensor, queen_guidance: torch.Tensor) -> torch.Tensor:
+        """
+        Generates a new vector by combining influence from a queen, a peer, and global guidance.
+        """
+        return explore_batch(
+            queen_pool, peer_pool, queen_guidance,
+            torch.tensor([self.alpha], dtype=queen_pool.dtype),
+            torch.tensor([self.noise_scale], dtype=queen_pool.dtype)
+        )[0]
+
+
+class SwarmQueen:
+    """
+    The Queen processes feedback (scores) and maintains a global model to guide the swarm.
+
+    Agent weights are a contiguous (agents,) tensor; row i of the vectors
+    passed to process_feedback belongs to agent i.
+    """
+    def __init__(self, num_agents: int, vector_dim: int, device=None, temperature: float = 0.1):
+        self.device = device or default_device()
+        self.agent_weights = torch.ones(num_agents, device=self.device)
+        self.global_model_vector = torch.zeros(vector_dim, device=self.device) # Represents promising directions
+        self.previous_avg_score = 0.0
+        self.temperature = temperature
+
+    def process_feedback(self, agent_vectors, scores: List[float]):
+        """
+        Updates agent weights and the global model based on the scores of the generated ideas.
+
+        The global model moves towards a softmax-weighted mix of the new
+        vectors: one matrix-vector product instead of a per-agent loop.
+
+        Args:
+            agent_vectors: (agents, dim) tensor of the vectors each agent produced
+                (a dict of agent ID to vector is also accepted).
+            scores: A list of scores corresponding to the rows of agent_vectors.
+        """
+        if isinstance(agent_vectors, dict):
+            agent_vectors = torch.stack([agent_vectors[aid] for aid in sorted(agent_vectors)])
+        if len(scores) == 0:
+            return
+
+        scores = torch.as_tensor(scores, dtype=torch.float32, device=self.device)
+        current_avg_score = scores.mean().item()
+        reward = current_avg_score - self.previous_avg_score
+
+        # Update agent weights based on reward
+        self.agent_weights.mul_(1 + reward * 0.1)
+        if reward > 0:
+            self.agent_weights.clamp_(max=1.5)
+        else:
+            self.agent_weights.clamp_(min=0.5)
+
+        # High-scoring vectors from high-weight agents have more influence
+        influence = (scores / 5.0) * self.agent_weights[:len(scores)] # Normalize score to 0-1 range
+        coefficients = torch.softmax(influence / self.temperature, dim=0)
+
+        # Decay the old model and move towards the weighted mix of new vectors
+        vectors = agent_vectors.to(self.device, torch.float32)
+        self.global_model_vector.mul_(0.9).add_(coefficients @ vectors, alpha=0.1)
+
+        # Normalize the global model vector to prevent its magnitude from exploding
+        norm = torch.linalg.norm(self.global_model_vector)
+        if norm > 0:
+            self.global_model_vector /= norm
+
+        self.previous_avg_score = current_avg_score
+
+    def get_guidance(self) -> torch.Tensor:
+        """Returns the current global guidance vector."""
+        return self.global_model_vector
+
+
+class VectorHistory:
+    """Preallocated ring buffer of idea vectors and their scores.
+
+    Appending writes into the fixed buffer in place, so memory does not grow
+    with the number of iterations. Once full, the oldest entries are
+    overwritten.
+    """
+    def __init__(self, capacity: int, dim: int, dtype=torch.float32):
+        self.capacity = capacity
+        self._vectors = torch.empty(capacity, dim, dtype=dtype)
+        self._scores = torch.empty(capacity, dtype=torch.float32)
+        self._next = 0
+        self.size = 0
+
+    def extend(self, vectors: torch.Tensor, scores: List[float]):
+        """Appends (n, dim) vectors with their n scores."""
+        vectors = vectors[-self.capacity:]
+        scores = torch.as_tensor(scores, dtype=torch.float32)[-self.capacity:]
+        positions = (self._next + torch.arange(len(vectors))) % self.capacity
+        self._vectors[positions] = vectors.to(self._vectors.dtype)
+        self._scores[positions] = scores
+        self._next = (self._next + len(vectors)) % self.capacity
+        self.size = min(self.capacity, self.size + len(vectors))
+
+    @property
+    def vectors(self) -> torch.Tensor:
+        """(size, dim) view of the stored vectors (no copy)."""
+        return self._vectors[:self.size]
+
+    @property
+    def scores(self) -> torch.Tensor:
+        """(size,) view of the stored scores (no copy)."""
+        return self._scores[:self.size]
+
+
+# ===========================================
+# Cross-Modal Projector
+# ===========================================
+
+class Projector(nn.Module):
+    """A simple MLP to project between embedding dimensions."""
+    def __init__(self, input_dim, output_dim):
+        super().__init__()
+        self.mlp = nn.Sequential(
+            nn.Linear(input_dim, (input_dim + output_dim) // 2),
+            nn.ReLU(),
+            nn.Linear((input_dim + output_dim) // 2, output_dim)
+        )
+
+    def forward(self, x):
+        return self.mlp(x)
+
+
+# ===========================================
+# Decoder (Large Language Model)
+# ===========================================
+
+class LatentToTextDecoder:
+    """Generates text from latent vectors using a causal language model."""
+    def __init__(self, model_name='google/gemma-2b-it', device=None):
+        from transformers import AutoTokenizer, AutoModelForCausalLM
+
+        self.device = device or default_device()
+        # float16 only pays off on GPU; CPU matmuls are much faster in float32
+        self.dtype = torch.float16 if self.device.type == "cuda" else torch.float32
+
+        print(f"Loading decoder model: {model_name}... (This will take time and memory)")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        if self.device.type == "cuda":
+            self.model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=self.dtype, device_map='auto')
+        else:
+            self.model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=self.dtype).to(self.device)
+        self.model.eval()
+        self.device = self.model.device
+        self.dim = self.model.get_input_embeddings().embedding_dim
+        self._prompt_cache = {}
+        print("Decoder loaded.")
+
+    def _prompt_embeds(self, prompt_prefix: str) -> torch.Tensor:
+        # The prefix is identical for every vector; embed it once
+        if prompt_prefix not in self._prompt_cache:
+            prompt_tokens = self.tokenizer(prompt_prefix, return_tensors='pt').input_ids.to(self.device)
+            with torch.no_grad():
+                self._prompt_cache[prompt_prefix] = self.model.get_input_embeddings()(prompt_tokens)
+        return self._prompt_cache[prompt_prefix]
+
+    def generate_batch(
+        self,
+        latent_vectors: torch.Tensor,
+        prompt_prefix: str = "Generate a creative, detailed idea based on this concept: ",
+        max_length: int = 60,
+        batch_size: int = 16
+    ) -> List[str]:
+        """Generates one text per latent vector, batch_size vectors per generate() call.
+
+        Every input is [prompt prefix, latent vector], so inputs in a batch
+        have equal length; sequences that finish early are padded with the
+        pad token and stripped when decoding.
+        """
+        prompt_embeds = self._prompt_embeds(prompt_prefix)
+        texts = []
+
+        for start in range(0, len(latent_vectors), batch_size):
+            chunk = latent_vectors[start:start + batch_size].to(self.device, self.dtype)
+            inputs_embeds = torch.cat([
+                prompt_embeds.expand(len(chunk), -1, -1),
+                chunk.unsqueeze(1)
+            ], dim=1)
+            attention_mask = torch.ones(inputs_embeds.shape[:2], dtype=torch.long, device=self.device)
+
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    inputs_embeds=inputs_embeds,
+                    attention_mask=attention_mask,
+                    max_new_tokens=max_length,
+                    do_sample=True,
+                    top_k=50,
+                    temperature=0.9,
+                    pad_token_id=self.tokenizer.pad_token_id
+                )
+
+            # Older transformers versions echo the (placeholder) prompt ids
+            if outputs.shape[1] > max_length:
+                outputs = outputs[:, inputs_embeds.shape[1]:]
+            texts.extend(self.tokenizer.batch_decode(outputs, skip_special_tokens=True))
+
+        return texts
+
+    def generate(self, latent_vector: torch.Tensor, prompt_prefix: str = "Generate a creative, detailed idea based on this concept: ", max_length=60) -> str:
+        """Generates text by feeding the latent vector as a continuous prompt."""
+        return self.generate_batch(latent_vector.unsqueeze(0), prompt_prefix, max_length)[0]
+
+
+# ===========================================
+# Evaluator (LLM-as-a-Judge)
+# ===========================================
+
+def dummy_score_ideas(ideas: List[str]) -> List[float]:
+    """Placeholder for an LLM-based evaluator. Assigns random scores."""
+    print(f"Scoring {len(ideas)} ideas (using dummy scores)...")
+    return [random.uniform(3.0, 5.0) for _ in ideas]
+
+
+# ===========================================
+# The Full Pipeline
+# ===========================================
+
+def run_latent_sqo_pipeline(
+    seed_ideas: List[str],
+    iterations: int = 2,
+    swarm_size: int = 20,
+    encoder: Optional[TextEncoder] = None,
+    decoder: Optional[LatentToTextDecoder] = None,
+    score_fn: Callable[[List[str]], List[float]] = dummy_score_ideas,
+    decode_batch_size: int = 16,
+    seed: Optional[int] = None,
+    history_size: Optional[int] = None
+):
+    """Runs the full ideation pipeline with the advanced Swarm Queen model.
+
+    Args:
+        seed_ideas: Initial idea texts
+        iterations: Number of swarm iterations
+        swarm_size: Number of agents (new ideas per iteration)
+        encoder: TextEncoder (default: all-MiniLM-L6-v2)
+        decoder: LatentToTextDecoder (default: gemma-2b-it)
+        score_fn: Scores a list of ideas (default: random placeholder scores)
+        decode_batch_size: Vectors per decoder generate() call
+        seed: Optional seed for the swarm's random choices and noise
+        history_size: Vectors kept as the peer/queen pool (default: all);
+            older vectors are overwritten once the ring buffer is full
+
+    Returns:
+        All ideas (seeds included) sorted by score, best first
+    """
+    device = default_device()
+
+    # --- Initialization ---
+    encoder = encoder or TextEncoder(device=device)
+    decoder = decoder or LatentToTextDecoder(device=device)
+    projector = Projector(input_dim=encoder.dim, output_dim=decoder.dim).to(decoder.device, decoder.dtype)
+
+    swarm = Swarm(swarm_size, seed=seed)
+    queen = SwarmQueen(num_agents=swarm_size, vector_dim=encoder.dim, device=device)
+
+    # --- Initial State ---
+    print("\nEncoding initial seed ideas...")
+    # Keep the population on the CPU; only projection/decoding run on the device
+    seed_vectors = encoder.encode(seed_ideas).cpu()
+    all_ideas = list(seed_ideas)
+    all_scores = score_fn(all_ideas)
+
+    history = VectorHistory(history_size or len(seed_ideas) + iterations * swarm_size, encoder.dim, seed_vectors.dtype)
+    history.extend(seed_vectors, all_scores)
+
+    # --- Iterative Generation Loop ---
+    for i in range(iterations):
+        print(f"\n{'='*20} Iteration {i+1}/{iterations} {'='*20}")
+
+        # 1. Identify Queens (top-k ideas)
+        top_k = min(5, history.size)
+        queen_indices = torch.topk(history.scores, top_k).indices
+        queen_pool = history.vectors[queen_indices]
+
+        # 2. Explore: every agent generates a new vector in one batched op
+        print("Swarm is exploring latent space...")
+        new_vectors = swarm.explore(queen_pool, history.vectors, queen.get_guidance().cpu())
+
+        # 3. Project & Decode in batches
+        print("Projecting and decoding new vectors into ideas...")
+        with torch.no_grad():
+            projected_vectors = projector(new_vectors.to(decoder.device, decoder.dtype))
+        generated_ideas = decoder.generate_batch(projected_vectors, batch_size=decode_batch_size)
+        for j, idea in enumerate(generated_ideas):
+            print(f"  -> New Idea {j+1}: {idea.strip()}")
+
+        # 4. Evaluate new ideas
+        new_scores = score_fn(generated_ideas)
+
+        # 5. Queen processes feedback
+        print("Queen is processing feedback...")
+        queen.process_feedback(new_vectors, new_scores)
+
+        # 6. Update State
+        all_ideas.extend(generated_ideas)
+        history.extend(new_vectors, new_scores)
+        all_scores.extend(new_scores)
+        print(f"Population size is now {len(all_ideas)} ideas.")
+
+    # --- Final Result ---
+    sorted_ideas = [idea for _, idea in sorted(zip(all_scores, all_ideas), key=lambda pair: pair[0], reverse=True)]
+    return sorted_ideas
+
+
+if __name__ == '__main__':
+    seed_ideas = [
+        "A drone that plants trees in deforested areas using biodegradable seed pods.",
+        "A smart coffee mug that uses kinetic energy from stirring to keep the drink warm.",
+        "Biodegradable shoes that contain seeds and can be planted at the end of their life.",
+        "An AI therapist chatbot that specializes in helping people with social anxiety.",
+        "A system for capturing and recycling greywater from showers for use in toilets."
+    ]
+
+    print("Starting Latent Space Ideation Pipeline with Advanced SQO...")
+    final_ideas = run_latent_sqo_pipeline(seed_ideas, iterations=2, swarm_size=10)
+
+    print("\n\n===================================")
+    print("      Final Generated Ideas      ")
+    print("   (Sorted by dummy score)   ")
+    print("===================================")
+    for i, idea in enumerate(final_ideas):
+        print(f"{i+1}. {idea}")
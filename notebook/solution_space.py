@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Persistent solution space for latent ideation lookups (NumPy only).
+
+Candidate concepts are encoded once, in batches, into a memory-mapped
+float32 matrix on disk. An IVF index (spherical k-means coarse quantizer
+plus inverted lists) answers nearest-neighbor queries by scanning only
+the `nprobe` lists closest to the query, which keeps lookups over 100k+
+candidates interactive on CPU.
+
+Layout of a solution space directory:
+
+    vectors.f32     (count, dim) float32 row-major, rows L2-normalized
+    texts.jsonl     one candidate text per line, same order as vectors
+    meta.json       {"count": ..., "dim": ...}
+    ivf.npz         centroids, inverted-list offsets and member ids
+
+Usage:
+
+    space = SolutionSpace.build("data/solution-space", texts, encoder.encode)
+    space = SolutionSpace.load("data/solution-space")
+    [(text, score), ...] = space.search(target_vector, k=5)
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class IVFIndex:
+    """Inverted-file index for cosine similarity over normalized vectors."""
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, ids: np.ndarray):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+        sample_size: Optional[int] = None,
+        chunk_size: int = 16_384,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """Cluster vectors with spherical k-means and build inverted lists.
+
+        Args:
+            vectors: (count, dim) normalized vectors (a memmap is fine)
+            n_lists: Number of lists (default: sqrt(count))
+            iterations: k-means iterations on the training sample
+            sample_size: Vectors used to train centroids (default: 32 per list)
+            chunk_size: Rows assigned per matrix product
+            seed: Random seed for sampling and initialization
+        """
+        count = len(vectors)
+        n_lists = n_lists or max(1, int(np.sqrt(count)))
+        n_lists = min(n_lists, count)
+        sample_size = sample_size or 32 * n_lists
+        rng = np.random.default_rng(seed)
+
+        sample_ids = rng.choice(count, size=min(count, sample_size), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_ids)], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assignment, minlength=n_lists)
+            order = np.argsort(assignment, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            empty = ~filled
+            # Re-seed empty lists with random sample points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        assignment = np.empty(count, dtype=np.int32)
+        for start in range(0, count, chunk_size):
+            chunk = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+            assignment[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+
+        ids = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+        return cls(centroids, offsets, ids)
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int = 5, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, scores) of the k best matches among the nprobe closest lists."""
+        query = _normalize(query)
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        candidates = np.concatenate([self.ids[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        candidates.sort()  # Sequential reads from the memmap
+        scores = np.asarray(vectors[candidates], dtype=np.float32) @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top], scores[top]
+
+    def save(self, path: Path) -> None:
+        np.savez(path, centroids=self.centroids, offsets=self.offsets, ids=self.ids)
+
+    @classmethod
+    def load(cls, path: Path) -> "IVFIndex":
+        with np.load(path) as data:
+            return cls(data["centroids"], data["offsets"], data["ids"])
+
+
+class SolutionSpace:
+    """Candidate texts with memory-mapped embeddings and an IVF index."""
+
+    def __init__(self, path: Path, texts: List[str], vectors: np.ndarray, index: IVFIndex):
+        self.path = Path(path)
+        self.texts = texts
+        self.vectors = vectors
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def build(
+        cls,
+        path,
+        texts: Sequence[str],
+        encode: Callable[[List[str]], np.ndarray],
+        batch_size: int = 256,
+        n_lists: Optional[int] = None
+    ) -> "SolutionSpace":
+        """Encode texts in batches into a new solution space directory.
+
+        Args:
+            path: Output directory
+            texts: Candidate concepts
+            encode: Maps a list of texts to a (len, dim) array
+            batch_size: Texts per encode call
+            n_lists: IVF list count (default: sqrt(len(texts)))
+        """
+        if not texts:
+            raise ValueError("Solution space needs at least one candidate text")
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        first = _normalize(encode(list(texts[:batch_size])))
+        dim = first.shape[1]
+        vectors = np.memmap(path / "vectors.f32", dtype=np.float32, mode="w+", shape=(len(texts), dim))
+        vectors[:len(first)] = first
+        for start in range(batch_size, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            vectors[start:start + len(batch)] = _normalize(encode(list(batch)))
+        vectors.flush()
+
+        with open(path / "texts.jsonl", "w", encoding="utf-8") as f:
+            for text in texts:
+                f.write(json.dumps(text, ensure_ascii=False) + "\n")
+        (path / "meta.json").write_text(json.dumps({"count": len(texts), "dim": dim}))
+
+        index = IVFIndex.train(vectors, n_lists=n_lists)
+        index.save(path / "ivf.npz")
+        return cls(path, list(texts), vectors, index)
+
+    @classmethod
+    def load(cls, path) -> "SolutionSpace":
+        """Open an existing solution space (vectors stay on disk)."""
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        vectors = np.memmap(path / "vectors.f32", dtype=np.float32, mode="r", shape=(meta["count"], meta["dim"]))
+        with open(path / "texts.jsonl", encoding="utf-8") as f:
+            texts = [json.loads(line) for line in f]
+        return cls(path, texts, vectors, IVFIndex.load(path / "ivf.npz"))
+
+    def search(self, target_vector: np.ndarray, k: int = 5, nprobe: int = 8) -> List[Tuple[str, float]]:
+        """Return the k candidates most similar to target_vector, best first."""
+        ids, scores = self.index.search(self.vectors, np.asarray(target_vector, dtype=np.float32), k, nprobe)
+        return [(self.texts[i], float(s)) for i, s in zip(ids, scores)]
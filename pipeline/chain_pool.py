@@ -0,0 +1,126 @@
+"""
+Warm pool of reusable stage chain instances.
+
+Building a stage chain is not free: every construction rebuilds the prompt
+template, the LLM client, and (for Stage 5) the StructuredOutputParser and
+Jinja2 environment. The chains hold no per-run state, so a single instance
+per stage can safely be shared by every run in the process.
+
+The pool caches one instance per factory (a stage class or a
+``create_stageN_chain`` function) and is safe to use from concurrent
+pipeline threads.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .stages.stage1_input_processing import Stage1Chain
+from .stages.stage2_signal_amplification import Stage2Chain
+from .stages.stage3_general_translation import Stage3Chain
+from .stages.stage4_brand_contextualization import Stage4Chain
+from .stages.stage5_opportunity_generation import Stage5Chain
+
+
+# Default factories, indexed by stage number - 1
+DEFAULT_STAGE_FACTORIES: Tuple[Callable[[], Any], ...] = (
+    Stage1Chain,
+    Stage2Chain,
+    Stage3Chain,
+    Stage4Chain,
+    Stage5Chain,
+)
+
+
+class ChainPool:
+    """Thread-safe cache of stateless stage chain instances.
+
+    Each factory is invoked at most once per pool; subsequent calls to
+    ``get`` return the same instance. Chains must therefore stay stateless
+    across runs (all run inputs are passed to ``run``).
+
+    Attributes:
+        _chains: Mapping of factory to constructed chain instance
+        _lock: Guards chain construction so concurrent runs build each
+               chain only once
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._chains: Dict[Callable[[], Any], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, factory: Callable[[], Any]) -> Any:
+        """Borrow the shared chain instance built by ``factory``.
+
+        Args:
+            factory: Zero-argument callable returning a chain instance
+                     (e.g. ``Stage1Chain`` or ``create_stage1_chain``)
+
+        Returns:
+            Shared chain instance for this factory
+
+        Raises:
+            ValueError: If chain construction fails (e.g. missing API config)
+        """
+        chain = self._chains.get(factory)
+        if chain is not None:
+            return chain
+
+        with self._lock:
+            # Re-check: another thread may have built it while we waited
+            chain = self._chains.get(factory)
+            if chain is None:
+                chain = factory()
+                self._chains[factory] = chain
+                logging.debug(
+                    f"Chain pool: built {getattr(factory, '__name__', factory)}"
+                )
+        return chain
+
+    def warm(self, factories: Optional[Iterable[Callable[[], Any]]] = None) -> int:
+        """Construct chains ahead of the first run.
+
+        Args:
+            factories: Factories to build (default: all five stage classes)
+
+        Returns:
+            Number of chains held by the pool after warming
+        """
+        for factory in (factories or DEFAULT_STAGE_FACTORIES):
+            self.get(factory)
+
+        logging.info(f"Chain pool warmed: {len(self._chains)} chains ready")
+        return len(self._chains)
+
+    def clear(self) -> None:
+        """Drop all cached chains (e.g. after changing LLM configuration)."""
+        with self._lock:
+            self._chains.clear()
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+
+_default_pool: Optional[ChainPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_chain_pool() -> ChainPool:
+    """Get the process-wide chain pool, creating it on first use.
+
+    Returns:
+        Shared ChainPool instance
+
+    Example:
+        >>> pool = get_chain_pool()
+        >>> stage1 = pool.get(Stage1Chain)
+        >>> result = stage1.run(input_text)
+    """
+    global _default_pool
+
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = ChainPool()
+    return _default_pool
@@ -0,0 +1,263 @@
+"""
+Run deadlines, LLM call timeouts and retry budgets.
+
+Every stage's LLM calls go through call_with_deadline() (RoutedChatModel
+wraps each client call in it), which:
+
+- gives each attempt a connect and a read timeout, so a hung upstream
+  connection cannot pin a pipeline thread;
+- retries timeouts, connection errors, 429s and 5xx responses with
+  jittered exponential backoff, up to LLM_MAX_ATTEMPTS per call and
+  LLM_RETRY_BUDGET retries per run (a bad upstream doesn't turn every
+  call of the run into three); 429s the rate-limited transport already
+  retried (pipeline/rate_limiter.py) are not retried again;
+- when the run has an end-to-end deadline (PIPELINE_DEADLINE_S, or
+  deadline_s on POST /run), splits the time left across the stages still
+  to run and caps each attempt's timeout at the current stage's share.
+
+A stage's share is fixed when its first call is made: the time left in
+the run times the stage's weight over the weights of it and the later
+stages. Weights follow the stages' max_tokens, since output length drives
+latency; time a fast stage doesn't use goes to the stages after it, and
+a fused call (Stages 2 and 3 in one, STAGE23_FUSED) takes both shares.
+Stages served from the semantic cache or a checkpoint make no calls and
+take no share. For streamed responses the read timeout applies per chunk,
+so only non-streaming calls are cut off exactly at the stage deadline.
+
+Usage:
+    with run_deadline(600) as deadline:
+        dag.run(context, ...)          # LLM calls honor the deadline
+        deadline.remaining()           # Seconds left, for status updates
+"""
+
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import httpx
+import openai
+
+from .instrumentation import current_stage, record_retry
+
+
+T = TypeVar("T")
+
+DEFAULT_CONNECT_TIMEOUT_S = 10.0
+DEFAULT_READ_TIMEOUT_S = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BUDGET = 6
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 20.0
+MIN_ATTEMPT_S = 5.0  # Don't start a retry with less time than this left
+
+# Stage order and relative share of the run's time (the stages' max_tokens)
+STAGE_WEIGHTS: Dict[str, float] = {
+    "stage1": 2500,
+    "stage2": 3000,
+    "stage3": 3500,
+    "stage4": 4000,
+    "stage5": 4000,
+}
+
+# Fused stages (one call doing several stages' work) take their shares together
+FUSED_STAGES: Dict[str, Tuple[str, ...]] = {
+    "stage23": ("stage2", "stage3"),
+}
+
+
+# Set on a 429 response the rate-limited transport already retried
+TRANSPORT_RETRIED_429 = "pipeline_transport_retried_429"
+
+
+class DeadlineExceeded(TimeoutError):
+    """The run's (or the current stage's) deadline has passed."""
+
+
+class RetryBudget:
+    """Retries a run may still spend across all of its LLM calls."""
+
+    def __init__(self, retries: int = DEFAULT_RETRY_BUDGET):
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class RunDeadline:
+    """End-to-end deadline of one run, split across its stages.
+
+    Args:
+        seconds: Run deadline (None: no deadline, timeouts and the retry
+            budget still apply)
+        retries: Retry budget for the run
+        clock: Monotonic clock (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        retries: int = DEFAULT_RETRY_BUDGET,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.seconds = seconds
+        self.budget = RetryBudget(retries)
+        self._clock = clock
+        self.started = clock()
+        self.expires_at = self.started + seconds if seconds else None
+        self._stage_expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the run (None without a deadline)."""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - self._clock()
+
+    def stage_remaining(self, stage: Optional[str]) -> Optional[float]:
+        """Seconds left for stage, allotting its share on the first call."""
+        remaining = self.remaining()
+        members = FUSED_STAGES.get(stage, (stage,))
+        if remaining is None or members[0] not in STAGE_WEIGHTS:
+            return remaining
+
+        with self._lock:
+            expiry = self._stage_expiry.get(stage)
+            if expiry is None:
+                order = list(STAGE_WEIGHTS)
+                later = order[order.index(members[0]):]
+                share = sum(STAGE_WEIGHTS[s] for s in members) / sum(STAGE_WEIGHTS[s] for s in later)
+                expiry = self._stage_expiry[stage] = self._clock() + max(0.0, remaining) * share
+                logging.debug(f"Deadline: {stage} gets {max(0.0, remaining) * share:.0f}s of {remaining:.0f}s left")
+        return min(expiry - self._clock(), remaining)
+
+    def status(self) -> Dict[str, Any]:
+        """Deadline fields for run status updates."""
+        remaining = self.remaining()
+        return {
+            "deadline_s": self.seconds,
+            "remaining_s": round(max(0.0, remaining), 1) if remaining is not None else None,
+            "retries_left": self.budget.remaining,
+        }
+
+
+_deadline: contextvars.ContextVar[Optional[RunDeadline]] = contextvars.ContextVar(
+    "pipeline_run_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[RunDeadline]:
+    """Get the deadline of the run executing in this context, if any."""
+    return _deadline.get()
+
+
+@contextmanager
+def run_deadline(seconds: Optional[float] = None) -> Iterator[RunDeadline]:
+    """Apply a deadline and retry budget to the LLM calls made inside this block.
+
+    Args:
+        seconds: Run deadline (default: PIPELINE_DEADLINE_S, unset: none)
+    """
+    if seconds is None:
+        seconds = float(os.getenv("PIPELINE_DEADLINE_S") or 0) or None
+    deadline = RunDeadline(seconds, retries=int(os.getenv("LLM_RETRY_BUDGET", DEFAULT_RETRY_BUDGET)))
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an LLM call error is transient (timeout, connection, 429, 5xx)."""
+    if isinstance(error, DeadlineExceeded) or isinstance(error.__cause__, DeadlineExceeded):
+        return False
+    if isinstance(error, openai.RateLimitError):
+        return not error.response.extensions.get(TRANSPORT_RETRIED_429)
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500 or error.status_code == 408
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number attempt (1-based)."""
+    return random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (attempt - 1)))
+
+
+def allow_retry(reason: str, stage: Optional[str] = None) -> bool:
+    """Spend one of the run's retries, unless the budget or the stage's time is used up.
+
+    For retries outside call_with_deadline (e.g. Stage 5 re-asking after a
+    parse failure); always True outside a run_deadline block.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return True
+    stage = stage or current_stage()
+    left = deadline.stage_remaining(stage)
+    if left is not None and left < MIN_ATTEMPT_S:
+        logging.warning(f"{stage}: not retrying ({reason}), {max(0.0, left):.0f}s left before the deadline")
+        return False
+    if not deadline.budget.try_spend():
+        logging.warning(f"{stage}: not retrying ({reason}), run retry budget used up")
+        return False
+    return True
+
+
+def call_with_deadline(call: Callable[[httpx.Timeout], T], description: str) -> T:
+    """Run call(timeout) with timeouts, jittered retries and the run's deadline.
+
+    Args:
+        call: Makes one attempt with the given request timeout
+        description: Name of the call for logs (e.g. "stage2 deepseek/deepseek-chat")
+
+    Returns:
+        The first successful attempt's result
+
+    Raises:
+        DeadlineExceeded: If the stage's time ran out
+        Exception: The last attempt's error if it is not retryable or no
+            retries are left
+    """
+    deadline = _deadline.get()
+    stage = current_stage()
+    connect_s = float(os.getenv("LLM_CONNECT_TIMEOUT_S", DEFAULT_CONNECT_TIMEOUT_S))
+    read_s = float(os.getenv("LLM_READ_TIMEOUT_S", DEFAULT_READ_TIMEOUT_S))
+    max_attempts = int(os.getenv("LLM_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+
+    attempt = 1
+    while True:
+        left = deadline.stage_remaining(stage) if deadline is not None else None
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"{stage or 'run'} deadline passed before {description} could complete")
+        timeout = read_s if left is None else min(read_s, left)
+
+        try:
+            return call(httpx.Timeout(timeout, connect=min(connect_s, timeout)))
+        except Exception as e:
+            if isinstance(e.__cause__, DeadlineExceeded):
+                raise e.__cause__  # Raised inside the HTTP transport (rate limiter wait)
+            if not is_retryable(e) or attempt >= max_attempts:
+                raise
+            delay = backoff_delay(attempt)
+            left = deadline.stage_remaining(stage) if deadline is not None else None
+            if left is not None and left - delay < MIN_ATTEMPT_S:
+                raise DeadlineExceeded(f"{stage or 'run'} deadline reached after {description} failed: {e}") from e
+            if deadline is not None and not deadline.budget.try_spend():
+                logging.warning(f"{description}: run retry budget used up, not retrying")
+                raise
+            logging.warning(f"{description} failed ({type(e).__name__}: {e}), retry {attempt}/{max_attempts - 1} in {delay:.1f}s")
+            record_retry("llm_call", f"{type(e).__name__}: {e}")
+            time.sleep(delay)
+            attempt += 1
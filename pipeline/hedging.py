@@ -0,0 +1,237 @@
+"""
+Hedged LLM requests.
+
+Stages run sequentially, so one OpenRouter call that takes 3-5x its
+median dominates the run. With LLM_HEDGE=true, create_llm() builds its clients as
+HedgedChatOpenAI: if a call is still running after the stage's learned
+threshold (the p90 of its recent latencies), a duplicate request is sent
+(to LLM_HEDGE_FALLBACK_MODEL if set) and whichever answers first wins.
+
+The losing request is cancelled: a streaming request (LLM_STREAMING=true)
+is closed at its next chunk, which aborts the HTTP stream; a blocking
+request can't be interrupted, so its response is discarded.
+
+Hedges are bounded per process by a HedgeBudget: every request earns
+LLM_HEDGE_BUDGET (default 0.1) hedge tokens, up to a small burst, and a
+hedge spends one, so total request volume stays within ~1.1x. At most
+burst hedges are in flight at once (a losing blocking hedge holds its
+slot until it returns); hedge attempts run on a pool of that size.
+
+Calls that can't be hedged (no threshold yet, no budget) run inline on
+the caller's thread, so enabling hedging doesn't cap LLM concurrency. A
+call that may be hedged runs its primary attempt on a thread of its own,
+so the caller can return as soon as either attempt answers.
+
+Configuration:
+    LLM_HEDGE                  Enable hedging (default false)
+    LLM_HEDGE_FALLBACK_MODEL   Model for the duplicate request (default: same model)
+    LLM_HEDGE_BUDGET           Hedges allowed per request (default 0.1)
+    LLM_HEDGE_MIN_DELAY_S      Lower bound on the hedge threshold (default 2.0)
+"""
+
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_openai import ChatOpenAI
+
+from .instrumentation import REGISTRY, current_stage, span
+
+
+DEFAULT_BUDGET_RATIO = 0.1
+DEFAULT_MIN_DELAY_S = 2.0
+HISTORY_SIZE = 50
+MIN_SAMPLES = 10  # No hedging until a stage has this many latencies
+
+
+def hedging_enabled() -> bool:
+    return os.getenv("LLM_HEDGE", "false").lower() == "true"
+
+
+class LatencyTracker:
+    """Recent LLM latencies per stage and the derived hedge threshold."""
+
+    def __init__(self, percentile: float = 90.0, size: int = HISTORY_SIZE, min_delay_s: float = DEFAULT_MIN_DELAY_S):
+        self.percentile = percentile
+        self.size = size
+        self.min_delay_s = min_delay_s
+        self._history: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, latency_s: float) -> None:
+        with self._lock:
+            self._history.setdefault(stage, deque(maxlen=self.size)).append(latency_s)
+
+    def threshold(self, stage: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while history is too short."""
+        with self._lock:
+            history = sorted(self._history.get(stage, ()))
+        if len(history) < MIN_SAMPLES:
+            return None
+        rank = max(0, math.ceil(self.percentile / 100 * len(history)) - 1)
+        return max(self.min_delay_s, history[rank])
+
+
+class HedgeBudget:
+    """Token bucket bounding hedges to a fraction of requests.
+
+    Args:
+        ratio: Hedge tokens earned per request
+        burst: Maximum stored tokens
+    """
+
+    def __init__(self, ratio: float = DEFAULT_BUDGET_RATIO, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.max_in_flight = max(1, math.ceil(burst))
+        self._tokens = burst if ratio > 0 else 0.0
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+
+    def on_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def available(self) -> bool:
+        """Whether a hedge could be afforded now (nothing is spent)."""
+        with self._lock:
+            return self._tokens >= 1.0
+
+    def try_spend(self) -> bool:
+        """Take a token and an in-flight slot; pair with finish() when True."""
+        if not self._in_flight.acquire(blocking=False):
+            return False
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+        self._in_flight.release()
+        return False
+
+    def finish(self) -> None:
+        """Free the in-flight slot of a finished hedge."""
+        self._in_flight.release()
+
+
+class _Cancelled(Exception):
+    """Raised inside a streaming attempt that lost the race."""
+
+
+_tracker = LatencyTracker(min_delay_s=float(os.getenv("LLM_HEDGE_MIN_DELAY_S", DEFAULT_MIN_DELAY_S)))
+_budget = HedgeBudget(ratio=float(os.getenv("LLM_HEDGE_BUDGET", DEFAULT_BUDGET_RATIO)))
+# Hedge attempts only; try_spend() keeps at most max_in_flight of them running
+_hedge_executor = ThreadPoolExecutor(max_workers=_budget.max_in_flight, thread_name_prefix="llm-hedge")
+
+
+def _start_thread(fn: Callable[[], ChatResult]) -> Future:
+    """Run fn in the current context on a new thread; returns its Future."""
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-primary", daemon=True).start()
+    return future
+
+
+class HedgedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that hedges slow calls with a duplicate request.
+
+    Attributes:
+        hedge_fallback: Client for the duplicate request (None: this client)
+    """
+
+    hedge_fallback: Optional[ChatOpenAI] = None
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        stage = current_stage() or "unattributed"
+        _budget.on_request()
+        delay = _tracker.threshold(stage)
+
+        cancel = {"primary": threading.Event(), "hedge": threading.Event()}
+        attempt = self._attempt(self, messages, stop, run_manager, cancel["primary"], kwargs)
+        started = time.perf_counter()
+
+        if delay is None or not _budget.available():
+            result = attempt()
+            _tracker.record(stage, time.perf_counter() - started)
+            return result
+
+        def record_latency(future: Future) -> None:
+            # Also recorded when the hedge won, so the p90 stays unbiased
+            if future.exception() is None:
+                _tracker.record(stage, time.perf_counter() - started)
+
+        primary = _start_thread(attempt)
+        primary.add_done_callback(record_latency)
+
+        done, _ = wait([primary], timeout=delay)
+        if done or not _budget.try_spend():
+            return primary.result()
+
+        fallback = self.hedge_fallback or self
+        with span("llm_hedge", kind="hedge", delay_s=round(delay, 3), model=fallback.model_name) as attrs:
+            hedge_attempt = self._attempt(fallback, messages, stop, None, cancel["hedge"], kwargs)
+            hedge = _hedge_executor.submit(contextvars.copy_context().run, hedge_attempt)
+            hedge.add_done_callback(lambda _: _budget.finish())
+            attempts = {primary: "primary", hedge: "hedge"}
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    winner = attempts[future]
+                    loser = "hedge" if winner == "primary" else "primary"
+                    cancel[loser].set()
+                    attrs["winner"] = winner
+                    REGISTRY.inc("pipeline_llm_hedges_total", 1, "Hedged LLM requests by winner", stage=stage, winner=winner)
+                    logging.info(f"LLM hedge ({stage}): {winner} won after {time.perf_counter() - started:.1f}s")
+                    return future.result()
+            attrs["winner"] = None
+            raise error
+
+    @staticmethod
+    def _attempt(
+        llm: ChatOpenAI,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Optional[CallbackManagerForLLMRun],
+        cancel: threading.Event,
+        kwargs: Dict[str, Any]
+    ) -> Callable[[], ChatResult]:
+        def attempt() -> ChatResult:
+            if not llm.streaming:
+                return ChatOpenAI._generate(llm, messages, stop=stop, run_manager=run_manager, **kwargs)
+
+            def chunks():
+                for chunk in ChatOpenAI._stream(llm, messages, stop=stop, run_manager=run_manager, **kwargs):
+                    if cancel.is_set():
+                        raise _Cancelled()  # Closes the HTTP stream
+                    yield chunk
+            return generate_from_stream(chunks())
+
+        return attempt
@@ -0,0 +1,719 @@
+"""
+Per-run timing, token and cost instrumentation for the pipeline.
+
+Every instrumented operation (stage run, LLM call, PDF extraction, Prisma
+call, webhook) is recorded as a span with its wall time and attributes.
+Spans are collected in two places:
+
+1. The RunMetrics of the run currently executing in this context
+   (exported as structured JSON per run)
+2. The process-wide MetricsRegistry (exposed in Prometheus text format)
+
+LLM calls are captured by LLMMetricsCallback, which create_llm() attaches to
+every ChatOpenAI instance. It records latency, time-to-first-token (when
+streaming), prompt/completion token counts and an estimated cost.
+
+Spans carry trace/span ids (see pipeline.tracing) and are handed to any
+configured trace exporters as they finish.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .tracing import (
+    current_span_context,
+    export_span,
+    flush_spans,
+    new_span_id,
+    new_trace_id,
+    reset_span_context,
+    set_span_context,
+    trace_id_for_run,
+)
+
+
+# Estimated USD price per 1M tokens: (prompt, completion).
+# Override or extend with LLM_PRICING='{"model/name": [prompt, completion]}'.
+DEFAULT_MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "deepseek/deepseek-chat": (0.27, 1.10),
+    "anthropic/claude-sonnet-4.5": (3.00, 15.00),
+    "anthropic/claude-sonnet-4.5-20250514": (3.00, 15.00),
+    "anthropic/claude-3.5-sonnet": (3.00, 15.00),
+    "openai/gpt-4-turbo": (10.00, 30.00),
+}
+
+# Histogram buckets (seconds) - LLM stages routinely take 10-60s
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+@dataclass
+class SpanRecord:
+    """A single timed operation within a run.
+
+    Attributes:
+        name: Operation name (e.g. "stage1", "llm", "pdf_extraction")
+        kind: Operation category ("stage", "llm", "io", "http", "step")
+        started_at: Wall-clock start (epoch seconds)
+        duration_s: Wall time in seconds
+        stage: Stage the operation ran under, if any
+        attributes: Extra data (tokens, cost, retries, status code, ...)
+        error: Error description if the operation failed
+        trace_id: W3C trace id (derived from the run id within a run)
+        span_id: W3C span id
+        parent_span_id: Enclosing span's id (None for trace roots)
+    """
+    name: str
+    kind: str
+    started_at: float
+    duration_s: float
+    stage: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    trace_id: Optional[str] = None
+    span_id: Optional[str] = None
+    parent_span_id: Optional[str] = None
+
+
+class RunMetrics:
+    """Collects spans for one pipeline run and summarizes them.
+
+    Attributes:
+        run_id: Run identifier
+        trace_id: Trace id shared by every span of the run
+        started_at: Wall-clock start of the run (epoch seconds)
+        status: "running", "completed" or "failed"
+        spans: Recorded spans in completion order
+        annotations: Run-level facts for reports (e.g. semantic cache provenance)
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.trace_id = trace_id_for_run(run_id)
+        self.root_span_id = new_span_id()
+        self.parent_span_id: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.spans: List[SpanRecord] = []
+        self.annotations: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._token = None
+        self._span_token = None
+
+    def record(self, span_record: SpanRecord) -> None:
+        """Add a finished span to this run."""
+        with self._lock:
+            self.spans.append(span_record)
+
+    def mark_failed(self, error: str) -> None:
+        """Flag the run as failed (exceptions handled by the caller)."""
+        self.status = "failed"
+        self.error = error
+
+    def merge(self, other: "RunMetrics") -> None:
+        """Import spans from another run (e.g. cached Stages 1-3 in batch mode)."""
+        with self._lock:
+            self.spans.extend(other.spans)
+
+    @property
+    def total_wall_time_s(self) -> float:
+        end = self.finished_at or time.time()
+        return end - self.started_at
+
+    def stage_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate spans per stage.
+
+        Returns:
+            Mapping of stage name to wall time, LLM call count, token counts,
+            estimated cost, retries and time-to-first-token
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+
+        def entry(stage: str) -> Dict[str, Any]:
+            return stages.setdefault(stage, {
+                "wall_time_s": 0.0,
+                "llm_calls": 0,
+                "llm_time_s": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
+                "retries": 0,
+                "time_to_first_token_s": None,
+            })
+
+        with self._lock:
+            spans = list(self.spans)
+
+        for record in spans:
+            if record.kind == "stage":
+                entry(record.name)["wall_time_s"] += record.duration_s
+            if not record.stage:
+                continue
+            stats = entry(record.stage)
+            stats["retries"] += record.attributes.get("retries", 0)
+            if record.kind == "llm":
+                stats["llm_calls"] += 1
+                stats["llm_time_s"] += record.duration_s
+                stats["prompt_tokens"] += record.attributes.get("prompt_tokens", 0)
+                stats["completion_tokens"] += record.attributes.get("completion_tokens", 0)
+                stats["cost_usd"] += record.attributes.get("cost_usd") or 0.0
+                ttft = record.attributes.get("time_to_first_token_s")
+                if ttft is not None and stats["time_to_first_token_s"] is None:
+                    stats["time_to_first_token_s"] = ttft
+
+        for stats in stages.values():
+            stats["wall_time_s"] = round(stats["wall_time_s"], 3)
+            stats["llm_time_s"] = round(stats["llm_time_s"], 3)
+            stats["cost_usd"] = round(stats["cost_usd"], 6)
+
+        return dict(sorted(stages.items()))
+
+    def totals(self) -> Dict[str, Any]:
+        """Run-level totals across all stages."""
+        stages = self.stage_summary()
+        return {
+            "wall_time_s": round(self.total_wall_time_s, 3),
+            "llm_calls": sum(s["llm_calls"] for s in stages.values()),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in stages.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in stages.values()),
+            "cost_usd": round(sum(s["cost_usd"] for s in stages.values()), 6),
+            "retries": sum(s["retries"] for s in stages.values()),
+        }
+
+    def to_dict(self, include_spans: bool = True) -> Dict[str, Any]:
+        """Serialize the run as a JSON-compatible dictionary."""
+        data = {
+            "run_id": self.run_id,
+            "trace_id": self.trace_id,
+            "status": self.status,
+            "error": self.error,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "totals": self.totals(),
+            "stages": self.stage_summary(),
+        }
+        if self.annotations:
+            data["annotations"] = dict(self.annotations)
+        if include_spans:
+            with self._lock:
+                data["spans"] = [asdict(s) for s in self.spans]
+        return data
+
+    def export_json(self, path: Path) -> Path:
+        """Write the run metrics to a JSON file.
+
+        Args:
+            path: Destination file (parent directories are created)
+
+        Returns:
+            Path to written file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        logging.info(f"Run metrics saved: {path}")
+        return path
+
+
+class MetricsRegistry:
+    """Process-wide aggregates rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    def _describe(self, name: str, metric_type: str, help_text: str) -> None:
+        self._help.setdefault(name, (metric_type, help_text))
+
+    def inc(self, metric: str, value: float = 1.0, help_text: str = "", **labels: Any) -> None:
+        """Increment a counter."""
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._describe(metric, "counter", help_text)
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def add_gauge(self, metric: str, value: float, help_text: str = "", **labels: Any) -> None:
+        """Add (or subtract) from a gauge."""
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._describe(metric, "gauge", help_text)
+            self._gauges[key] = self._gauges.get(key, 0.0) + value
+
+    def observe(self, metric: str, value: float, help_text: str = "", **labels: Any) -> None:
+        """Record a histogram observation."""
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._describe(metric, "histogram", help_text)
+            # Layout: one slot per bucket, then +Inf count, then sum
+            buckets = self._histograms.setdefault(key, [0.0] * (len(DURATION_BUCKETS) + 2))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            buckets[-2] += 1
+            buckets[-1] += value
+
+    def reset(self) -> None:
+        """Clear all metrics (used by tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format (0.0.4)."""
+        def fmt_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+            parts = [f'{k}="{_escape_label(v)}"' for k, v in labels]
+            if extra:
+                parts.append(extra)
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines: List[str] = []
+        with self._lock:
+            for name, (metric_type, help_text) in sorted(self._help.items()):
+                lines.append(f"# HELP {name} {help_text or name}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                if metric_type == "histogram":
+                    for (metric, labels), values in sorted(self._histograms.items()):
+                        if metric != name:
+                            continue
+                        for bound, count in zip(DURATION_BUCKETS, values):
+                            le = fmt_labels(labels, 'le="%s"' % bound)
+                            lines.append(f"{name}_bucket{le} {count:g}")
+                        le = fmt_labels(labels, 'le="+Inf"')
+                        lines.append(f"{name}_bucket{le} {values[-2]:g}")
+                        lines.append(f"{name}_count{fmt_labels(labels)} {values[-2]:g}")
+                        lines.append(f"{name}_sum{fmt_labels(labels)} {values[-1]:.6f}")
+                else:
+                    source = self._counters if metric_type == "counter" else self._gauges
+                    for (metric, labels), value in sorted(source.items()):
+                        if metric == name:
+                            lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+_current_run: ContextVar[Optional[RunMetrics]] = ContextVar("pipeline_current_run", default=None)
+_current_stage: ContextVar[Optional[str]] = ContextVar("pipeline_current_stage", default=None)
+
+
+def current_run() -> Optional[RunMetrics]:
+    """Get the RunMetrics for the run executing in this context, if any."""
+    return _current_run.get()
+
+
+def current_stage() -> Optional[str]:
+    """Get the stage executing in this context, if any."""
+    return _current_stage.get()
+
+
+def _child_ids() -> Tuple[str, Optional[str], str]:
+    """Get (trace_id, parent_span_id, span_id) for a new span in this context."""
+    context = current_span_context()
+    if context is not None:
+        trace_id, parent_span_id = context
+    else:
+        run = _current_run.get()
+        trace_id = run.trace_id if run is not None else new_trace_id()
+        parent_span_id = None
+    return trace_id, parent_span_id, new_span_id()
+
+
+def begin_run(run_id: str) -> RunMetrics:
+    """Start collecting metrics for a run in the current context.
+
+    Pair with end_run() (typically in a finally block). Opens the run's root
+    span; if called under an enclosing span of the same trace (e.g. the
+    /run request handler), the root span is parented to it.
+
+    Args:
+        run_id: Run identifier
+
+    Returns:
+        RunMetrics collecting this run's spans
+    """
+    metrics = RunMetrics(run_id)
+    parent = current_span_context()
+    if parent is not None and parent[0] == metrics.trace_id:
+        metrics.parent_span_id = parent[1]
+    metrics._token = _current_run.set(metrics)
+    metrics._span_token = set_span_context(metrics.trace_id, metrics.root_span_id)
+    REGISTRY.add_gauge("pipeline_runs_in_progress", 1, "Pipeline runs currently executing")
+    return metrics
+
+
+def end_run(metrics: RunMetrics) -> None:
+    """Stop collecting metrics for a run and publish run-level aggregates."""
+    metrics.finished_at = time.time()
+    if metrics.status == "running":
+        metrics.status = "completed"
+
+    record_span(SpanRecord(
+        name="pipeline_run",
+        kind="run",
+        started_at=metrics.started_at,
+        duration_s=round(metrics.total_wall_time_s, 6),
+        attributes={"run_id": metrics.run_id, "status": metrics.status},
+        error=metrics.error,
+        trace_id=metrics.trace_id,
+        span_id=metrics.root_span_id,
+        parent_span_id=metrics.parent_span_id,
+    ))
+
+    if metrics._span_token is not None:
+        reset_span_context(metrics._span_token)
+        metrics._span_token = None
+    if metrics._token is not None:
+        _current_run.reset(metrics._token)
+        metrics._token = None
+
+    REGISTRY.add_gauge("pipeline_runs_in_progress", -1, "Pipeline runs currently executing")
+    REGISTRY.inc("pipeline_runs_total", 1, "Pipeline runs by final status", status=metrics.status)
+    REGISTRY.observe(
+        "pipeline_run_duration_seconds", metrics.total_wall_time_s,
+        "End-to-end pipeline run wall time", status=metrics.status
+    )
+
+    totals = metrics.totals()
+    logging.info(
+        f"[{metrics.run_id}] Run metrics: {totals['wall_time_s']:.1f}s, "
+        f"{totals['llm_calls']} LLM calls, "
+        f"{totals['prompt_tokens']}+{totals['completion_tokens']} tokens, "
+        f"~${totals['cost_usd']:.4f}"
+    )
+    flush_spans()
+
+
+@contextmanager
+def track_run(run_id: str) -> Iterator[RunMetrics]:
+    """Context manager form of begin_run()/end_run().
+
+    Example:
+        >>> with track_run("savannah-bananas") as metrics:
+        ...     stage1_chain.run(input_text)
+        >>> metrics.export_json(output_dir / "metrics.json")
+    """
+    metrics = begin_run(run_id)
+    try:
+        yield metrics
+    except Exception as e:
+        metrics.mark_failed(str(e))
+        raise
+    finally:
+        end_run(metrics)
+
+
+@contextmanager
+def child_run(name: str) -> Iterator[RunMetrics]:
+    """Collect the spans of a sub-task separately, then merge them into the run.
+
+    Unlike track_run(), no run-level span or metrics are published; spans
+    keep their trace parenting and exporters still receive them. Used to
+    measure the cost of speculative work inside a run.
+
+    Example:
+        >>> with child_run("track2") as branch:
+        ...     stage2_chain.run(track_text)
+        >>> branch.totals()["cost_usd"]
+    """
+    parent = _current_run.get()
+    child = RunMetrics(name)
+    if parent is not None:
+        child.trace_id = parent.trace_id
+    token = _current_run.set(child)
+    try:
+        yield child
+    finally:
+        _current_run.reset(token)
+        child.finished_at = time.time()
+        if parent is not None:
+            parent.merge(child)
+
+
+def record_span(span_record: SpanRecord) -> None:
+    """Publish a finished span to the current run, the registry and exporters."""
+    run = _current_run.get()
+    if run is not None:
+        run.record(span_record)
+    export_span(span_record)
+
+    labels = {"name": span_record.name, "kind": span_record.kind}
+    REGISTRY.observe(
+        "pipeline_span_duration_seconds", span_record.duration_s,
+        "Wall time of instrumented pipeline operations", **labels
+    )
+    if span_record.error:
+        REGISTRY.inc("pipeline_span_errors_total", 1, "Failed pipeline operations", **labels)
+    retries = span_record.attributes.get("retries", 0)
+    if retries:
+        REGISTRY.inc("pipeline_retries_total", retries, "Retries by operation", **labels)
+
+
+@contextmanager
+def span(name: str, kind: str = "step", **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """Time an operation and record it as a span.
+
+    Spans of kind "stage" also set the current stage, so nested spans (LLM
+    calls, retries) are attributed to it. The span is current (for trace
+    parenting) while the block runs.
+
+    Args:
+        name: Operation name
+        kind: Operation category ("stage", "llm", "io", "http", "step")
+        **attributes: Initial span attributes
+
+    Yields:
+        Mutable attribute dict; callers may add fields (e.g. retries)
+
+    Example:
+        >>> with span("pdf_extraction", kind="io") as attrs:
+        ...     text = extract(pdf)
+        ...     attrs["characters"] = len(text)
+    """
+    attrs: Dict[str, Any] = dict(attributes)
+    stage_token = _current_stage.set(name) if kind == "stage" else None
+    stage = _current_stage.get()
+    trace_id, parent_span_id, span_id = _child_ids()
+    span_token = set_span_context(trace_id, span_id)
+    started_at = time.time()
+    start = time.perf_counter()
+    error = None
+
+    try:
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        reset_span_context(span_token)
+        if stage_token is not None:
+            _current_stage.reset(stage_token)
+        record_span(SpanRecord(
+            name=name,
+            kind=kind,
+            started_at=started_at,
+            duration_s=round(duration, 6),
+            stage=stage,
+            attributes=attrs,
+            error=error,
+            trace_id=trace_id,
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        ))
+
+
+def instrument_stage(stage: str) -> Callable:
+    """Decorator recording a stage's run() as a "stage" span.
+
+    Args:
+        stage: Stage name (e.g. "stage1")
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(stage, kind="stage"):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_retry(name: str, reason: str = "") -> None:
+    """Count a retry against the current stage (or operation name)."""
+    stage = _current_stage.get()
+    trace_id, parent_span_id, span_id = _child_ids()
+    record_span(SpanRecord(
+        name=f"{name}.retry",
+        kind="retry",
+        started_at=time.time(),
+        duration_s=0.0,
+        stage=stage,
+        attributes={"retries": 1, "reason": reason[:200]},
+        trace_id=trace_id,
+        span_id=span_id,
+        parent_span_id=parent_span_id,
+    ))
+
+
+def get_model_pricing() -> Dict[str, Tuple[float, float]]:
+    """Get per-model pricing (USD per 1M tokens), including LLM_PRICING overrides."""
+    pricing = dict(DEFAULT_MODEL_PRICING)
+    override = os.getenv("LLM_PRICING")
+    if override:
+        try:
+            for model, prices in json.loads(override).items():
+                pricing[model] = (float(prices[0]), float(prices[1]))
+        except (ValueError, TypeError, IndexError, AttributeError) as e:
+            logging.warning(f"Ignoring invalid LLM_PRICING value: {e}")
+    return pricing
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimate USD cost of an LLM call.
+
+    Returns:
+        Estimated cost, or None if the model has no known pricing
+    """
+    prices = get_model_pricing().get(model or "")
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count for text (tiktoken if installed, else ~4 chars/token)."""
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except Exception:
+        return max(1, len(text) // 4) if text else 0
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """LangChain callback recording every LLM call as an "llm" span.
+
+    Captures latency, time-to-first-token (streaming only), prompt and
+    completion token counts (provider usage, or estimated when the provider
+    returns none) and estimated cost.
+
+    One instance is shared by all LLM clients; per-call state is keyed by
+    the LangChain run id.
+    """
+
+    def __init__(self):
+        self._calls: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, prompt_text: str, serialized: Dict[str, Any], kwargs: Dict[str, Any]) -> None:
+        params = kwargs.get("invocation_params") or {}
+        trace_id, parent_span_id, span_id = _child_ids()
+        with self._lock:
+            self._calls[run_id] = {
+                "start": time.perf_counter(),
+                "started_at": time.time(),
+                "first_token": None,
+                "prompt_text": prompt_text,
+                "model": params.get("model") or params.get("model_name"),
+                "stage": _current_stage.get(),
+                "trace_ids": (trace_id, parent_span_id, span_id),
+                "completion_text": [],
+            }
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_text = "\n".join(
+            str(getattr(m, "content", m)) for batch in messages for m in batch
+        )
+        self._start(run_id, prompt_text, serialized, kwargs)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "\n".join(prompts), serialized, kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is None:
+                return
+            if call["first_token"] is None:
+                call["first_token"] = time.perf_counter()
+            call["completion_text"].append(token)
+
+    def on_retry(self, retry_state: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None:
+                call["retries"] = call.get("retries", 0) + 1
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+
+        llm_output = getattr(response, "llm_output", None) or {}
+        usage = llm_output.get("token_usage") or {}
+        model = llm_output.get("model_name") or call["model"]
+
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            completion_text = "".join(call["completion_text"]) or "".join(
+                g.text for gens in getattr(response, "generations", []) for g in gens
+            )
+            prompt_tokens = estimate_tokens(call["prompt_text"])
+            completion_tokens = estimate_tokens(completion_text)
+
+        self._finish(call, model, error=None, attributes={
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "tokens_estimated": estimated,
+        })
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is not None:
+            self._finish(call, call["model"], error=f"{type(error).__name__}: {error}", attributes={})
+
+    def _finish(self, call: Dict[str, Any], model: Optional[str], error: Optional[str], attributes: Dict[str, Any]) -> None:
+        duration = time.perf_counter() - call["start"]
+        stage = call["stage"] or "unattributed"
+        ttft = (call["first_token"] - call["start"]) if call["first_token"] else None
+
+        attributes.update({
+            "model": model,
+            "time_to_first_token_s": round(ttft, 6) if ttft is not None else None,
+            "retries": call.get("retries", 0),
+        })
+        prompt_tokens = attributes.get("prompt_tokens", 0)
+        completion_tokens = attributes.get("completion_tokens", 0)
+        attributes["cost_usd"] = estimate_cost(model, prompt_tokens, completion_tokens)
+
+        trace_id, parent_span_id, span_id = call["trace_ids"]
+        record_span(SpanRecord(
+            name="llm",
+            kind="llm",
+            started_at=call["started_at"],
+            duration_s=round(duration, 6),
+            stage=call["stage"],
+            attributes=attributes,
+            error=error,
+            trace_id=trace_id,
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        ))
+
+        labels = {"stage": stage, "model": model or "unknown"}
+        REGISTRY.inc("pipeline_llm_tokens_total", prompt_tokens, "LLM tokens by stage and type", type="prompt", **labels)
+        REGISTRY.inc("pipeline_llm_tokens_total", completion_tokens, "LLM tokens by stage and type", type="completion", **labels)
+        if attributes["cost_usd"] is not None:
+            REGISTRY.inc("pipeline_llm_cost_usd_total", attributes["cost_usd"], "Estimated LLM cost (USD)", **labels)
+        if ttft is not None:
+            REGISTRY.observe("pipeline_llm_time_to_first_token_seconds", ttft, "LLM time to first streamed token", **labels)
+
+
+_llm_callback = LLMMetricsCallback()
+
+
+def get_llm_callback() -> LLMMetricsCallback:
+    """Get the shared LLM metrics callback attached by create_llm()."""
+    return _llm_callback
@@ -0,0 +1,67 @@
+"""
+Append-only JSONL files shared between processes.
+
+The novelty index and the semantic cache persist records as one JSON
+object per line. Every process appends its own records and reads the
+lines other processes appended since its last read, starting from the
+byte offset it stopped at. A trailing line without a newline is still
+being written and is left for the next read.
+
+Usage:
+    log = AppendOnlyJsonl(path, "novelty index")
+    for record in log.read_new():       # Lines appended since the last read
+        ...
+    log.append({"key": key, ...})       # Not returned by the next read_new()
+
+Not thread-safe: callers hold their own lock around both calls, together
+with the in-memory state the records feed.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+
+class AppendOnlyJsonl:
+    """Incrementally read JSONL file that this and other processes append to.
+
+    Args:
+        path: JSONL file (created on the first append)
+        name: What the file holds, for log messages
+    """
+
+    def __init__(self, path: Union[str, Path], name: str = "JSONL"):
+        self.path = Path(path)
+        self.name = name
+        self._offset = 0
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        """Records appended since the last read (malformed lines are skipped)."""
+        if not self.path.exists():
+            return []
+
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partially written line; picked up next read
+                self._offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError as e:
+                    logging.warning(f"Skipping malformed {self.name} line: {e}")
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append a record as one line."""
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(line)
+            end = f.tell()
+        # Skip our own line on the next read unless another process appended
+        # in between (the caller then sees its record again and ignores it)
+        if end == self._offset + len(line):
+            self._offset = end
@@ -0,0 +1,53 @@
+"""
+Stages 2+3: Innovation Anatomy and Job Architecture in one response
+
+Fused prompt that runs the Stage 2 (Doblin's 10 Types) and Stage 3
+(Jobs-to-be-Done) analyses in a single call, sending the Stage 1
+mechanisms once. Both tasks are taken verbatim from the Stage 2 and
+Stage 3 prompts; the response wraps each in tags so it can be split back
+into the two stage outputs.
+"""
+
+from langchain.prompts import PromptTemplate
+
+from .stage2_prompt import get_prompt_template as get_stage2_prompt_template
+from .stage3_prompt import get_prompt_template as get_stage3_prompt_template
+
+
+STAGE2_TAG = "stage2"
+STAGE3_TAG = "stage3"
+
+
+def _task_section(prompt: PromptTemplate) -> str:
+    """The part of a stage prompt after its inputs (from "TASK:" on)."""
+    return prompt.template[prompt.template.index("TASK:"):]
+
+
+def get_prompt_template() -> PromptTemplate:
+    """Get the fused Stage 2+3 prompt.
+
+    Returns:
+        PromptTemplate taking stage1_output
+    """
+    template = f"""You are an innovation strategist specializing in systematic innovation classification using Doblin's 10 Types framework, the Jobs-to-be-Done framework and cross-industry pattern transfer.
+
+STAGE 1 MECHANISMS (INPUT):
+{{stage1_output}}
+
+Complete TWO analyses of these mechanisms, in order, in one response.
+Write PART 1 between <{STAGE2_TAG}> and </{STAGE2_TAG}>, then PART 2 between <{STAGE3_TAG}> and </{STAGE3_TAG}>.
+Write nothing outside the tags.
+
+=== PART 1: INNOVATION TYPE ANALYSIS ===
+
+{_task_section(get_stage2_prompt_template())}
+=== PART 2: JOB ARCHITECTURE ===
+
+Use your Part 1 innovation type analysis as the Stage 2 input.
+
+{_task_section(get_stage3_prompt_template())}"""
+
+    return PromptTemplate(
+        input_variables=["stage1_output"],
+        template=template
+    )
@@ -8,37 +8,43 @@ using the 5 core CPG innovation patterns and retail viability assessment.
 from langchain.prompts import PromptTemplate
 
 
-def get_prompt_template() -> PromptTemplate:
-    """Get enhanced Stage 4 prompt for CPG-specific brand translation.
-
-    Returns:
-        PromptTemplate configured for CPG brand application
-    """
-
-    template = """You are a CPG innovation strategist specializing in translating innovation mechanisms into retail-ready brand opportunities.
+# Prompt sections. The map-reduce prompts (one call per Stage 3 lesson, then
+# a merge call) reuse the shared sections, brand profile first, so the
+# concurrent lesson calls share one prefix
+_HEADER = """You are a CPG innovation strategist specializing in translating innovation mechanisms into retail-ready brand opportunities.
 
 BRAND PROFILE:
 {brand_profile}
 
-BRAND RESEARCH DATA:
+"""
+
+_RESEARCH = """BRAND RESEARCH DATA:
 {research_data}
 
-STAGE 3 JOB ARCHITECTURE (INPUT):
+"""
+
+_STAGE3 = """STAGE 3 JOB ARCHITECTURE (INPUT):
 {stage3_output}
 
-THE 5 CORE CPG INNOVATION PATTERNS:
+"""
+
+_PATTERNS = """THE 5 CORE CPG INNOVATION PATTERNS:
 1. **Better-For-You-ification** - Add protein, remove sugar, clean label, functional benefits
 2. **Premiumization** - Better ingredients, craft story, artisan positioning, 2x price
 3. **Convenience Shift** - RTD, single-serve, portable, grab-and-go, no prep required
 4. **Format Migration** - Bar→bite, powder→shot, bottle→pouch, new consumption format
 5. **Occasion Expansion** - Breakfast→snack, dinner→lunch, adult→kid, new usage moments
 
-TASK:
+"""
+
+_TASK = """TASK:
 Translate the universal mechanisms into specific opportunities for THIS brand in the CPG context, focusing on retail viability and speed to market.
 
 ## Brand-Specific CPG Translation
 
-### Brand Context Assessment
+"""
+
+_CONTEXT_ASSESSMENT = """### Brand Context Assessment
 
 **Current Portfolio Fit:**
 - Core products: [List relevant products from brand profile]
@@ -50,7 +56,9 @@ Translate the universal mechanisms into specific opportunities for THIS brand in
 - Differentiation opportunity: [How mechanisms create advantage]
 - Category dynamics: [Is the category growing/declining?]
 
-### Mechanism-to-CPG Pattern Mapping
+"""
+
+_PATTERN_MAPPING = """### Mechanism-to-CPG Pattern Mapping
 
 For each mechanism from previous stages, identify which CPG pattern(s) apply:
 
@@ -66,7 +74,9 @@ For each mechanism from previous stages, identify which CPG pattern(s) apply:
 
 [Continue for all mechanisms]
 
-### Retail Viability Assessment
+"""
+
+_RETAIL_VIABILITY = """### Retail Viability Assessment
 
 For each opportunity, evaluate retail acceptance:
 
@@ -85,7 +95,9 @@ For each opportunity, evaluate retail acceptance:
 
 [Repeat for 2-3 top opportunities]
 
-### Brand Permission & Credibility Check
+"""
+
+_BRAND_PERMISSION = """### Brand Permission & Credibility Check
 
 **Can THIS brand credibly execute these opportunities?**
 
@@ -100,7 +112,9 @@ For each opportunity, evaluate retail acceptance:
 - Claims we can't make: [Outside brand permission]
 - Proof points needed: [To establish credibility]
 
-### Speed-to-Market Execution Plan
+"""
+
+_SPEED_TO_MARKET = """### Speed-to-Market Execution Plan
 
 **Fast Track Opportunity: [Highest speed/impact ratio]**
 
@@ -122,7 +136,9 @@ For each opportunity, evaluate retail acceptance:
 □ <$500K total investment? ✓/✗
 □ No new equipment needed? ✓/✗
 
-### Top 3 Brand-Specific Opportunities
+"""
+
+_TOP_OPPORTUNITIES = """### Top 3 Brand-Specific Opportunities
 
 Based on mechanism translation, retail viability, and brand permission:
 
@@ -147,7 +163,9 @@ Based on mechanism translation, retail viability, and brand permission:
 - Retail hook: [What buyers will love]
 - 6-month milestone: [What success looks like]
 
-### Risk & Reality Check
+"""
+
+_RISK_CHECK = """### Risk & Reality Check
 
 **Biggest Risks:**
 1. [Primary risk and mitigation]
@@ -158,7 +176,9 @@ Based on mechanism translation, retail viability, and brand permission:
 - Will retailers buy this? [YES/NO because...]
 - Can we launch in <12 months? [YES/NO because...]
 
-CRITICAL CPG SUCCESS FACTORS:
+"""
+
+_SUCCESS_FACTORS = """CRITICAL CPG SUCCESS FACTORS:
 - Every opportunity must fit one of the 5 CPG patterns
 - Every opportunity must pass retail viability test
 - Every opportunity must be launchable in <12 months
@@ -166,7 +186,110 @@ CRITICAL CPG SUCCESS FACTORS:
 - Every opportunity must have clear retail buyer appeal
 """
 
+def get_prompt_template() -> PromptTemplate:
+    """Get enhanced Stage 4 prompt for CPG-specific brand translation.
+
+    Returns:
+        PromptTemplate configured for CPG brand application
+    """
+
+    template = (
+        _HEADER + _RESEARCH + _STAGE3 + _PATTERNS + _TASK
+        + _CONTEXT_ASSESSMENT + _PATTERN_MAPPING + _RETAIL_VIABILITY
+        + _BRAND_PERMISSION + _SPEED_TO_MARKET + _TOP_OPPORTUNITIES
+        + _RISK_CHECK + _SUCCESS_FACTORS
+    )
+
     return PromptTemplate(
         input_variables=["brand_profile", "research_data", "stage3_output"],
         template=template
-    )
\ No newline at end of file
+    )
+
+
+_LESSON_INPUT = """RELEVANT BRAND RESEARCH (EXCERPTS):
+{research_snippets}
+
+UNIVERSAL LESSON {lesson_number} OF {lesson_count} (INPUT):
+{lesson}
+
+"""
+
+_LESSON_TASK = """TASK:
+Translate THIS lesson's mechanism into a specific opportunity for THIS brand in the CPG context, focusing on retail viability and speed to market. The other lessons are translated separately; stay within yours.
+
+#### Lesson {lesson_number}: [Lesson title]
+
+**Mechanism → CPG Pattern Translation:**
+- Primary Pattern: [Which of the 5 patterns?]
+- How it applies: [Specific application to this brand]
+- Example execution: [Concrete product concept]
+
+**Retail Readiness Scorecard:**
+- Category fit: Does this fit existing shelf sets? [YES/NO/MAYBE]
+- Buyer appeal: Clear story for category buyers? [YES/NO/MAYBE]
+- Velocity potential: Can it turn 2+ units/store/week? [YES/NO/MAYBE]
+- Margin structure: >35% gross margin achievable? [YES/NO/MAYBE]
+- Shelf presence: Does packaging pop at 6 feet? [YES/NO/MAYBE]
+
+**Target Retailers:** [Walmart/Target/Kroger/Whole Foods/etc.]
+
+**Brand Permission:**
+- Credibility builders: [What gives them right to play]
+- Credibility gaps: [What might consumers question]
+
+**Speed to Market:** [Launch timeline, investment $[X]K - $[Y]K, partners needed]
+
+IMPORTANT:
+- Ground brand claims in the brand profile and research excerpts above
+- Keep it under 400 words: a later step compares all lessons and picks the top 3
+"""
+
+_MERGE_INPUT = """PER-LESSON BRAND TRANSLATIONS (INPUT):
+{lesson_translations}
+
+"""
+
+_MERGE_TASK = """TASK:
+Each lesson above was translated for this brand on its own. Compare the translations and write ONLY the sections below; do not repeat the per-lesson translations.
+
+"""
+
+
+def get_lesson_prompt_template() -> PromptTemplate:
+    """Get the per-lesson Stage 4 prompt (map-reduce mode).
+
+    Starts with the brand profile and CPG patterns shared with
+    get_prompt_template(), followed by the lesson and the research excerpts
+    relevant to it instead of the whole research document.
+
+    Returns:
+        PromptTemplate taking brand_profile, research_snippets, lesson,
+        lesson_number and lesson_count
+    """
+    template = _HEADER + _PATTERNS + _LESSON_INPUT + _LESSON_TASK
+
+    return PromptTemplate(
+        input_variables=["brand_profile", "research_snippets", "lesson", "lesson_number", "lesson_count"],
+        template=template
+    )
+
+
+def get_merge_prompt_template() -> PromptTemplate:
+    """Get the Stage 4 merge prompt (map-reduce mode).
+
+    Asks only for the cross-lesson sections of the Stage 4 output (brand
+    context, top 3 opportunities, risks); the per-lesson translations are
+    kept as written.
+
+    Returns:
+        PromptTemplate taking brand_profile and lesson_translations
+    """
+    template = (
+        _HEADER + _PATTERNS + _MERGE_INPUT + _MERGE_TASK
+        + _CONTEXT_ASSESSMENT + _TOP_OPPORTUNITIES + _RISK_CHECK + _SUCCESS_FACTORS
+    )
+
+    return PromptTemplate(
+        input_variables=["brand_profile", "lesson_translations"],
+        template=template
+    )
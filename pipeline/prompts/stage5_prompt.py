@@ -9,36 +9,18 @@ from langchain.prompts import PromptTemplate
 from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 
 
-def get_output_parser() -> StructuredOutputParser:
-    """Get structured output parser for 5 opportunity cards.
-
-    Returns:
-        StructuredOutputParser configured to extract 5 opportunities
-    """
-
-    response_schemas = [
-        ResponseSchema(
-            name="opportunities",
-            description="Array of exactly 5 innovation opportunities",
-            type="array"
-        )
-    ]
-
-    parser = StructuredOutputParser.from_response_schemas(response_schemas)
-    return parser
-
-
-def get_prompt_template() -> PromptTemplate:
-    """Get enhanced Stage 5 prompt for CPG opportunity generation.
-
-    Returns:
-        PromptTemplate configured for Stage 5 processing
-    """
-
-    parser = get_output_parser()
-    format_instructions = parser.get_format_instructions()
-
-    template = """You are a CPG innovation strategist generating retail-ready opportunities for immediate execution.
+# Required opportunity patterns (one card each), as listed in _PATTERNS
+OPPORTUNITY_PATTERNS = [
+    ("Better-For-You", "Protein+, sugar-, clean label"),
+    ("Premium", "2x price, craft story, better ingredients"),
+    ("Convenience", "RTD, portable, no-prep"),
+    ("Format", "New form factor for consumption"),
+    ("Occasion", "New when/where to consume"),
+]
+
+# Prompt sections. The per-pattern prompt (parallel mode) reuses the shared
+# sections in the same order, so its five calls share one long prefix
+_HEADER = """You are a CPG innovation strategist generating retail-ready opportunities for immediate execution.
 
 BRAND-SPECIFIC CPG OPPORTUNITIES (FROM STAGE 4):
 {stage4_output}
@@ -46,24 +28,32 @@ BRAND-SPECIFIC CPG OPPORTUNITIES (FROM STAGE 4):
 BRAND: {brand_name}
 INPUT SOURCE: {input_source}
 
-TASK:
+"""
+
+_TASK = """TASK:
 Generate exactly 5 distinct, retail-ready innovation opportunities that can be pitched to buyers within 90 days.
 
-CPG INNOVATION REALITY CHECK:
+"""
+
+_REALITY_CHECK = """CPG INNOVATION REALITY CHECK:
 - Innovation teams have 2-5 people, not 50
 - Quarterly pipeline reviews demand concepts NOW
 - Retail buyers need to see it, understand it, and want it in 30 seconds
 - Budget is $50K for research, not $500K
 - Success = on shelf in 12 months at Target/Walmart
 
-THE 5 OPPORTUNITIES MUST SPAN THESE PATTERNS:
+"""
+
+_PATTERNS = """THE 5 OPPORTUNITIES MUST SPAN THESE PATTERNS:
 1. **Better-For-You** - Protein+, sugar-, clean label
 2. **Premium** - 2x price, craft story, better ingredients
 3. **Convenience** - RTD, portable, no-prep
 4. **Format** - New form factor for consumption
 5. **Occasion** - New when/where to consume
 
-OUTPUT STRUCTURE FOR EACH OPPORTUNITY:
+"""
+
+_OUTPUT_STRUCTURE = """OUTPUT STRUCTURE FOR EACH OPPORTUNITY:
 
 **title**: [8 words max - must be specific and compelling]
 
@@ -93,7 +83,9 @@ OUTPUT STRUCTURE FOR EACH OPPORTUNITY:
   - Gross margin: XX%
   - Launch timeline: X months]
 
-CPG OPPORTUNITY QUALITY CRITERIA:
+"""
+
+_CRITERIA = """CPG OPPORTUNITY QUALITY CRITERIA:
 ✓ Can explain to Walmart buyer in 30 seconds
 ✓ Uses existing co-packer capabilities (no new lines)
 ✓ <$500K total investment to launch
@@ -109,9 +101,9 @@ FORBIDDEN:
 ✗ Premium plays for value brands (or vice versa)
 ✗ Complex education required for consumer understanding
 
-{format_instructions}
+"""
 
-IMPORTANT:
+_IMPORTANT = """IMPORTANT:
 - Generate EXACTLY 5 opportunities spanning different CPG patterns
 - Each must be explainable to a retail buyer in 30 seconds
 - Each must be launchable with <$500K in <12 months
@@ -120,8 +112,108 @@ IMPORTANT:
 - This is about getting on shelf at Target, not winning innovation awards
 """
 
+def get_output_parser() -> StructuredOutputParser:
+    """Get structured output parser for 5 opportunity cards.
+
+    Returns:
+        StructuredOutputParser configured to extract 5 opportunities
+    """
+
+    response_schemas = [
+        ResponseSchema(
+            name="opportunities",
+            description="Array of exactly 5 innovation opportunities",
+            type="array"
+        )
+    ]
+
+    parser = StructuredOutputParser.from_response_schemas(response_schemas)
+    return parser
+
+
+_CARD_TASK = """TASK:
+Generate exactly ONE retail-ready innovation opportunity that can be pitched to buyers within 90 days, for this pattern:
+**{pattern}** - {pattern_description}
+
+The other patterns get their own opportunity; stay within yours.
+
+ALREADY PROPOSED (choose a clearly different product concept):
+{avoid}
+
+"""
+
+_CARD_IMPORTANT = """IMPORTANT:
+- Generate EXACTLY 1 opportunity, with innovation_type "{pattern}"
+- It must be explainable to a retail buyer in 30 seconds
+- It must be launchable with <$500K in <12 months
+- It must include specific retail metrics
+- Focus on SPEED and SIMPLICITY over perfection
+- This is about getting on shelf at Target, not winning innovation awards
+"""
+
+
+def get_card_output_parser() -> StructuredOutputParser:
+    """Get structured output parser for a single opportunity card.
+
+    Returns:
+        StructuredOutputParser configured to extract one opportunity
+    """
+    response_schemas = [
+        ResponseSchema(
+            name="opportunity",
+            description=(
+                "A single innovation opportunity object with title, innovation_type, description, "
+                "actionability_items, visual_description, follow_up_prompts and retail_metrics"
+            ),
+            type="object"
+        )
+    ]
+
+    return StructuredOutputParser.from_response_schemas(response_schemas)
+
+
+def get_card_prompt_template() -> PromptTemplate:
+    """Get the per-pattern Stage 5 prompt (parallel generation mode).
+
+    Shares the Stage 4 context, reality check, output structure and quality
+    criteria with get_prompt_template(), in front of the pattern-specific
+    task, so the five concurrent calls send the same prefix.
+
+    Returns:
+        PromptTemplate taking pattern, pattern_description and avoid (titles
+        of already proposed cards, or "None") besides the Stage 5 inputs
+    """
+    format_instructions = get_card_output_parser().get_format_instructions()
+
+    template = (
+        _HEADER + _REALITY_CHECK + _OUTPUT_STRUCTURE + _CRITERIA + _CARD_TASK
+        + "{format_instructions}\n\n" + _CARD_IMPORTANT
+    )
+
+    return PromptTemplate(
+        input_variables=["stage4_output", "brand_name", "input_source", "pattern", "pattern_description", "avoid"],
+        template=template,
+        partial_variables={"format_instructions": format_instructions}
+    )
+
+
+def get_prompt_template() -> PromptTemplate:
+    """Get enhanced Stage 5 prompt for CPG opportunity generation.
+
+    Returns:
+        PromptTemplate configured for Stage 5 processing
+    """
+
+    parser = get_output_parser()
+    format_instructions = parser.get_format_instructions()
+
+    template = (
+        _HEADER + _TASK + _REALITY_CHECK + _PATTERNS + _OUTPUT_STRUCTURE + _CRITERIA
+        + "{format_instructions}\n\n" + _IMPORTANT
+    )
+
     return PromptTemplate(
         input_variables=["stage4_output", "brand_name", "input_source"],
         template=template,
         partial_variables={"format_instructions": format_instructions}
-    )
\ No newline at end of file
+    )
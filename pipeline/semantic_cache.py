@@ -0,0 +1,232 @@
+"""
+Semantic cache for Stages 1-3.
+
+Stages 1-3 depend only on the input document, and trend reports are often
+re-uploaded as near-identical re-exports (new PDF metadata, a fixed typo),
+so an exact-hash cache misses them. Entries here are keyed by an embedding
+of the extracted input text: a new document whose vector has cosine
+similarity >= SEMANTIC_CACHE_THRESHOLD (default 0.98) with a cached one
+reuses that run's Stage 1-3 outputs.
+
+Entries are appended to SEMANTIC_CACHE_PATH as JSONL (the cache is
+disabled when it is unset); refresh() picks up entries written by other
+processes (see jsonl_log). Served outputs carry a provenance
+note (source run, similarity, cache time) so readers can tell a cached
+analysis from a fresh one; force_recompute=True skips the lookup and
+replaces the entry with fresh outputs. Lookups are counted by result in
+pipeline_semantic_cache_lookups_total.
+
+Usage:
+    from pipeline.semantic_cache import get_semantic_cache
+
+    cache = get_semantic_cache()
+    hit = cache.lookup(input_text) if cache else None
+    if hit:
+        outputs = hit.outputs            # stage1_output, stage2_output, stage3_output
+        note = hit.provenance()
+    else:
+        ...
+        cache.store(input_text, outputs, source=run_id)
+"""
+
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .embeddings import EmbeddingService, get_embedding_service
+from .instrumentation import REGISTRY, span
+from .jsonl_log import AppendOnlyJsonl
+
+
+DEFAULT_THRESHOLD = 0.98
+CHUNK_CHARS = 2000
+STAGE_KEYS = ("stage1_output", "stage2_output", "stage3_output")
+
+
+@dataclass
+class CacheHit:
+    """Cached Stage 1-3 outputs matched to a new input document."""
+    outputs: Dict[str, str]
+    similarity: float
+    source: str
+    cached_at: str
+    exact: bool
+
+    def provenance(self) -> Dict[str, Any]:
+        """Note attached to results served from the cache."""
+        return {
+            "cached": True,
+            "source_run": self.source,
+            "similarity": round(self.similarity, 4),
+            "exact_match": self.exact,
+            "cached_at": self.cached_at,
+            "note": (
+                f"Stages 1-3 reused from run {self.source} "
+                f"(input similarity {self.similarity:.3f}); rerun with force_recompute to regenerate"
+            ),
+        }
+
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class SemanticStageCache:
+    """Stage 1-3 outputs keyed by input document embeddings.
+
+    Args:
+        path: JSONL file to load from and append to
+        service: Embedding service (default: shared service)
+        threshold: Minimum cosine similarity for a hit
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        service: Optional[EmbeddingService] = None,
+        threshold: float = DEFAULT_THRESHOLD
+    ):
+        self.path = Path(path)
+        self.service = service or get_embedding_service()
+        self.threshold = threshold
+
+        self._entries: List[Dict[str, Any]] = []
+        self._vectors = np.empty((0, self.service.dim), dtype=np.float32)
+        self._by_hash: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._log = AppendOnlyJsonl(self.path, "semantic cache")
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def document_vector(self, text: str) -> np.ndarray:
+        """Mean of chunk embeddings, so long documents are covered end to end."""
+        text = _normalize_text(text)
+        chunks = [text[i:i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)] or [""]
+        vector = self.service.encode(chunks).mean(axis=0)
+        return (vector / max(float(np.linalg.norm(vector)), 1e-12)).astype(np.float32)
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(_normalize_text(text).encode("utf-8")).hexdigest()
+
+    def _insert(self, entry: Dict[str, Any], vector: np.ndarray) -> None:
+        # A recomputed entry for the same text supersedes the older one
+        position = self._by_hash.get(entry["hash"])
+        if position is not None:
+            self._entries[position] = entry
+            self._vectors[position] = vector
+            return
+        count = len(self._entries)
+        if count == len(self._vectors):
+            grown = np.empty((max(64, 2 * count), self.service.dim), dtype=np.float32)
+            grown[:count] = self._vectors[:count]
+            self._vectors = grown
+        # Row first: lookup() reads the entry count, then the rows, unlocked
+        self._vectors[count] = vector
+        self._by_hash[entry["hash"]] = count
+        self._entries.append(entry)
+
+    def refresh(self) -> int:
+        """Load entries appended since the last read (by any process)."""
+        loaded = 0
+        with self._lock:
+            for entry in self._log.read_new():
+                try:
+                    vector = np.frombuffer(base64.b64decode(entry.pop("vector")), dtype=np.float32)
+                except (ValueError, KeyError) as e:
+                    logging.warning(f"Skipping malformed semantic cache line: {e}")
+                    continue
+                if entry.get("model") != self.service.model_id or len(vector) != self.service.dim:
+                    continue  # Written with a different embedding model
+                self._insert(entry, vector)
+                loaded += 1
+
+        return loaded
+
+    def lookup(self, input_text: str, force_recompute: bool = False) -> Optional[CacheHit]:
+        """Return the most similar cached entry at or above the threshold."""
+        if force_recompute:
+            logging.info("Semantic cache: lookup skipped (force_recompute)")
+            return None
+
+        self.refresh()
+        with span("semantic_cache_lookup", kind="cache", entries=len(self._entries)) as attrs:
+            exact = self._by_hash.get(self.content_hash(input_text))
+            if exact is not None:
+                position, similarity = exact, 1.0
+            elif self._entries:
+                count = len(self._entries)
+                scores = self._vectors[:count] @ self.document_vector(input_text)
+                position = int(np.argmax(scores))
+                similarity = float(scores[position])
+            else:
+                position, similarity = None, 0.0
+
+            hit = position is not None and similarity >= self.threshold
+            attrs["hit"] = hit
+            attrs["similarity"] = round(similarity, 4)
+        REGISTRY.inc("pipeline_semantic_cache_lookups_total", 1, "Semantic cache lookups by result", result="hit" if hit else "miss")
+
+        if not hit:
+            logging.info(f"Semantic cache: miss (best similarity {similarity:.3f} < {self.threshold})")
+            return None
+
+        entry = self._entries[position]
+        logging.info(f"Semantic cache: hit from {entry['source']} (similarity {similarity:.3f})")
+        return CacheHit(
+            outputs={key: entry["outputs"][key] for key in STAGE_KEYS},
+            similarity=similarity,
+            source=entry["source"],
+            cached_at=entry["cached_at"],
+            exact=exact is not None,
+        )
+
+    def store(self, input_text: str, outputs: Dict[str, str], source: str) -> None:
+        """Cache Stage 1-3 outputs for input_text and append them to the file."""
+        vector = self.document_vector(input_text)
+        entry = {
+            "hash": self.content_hash(input_text),
+            "model": self.service.model_id,
+            "source": source,
+            "cached_at": datetime.utcnow().isoformat() + "Z",
+            "outputs": {key: outputs[key] for key in STAGE_KEYS},
+        }
+        with self._lock:
+            self._insert(entry, vector)
+            self._log.append({**entry, "vector": base64.b64encode(vector.tobytes()).decode("ascii")})
+
+        logging.info(f"Semantic cache: stored Stages 1-3 from {source}")
+
+
+_caches: Dict[str, SemanticStageCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(path: Optional[str] = None) -> Optional[SemanticStageCache]:
+    """Return the shared cache for path (default: SEMANTIC_CACHE_PATH).
+
+    Returns None when no path is configured. The threshold comes from
+    SEMANTIC_CACHE_THRESHOLD.
+    """
+    path = path or os.getenv("SEMANTIC_CACHE_PATH")
+    if not path:
+        return None
+
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+            cache = _caches[path] = SemanticStageCache(Path(path), threshold=threshold)
+            logging.info(f"Semantic cache loaded: {len(cache)} entries from {path} (threshold {threshold})")
+        return cache
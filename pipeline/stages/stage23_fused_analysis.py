@@ -0,0 +1,157 @@
+"""
+Stages 2+3: Fused Signal Amplification and General Translation
+
+This module implements the optional fused mode of Stages 2 and 3: one LLM
+call writes both the Stage 2 trend analysis and the Stage 3 universal
+lessons, instead of Stage 3 waiting for Stage 2 and re-sending the Stage 1
+output. The response is split back into stage2_output and stage3_output,
+so the saved artifacts (trend-analysis.md, universal-lessons.md) and
+everything downstream stay the same.
+
+Enabled with STAGE23_FUSED; build_stage_dag() falls back to the separate
+Stage 2 and Stage 3 chains if a fused response can't be split.
+"""
+
+import logging
+import os
+import re
+from typing import Dict, Any, Optional, Tuple
+
+from langchain.chains import LLMChain
+
+from ..prompts.stage23_prompt import STAGE2_TAG, STAGE3_TAG, get_prompt_template
+from ..instrumentation import instrument_stage
+from ..utils import create_llm
+
+
+# Room for both stages' outputs (Stage 2: 3000, Stage 3: 3500)
+FUSED_MAX_TOKENS = 6500
+
+# Headings the two parts start with, for responses that drop the tags
+_STAGE3_HEADING = re.compile(r"^## +Job Architecture", re.MULTILINE)
+
+
+def fused_stages_enabled(requested: Optional[bool] = None) -> bool:
+    """Whether Stages 2 and 3 run as one fused call (STAGE23_FUSED)."""
+    if requested is not None:
+        return requested
+    return os.getenv("STAGE23_FUSED", "false").lower() == "true"
+
+
+def split_fused_output(text: str) -> Tuple[str, str]:
+    """Split a fused response into (stage2_output, stage3_output).
+
+    Takes the tagged parts; a missing closing tag on the last part (a
+    response cut off at max_tokens) is tolerated. Untagged responses are
+    split at the Stage 3 "## Job Architecture" heading.
+
+    Raises:
+        ValueError: If either part is missing or empty
+    """
+    stage2 = re.search(rf"<{STAGE2_TAG}>(.*?)</{STAGE2_TAG}>", text, re.DOTALL)
+    stage3 = re.search(rf"<{STAGE3_TAG}>(.*?)(?:</{STAGE3_TAG}>|\Z)", text, re.DOTALL)
+    if stage2 and stage3:
+        parts = (stage2.group(1), stage3.group(1))
+    else:
+        heading = _STAGE3_HEADING.search(text)
+        if not heading:
+            raise ValueError("Fused Stage 2+3 output has neither part tags nor a Job Architecture heading")
+        logging.warning("Fused Stage 2+3 output has no part tags, splitting at the Job Architecture heading")
+        parts = (text[:heading.start()], text[heading.start():])
+
+    stage2_output, stage3_output = (re.sub(r"</?stage[23]>", "", part).strip() for part in parts)
+    if not stage2_output or not stage3_output:
+        raise ValueError("Fused Stage 2+3 output is missing the Stage 2 or Stage 3 part")
+    return stage2_output, stage3_output
+
+
+class Stage23Chain:
+    """Fused chain producing the Stage 2 and Stage 3 outputs in one call.
+
+    Attributes:
+        chain: Configured LangChain LLMChain for the fused stages
+        output_key: Key name for chain output ("stage23_output")
+    """
+
+    def __init__(self):
+        """Initialize fused Stage 2+3 chain."""
+        self.output_key = "stage23_output"
+        self.chain = self._create_chain()
+
+    def _create_chain(self) -> LLMChain:
+        """Create and configure the fused Stage 2+3 LLMChain.
+
+        Returns:
+            Configured LLMChain for fused Stage 2+3 processing
+
+        Raises:
+            ValueError: If OpenRouter API key or base URL not configured
+        """
+        llm = create_llm(temperature=0.4, max_tokens=FUSED_MAX_TOKENS, stage="stage23")
+
+        chain = LLMChain(
+            llm=llm,
+            prompt=get_prompt_template(),
+            output_key=self.output_key
+        )
+
+        logging.info("Fused Stage 2+3 chain created successfully")
+        return chain
+
+    @instrument_stage("stage23")
+    def run(self, stage1_output: str) -> Dict[str, Any]:
+        """Execute the fused chain on Stage 1 output.
+
+        Args:
+            stage1_output: Stage 1 inspiration analysis text
+
+        Returns:
+            Dictionary with stage2_output (trend analysis) and stage3_output
+            (universal lessons) keys
+
+        Raises:
+            ValueError: If stage1_output is empty, or the response can't be
+                split into both stage outputs
+            Exception: If chain execution fails
+        """
+        logging.info("Starting Stages 2+3 (fused): Signal Amplification and General Translation")
+
+        if not stage1_output or not stage1_output.strip():
+            logging.error("Stage 1 output is empty or whitespace-only")
+            raise ValueError(
+                "stage1_output cannot be empty. "
+                "Ensure Stage 1 executed successfully before running Stages 2+3."
+            )
+
+        logging.debug(f"Stage 1 output length: {len(stage1_output)} characters")
+
+        try:
+            result = self.chain.invoke({"stage1_output": stage1_output})
+        except Exception as e:
+            logging.error(f"Fused Stage 2+3 execution failed: {e}", exc_info=True)
+            raise
+
+        stage2_output, stage3_output = split_fused_output(result[self.output_key])
+        logging.info(
+            f"Fused Stage 2+3 execution completed: {len(stage2_output)} + "
+            f"{len(stage3_output)} characters"
+        )
+        return {
+            "stage2_output": stage2_output,
+            "stage3_output": stage3_output
+        }
+
+
+def create_stage23_chain() -> Stage23Chain:
+    """Factory function to create the fused Stage 2+3 chain.
+
+    Returns:
+        Configured Stage23Chain instance
+
+    Example:
+        >>> chain = create_stage23_chain()
+        >>> result = chain.run(stage1_output)
+        >>> Stage2Chain.save_output(result["stage2_output"], output_dir)
+        >>> Stage3Chain.save_output(result["stage3_output"], output_dir)
+    """
+    return Stage23Chain()
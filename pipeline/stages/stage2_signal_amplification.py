@@ -13,6 +13,7 @@ from typing import Dict, Any
 from langchain.chains import LLMChain
 
 from ..prompts.stage2_prompt import get_prompt_template
+from ..instrumentation import instrument_stage
 from ..utils import create_llm
 
 
@@ -42,7 +43,7 @@ class Stage2Chain:
             ValueError: If OpenRouter API key or base URL not configured
         """
         # Create LLM using centralized configuration (model from .env)
-        llm = create_llm(temperature=0.4, max_tokens=3000)
+        llm = create_llm(temperature=0.4, max_tokens=3000, stage="stage2")
 
         # Get prompt template
         prompt = get_prompt_template()
@@ -57,6 +58,7 @@ class Stage2Chain:
         logging.info("Stage 2 chain created successfully")
         return chain
 
+    @instrument_stage("stage2")
     def run(self, stage1_output: str) -> Dict[str, Any]:
         """Execute Stage 2 chain on Stage 1 output.
 
@@ -97,7 +99,8 @@ class Stage2Chain:
             logging.error(f"Stage 2 execution failed: {e}", exc_info=True)
             raise
 
-    def save_output(self, output: str, output_dir: Path) -> Path:
+    @staticmethod
+    def save_output(output: str, output_dir: Path) -> Path:
         """Save Stage 2 output to file.
 
         Args:
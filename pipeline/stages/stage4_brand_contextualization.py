@@ -4,20 +4,107 @@ Stage 4: Brand Contextualization with Research Data
 This module implements Stage 4 of the Innovation Intelligence Pipeline,
 which customizes universal lessons from Stage 3 for a specific brand using
 brand profile data and comprehensive pre-existing research.
+
+By default one LLM call contextualizes all lessons against the whole
+research document. With STAGE4_MAP_REDUCE set, each lesson gets its own
+concurrent call with only the research excerpts most similar to it (the
+map step), and a short merge call writes the cross-lesson sections (brand
+context, top 3 opportunities, risks): Stage 4 takes about as long as the
+slowest lesson plus the merge, instead of one call writing everything.
 """
 
+import contextvars
+import functools
 import logging
+import math
 import os
+import re
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from langchain.chains import LLMChain
 
-from ..prompts.stage4_prompt import get_prompt_template
+from ..prompts.stage4_prompt import (
+    get_lesson_prompt_template,
+    get_merge_prompt_template,
+    get_prompt_template,
+)
+from ..deadlines import DeadlineExceeded
+from ..embeddings import HASHING_MODEL_ID, get_embedding_service, markdown_sections, stage3_lessons
+from ..instrumentation import instrument_stage, span
 from ..utils import create_llm
 
 
+LESSON_MAX_TOKENS = 1200
+MERGE_MAX_TOKENS = 1500
+MAX_LESSONS = 8  # More lessons are grouped, to bound the fan-out
+RESEARCH_SNIPPETS_PER_LESSON = 4
+RESEARCH_SNIPPET_CHARS = 1500
+
+
+def map_reduce_enabled(requested: Optional[bool] = None) -> bool:
+    """Whether Stage 4 contextualizes each lesson in its own call (STAGE4_MAP_REDUCE)."""
+    if requested is not None:
+        return requested
+    return os.getenv("STAGE4_MAP_REDUCE", "false").lower() == "true"
+
+
+def research_embedding_service():
+    """Embedding service for research selection.
+
+    Selection runs on the request path, so it uses the hashing embedder
+    unless EMBEDDING_MODEL names a model explicitly.
+    """
+    return get_embedding_service(None if os.getenv("EMBEDDING_MODEL") else HASHING_MODEL_ID)
+
+
+def split_lessons(stage3_output: str, max_lessons: int = MAX_LESSONS) -> List[str]:
+    """Split Stage 3 output into lessons to contextualize separately.
+
+    Numbered '## N. title' lessons (or the level-2 sections) are used as
+    they are; a single section, like the job architecture mapping, is
+    split at its '###' subsections. Beyond max_lessons, neighbouring
+    lessons are grouped together.
+    """
+    lessons = stage3_lessons(stage3_output)
+    if len(lessons) < 2:
+        subsections = markdown_sections(stage3_output, level=3)
+        if len(subsections) > len(lessons):
+            lessons = [f"### {heading}\n{body}" for heading, body in subsections]
+
+    if len(lessons) > max_lessons:
+        size = math.ceil(len(lessons) / max_lessons)
+        lessons = ["\n\n".join(lessons[i:i + size]) for i in range(0, len(lessons), size)]
+    return lessons
+
+
+def research_snippets(research_data: str, max_chars: int = RESEARCH_SNIPPET_CHARS) -> List[str]:
+    """Split research markdown into snippets of about max_chars.
+
+    Splits at headings (levels 1-3), then between paragraphs; a section
+    split in several snippets repeats its heading in each.
+    """
+    snippets = []
+    for block in re.split(r"\n(?=#{1,3} )", research_data):
+        block = block.strip()
+        if not block:
+            continue
+        heading = block.splitlines()[0] if block.startswith("#") else None
+        current: List[str] = []
+        size = 0
+        for paragraph in re.split(r"\n\s*\n", block):
+            if current and size + len(paragraph) > max_chars:
+                snippets.append("\n\n".join(current))
+                current = [heading] if heading else []
+                size = len(heading) if heading else 0
+            current.append(paragraph)
+            size += len(paragraph)
+        snippets.append("\n\n".join(current))
+    return snippets
+
+
 class Stage4Chain:
     """Stage 4 chain for brand contextualization with research data.
 
@@ -27,6 +114,8 @@ class Stage4Chain:
 
     Attributes:
         chain: Configured LangChain LLMChain for Stage 4
+        lesson_chain: LLMChain contextualizing one lesson (map-reduce mode, built on first use)
+        merge_chain: LLMChain writing the cross-lesson sections (map-reduce mode, built on first use)
         output_key: Key name for chain output ("stage4_output")
     """
 
@@ -35,6 +124,14 @@ class Stage4Chain:
         self.output_key = "stage4_output"
         self.chain = self._create_chain()
 
+    @functools.cached_property
+    def lesson_chain(self) -> LLMChain:
+        return self._create_lesson_chain()
+
+    @functools.cached_property
+    def merge_chain(self) -> LLMChain:
+        return self._create_merge_chain()
+
     def _create_chain(self) -> LLMChain:
         """Create and configure the Stage 4 LLMChain.
 
@@ -45,7 +142,7 @@ class Stage4Chain:
             ValueError: If OpenRouter API key or base URL not configured
         """
         # Create LLM using centralized configuration (model from .env)
-        llm = create_llm(temperature=0.5, max_tokens=4000)
+        llm = create_llm(temperature=0.5, max_tokens=4000, stage="stage4")
 
         # Get prompt template
         prompt = get_prompt_template()
@@ -60,11 +157,23 @@ class Stage4Chain:
         logging.info("Stage 4 chain created successfully")
         return chain
 
+    def _create_lesson_chain(self) -> LLMChain:
+        """Create the per-lesson LLMChain (map-reduce mode)."""
+        llm = create_llm(temperature=0.5, max_tokens=LESSON_MAX_TOKENS, stage="stage4")
+        return LLMChain(llm=llm, prompt=get_lesson_prompt_template(), output_key=self.output_key)
+
+    def _create_merge_chain(self) -> LLMChain:
+        """Create the merge LLMChain (map-reduce mode)."""
+        llm = create_llm(temperature=0.5, max_tokens=MERGE_MAX_TOKENS, stage="stage4")
+        return LLMChain(llm=llm, prompt=get_merge_prompt_template(), output_key=self.output_key)
+
+    @instrument_stage("stage4")
     def run(
         self,
         stage3_output: str,
         brand_profile: Dict[str, Any],
-        research_data: str
+        research_data: str,
+        map_reduce: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Execute Stage 4 chain to generate brand-specific insights.
 
@@ -73,6 +182,8 @@ class Stage4Chain:
             brand_profile: Brand profile dictionary from YAML
             research_data: Comprehensive brand research markdown content
                           (empty string if unavailable - graceful degradation)
+            map_reduce: Contextualize each lesson in its own concurrent call
+                (default: STAGE4_MAP_REDUCE)
 
         Returns:
             Dictionary with stage4_output key containing brand-specific insights
@@ -142,6 +253,13 @@ class Stage4Chain:
         )
         logging.debug(f"Research data status: {research_status}")
 
+        if map_reduce_enabled(map_reduce):
+            lessons = split_lessons(stage3_output)
+            if len(lessons) > 1:
+                research = research_data if research_data.strip() else ""
+                return self._run_map_reduce(lessons, brand_profile_text, research, research_data_text)
+            logging.info("Stage 3 output has a single lesson, running Stage 4 as one call")
+
         try:
             result = self.chain.invoke({
                 "stage3_output": stage3_output,
@@ -155,7 +273,111 @@ class Stage4Chain:
             logging.error(f"Stage 4 execution failed: {e}", exc_info=True)
             raise
 
-    def save_output(self, output: str, output_dir: Path) -> Path:
+    def _run_map_reduce(
+        self,
+        lessons: List[str],
+        brand_profile_text: str,
+        research_data: str,
+        fallback_research_text: str
+    ) -> Dict[str, Any]:
+        """Contextualize lessons concurrently, then merge them.
+
+        A lesson whose call fails is left out of the output; the stage only
+        fails if every lesson does (or the run's deadline passes).
+
+        Returns:
+            Dictionary with stage4_output key, in the single-call output's
+            layout (per-lesson translations under the pattern mapping)
+        """
+        research = self._select_research(lessons, research_data, fallback_research_text)
+        logging.info(f"Stage 4 map-reduce: {len(lessons)} lessons in parallel")
+
+        self.lesson_chain  # Build it here rather than racing to in the lesson threads
+        with ThreadPoolExecutor(max_workers=len(lessons), thread_name_prefix="stage4-lesson") as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._translate_lesson, brand_profile_text, lesson, snippets, number, len(lessons)
+                )
+                for number, (lesson, snippets) in enumerate(zip(lessons, research), start=1)
+            ]
+            translations = []
+            errors = []
+            for number, future in enumerate(futures, start=1):
+                try:
+                    translations.append(future.result())
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    logging.warning(f"Stage 4 lesson {number} failed, leaving it out: {e}")
+                    errors.append(e)
+
+        if not translations:
+            logging.error(f"Stage 4 execution failed: all {len(lessons)} lessons failed")
+            raise errors[0]
+
+        lesson_translations = "\n\n".join(translations)
+        with span("stage4.merge", lessons=len(translations)):
+            result = self.merge_chain.invoke({
+                "brand_profile": brand_profile_text,
+                "lesson_translations": lesson_translations
+            })
+
+        output = (
+            "## Brand-Specific CPG Translation\n\n"
+            "### Mechanism-to-CPG Pattern Mapping\n\n"
+            f"{lesson_translations}\n\n"
+            f"{result[self.output_key].strip()}\n"
+        )
+        logging.info(f"Stage 4 execution completed: {len(translations)}/{len(lessons)} lessons merged")
+        return {self.output_key: output}
+
+    def _select_research(
+        self,
+        lessons: List[str],
+        research_data: str,
+        fallback_research_text: str
+    ) -> List[str]:
+        """Research excerpts for each lesson: its most similar snippets, in document order."""
+        if not research_data:
+            return [fallback_research_text] * len(lessons)
+
+        snippets = research_snippets(research_data)
+        if len(snippets) <= RESEARCH_SNIPPETS_PER_LESSON:
+            return [research_data] * len(lessons)
+
+        service = research_embedding_service()
+        vectors = service.encode(snippets)
+        selected = []
+        for lesson in lessons:
+            hits = service.search(lesson, vectors, k=RESEARCH_SNIPPETS_PER_LESSON)
+            selected.append("\n\n---\n\n".join(snippets[i] for i in sorted(i for i, _ in hits)))
+        logging.debug(
+            f"Stage 4 research: {RESEARCH_SNIPPETS_PER_LESSON} of {len(snippets)} snippets per lesson"
+        )
+        return selected
+
+    def _translate_lesson(
+        self,
+        brand_profile_text: str,
+        lesson: str,
+        research_excerpts: str,
+        number: int,
+        count: int
+    ) -> str:
+        """Contextualize one lesson for the brand (map step)."""
+        with span("stage4.lesson", lesson=number):
+            result = self.lesson_chain.invoke({
+                "brand_profile": brand_profile_text,
+                "research_snippets": research_excerpts,
+                "lesson": lesson,
+                "lesson_number": number,
+                "lesson_count": count
+            })
+        return result[self.output_key].strip()
+
+    @staticmethod
+    def save_output(output: str, output_dir: Path) -> Path:
         """Save Stage 4 output to file.
 
         Args:
@@ -4,22 +4,67 @@ Stage 5: Opportunity Generation Chain
 This module implements Stage 5 of the Innovation Intelligence Pipeline,
 which generates exactly 5 distinct, actionable innovation opportunities
 from brand-specific insights (Stage 4 output).
+
+By default one LLM call writes all 5 opportunities. With STAGE5_PARALLEL
+set, each pattern gets its own concurrent, smaller call (sharing the
+prompt prefix): Stage 5 takes about as long as the slowest card, a
+malformed card is retried on its own, and cards that duplicate another
+card are regenerated.
 """
 
+import contextvars
 import logging
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from langchain.chains import LLMChain
-
-from ..prompts.stage5_prompt import get_prompt_template, get_output_parser
+from langchain_core.output_parsers.json import parse_json_markdown
+
+from ..prompts.stage5_prompt import (
+    OPPORTUNITY_PATTERNS,
+    get_card_prompt_template,
+    get_output_parser,
+    get_prompt_template,
+)
+from ..deadlines import allow_retry
+from ..instrumentation import instrument_stage, record_retry, span
+from ..novelty_index import DEFAULT_THRESHOLD, get_history_index, index_cards, shingles
 from ..utils import create_llm
 
 
+CARD_MAX_TOKENS = 1200
+
+# Cards are near-duplicates if their titles share this many words, or their
+# descriptions this many word pairs (Jaccard)
+DUPLICATE_TITLE_THRESHOLD = 0.6
+DUPLICATE_DESCRIPTION_THRESHOLD = 0.35
+
+
+def parallel_cards_enabled(requested: Optional[bool] = None) -> bool:
+    """Whether Stage 5 generates one card per pattern concurrently (STAGE5_PARALLEL)."""
+    if requested is not None:
+        return requested
+    return os.getenv("STAGE5_PARALLEL", "false").lower() == "true"
+
+
+def _jaccard(a: List[str], b: List[str]) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+def is_duplicate_card(card: Dict[str, Any], other: Dict[str, Any]) -> bool:
+    """Whether two opportunity cards pitch essentially the same concept."""
+    titles = _jaccard(shingles(card.get('title', ''), 1), shingles(other.get('title', ''), 1))
+    descriptions = _jaccard(shingles(card.get('description', ''), 2), shingles(other.get('description', ''), 2))
+    return titles >= DUPLICATE_TITLE_THRESHOLD or descriptions >= DUPLICATE_DESCRIPTION_THRESHOLD
+
+
 class Stage5Chain:
     """Stage 5 chain for opportunity generation.
 
@@ -30,6 +75,7 @@ class Stage5Chain:
 
     Attributes:
         chain: Configured LangChain LLMChain for Stage 5
+        card_chain: LLMChain writing one pattern's card (parallel mode)
         parser: StructuredOutputParser to extract 5 opportunities
         jinja_env: Jinja2 environment for template rendering
         output_key: Key name for chain output ("stage5_output")
@@ -45,6 +91,7 @@ class Stage5Chain:
         self.output_key = "stage5_output"
         self.parser = get_output_parser()
         self.chain = self._create_chain()
+        self.card_chain = self._create_card_chain()
 
         # Set up Jinja2 environment for opportunity card rendering
         if template_dir is None:
@@ -73,7 +120,7 @@ class Stage5Chain:
             ValueError: If OpenRouter API key or base URL not configured
         """
         # Create LLM with temperature=0.7 for creative opportunity generation
-        llm = create_llm(temperature=0.7, max_tokens=4000)
+        llm = create_llm(temperature=0.7, max_tokens=4000, stage="stage5")
 
         # Get prompt template
         prompt = get_prompt_template()
@@ -90,12 +137,29 @@ class Stage5Chain:
         )
         return chain
 
+    def _create_card_chain(self) -> LLMChain:
+        """Create the per-pattern LLMChain used in parallel mode.
+
+        Same temperature as the full chain; one card needs far fewer tokens.
+
+        Returns:
+            Configured LLMChain writing a single opportunity card
+        """
+        llm = create_llm(temperature=0.7, max_tokens=CARD_MAX_TOKENS, stage="stage5")
+        return LLMChain(
+            llm=llm,
+            prompt=get_card_prompt_template(),
+            output_key=self.output_key
+        )
+
+    @instrument_stage("stage5")
     def run(
         self,
         stage4_output: str,
         brand_name: str,
         input_source: str,
-        max_retries: int = 2
+        max_retries: int = 2,
+        parallel: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Execute Stage 5 chain to generate 5 opportunity cards.
 
@@ -103,7 +167,11 @@ class Stage5Chain:
             stage4_output: Stage 4 brand-specific insights text
             brand_name: Name of the brand (e.g., "Lactalis Canada")
             input_source: Original input source (e.g., "Savannah Bananas")
-            max_retries: Maximum number of retry attempts on parse failure (default: 2)
+            max_retries: Maximum number of retry attempts on parse failure
+                (default: 2; each spends one of the run's LLM retries).
+                Timeouts and upstream errors are retried by the LLM client
+            parallel: Generate one card per pattern concurrently (default:
+                STAGE5_PARALLEL); max_retries then applies per card
 
         Returns:
             Dictionary with:
@@ -137,11 +205,22 @@ class Stage5Chain:
         )
         logging.debug(f"Brand: {brand_name}, Input Source: {input_source}")
 
+        if parallel_cards_enabled(parallel):
+            raw_output, opportunities = self._run_parallel(
+                stage4_output, brand_name, input_source, max_retries
+            )
+            self._annotate_novelty(opportunities, brand_name, input_source)
+            return {
+                "stage5_output": raw_output,
+                "opportunities": opportunities
+            }
+
         last_error = None
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
                     logging.warning(f"Retry attempt {attempt}/{max_retries} for Stage 5")
+                    record_retry("stage5", reason=str(last_error))
 
                 # Execute chain
                 result = self.chain.invoke({
@@ -175,6 +254,8 @@ class Stage5Chain:
                         f"opportunities generated"
                     )
 
+                    self._annotate_novelty(opportunities, brand_name, input_source)
+
                     # Return both raw output and parsed opportunities
                     return {
                         "stage5_output": raw_output,
@@ -202,6 +283,7 @@ class Stage5Chain:
 
                             if len(opportunities) == 5:
                                 logging.warning("JSON repair successful! Continuing with repaired output.")
+                                self._annotate_novelty(opportunities, brand_name, input_source)
                                 return {
                                     "stage5_output": repaired_output,
                                     "opportunities": opportunities
@@ -211,12 +293,12 @@ class Stage5Chain:
 
                     # If we have retries left, continue loop; otherwise raise
                     last_error = parse_error
-                    if attempt < max_retries:
+                    if attempt < max_retries and allow_retry("stage5 parse failure", "stage5"):
                         logging.info(f"Will retry Stage 5 execution (attempt {attempt + 2}/{max_retries + 1})")
                         continue
                     else:
                         raise ValueError(
-                            f"Failed to parse Stage 5 output after {max_retries + 1} attempts: "
+                            f"Failed to parse Stage 5 output after {attempt + 1} attempts: "
                             f"{parse_error}"
                         )
 
@@ -224,24 +306,167 @@ class Stage5Chain:
                 # Re-raise ValueError (parsing failures)
                 raise
             except Exception as e:
+                # Transient LLM errors were already retried by call_with_deadline
                 logging.error(f"Stage 5 execution failed: {e}", exc_info=True)
-                last_error = e
-                if attempt < max_retries:
-                    logging.info(f"Will retry Stage 5 execution (attempt {attempt + 2}/{max_retries + 1})")
-                    continue
-                else:
-                    raise
+                raise
 
         # Should not reach here, but just in case
         raise ValueError(
             f"Stage 5 failed after {max_retries + 1} attempts. Last error: {last_error}"
         )
 
+    def _run_parallel(
+        self,
+        stage4_output: str,
+        brand_name: str,
+        input_source: str,
+        max_retries: int
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Generate one card per pattern concurrently, then replace duplicates.
+
+        A card duplicating an earlier one is regenerated once with the other
+        cards' titles to avoid; if that fails, the original card is kept.
+
+        Returns:
+            (stage5_output JSON text, 5 opportunities in pattern order)
+
+        Raises:
+            ValueError: If a card can't be parsed after its retries
+        """
+        inputs = {
+            "stage4_output": stage4_output,
+            "brand_name": brand_name,
+            "input_source": input_source
+        }
+
+        with ThreadPoolExecutor(max_workers=len(OPPORTUNITY_PATTERNS), thread_name_prefix="stage5-card") as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._generate_card, inputs, pattern, description, max_retries
+                )
+                for pattern, description in OPPORTUNITY_PATTERNS
+            ]
+            cards = [future.result() for future in futures]
+
+        for idx, (pattern, description) in enumerate(OPPORTUNITY_PATTERNS):
+            original = next((card for card in cards[:idx] if is_duplicate_card(cards[idx], card)), None)
+            if original is None:
+                continue
+            logging.warning(f"Stage 5 {pattern} card duplicates '{original.get('title')}', regenerating it")
+            if not allow_retry(f"duplicate {pattern} card", "stage5"):
+                continue
+            avoid = "\n".join(f"- {card.get('title', '')}" for card in cards if card is not cards[idx])
+            try:
+                cards[idx] = self._generate_card(inputs, pattern, description, 0, avoid)
+            except ValueError as e:
+                logging.warning(f"Keeping duplicate {pattern} card, regeneration failed: {e}")
+
+        logging.info(f"Stage 5 execution completed: {len(cards)} opportunities generated in parallel")
+        raw_output = f"```json\n{json.dumps({'opportunities': cards}, indent=2, ensure_ascii=False)}\n```"
+        return raw_output, cards
+
+    def _generate_card(
+        self,
+        inputs: Dict[str, str],
+        pattern: str,
+        description: str,
+        max_retries: int,
+        avoid: str = "None"
+    ) -> Dict[str, Any]:
+        """Generate and parse one pattern's card, retrying parse failures.
+
+        Raises:
+            ValueError: If the card can't be parsed after max_retries retries
+        """
+        with span("stage5.card", pattern=pattern) as attrs:
+            for attempt in range(max_retries + 1):
+                attrs["attempts"] = attempt + 1
+                result = self.card_chain.invoke({
+                    **inputs,
+                    "pattern": pattern,
+                    "pattern_description": description,
+                    "avoid": avoid
+                })
+                raw_output = result[self.output_key]
+                self._save_raw_output_debug(raw_output, inputs["input_source"], attempt, label=pattern)
+
+                try:
+                    return self._parse_card(raw_output, pattern)
+                except ValueError as parse_error:
+                    logging.error(f"Failed to parse Stage 5 {pattern} card: {parse_error}")
+                    if attempt == max_retries or not allow_retry(f"{pattern} card parse failure", "stage5"):
+                        raise ValueError(
+                            f"Failed to parse Stage 5 {pattern} card after {attempt + 1} attempts: {parse_error}"
+                        )
+                    logging.warning(f"Retry attempt {attempt + 1}/{max_retries} for Stage 5 {pattern} card")
+                    record_retry("stage5", reason=f"{pattern}: {parse_error}")
+
+    def _parse_card(self, raw_output: str, pattern: str) -> Dict[str, Any]:
+        """Parse one card's JSON (repairing common errors).
+
+        Raises:
+            ValueError: If no card with a title and description can be parsed
+        """
+        try:
+            data = parse_json_markdown(raw_output)
+        except ValueError:
+            repaired = self._attempt_json_repair(raw_output)
+            if not repaired:
+                raise ValueError(f"{pattern} card is not valid JSON")
+            data = parse_json_markdown(repaired)
+
+        card = data.get("opportunity", data) if isinstance(data, dict) else None
+        if not isinstance(card, dict) or not card.get("title") or not card.get("description"):
+            raise ValueError(f"{pattern} card has no title or description")
+        card["innovation_type"] = card.get("innovation_type") or pattern
+        return card
+
+    def _annotate_novelty(
+        self,
+        opportunities: List[Dict[str, Any]],
+        brand_name: str,
+        input_source: str
+    ) -> None:
+        """Score each opportunity against previously generated cards.
+
+        Only active when NOVELTY_INDEX_PATH is set. Adds 'novelty_score'
+        (1.0 = nothing similar seen before) and 'similar_opportunities'
+        (history cards with >=0.8 estimated Jaccard similarity). The cards
+        join the history once render_opportunity_cards() saves them.
+        Failures are logged, never raised.
+
+        Args:
+            opportunities: Parsed opportunity dictionaries (modified in place)
+            brand_name: Name of the brand
+            input_source: Original input source
+        """
+        try:
+            index = get_history_index()
+            if index is None:
+                return
+
+            for opportunity in opportunities:
+                matches = index.query(opportunity.get('description', ''), threshold=0.0)
+                opportunity['novelty_score'] = round(1.0 - matches[0][1], 3) if matches else 1.0
+                opportunity['similar_opportunities'] = [
+                    {'key': key, 'similarity': round(similarity, 3), **index.get_metadata(key)}
+                    for key, similarity in matches if similarity >= DEFAULT_THRESHOLD
+                ]
+
+            logging.info(
+                "Stage 5 novelty scores: "
+                + ", ".join(f"{o['novelty_score']:.2f}" for o in opportunities)
+            )
+        except Exception as e:
+            logging.warning(f"Novelty annotation skipped: {e}")
+
     def _save_raw_output_debug(
         self,
         raw_output: str,
         input_source: str,
-        attempt: int = 0
+        attempt: int = 0,
+        label: str = ""
     ) -> None:
         """Save raw LLM output to file for debugging.
 
@@ -249,12 +474,15 @@ class Stage5Chain:
             raw_output: Raw text output from LLM
             input_source: Input source identifier for filename
             attempt: Retry attempt number (0 for first attempt)
+            label: Filename suffix (e.g. the card's pattern in parallel mode)
         """
         try:
             debug_dir = Path("data/test-outputs") / input_source / "stage5_debug"
             debug_dir.mkdir(parents=True, exist_ok=True)
 
             attempt_suffix = f"_attempt{attempt}" if attempt > 0 else ""
+            if label:
+                attempt_suffix = f"_{label.lower()}{attempt_suffix}"
             debug_file = debug_dir / f"raw_output_{datetime.now().strftime('%Y%m%d_%H%M%S')}{attempt_suffix}.txt"
             debug_file.write_text(raw_output, encoding='utf-8')
 
@@ -374,7 +602,8 @@ class Stage5Chain:
                 'description': opportunity.get('description', ''),
                 'actionability_items': opportunity.get('actionability_items', []),
                 'visual_description': opportunity.get('visual_description', ''),
-                'follow_up_prompts': opportunity.get('follow_up_prompts', [])
+                'follow_up_prompts': opportunity.get('follow_up_prompts', []),
+                'novelty_score': opportunity.get('novelty_score')
             }
 
             # Render template
@@ -399,8 +628,46 @@ class Stage5Chain:
         logging.info(
             f"All 5 opportunity cards rendered successfully in {stage5_dir}"
         )
+        self._index_cards(opportunities, rendered_files, brand_name, input_source)
         return rendered_files
 
+    def _index_cards(
+        self,
+        opportunities: List[Dict[str, Any]],
+        card_files: List[Path],
+        brand_name: str,
+        input_source: str
+    ) -> None:
+        """Add saved cards to the novelty history (when NOVELTY_INDEX_PATH is set).
+
+        Cards are keyed by file path with the brand id, the same way
+        scripts/update_novelty_index.py indexes batch runs, so a card is
+        never indexed twice. Failures are logged, never raised.
+
+        Args:
+            opportunities: Rendered opportunity dictionaries
+            card_files: Saved card path for each opportunity
+            brand_name: Name of the brand
+            input_source: Original input source
+        """
+        try:
+            index = get_history_index()
+            if index is None:
+                return
+            brand_id = brand_name.lower().replace(' ', '-')
+            index_cards(index, [
+                {
+                    'path': card_file,
+                    'description': opportunity.get('description', ''),
+                    'title': opportunity.get('title', ''),
+                    'brand': brand_id,
+                    'input_source': input_source
+                }
+                for opportunity, card_file in zip(opportunities, card_files)
+            ])
+        except Exception as e:
+            logging.warning(f"Novelty indexing skipped: {e}")
+
     def generate_summary_file(
         self,
         opportunities: List[Dict[str, Any]],
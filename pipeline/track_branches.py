@@ -0,0 +1,202 @@
+"""
+Speculative track branches (dual-track mode).
+
+Stage 1 identifies two inspiration tracks and the UI asks the user to pick
+one. In dual-track mode the pipeline doesn't wait: the selected track runs
+as the main branch and the other track runs Stages 2-5 concurrently, as a
+sibling branch of the same run, starting as soon as Stage 1 completes.
+Switching tracks in the UI then reads the stored branch instead of
+starting a new run.
+
+Sibling branches are speculative, so they never fail the run and are
+admitted through a SpeculationBudget:
+
+    DUAL_TRACK_MAX_CONCURRENT       Speculative branches running at once
+                                    across the process (default 2, 0 disables)
+    DUAL_TRACK_HOURLY_COST_CAP_USD  Estimated LLM spend of speculative
+                                    branches per rolling hour (unset: no cap)
+
+A denied branch returns {"status": "skipped", ...}; the UI falls back to a
+fresh run for that track.
+
+Usage:
+    dag = build_stage_dag(factories, track=selected_track)
+    for track in add_track_branches(dag, factories, selected_track):
+        ...  # node f"track{track}" yields the branch result
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .chain_pool import get_chain_pool
+from .dag import StageDAG, run_fused_stages
+from .instrumentation import child_run
+from .stages.stage1_input_processing import Stage1Chain
+from .stages.stage23_fused_analysis import fused_stages_enabled
+
+
+TRACKS = (1, 2)
+DEFAULT_MAX_CONCURRENT = 2
+COST_WINDOW_S = 3600.0
+
+
+def dual_track_enabled(requested: Optional[bool] = None) -> bool:
+    """Per-run flag if given, else DUAL_TRACK_MODE (default off)."""
+    if requested is not None:
+        return requested
+    return os.getenv("DUAL_TRACK_MODE", "").lower() in ("1", "true", "yes")
+
+
+def branch_node(track: int) -> str:
+    return f"track{track}"
+
+
+def branch_track(node_name: str) -> Optional[int]:
+    """Track number for a branch node name, else None."""
+    if node_name.startswith("track") and node_name[5:].isdigit():
+        return int(node_name[5:])
+    return None
+
+
+class SpeculationBudget:
+    """Admission control for speculative branches.
+
+    Args:
+        max_concurrent: Branches allowed to run at once (0 disables)
+        hourly_cost_cap_usd: Estimated spend allowed per rolling hour
+            (None: no cap)
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, hourly_cost_cap_usd: Optional[float] = None):
+        self.max_concurrent = max_concurrent
+        self.hourly_cost_cap_usd = hourly_cost_cap_usd
+        self._running = 0
+        self._spend: Deque[Tuple[float, float]] = deque()
+        self._lock = threading.Lock()
+
+    def spent_last_hour(self) -> float:
+        with self._lock:
+            return self._prune()
+
+    def _prune(self) -> float:
+        cutoff = time.time() - COST_WINDOW_S
+        while self._spend and self._spend[0][0] < cutoff:
+            self._spend.popleft()
+        return sum(cost for _, cost in self._spend)
+
+    def try_acquire(self) -> Tuple[bool, str]:
+        """Reserve a branch slot; returns (admitted, reason if denied)."""
+        with self._lock:
+            if self._running >= self.max_concurrent:
+                return False, f"{self._running}/{self.max_concurrent} speculative branches running"
+            if self.hourly_cost_cap_usd is not None:
+                spent = self._prune()
+                if spent >= self.hourly_cost_cap_usd:
+                    return False, f"speculative spend ${spent:.2f} reached hourly cap ${self.hourly_cost_cap_usd:.2f}"
+            self._running += 1
+            return True, ""
+
+    def release(self, cost_usd: float = 0.0) -> None:
+        """Free a slot and record the branch's estimated cost."""
+        with self._lock:
+            self._running = max(0, self._running - 1)
+            if cost_usd:
+                self._spend.append((time.time(), cost_usd))
+
+
+_budget: Optional[SpeculationBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_speculation_budget() -> SpeculationBudget:
+    """Process-wide budget configured from the environment."""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            cap = os.getenv("DUAL_TRACK_HOURLY_COST_CAP_USD")
+            _budget = SpeculationBudget(
+                max_concurrent=int(os.getenv("DUAL_TRACK_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT)),
+                hourly_cost_cap_usd=float(cap) if cap else None
+            )
+        return _budget
+
+
+def add_track_branches(
+    dag: StageDAG,
+    factories: Sequence[Callable[[], Any]],
+    selected_track: int,
+    budget: Optional[SpeculationBudget] = None,
+    fused: Optional[bool] = None
+) -> List[int]:
+    """Add a sibling branch node for every track except selected_track.
+
+    Each node runs Stages 2-5 on its track (inputs: stage1 and the Stage 4-5
+    context values) and returns a dict with status ("completed", "skipped"
+    or "failed"), the stage results, cost_usd and reason. Stages 2 and 3
+    run fused or separately, as in build_stage_dag().
+
+    Args:
+        fused: Run Stages 2 and 3 as one call (default: STAGE23_FUSED)
+
+    Returns:
+        Tracks that got a branch node
+    """
+    budget = budget or get_speculation_budget()
+    fused = fused_stages_enabled(fused)
+    tracks = [track for track in TRACKS if track != selected_track]
+
+    def chain(stage_num: int):
+        return get_chain_pool().get(factories[stage_num - 1])
+
+    def stages_2_3(track_text: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if fused:
+            outputs = run_fused_stages(chain, track_text)
+            return {"stage2_output": outputs["stage2_output"]}, {"stage3_output": outputs["stage3_output"]}
+        stage2 = chain(2).run(track_text)
+        return stage2, chain(3).run(track_text, stage2.get("stage2_output", ""))
+
+    def make_branch(track: int):
+        def branch(stage1, brand_profile, research_data, brand_name, input_source):
+            admitted, reason = budget.try_acquire()
+            if not admitted:
+                logging.info(f"Track {track} branch skipped: {reason}")
+                return {"track": track, "status": "skipped", "reason": reason, "cost_usd": 0.0}
+
+            result: Dict[str, Any] = {"track": track, "status": "failed", "reason": "", "cost_usd": 0.0}
+            try:
+                with child_run(f"track{track}") as metrics:
+                    try:
+                        track_text = Stage1Chain.track_output(stage1.get("stage1_output", ""), track)
+                        result["stage2"], result["stage3"] = stages_2_3(track_text)
+                        result["stage4"] = chain(4).run(
+                            result["stage3"].get("stage3_output", ""), brand_profile, research_data
+                        )
+                        result["stage5"] = chain(5).run(
+                            result["stage4"].get("stage4_output", ""), brand_name, input_source
+                        )
+                        result["status"] = "completed"
+                    except Exception as e:
+                        # Speculative work must not fail the run
+                        logging.warning(f"Track {track} branch failed: {e}")
+                        result["reason"] = str(e)
+                    finally:
+                        result["cost_usd"] = metrics.totals()["cost_usd"]
+            finally:
+                # Free the slot even if the branch is interrupted, recording
+                # whatever it spent before stopping
+                budget.release(result["cost_usd"])
+            logging.info(f"Track {track} branch {result['status']} (~${result['cost_usd']:.4f})")
+            return result
+        return branch
+
+    for track in tracks:
+        dag.add(
+            branch_node(track),
+            make_branch(track),
+            ["stage1", "brand_profile", "research_data", "brand_name", "input_source"]
+        )
+    return tracks
@@ -10,59 +10,127 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
+import openai
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
+from .hedging import HedgedChatOpenAI, hedging_enabled
+from .instrumentation import get_llm_callback
+from .model_routing import Endpoint, RoutedChatModel
+from .rate_limiter import get_rate_limited_http_client
+from .text_condenser import read_pdf_text
 
-def create_llm(temperature: float = 0.5, max_tokens: int = 4000) -> ChatOpenAI:
+
+def create_llm(temperature: float = 0.5, max_tokens: int = 4000, stage: Optional[str] = None) -> BaseChatModel:
     """Create configured LLM instance with centralized model settings.
 
     ⚡ SINGLE SOURCE OF TRUTH FOR MODEL CONFIGURATION ⚡
     Change LLM_MODEL in .env to switch models across entire pipeline.
+    Set LLM_ROUTING_CONFIG to route stages to different models and
+    fallbacks (see pipeline/model_routing.py).
 
     Args:
         temperature: LLM temperature (0.0-1.0, default: 0.5)
         max_tokens: Maximum tokens in response (default: 4000)
+        stage: Stage whose route to use (default: the stage making the call)
 
     Returns:
-        Configured ChatOpenAI instance
+        Chat model resolving the stage's route on every call
 
     Raises:
         ValueError: If required environment variables not set
 
     Example:
-        >>> llm = create_llm(temperature=0.7, max_tokens=3000)
-        >>> # Uses model from LLM_MODEL env variable
+        >>> llm = create_llm(temperature=0.7, max_tokens=3000, stage="stage5")
+        >>> # Uses the stage5 route, or the model from LLM_MODEL
+
+    Every call is recorded by the shared LLMMetricsCallback (latency, tokens,
+    estimated cost). Set LLM_STREAMING=true to also capture time-to-first-token.
+    Set LLM_HEDGE=true to hedge slow calls (see pipeline/hedging.py) and
+    LLM_RATE_LIMIT_RPM/TPM to share a rate limit across runs
+    (see pipeline/rate_limiter.py). Calls have connect/read timeouts and
+    retry within the run's deadline and retry budget (see
+    pipeline/deadlines.py).
     """
     # Validate environment variables
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    base_url = os.getenv("OPENROUTER_BASE_URL")
     model = os.getenv("LLM_MODEL", "deepseek/deepseek-chat")  # Default to DeepSeek
 
-    if not api_key:
+    if not os.getenv("OPENROUTER_API_KEY"):
         raise ValueError(
             "OPENROUTER_API_KEY not set. "
             "Please configure in .env file (see .env.template)"
         )
 
-    if not base_url:
+    if not os.getenv("OPENROUTER_BASE_URL"):
         raise ValueError(
             "OPENROUTER_BASE_URL not set. "
             "Please configure in .env file (see .env.template)"
         )
 
+    return RoutedChatModel(
+        stage=stage,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        default_model=model,
+        client_factory=create_chat_client,
+        callbacks=[get_llm_callback()]
+    )
+
+
+def create_chat_client(
+    model: str,
+    endpoint: Optional[Endpoint],
+    temperature: float,
+    max_tokens: int
+) -> ChatOpenAI:
+    """Build the client for one routed model (OpenRouter if endpoint is None).
+
+    OpenRouter clients share the rate limiter; metrics are recorded by the
+    RoutedChatModel making the call, so clients have no callbacks. Clients
+    don't retry: call_with_deadline() retries within the run's budget and
+    passes each attempt's timeout (see pipeline/deadlines.py).
+    """
+    streaming = os.getenv("LLM_STREAMING", "false").lower() == "true"
+    if endpoint is None:
+        api_key = os.getenv("OPENROUTER_API_KEY")
+        base_url = os.getenv("OPENROUTER_BASE_URL")
+    else:
+        # Local OpenAI-compatible servers usually accept any key
+        api_key = endpoint.api_key or "not-needed"
+        base_url = endpoint.base_url
+
     logging.debug(
-        f"Creating LLM: model={model}, temperature={temperature}, "
-        f"max_tokens={max_tokens}"
+        f"Creating LLM: model={model}, base_url={base_url}, temperature={temperature}, "
+        f"max_tokens={max_tokens}, streaming={streaming}"
     )
 
-    return ChatOpenAI(
-        model=model,
+    settings = dict(
         temperature=temperature,
         max_tokens=max_tokens,
         openai_api_key=api_key,
-        base_url=base_url
+        base_url=base_url,
+        streaming=streaming,
+        max_retries=0
     )
 
+    http_client = get_rate_limited_http_client() if endpoint is None else None
+    if http_client is not None:
+        # ChatOpenAI would also hand http_client to its async client, which
+        # needs an httpx.AsyncClient; the stage chains only call the sync one
+        settings["client"] = openai.OpenAI(
+            api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0
+        ).chat.completions
+
+    if hedging_enabled():
+        fallback_model = os.getenv("LLM_HEDGE_FALLBACK_MODEL") if endpoint is None else None
+        return HedgedChatOpenAI(
+            model=model,
+            hedge_fallback=ChatOpenAI(model=fallback_model, **settings) if fallback_model else None,
+            **settings
+        )
+
+    return ChatOpenAI(model=model, **settings)
+
 
 def create_test_output_dir(
     input_id: str,
@@ -241,14 +309,14 @@ def load_input_document(input_id: str, input_manifest_path: Path = Path("data/in
         input_manifest_path: Path to input manifest YAML file
 
     Returns:
-        Extracted text content from PDF document
+        Extracted text content from PDF document, condensed (see
+        text_condenser) unless INPUT_CONDENSE=false
 
     Raises:
         FileNotFoundError: If manifest or PDF file doesn't exist
         ValueError: If input_id not found in manifest
     """
     import yaml
-    from pypdf import PdfReader
 
     # Load manifest
     if not input_manifest_path.exists():
@@ -272,11 +340,8 @@ def load_input_document(input_id: str, input_manifest_path: Path = Path("data/in
     if not pdf_path.exists():
         raise FileNotFoundError(f"Input PDF not found: {pdf_path}")
 
-    # Extract text from PDF
-    reader = PdfReader(pdf_path)
-    text_content = ""
-    for page in reader.pages:
-        text_content += page.extract_text()
+    # Extract text from PDF (cached by content hash)
+    text_content = read_pdf_text(pdf_path)
 
     logging.debug(f"Loaded input document: {pdf_path} ({len(text_content)} characters)")
     return text_content
@@ -5,13 +5,98 @@ Generates comprehensive metrics and insights for Story 4.4.
 """
 
 import csv
+import heapq
+import math
 from pathlib import Path
-from collections import defaultdict
-
-def load_assessment_data():
-    """Load quality assessment CSV."""
-    data = []
-    with open('data/quality-assessment.csv', 'r') as f:
+from collections import Counter, defaultdict
+
+DIMENSIONS = ['novelty', 'actionability', 'relevance', 'specificity']
+
+class RunningStats:
+    """Online count/sum/min/max plus Welford mean and variance."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def average(self):
+        # total / count rather than the Welford mean so rounded report
+        # values match a plain sum() / len()
+        return self.total / self.count
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+class QualityAggregator:
+    """Single-pass aggregation of assessment rows in constant memory.
+
+    Keeps running statistics overall, per dimension, per brand and per
+    input source, plus bounded heaps holding only the top-N and bottom-N
+    rows. Ties keep file order, as a stable sort would.
+    """
+
+    def __init__(self, n=5):
+        self.n = n
+        self.overall = RunningStats()
+        self.passing = 0
+        self.dimensions = {dim: RunningStats() for dim in DIMENSIONS}
+        self.distributions = {dim: Counter() for dim in DIMENSIONS}
+        self.by_brand = defaultdict(RunningStats)
+        self.by_source = defaultdict(RunningStats)
+        self._top = []     # min-heap of (score, -seq, row): worst of the top N first
+        self._bottom = []  # min-heap of (-score, -seq, row): best of the bottom N first
+        self._seq = 0
+
+    def add(self, row):
+        score = row['overall_score']
+        self.overall.add(score)
+        if score >= 3.0:
+            self.passing += 1
+
+        for dim in DIMENSIONS:
+            self.dimensions[dim].add(row[dim])
+            self.distributions[dim][row[dim]] += 1
+
+        self.by_brand[row['brand']].add(score)
+        self.by_source[row['input_source']].add(score)
+
+        seq = self._seq
+        self._seq += 1
+        self._push(self._top, (score, -seq, row))
+        self._push(self._bottom, (-score, -seq, row))
+
+    def _push(self, heap, item):
+        if len(heap) < self.n:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    def top(self):
+        return [row for _, _, row in sorted(self._top, key=lambda item: item[:2], reverse=True)]
+
+    def bottom(self):
+        return [row for _, _, row in sorted(self._bottom, key=lambda item: item[:2], reverse=True)]
+
+def stream_assessment_data(csv_path='data/quality-assessment.csv'):
+    """Yield quality assessment rows with numeric scores, one at a time."""
+    with open(csv_path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
             # Convert scores to numeric
@@ -20,106 +105,97 @@ def load_assessment_data():
             row['relevance'] = int(row['relevance'])
             row['specificity'] = int(row['specificity'])
             row['overall_score'] = float(row['overall_score'])
-            data.append(row)
-    return data
+            yield row
+
+def aggregate_assessment_data(rows, n=5):
+    """Aggregate every row in a single pass."""
+    aggregator = QualityAggregator(n)
+    for row in rows:
+        aggregator.add(row)
+    return aggregator
 
-def calculate_overall_metrics(data):
+def calculate_overall_metrics(aggregator):
     """Calculate overall quality metrics."""
-    total = len(data)
-    overall_scores = [d['overall_score'] for d in data]
+    total = aggregator.overall.count
 
-    avg_overall = sum(overall_scores) / total
-    passing = sum(1 for score in overall_scores if score >= 3.0)
+    avg_overall = aggregator.overall.average
+    passing = aggregator.passing
     passing_pct = (passing / total) * 100
 
     return {
         'total_assessed': total,
         'avg_overall_score': round(avg_overall, 2),
+        'std_overall_score': round(aggregator.overall.std, 2),
         'passing_count': passing,
         'passing_percentage': round(passing_pct, 1),
         'meets_avg_target': avg_overall >= 3.5,
         'meets_passing_target': passing_pct >= 70
     }
 
-def calculate_dimension_breakdown(data):
+def calculate_dimension_breakdown(aggregator):
     """Calculate average scores by dimension."""
-    dimensions = ['novelty', 'actionability', 'relevance', 'specificity']
     breakdown = {}
 
-    for dim in dimensions:
-        scores = [d[dim] for d in data]
-        avg = sum(scores) / len(scores)
+    for dim in DIMENSIONS:
+        stats = aggregator.dimensions[dim]
+        counts = aggregator.distributions[dim]
         breakdown[dim] = {
-            'average': round(avg, 2),
-            'min': min(scores),
-            'max': max(scores),
-            'count_5': sum(1 for s in scores if s == 5),
-            'count_4': sum(1 for s in scores if s == 4),
-            'count_3': sum(1 for s in scores if s == 3),
-            'count_2': sum(1 for s in scores if s == 2),
-            'count_1': sum(1 for s in scores if s == 1)
+            'average': round(stats.average, 2),
+            'std': round(stats.std, 2),
+            'min': stats.min,
+            'max': stats.max,
+            'count_5': counts[5],
+            'count_4': counts[4],
+            'count_3': counts[3],
+            'count_2': counts[2],
+            'count_1': counts[1]
         }
 
     return breakdown
 
-def identify_top_performers(data, n=5):
-    """Identify top N highest-scoring opportunities."""
-    sorted_data = sorted(data, key=lambda x: x['overall_score'], reverse=True)
-    return sorted_data[:n]
+def identify_top_performers(aggregator):
+    """Top N highest-scoring opportunities."""
+    return aggregator.top()
 
-def identify_bottom_performers(data, n=5):
-    """Identify bottom N lowest-scoring opportunities."""
-    sorted_data = sorted(data, key=lambda x: x['overall_score'])
-    return sorted_data[:n]
+def identify_bottom_performers(aggregator):
+    """Bottom N lowest-scoring opportunities."""
+    return aggregator.bottom()
 
-def analyze_by_brand(data):
-    """Analyze scores grouped by brand."""
-    by_brand = defaultdict(list)
-
-    for record in data:
-        by_brand[record['brand']].append(record['overall_score'])
-
-    brand_analysis = {}
-    for brand, scores in by_brand.items():
-        brand_analysis[brand] = {
-            'count': len(scores),
-            'avg_score': round(sum(scores) / len(scores), 2),
-            'min': round(min(scores), 1),
-            'max': round(max(scores), 1)
+def _group_analysis(groups):
+    return {
+        key: {
+            'count': stats.count,
+            'avg_score': round(stats.average, 2),
+            'std': round(stats.std, 2),
+            'min': round(stats.min, 1),
+            'max': round(stats.max, 1)
         }
+        for key, stats in groups.items()
+    }
 
-    return brand_analysis
+def analyze_by_brand(aggregator):
+    """Analyze scores grouped by brand."""
+    return _group_analysis(aggregator.by_brand)
 
-def analyze_by_input_source(data):
+def analyze_by_input_source(aggregator):
     """Analyze scores grouped by input source."""
-    by_source = defaultdict(list)
-
-    for record in data:
-        by_source[record['input_source']].append(record['overall_score'])
-
-    source_analysis = {}
-    for source, scores in by_source.items():
-        source_analysis[source] = {
-            'count': len(scores),
-            'avg_score': round(sum(scores) / len(scores), 2),
-            'min': round(min(scores), 1),
-            'max': round(max(scores), 1)
-        }
-
-    return source_analysis
+    return _group_analysis(aggregator.by_source)
 
 def generate_analysis_report():
     """Generate comprehensive analysis report."""
     print("📊 QUALITY ASSESSMENT ANALYSIS REPORT")
     print("="*80)
 
-    # Load data
-    data = load_assessment_data()
+    # Aggregate everything in one streaming pass over the CSV
+    aggregator = aggregate_assessment_data(stream_assessment_data(), n=5)
+    if aggregator.overall.count == 0:
+        print("\n⚠️  No scored opportunities in data/quality-assessment.csv")
+        return
 
     # Overall Metrics
     print("\n## 1. OVERALL METRICS")
     print("-"*80)
-    overall = calculate_overall_metrics(data)
+    overall = calculate_overall_metrics(aggregator)
     print(f"Total Opportunities Assessed: {overall['total_assessed']}")
     print(f"Average Overall Score: {overall['avg_overall_score']}")
     print(f"Target: ≥3.5 → {'✅ MET' if overall['meets_avg_target'] else '❌ MISSED'}")
@@ -129,7 +205,7 @@ def generate_analysis_report():
     # Dimension Breakdown
     print("\n## 2. DIMENSION BREAKDOWN")
     print("-"*80)
-    breakdown = calculate_dimension_breakdown(data)
+    breakdown = calculate_dimension_breakdown(aggregator)
 
     print(f"\n{'Dimension':<15} {'Avg':<8} {'Min':<8} {'Max':<8} {'Distribution'}")
     print("-"*80)
@@ -156,7 +232,7 @@ def generate_analysis_report():
     print("-"*80)
     print("(For Story 4.5 Executive Package)")
     print()
-    top_5 = identify_top_performers(data, 5)
+    top_5 = identify_top_performers(aggregator)
     for i, opp in enumerate(top_5, 1):
         print(f"{i}. Score {opp['overall_score']:.1f} | {opp['input_source']} → {opp['brand']}")
         print(f"   Scenario: {opp['scenario_id']}")
@@ -166,7 +242,7 @@ def generate_analysis_report():
     # Bottom Performers
     print("\n## 5. LOWEST-SCORING OPPORTUNITIES (Need Improvement)")
     print("-"*80)
-    bottom_5 = identify_bottom_performers(data, 5)
+    bottom_5 = identify_bottom_performers(aggregator)
     for i, opp in enumerate(bottom_5, 1):
         print(f"{i}. Score {opp['overall_score']:.1f} | {opp['input_source']} → {opp['brand']}")
         print(f"   Issue: {opp['notes']}")
@@ -174,7 +250,7 @@ def generate_analysis_report():
     # By Brand Analysis
     print("\n## 6. PERFORMANCE BY BRAND")
     print("-"*80)
-    brand_analysis = analyze_by_brand(data)
+    brand_analysis = analyze_by_brand(aggregator)
     print(f"\n{'Brand':<25} {'Count':<8} {'Avg Score':<12} {'Range'}")
     print("-"*80)
     for brand, stats in sorted(brand_analysis.items(), key=lambda x: x[1]['avg_score'], reverse=True):
@@ -183,7 +259,7 @@ def generate_analysis_report():
     # By Input Source Analysis
     print("\n## 7. PERFORMANCE BY INPUT SOURCE")
     print("-"*80)
-    source_analysis = analyze_by_input_source(data)
+    source_analysis = analyze_by_input_source(aggregator)
     print(f"\n{'Input Source':<25} {'Count':<8} {'Avg Score':<12} {'Range'}")
     print("-"*80)
     for source, stats in sorted(source_analysis.items(), key=lambda x: x[1]['avg_score'], reverse=True):
@@ -9,55 +9,38 @@ Real business validation requires manual PM assessment.
 
 import csv
 import json
-import re
+import sys
 from pathlib import Path
 
-def parse_opportunity(file_path):
-    """Extract opportunity details from markdown file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    # Extract sections
-    title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else ""
-
-    desc_match = re.search(r'## Description\n\n(.+?)(?=\n##|$)', content, re.DOTALL)
-    description = desc_match.group(1).strip() if desc_match else ""
-
-    action_match = re.search(r'## Actionability\n\n(.+?)(?=\n##|$)', content, re.DOTALL)
-    actionability_section = action_match.group(1).strip() if action_match else ""
-
-    return {
-        'title': title,
-        'description': description,
-        'actionability': actionability_section,
-        'full_content': content
-    }
+sys.path.insert(0, str(Path(__file__).parent))
+
+from opportunity_corpus import load_opportunity_files, parse_opportunity
+from rubric_engine import (
+    ACTION_SPECIFIC_TERMS,
+    ACTION_TIMELINE_TERMS,
+    BRAND_ALIGNMENT_TERMS,
+    CAPABILITY_TERMS,
+    CROSS_INDUSTRY_TERMS,
+    NOVELTY_HIGH_TERMS,
+    NOVELTY_LOW_TERMS,
+    NOVELTY_MEDIUM_TERMS,
+    SPECIFICITY_CHANNEL_TERMS,
+    SPECIFICITY_CUSTOMER_TERMS,
+    SPECIFICITY_MARKET_TERMS,
+    SPECIFICITY_TIMELINE_TERMS,
+    RubricEngine,
+)
 
 def score_novelty(opportunity, brand, input_source):
     """Score novelty (1-5) based on concept originality."""
     content = opportunity['full_content'].lower()
-    title = opportunity['title'].lower()
 
-    # High novelty indicators
-    high_novelty = ['biomimicry', 'circular economy', 'upcycl', 'regenerative',
-                    'blockchain', 'ai-powered', 'personaliz', 'immersive',
-                    'virtual reality', 'augmented reality', 'nft']
-
-    # Medium novelty indicators
-    medium_novelty = ['partnership', 'collaboration', 'campaign', 'platform',
-                      'digital', 'sustainability', 'innovation']
-
-    # Low novelty indicators
-    low_novelty = ['standard', 'traditional', 'basic', 'simple', 'generic']
-
-    high_count = sum(1 for term in high_novelty if term in content)
-    medium_count = sum(1 for term in medium_novelty if term in content)
-    low_count = sum(1 for term in low_novelty if term in content)
+    high_count = sum(1 for term in NOVELTY_HIGH_TERMS if term in content)
+    medium_count = sum(1 for term in NOVELTY_MEDIUM_TERMS if term in content)
+    low_count = sum(1 for term in NOVELTY_LOW_TERMS if term in content)
 
     # Cross-industry inspiration (high novelty)
-    cross_industry_terms = ['inspired by', 'like the savannah', 'similar to', 'borrowing from']
-    has_cross_industry = any(term in content for term in cross_industry_terms)
+    has_cross_industry = any(term in content for term in CROSS_INDUSTRY_TERMS)
 
     if high_count >= 2 or has_cross_industry:
         return 4  # Innovative
@@ -81,18 +64,9 @@ def score_actionability(opportunity):
     bullet_count = action_section.count('\n-')
 
     # Check for specific elements
-    has_specifics = any(term in action_section.lower() for term in [
-        'partner with', 'launch pilot', 'conduct', 'develop prototype',
-        'target market', 'specific', 'identified', 'named'
-    ])
-
-    has_timeline = any(term in action_section.lower() for term in [
-        'within', 'by', 'q1', 'q2', 'q3', 'q4', 'month', 'year', 'phase'
-    ])
-
-    has_metrics = any(term in action_section.lower() for term in [
-        'measure', 'kpi', 'metric', 'target', 'goal', '%'
-    ])
+    action_lower = action_section.lower()
+    has_specifics = any(term in action_lower for term in ACTION_SPECIFIC_TERMS)
+    has_timeline = any(term in action_lower for term in ACTION_TIMELINE_TERMS)
 
     # Scoring logic
     if bullet_count >= 3 and has_specifics and has_timeline:
@@ -109,27 +83,13 @@ def score_actionability(opportunity):
 def score_relevance(opportunity, brand):
     """Score relevance (1-5) based on brand fit."""
     content = opportunity['full_content'].lower()
-    title = opportunity['title'].lower()
 
     # Brand-specific relevance indicators
-    brand_alignment = {
-        'lactalis-canada': ['dairy', 'milk', 'cheese', 'yogurt', 'nutrition',
-                            'canadian', 'farm', 'whey', 'lactose', 'protein'],
-        'columbia-sportswear': ['outdoor', 'apparel', 'gear', 'hiking', 'adventure',
-                                'sustainable', 'fabric', 'textile', 'garment', 'clothing'],
-        'decathlon': ['sport', 'athletic', 'fitness', 'outdoor', 'equipment',
-                      'gear', 'performance', 'training', 'recreation'],
-        'mccormick-usa': ['spice', 'flavor', 'seasoning', 'culinary', 'food',
-                          'recipe', 'cooking', 'ingredient', 'taste', 'herb']
-    }
-
-    relevant_terms = brand_alignment.get(brand, [])
+    relevant_terms = BRAND_ALIGNMENT_TERMS.get(brand, [])
     match_count = sum(1 for term in relevant_terms if term in content)
 
     # Check for capabilities mention
-    has_capabilities = any(term in content for term in [
-        'leverage', 'expertise', 'capability', 'strength', 'existing'
-    ])
+    has_capabilities = any(term in content for term in CAPABILITY_TERMS)
 
     if match_count >= 4 and has_capabilities:
         return 5  # Perfect fit
@@ -144,25 +104,14 @@ def score_relevance(opportunity, brand):
 
 def score_specificity(opportunity):
     """Score specificity (1-5) based on detail level."""
-    content = opportunity['full_content']
+    content = opportunity['full_content'].lower()
     description = opportunity['description']
 
     # Count specific elements
-    has_target_customer = any(term in content.lower() for term in [
-        'consumer', 'customer', 'audience', 'demographic', 'segment'
-    ])
-
-    has_channel = any(term in content.lower() for term in [
-        'e-commerce', 'retail', 'online', 'store', 'platform', 'channel'
-    ])
-
-    has_timeline = any(term in content.lower() for term in [
-        'pilot', 'launch', 'phase', 'rollout', 'q1', 'q2', 'month', 'year'
-    ])
-
-    has_market = any(term in content.lower() for term in [
-        'toronto', 'vancouver', 'canada', 'urban', 'market', 'region'
-    ])
+    has_target_customer = any(term in content for term in SPECIFICITY_CUSTOMER_TERMS)
+    has_channel = any(term in content for term in SPECIFICITY_CHANNEL_TERMS)
+    has_timeline = any(term in content for term in SPECIFICITY_TIMELINE_TERMS)
+    has_market = any(term in content for term in SPECIFICITY_MARKET_TERMS)
 
     # Check description length as proxy for detail
     word_count = len(description.split())
@@ -227,22 +176,21 @@ def score_all_opportunities():
     with open('data/collected-opportunities.json', 'r') as f:
         opportunities = json.load(f)
 
+    # Load every card through the shared corpus cache, then score the whole
+    # corpus in one vectorized pass
+    cards = load_opportunity_files(opp['opportunity_file'] for opp in opportunities)
+    parsed = [cards[opp['opportunity_file']] for opp in opportunities]
+    engine = RubricEngine()
+    scores = engine.score(parsed, [opp['brand'] for opp in opportunities])
+    overall_scores = engine.overall(scores)
+
     scored_opportunities = []
 
-    for idx, opp in enumerate(opportunities, 1):
+    for idx, (opp, opportunity_data) in enumerate(zip(opportunities, parsed), 1):
         print(f"\n📊 Scoring {idx}/{len(opportunities)}: {opp['scenario_id']}")
 
-        # Parse opportunity content
-        opportunity_data = parse_opportunity(opp['opportunity_file'])
-
-        # Score each dimension
-        novelty = score_novelty(opportunity_data, opp['brand'], opp['input_source'])
-        actionability = score_actionability(opportunity_data)
-        relevance = score_relevance(opportunity_data, opp['brand'])
-        specificity = score_specificity(opportunity_data)
-
-        # Calculate overall
-        overall = round((novelty + actionability + relevance + specificity) / 4, 1)
+        novelty, actionability, relevance, specificity = (int(v) for v in scores[idx - 1])
+        overall = float(overall_scores[idx - 1])
 
         # Generate notes
         notes = generate_notes(
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+TF-IDF brand similarity for differentiation analysis.
+
+Builds one document per brand from its profile YAML (data/brand-profiles)
+and, when present, its research notes (data/web-search-setup), then scores
+every opportunity against every brand with a single matrix product. Any
+brand with a profile file is picked up automatically.
+
+Usage:
+    from brand_similarity import BrandSimilarityEngine, load_brand_documents
+
+    engine = BrandSimilarityEngine(load_brand_documents())
+    report = engine.analyze(opportunities)   # dicts with brand/title/description
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+BRAND_PROFILES_DIR = Path("data/brand-profiles")
+BRAND_RESEARCH_DIR = Path("data/web-search-setup")
+
+# Opportunity pairs from different brands above this cosine similarity are
+# reported as near-duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+# A card whose own brand is not the closest is still moderately
+# contextualized if its own-brand similarity is at least this fraction of
+# the closest brand's
+MODERATE_SIMILARITY_RATIO = 0.75
+
+URL_PATTERN = re.compile(r'https?://\S+')
+TOKEN_PATTERN = re.compile(r'[a-z][a-z0-9]+')
+
+STOPWORDS = frozenset("""
+    about above after again against all also and any are because been before being
+    below between both but can could did does doing down during each few for from
+    further had has have having her here hers him his how into its itself just more
+    most not now off once only other our ours out over own same she should some such
+    than that the their theirs them then there these they this those through too under
+    until very was were what when where which while who whom why will with would you
+    your yours source sources via per new
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with URLs and stopwords removed."""
+    text = URL_PATTERN.sub(' ', text.lower())
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def flatten_profile(value: Any) -> str:
+    """Concatenate every string in a nested brand profile structure."""
+    if isinstance(value, dict):
+        return "\n".join(flatten_profile(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return "\n".join(flatten_profile(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def load_brand_documents(
+    profiles_dir: Path = BRAND_PROFILES_DIR,
+    research_dir: Path = BRAND_RESEARCH_DIR
+) -> Dict[str, str]:
+    """Build one text document per brand.
+
+    Args:
+        profiles_dir: Directory of {brand_id}.yaml brand profiles
+        research_dir: Directory of optional {brand_id}-research.md notes
+
+    Returns:
+        Dictionary mapping brand_id to profile (+ research) text
+    """
+    import yaml
+
+    documents = {}
+    for profile_path in sorted(profiles_dir.glob("*.yaml")):
+        brand_id = profile_path.stem
+        with open(profile_path, 'r', encoding='utf-8') as f:
+            parts = [brand_id.replace('-', ' '), flatten_profile(yaml.safe_load(f))]
+
+        research_path = research_dir / f"{brand_id}-research.md"
+        if research_path.exists():
+            parts.append(research_path.read_text(encoding='utf-8'))
+
+        documents[brand_id] = "\n".join(parts)
+
+    return documents
+
+
+def opportunity_text(opportunity: Dict[str, str]) -> str:
+    """Text used to represent an opportunity card."""
+    return "\n".join(
+        opportunity.get(field, "") for field in ('title', 'description', 'actionability')
+    )
+
+
+class TfidfModel:
+    """Smoothed TF-IDF with sublinear term frequency and L2-normalized rows."""
+
+    def __init__(self, documents: Sequence[str]):
+        tokenized = [tokenize(doc) for doc in documents]
+        self.vocabulary: Dict[str, int] = {}
+        for tokens in tokenized:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        counts = self._counts(tokenized)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        n_docs = len(documents)
+        self.idf = (np.log((1 + n_docs) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    def _counts(self, tokenized: Sequence[List[str]]) -> np.ndarray:
+        n_terms = len(self.vocabulary)
+        rows, cols = [], []
+        for row, tokens in enumerate(tokenized):
+            ids = [self.vocabulary[t] for t in tokens if t in self.vocabulary]
+            rows.extend([row] * len(ids))
+            cols.extend(ids)
+
+        flat = np.asarray(rows, dtype=np.int64) * n_terms + np.asarray(cols, dtype=np.int64)
+        counts = np.bincount(flat, minlength=len(tokenized) * n_terms)
+        return counts.reshape(len(tokenized), n_terms).astype(np.float32)
+
+    def transform(self, documents: Sequence[str]) -> np.ndarray:
+        """Return an (n_documents, n_terms) matrix of unit-length TF-IDF rows."""
+        counts = self._counts([tokenize(doc) for doc in documents])
+        weights = np.log1p(counts, out=counts) * self.idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        return weights / np.maximum(norms, 1e-12)
+
+
+@dataclass
+class DifferentiationReport:
+    """Brand similarity results for a set of opportunities."""
+
+    brand_ids: List[str]
+    similarity: np.ndarray          # (n_opportunities, n_brands) cosine similarity
+    pairwise: np.ndarray            # (n_opportunities, n_opportunities) cosine similarity
+    own_brand_similarity: np.ndarray
+    best_brand: List[str]
+    contextualized: np.ndarray      # own brand is the closest brand profile
+    moderate: np.ndarray            # own brand not closest, but within MODERATE_SIMILARITY_RATIO of it
+    duplicate_pairs: List[Tuple[int, int, float]]
+
+
+class BrandSimilarityEngine:
+    """Score opportunities against brand documents with TF-IDF cosine similarity."""
+
+    def __init__(self, brand_documents: Dict[str, str]):
+        if not brand_documents:
+            raise ValueError("At least one brand document is required")
+        self.brand_ids = list(brand_documents)
+        self.brand_documents = [brand_documents[b] for b in self.brand_ids]
+
+    def analyze(
+        self,
+        opportunities: Sequence[Dict[str, str]],
+        duplicate_threshold: float = DUPLICATE_THRESHOLD
+    ) -> DifferentiationReport:
+        """Compare opportunities with every brand and with each other.
+
+        Args:
+            opportunities: Parsed cards with a 'brand' key
+            duplicate_threshold: Cosine similarity at which two cards for
+                different brands count as near-duplicates
+
+        Returns:
+            DifferentiationReport
+        """
+        texts = [opportunity_text(opp) for opp in opportunities]
+
+        # IDF is fitted on brands and opportunities together so that
+        # vocabulary shared by every card (the input source) is down-weighted
+        model = TfidfModel(self.brand_documents + texts)
+        brand_vectors = model.transform(self.brand_documents)
+        opportunity_vectors = model.transform(texts)
+
+        similarity = opportunity_vectors @ brand_vectors.T
+        pairwise = opportunity_vectors @ opportunity_vectors.T
+
+        brand_index = {brand: i for i, brand in enumerate(self.brand_ids)}
+        own = np.array([brand_index.get(opp['brand'], -1) for opp in opportunities], dtype=np.int64)
+        known = own >= 0
+        rows = np.arange(len(opportunities))
+
+        own_similarity = np.where(known, similarity[rows, np.maximum(own, 0)], 0.0)
+        best = similarity.argmax(axis=1)
+        contextualized = known & (best == own)
+        best_similarity = similarity[rows, best]
+        moderate = (
+            known & ~contextualized & (own_similarity > 0)
+            & (own_similarity >= MODERATE_SIMILARITY_RATIO * best_similarity)
+        )
+
+        brands = np.array([opp['brand'] for opp in opportunities], dtype=object)
+        upper = np.triu(pairwise >= duplicate_threshold, k=1) & (brands[:, None] != brands[None, :])
+        duplicate_pairs = [
+            (int(i), int(j), float(pairwise[i, j])) for i, j in zip(*np.nonzero(upper))
+        ]
+
+        return DifferentiationReport(
+            brand_ids=self.brand_ids,
+            similarity=similarity,
+            pairwise=pairwise,
+            own_brand_similarity=own_similarity,
+            best_brand=[self.brand_ids[i] for i in best],
+            contextualized=contextualized,
+            moderate=moderate,
+            duplicate_pairs=duplicate_pairs
+        )
@@ -4,12 +4,14 @@ Collect opportunity cards from Story 4.3 batch execution for quality assessment.
 Selects one representative opportunity (opportunity-1.md) from each successful scenario.
 """
 
-import os
 import json
+import sys
+from itertools import groupby
 from pathlib import Path
 
-# Base directory for test outputs
-TEST_OUTPUTS_DIR = Path("data/test-outputs")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from opportunity_corpus import TEST_OUTPUTS_DIR, scan_opportunity_files
 
 # Failed scenarios from batch summary
 FAILED_SCENARIOS = [
@@ -17,33 +19,14 @@ FAILED_SCENARIOS = [
     "cat-dad-campaign-mccormick-usa-20251007-165319"
 ]
 
-def extract_scenario_info(dir_name):
-    """Extract input_source and brand from directory name."""
-    # Format: {input-source}-{brand}-{timestamp}
-    # Example: savannah-bananas-lactalis-canada-20251007-160745
-
-    # Find where brand starts (brands are: lactalis-canada, columbia-sportswear, decathlon, mccormick-usa)
-    brands = ['lactalis-canada', 'columbia-sportswear', 'decathlon', 'mccormick-usa']
-
-    for brand in brands:
-        if brand in dir_name:
-            # Split at brand to separate input_source and timestamp
-            before_brand = dir_name.split(brand)[0].rstrip('-')
-            return before_brand, brand
-
-    return None, None
-
 def collect_opportunities():
     """Collect one opportunity per successful scenario."""
     opportunities = []
 
-    # Get all scenario directories
-    for item in TEST_OUTPUTS_DIR.iterdir():
-        if not item.is_dir():
-            continue
-
-        dir_name = item.name
+    # One scandir pass over every scenario's stage5 cards
+    cards = scan_opportunity_files(TEST_OUTPUTS_DIR)
 
+    for dir_name, scenario_cards in groupby(cards, key=lambda c: c['scenario_id']):
         # Skip failed scenarios
         if dir_name in FAILED_SCENARIOS:
             print(f"⏭️  Skipping failed scenario: {dir_name}")
@@ -53,26 +36,20 @@ def collect_opportunities():
         if 'integration-test' in dir_name:
             continue
 
-        # Check if this is a valid scenario directory
-        stage5_dir = item / "stage5"
-        if not stage5_dir.exists():
-            continue
-
         # Select opportunity-1.md as representative
-        opp_file = stage5_dir / "opportunity-1.md"
-        if not opp_file.exists():
+        card = next((c for c in scenario_cards if c['opportunity_number'] == 1), None)
+        if card is None:
             print(f"⚠️  Warning: {dir_name} missing opportunity-1.md")
             continue
 
-        # Extract scenario information
-        input_source, brand = extract_scenario_info(dir_name)
+        input_source, brand = card['input_source'], card['brand']
 
         if input_source and brand:
             opportunities.append({
                 'scenario_id': dir_name,
                 'input_source': input_source,
                 'brand': brand,
-                'opportunity_file': str(opp_file),
+                'opportunity_file': card['path'],
                 'opportunity_number': 1
             })
             print(f"✅ Collected: {input_source} → {brand}")
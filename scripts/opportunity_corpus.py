@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared loader for opportunity cards produced by batch runs.
+
+Finds run directories under data/test-outputs with os.scandir, parses
+stage5/opportunity-*.md cards in a worker pool and caches parsed cards in
+a compact JSONL file keyed by path, mtime and size, so the collection,
+scoring and validation scripts stop re-reading and re-parsing the same
+files.
+
+Usage:
+    from opportunity_corpus import load_corpus, load_opportunity_files
+
+    cards = load_corpus()                         # every card in data/test-outputs
+    by_path = load_opportunity_files(paths)       # specific cards, cached
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+TEST_OUTPUTS_DIR = Path("data/test-outputs")
+DEFAULT_CACHE_PATH = Path("data/.opportunity-cache.jsonl")
+
+KNOWN_BRANDS = ['lactalis-canada', 'columbia-sportswear', 'decathlon', 'mccormick-usa']
+
+CARD_FILE_PATTERN = re.compile(r'^opportunity-(\d+)\.md$')
+TITLE_PATTERN = re.compile(r'^# (.+)$', re.MULTILINE)
+DESCRIPTION_PATTERN = re.compile(r'## Description\n\n(.+?)(?=\n##|$)', re.DOTALL)
+ACTIONABILITY_PATTERN = re.compile(r'## Actionability\n\n(.+?)(?=\n##|$)', re.DOTALL)
+
+# Bump when parsing changes so stale cache entries are re-parsed
+PARSER_VERSION = 1
+
+
+def extract_scenario_info(dir_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract input_source and brand from a run directory name.
+
+    Format: {input-source}-{brand}-{timestamp}
+    Example: savannah-bananas-lactalis-canada-20251007-160745
+
+    Returns:
+        (input_source, brand), or (None, None) if no known brand is found
+    """
+    for brand in KNOWN_BRANDS:
+        if brand in dir_name:
+            # Split at brand to separate input_source and timestamp
+            before_brand = dir_name.split(brand)[0].rstrip('-')
+            return before_brand, brand
+
+    return None, None
+
+
+def parse_opportunity_text(content: str) -> Dict[str, str]:
+    """Extract title, description and actionability sections from card markdown."""
+    title_match = TITLE_PATTERN.search(content)
+    desc_match = DESCRIPTION_PATTERN.search(content)
+    action_match = ACTIONABILITY_PATTERN.search(content)
+
+    return {
+        'title': title_match.group(1) if title_match else "",
+        'description': desc_match.group(1).strip() if desc_match else "",
+        'actionability': action_match.group(1).strip() if action_match else "",
+        'full_content': content
+    }
+
+
+def parse_opportunity(file_path) -> Dict[str, str]:
+    """Read and parse one opportunity card."""
+    with open(file_path, 'r') as f:
+        return parse_opportunity_text(f.read())
+
+
+def _parse_file(path: str) -> Dict[str, str]:
+    # Module-level so it can run in a process pool
+    return parse_opportunity(path)
+
+
+def scan_opportunity_files(root: Path = TEST_OUTPUTS_DIR) -> List[Dict[str, Any]]:
+    """List every stage5/opportunity-N.md card below root.
+
+    Args:
+        root: Directory containing one subdirectory per pipeline run
+
+    Returns:
+        One dict per card with path, scenario_id, input_source, brand and
+        opportunity_number, sorted by scenario and card number
+    """
+    entries = []
+    try:
+        runs = list(os.scandir(root))
+    except FileNotFoundError:
+        return entries
+
+    for run in runs:
+        if not run.is_dir():
+            continue
+        try:
+            stage5_entries = list(os.scandir(os.path.join(run.path, "stage5")))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        input_source, brand = extract_scenario_info(run.name)
+        for entry in stage5_entries:
+            match = CARD_FILE_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                entries.append({
+                    'path': entry.path,
+                    'scenario_id': run.name,
+                    'input_source': input_source,
+                    'brand': brand,
+                    'opportunity_number': int(match.group(1)),
+                })
+
+    entries.sort(key=lambda e: (e['scenario_id'], e['opportunity_number']))
+    return entries
+
+
+def _cache_key(path: str) -> str:
+    return os.path.abspath(path)
+
+
+def _read_cache(cache_path: Path) -> Dict[str, Dict[str, Any]]:
+    cache = {}
+    if not cache_path.exists():
+        return cache
+    with open(cache_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Truncated write; the card is re-parsed
+            if record.get('parser_version') == PARSER_VERSION:
+                cache[record['key']] = record
+    return cache
+
+
+def _write_cache(cache_path: Path, cache: Dict[str, Dict[str, Any]]) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in cache.values():
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+    os.replace(tmp_path, cache_path)
+
+
+def load_opportunity_files(
+    paths: Iterable[str],
+    cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
+    workers: Optional[int] = None,
+    use_processes: bool = False
+) -> Dict[str, Dict[str, str]]:
+    """Parse opportunity cards, reusing cached results for unchanged files.
+
+    A cached card is reused when its path, mtime and size match. Changed
+    or new cards are parsed in a thread pool (or a process pool for very
+    large corpora) and written back to the cache.
+
+    Args:
+        paths: Card file paths
+        cache_path: JSONL cache file, or None to disable caching
+        workers: Pool size (default: executor default)
+        use_processes: Parse in a process pool instead of threads
+
+    Returns:
+        Dictionary mapping each path (as given) to its parsed card
+        (title, description, actionability, full_content)
+    """
+    paths = list(dict.fromkeys(str(p) for p in paths))
+    cache = _read_cache(cache_path) if cache_path else {}
+
+    cards: Dict[str, Dict[str, str]] = {}
+    stale: List[Tuple[str, os.stat_result]] = []
+    for path in paths:
+        stat = os.stat(path)
+        record = cache.get(_cache_key(path))
+        if record and record['mtime_ns'] == stat.st_mtime_ns and record['size'] == stat.st_size:
+            cards[path] = record['card']
+        else:
+            stale.append((path, stat))
+
+    if stale:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as pool:
+            parsed = pool.map(_parse_file, [path for path, _ in stale], chunksize=16 if use_processes else 1)
+            for (path, stat), card in zip(stale, parsed):
+                cards[path] = card
+                cache[_cache_key(path)] = {
+                    'key': _cache_key(path),
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'parser_version': PARSER_VERSION,
+                    'card': card,
+                }
+
+        if cache_path:
+            # Drop entries for cards that were deleted since they were cached
+            cache = {key: record for key, record in cache.items() if os.path.exists(key)}
+            _write_cache(cache_path, cache)
+
+    return cards
+
+
+def load_corpus(
+    root: Path = TEST_OUTPUTS_DIR,
+    cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
+    workers: Optional[int] = None,
+    use_processes: bool = False
+) -> List[Dict[str, Any]]:
+    """Load every opportunity card below root.
+
+    Returns:
+        One dict per card combining scan_opportunity_files() metadata with
+        the parsed sections
+    """
+    entries = scan_opportunity_files(root)
+    cards = load_opportunity_files(
+        [entry['path'] for entry in entries],
+        cache_path=cache_path,
+        workers=workers,
+        use_processes=use_processes
+    )
+    return [{**entry, **cards[entry['path']]} for entry in entries]
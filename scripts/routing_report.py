@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Per-stage model routing report.
+
+Aggregates the LLM spans in run metrics.json files (batch and web runs
+under data/test-outputs, backend runs under /tmp/runs) by stage and model:
+calls, failures, p50/p90 latency, tokens and estimated cost. Shows the
+configured route next to each stage, so stages that would be faster or
+cheaper on another model stand out.
+
+Usage:
+    python scripts/routing_report.py
+    python scripts/routing_report.py --runs data/test-outputs /tmp/runs --json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.harness import percentile
+from pipeline.model_routing import get_routing_config
+
+DEFAULT_RUN_DIRS = ["data/test-outputs", "/tmp/runs"]
+
+
+def find_metrics_files(run_dirs: Sequence[str]) -> List[Path]:
+    """metrics.json files at any depth (web runs nest under the input name)."""
+    return [path for runs in run_dirs if Path(runs).is_dir() for path in sorted(Path(runs).rglob("metrics.json"))]
+
+
+def load_spans(metrics_files: Iterable[Path]) -> List[Dict[str, Any]]:
+    """Spans from metrics.json files (unreadable files are skipped)."""
+    spans = []
+    for path in metrics_files:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Skipping {path}: {e}", file=sys.stderr)
+            continue
+        spans.extend(data.get("spans", []))
+    return spans
+
+
+def summarize(spans: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Latency, token and cost statistics of LLM spans per stage and model."""
+    groups = defaultdict(list)
+    for record in spans:
+        if record.get("kind") != "llm":
+            continue
+        attributes = record.get("attributes") or {}
+        groups[(record.get("stage") or "unattributed", attributes.get("model") or "unknown")].append(record)
+
+    summary: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    for (stage, model), records in sorted(groups.items()):
+        ok = [r for r in records if not r.get("error")]
+        latencies = [r["duration_s"] for r in ok]
+        costs = [r["attributes"].get("cost_usd") for r in ok if r["attributes"].get("cost_usd") is not None]
+        summary[stage][model] = {
+            "calls": len(records),
+            "failures": len(records) - len(ok),
+            "p50_latency_s": round(percentile(latencies, 50), 2) if latencies else None,
+            "p90_latency_s": round(percentile(latencies, 90), 2) if latencies else None,
+            "avg_prompt_tokens": round(sum(r["attributes"].get("prompt_tokens", 0) for r in ok) / len(ok)) if ok else 0,
+            "avg_completion_tokens": round(sum(r["attributes"].get("completion_tokens", 0) for r in ok) / len(ok)) if ok else 0,
+            "avg_cost_usd": round(sum(costs) / len(costs), 6) if costs else None,
+            "total_cost_usd": round(sum(costs), 4) if costs else None,
+        }
+    return dict(summary)
+
+
+def print_report(summary: Dict[str, Dict[str, Dict[str, Any]]], default_model: str) -> None:
+    config = get_routing_config()
+    for stage, models in summary.items():
+        route = config.route(stage, default_model)
+        print(f"\n## {stage}  (route: {' -> '.join(route.models)})\n")
+        print("| Model | Calls | Failed | p50 (s) | p90 (s) | Avg tokens in/out | Avg cost | Total cost |")
+        print("|-------|------:|-------:|--------:|--------:|------------------:|---------:|-----------:|")
+        for model, stats in sorted(models.items(), key=lambda item: item[1]["p50_latency_s"] or math.inf):
+            avg_cost = f"${stats['avg_cost_usd']:.4f}" if stats["avg_cost_usd"] is not None else "n/a"
+            total_cost = f"${stats['total_cost_usd']:.2f}" if stats["total_cost_usd"] is not None else "n/a"
+            print(
+                f"| {model} | {stats['calls']} | {stats['failures']} | {stats['p50_latency_s']} | "
+                f"{stats['p90_latency_s']} | {stats['avg_prompt_tokens']}/{stats['avg_completion_tokens']} | "
+                f"{avg_cost} | {total_cost} |"
+            )
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description="Per-stage LLM latency and cost by model")
+    parser.add_argument("--runs", nargs="+", default=DEFAULT_RUN_DIRS, help="Directories of run output folders")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    metrics_files = find_metrics_files(args.runs)
+    summary = summarize(load_spans(metrics_files))
+    calls = sum(stats["calls"] for models in summary.values() for stats in models.values())
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"📊 Model routing report: {calls} LLM calls from {len(metrics_files)} runs")
+    if not calls:
+        print("   No metrics.json files with LLM spans found")
+        return 0
+    print_report(summary, os.getenv("LLM_MODEL", "deepseek/deepseek-chat"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
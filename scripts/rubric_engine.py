@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Vectorized rubric scoring engine for opportunity cards.
+
+Compiles every rubric vocabulary into one trie-shaped regex (an
+Aho-Corasick-style automaton executed by the C regex engine), builds a
+term-count matrix for the whole corpus in one pass over the cards and
+computes the four dimension scores (novelty, actionability, relevance,
+specificity) as NumPy array operations.
+
+Scores are identical to the per-card functions in auto_score_opportunities.py,
+which share the vocabularies defined here.
+"""
+
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+DIMENSIONS = ("novelty", "actionability", "relevance", "specificity")
+
+# Novelty (matched in full content)
+NOVELTY_HIGH_TERMS = ['biomimicry', 'circular economy', 'upcycl', 'regenerative',
+                      'blockchain', 'ai-powered', 'personaliz', 'immersive',
+                      'virtual reality', 'augmented reality', 'nft']
+NOVELTY_MEDIUM_TERMS = ['partnership', 'collaboration', 'campaign', 'platform',
+                        'digital', 'sustainability', 'innovation']
+NOVELTY_LOW_TERMS = ['standard', 'traditional', 'basic', 'simple', 'generic']
+CROSS_INDUSTRY_TERMS = ['inspired by', 'like the savannah', 'similar to', 'borrowing from']
+
+# Actionability (matched in the Actionability section)
+ACTION_SPECIFIC_TERMS = ['partner with', 'launch pilot', 'conduct', 'develop prototype',
+                         'target market', 'specific', 'identified', 'named']
+ACTION_TIMELINE_TERMS = ['within', 'by', 'q1', 'q2', 'q3', 'q4', 'month', 'year', 'phase']
+
+# Relevance (matched in full content)
+BRAND_ALIGNMENT_TERMS: Dict[str, List[str]] = {
+    'lactalis-canada': ['dairy', 'milk', 'cheese', 'yogurt', 'nutrition',
+                        'canadian', 'farm', 'whey', 'lactose', 'protein'],
+    'columbia-sportswear': ['outdoor', 'apparel', 'gear', 'hiking', 'adventure',
+                            'sustainable', 'fabric', 'textile', 'garment', 'clothing'],
+    'decathlon': ['sport', 'athletic', 'fitness', 'outdoor', 'equipment',
+                  'gear', 'performance', 'training', 'recreation'],
+    'mccormick-usa': ['spice', 'flavor', 'seasoning', 'culinary', 'food',
+                      'recipe', 'cooking', 'ingredient', 'taste', 'herb']
+}
+CAPABILITY_TERMS = ['leverage', 'expertise', 'capability', 'strength', 'existing']
+
+# Specificity (matched in full content)
+SPECIFICITY_CUSTOMER_TERMS = ['consumer', 'customer', 'audience', 'demographic', 'segment']
+SPECIFICITY_CHANNEL_TERMS = ['e-commerce', 'retail', 'online', 'store', 'platform', 'channel']
+SPECIFICITY_TIMELINE_TERMS = ['pilot', 'launch', 'phase', 'rollout', 'q1', 'q2', 'month', 'year']
+SPECIFICITY_MARKET_TERMS = ['toronto', 'vancouver', 'canada', 'urban', 'market', 'region']
+
+
+class TermMatcher:
+    """Count every (possibly overlapping) occurrence of a fixed vocabulary.
+
+    A term without whitespace can only occur inside a whitespace-delimited
+    token, and a corpus of cards repeats the same few thousand tokens. Each
+    distinct token is scanned once with the vocabulary compiled into a
+    single trie-shaped regex (an Aho-Corasick-style automaton run by the C
+    regex engine); cards are then reduced to token counts. The few
+    multi-word terms are located with substring search over the joined
+    corpus.
+
+    Example:
+        >>> matcher = TermMatcher(['q1', 'q', 'month', 'next month'])
+        >>> matcher.count_matrix(['Q1 and next month'])
+        array([[1, 1, 1, 1]], dtype=int32)
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.vocabulary: List[str] = sorted({t.lower() for t in terms if t})
+        self.index: Dict[str, int] = {term: i for i, term in enumerate(self.vocabulary)}
+
+        words = [t for t in self.vocabulary if not any(c.isspace() for c in t)]
+        self._phrases = [t for t in self.vocabulary if t not in words]
+
+        trie: Dict[str, dict] = {}
+        for term in words:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = re.compile(f"(?=({self._trie_regex(trie)}))", re.DOTALL) if trie else None
+
+        # Longest match at a position -> it and every vocabulary word that prefixes it
+        # (any shorter word matching at that position must be such a prefix)
+        self._implied: Dict[str, List[int]] = {
+            term: [self.index[p] for p in words if term.startswith(p)] for term in words
+        }
+
+        # Every token seen gets an id; the term indices found in token `i` are
+        # _token_terms[_token_starts[i]:_token_starts[i + 1]] (usually empty)
+        self._token_ids: Dict[str, int] = {}
+        self._token_starts: List[int] = [0]
+        self._token_terms: List[int] = []
+
+    @classmethod
+    def _trie_regex(cls, node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + cls._trie_regex(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: prefer the longer term, fall back to this one
+        return f"(?:{body})?" if "" in node else body
+
+    def _scan_tokens(self, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            self._token_ids[token] = len(self._token_ids)
+            if self._pattern is not None:
+                self._token_terms.extend(
+                    i for m in self._pattern.finditer(token) for i in self._implied[m.group(1)]
+                )
+            self._token_starts.append(len(self._token_terms))
+
+    def count_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """Term counts, shape (len(texts), len(vocabulary)); matching is case-insensitive."""
+        n_texts, n_terms = len(texts), len(self.vocabulary)
+        lowered = [text.lower() for text in texts]
+        tokens = [text.split() for text in lowered]
+
+        self._scan_tokens(set(chain.from_iterable(tokens)) - self._token_ids.keys())
+
+        # Token occurrences -> (row, token id), then one entry per term in the token
+        n_tokens = sum(len(row_tokens) for row_tokens in tokens)
+        token_ids = np.fromiter(
+            map(self._token_ids.__getitem__, chain.from_iterable(tokens)), dtype=np.int64, count=n_tokens
+        )
+        rows = np.repeat(np.arange(n_texts, dtype=np.int64), [len(row_tokens) for row_tokens in tokens])
+
+        starts = np.asarray(self._token_starts, dtype=np.int64)
+        spans = starts[token_ids + 1] - starts[token_ids]
+        first = np.repeat(starts[token_ids] - np.cumsum(spans) + spans, spans)
+        term_cols = np.asarray(self._token_terms, dtype=np.int64)[first + np.arange(spans.sum())]
+        counts = np.bincount(np.repeat(rows, spans) * n_terms + term_cols, minlength=n_texts * n_terms)
+
+        if self._phrases and n_texts:
+            # NUL never appears in a term, so matches cannot span two texts
+            corpus = "\0".join(lowered)
+            lengths = np.fromiter((len(text) + 1 for text in lowered), dtype=np.int64, count=n_texts)
+            offsets = np.cumsum(lengths) - lengths
+            for phrase in self._phrases:
+                phrase_starts = []
+                position = corpus.find(phrase)
+                while position != -1:
+                    phrase_starts.append(position)
+                    position = corpus.find(phrase, position + 1)
+                if phrase_starts:
+                    phrase_rows = np.searchsorted(offsets, phrase_starts, side="right") - 1
+                    counts += np.bincount(
+                        phrase_rows * n_terms + self.index[phrase], minlength=n_texts * n_terms
+                    )
+
+        return counts.reshape(n_texts, n_terms).astype(np.int32)
+
+
+@dataclass
+class TermMatrix:
+    """Per-card term counts and structural features for a corpus.
+
+    Attributes:
+        content_counts: Term counts over the full card, shape (cards, vocabulary)
+        action_counts: Term counts over the Actionability section only
+        bullet_counts: Bullet points ("\\n-") in the Actionability section
+        has_action: Whether the card has an Actionability section
+        description_words: Word count of the Description section
+    """
+    content_counts: np.ndarray
+    action_counts: np.ndarray
+    bullet_counts: np.ndarray
+    has_action: np.ndarray
+    description_words: np.ndarray
+
+
+class RubricEngine:
+    """Score a corpus of parsed opportunities on the four rubric dimensions.
+
+    Example:
+        >>> engine = RubricEngine()
+        >>> scores = engine.score(opportunities, brands)  # shape (n, 4)
+        >>> overall = engine.overall(scores)
+    """
+
+    def __init__(self, brand_terms: Dict[str, List[str]] = None):
+        self.brand_terms = brand_terms if brand_terms is not None else BRAND_ALIGNMENT_TERMS
+
+        vocabulary = (
+            NOVELTY_HIGH_TERMS + NOVELTY_MEDIUM_TERMS + NOVELTY_LOW_TERMS + CROSS_INDUSTRY_TERMS
+            + ACTION_SPECIFIC_TERMS + ACTION_TIMELINE_TERMS + CAPABILITY_TERMS
+            + SPECIFICITY_CUSTOMER_TERMS + SPECIFICITY_CHANNEL_TERMS
+            + SPECIFICITY_TIMELINE_TERMS + SPECIFICITY_MARKET_TERMS
+            + [term for terms in self.brand_terms.values() for term in terms]
+        )
+        self.matcher = TermMatcher(vocabulary)
+
+        self.brands = list(self.brand_terms)
+        # One extra all-zero row for brands without an alignment vocabulary
+        self._brand_mask = np.zeros((len(self.brands) + 1, len(self.matcher.vocabulary)), dtype=bool)
+        for row, brand in enumerate(self.brands):
+            self._brand_mask[row, self._columns(self.brand_terms[brand])] = True
+
+    def _columns(self, terms: List[str]) -> np.ndarray:
+        return np.array(sorted({self.matcher.index[t.lower()] for t in terms}), dtype=np.intp)
+
+    def term_matrix(self, opportunities: Sequence[Dict[str, str]]) -> TermMatrix:
+        """Count rubric terms and collect structural features for every card.
+
+        Args:
+            opportunities: Dicts from parse_opportunity() with title,
+                description, actionability and full_content
+
+        Returns:
+            TermMatrix for the corpus
+        """
+        return TermMatrix(
+            content_counts=self.matcher.count_matrix([o['full_content'] for o in opportunities]),
+            action_counts=self.matcher.count_matrix([o['actionability'] for o in opportunities]),
+            bullet_counts=np.array([o['actionability'].count('\n-') for o in opportunities], dtype=np.int32),
+            has_action=np.array([bool(o['actionability']) for o in opportunities], dtype=bool),
+            description_words=np.array([len(o['description'].split()) for o in opportunities], dtype=np.int32),
+        )
+
+    def score(self, opportunities: Sequence[Dict[str, str]], brands: Sequence[str]) -> np.ndarray:
+        """Score every card on all four dimensions.
+
+        Args:
+            opportunities: Parsed opportunity dicts
+            brands: Brand id of each card
+
+        Returns:
+            Integer array of shape (n, 4), columns in DIMENSIONS order
+        """
+        matrix = self.term_matrix(opportunities)
+        if not len(opportunities):
+            return np.zeros((0, len(DIMENSIONS)), dtype=np.int32)
+
+        present = matrix.content_counts > 0
+        action_present = matrix.action_counts > 0
+
+        def count(terms: List[str], where: np.ndarray = present) -> np.ndarray:
+            return where[:, self._columns(terms)].sum(axis=1)
+
+        def any_of(terms: List[str], where: np.ndarray = present) -> np.ndarray:
+            return where[:, self._columns(terms)].any(axis=1)
+
+        # Novelty
+        high = count(NOVELTY_HIGH_TERMS)
+        medium = count(NOVELTY_MEDIUM_TERMS)
+        low = count(NOVELTY_LOW_TERMS)
+        novelty = np.select(
+            [(high >= 2) | any_of(CROSS_INDUSTRY_TERMS), high >= 1, (medium >= 2) & (low == 0), low > 0],
+            [4, 3, 3, 2],
+            default=3,
+        )
+
+        # Actionability
+        bullets = matrix.bullet_counts
+        has_specifics = any_of(ACTION_SPECIFIC_TERMS, action_present)
+        has_timeline = any_of(ACTION_TIMELINE_TERMS, action_present)
+        actionability = np.select(
+            [~matrix.has_action, (bullets >= 3) & has_specifics & has_timeline,
+             (bullets >= 3) & has_specifics, bullets >= 2, bullets >= 1],
+            [2, 5, 4, 3, 2],
+            default=1,
+        )
+
+        # Relevance
+        brand_rows = np.array([
+            self.brands.index(b) if b in self.brand_terms else len(self.brands) for b in brands
+        ], dtype=np.intp)
+        brand_matches = (present & self._brand_mask[brand_rows]).sum(axis=1)
+        relevance = np.select(
+            [(brand_matches >= 4) & any_of(CAPABILITY_TERMS), brand_matches >= 3, brand_matches >= 2],
+            [5, 4, 3],
+            default=2,
+        )
+
+        # Specificity
+        elements = (
+            any_of(SPECIFICITY_CUSTOMER_TERMS).astype(int) + any_of(SPECIFICITY_CHANNEL_TERMS)
+            + any_of(SPECIFICITY_TIMELINE_TERMS) + any_of(SPECIFICITY_MARKET_TERMS)
+        )
+        words = matrix.description_words
+        specificity = np.select(
+            [(elements >= 3) & (words >= 80), (elements >= 2) & (words >= 60),
+             (elements >= 1) & (words >= 40), words >= 30],
+            [5, 4, 3, 2],
+            default=1,
+        )
+
+        return np.stack([novelty, actionability, relevance, specificity], axis=1).astype(np.int32)
+
+    @staticmethod
+    def overall(scores: np.ndarray) -> np.ndarray:
+        """Mean of the four dimensions, rounded to one decimal."""
+        return np.round(scores.sum(axis=1) / len(DIMENSIONS), 1)
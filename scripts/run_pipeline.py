@@ -17,7 +17,9 @@ Usage:
 """
 
 import argparse
+import json
 import logging
+import secrets
 import sys
 import time
 from pathlib import Path
@@ -40,10 +42,19 @@ from pipeline.utils import (
     setup_pipeline_logging,
     create_test_output_dir as utils_create_output_dir
 )
-from pipeline.stages.stage1_input_processing import create_stage1_chain
-from pipeline.stages.stage2_signal_amplification import create_stage2_chain
-from pipeline.stages.stage3_general_translation import create_stage3_chain
-from pipeline.stages.stage4_brand_contextualization import create_stage4_chain
+from pipeline.chain_pool import get_chain_pool
+from pipeline.dag import STAGE_TITLES, DAGResult, NodeEvent, StageDAG, build_stage_dag
+from pipeline.deadlines import current_deadline, run_deadline
+from pipeline.instrumentation import RunMetrics, begin_run, end_run, track_run
+from pipeline.model_routing import parse_route_overrides, route_overrides
+from pipeline.semantic_cache import get_semantic_cache
+from pipeline.text_condenser import read_pdf_text
+from pipeline.track_branches import add_track_branches, branch_node, dual_track_enabled
+from pipeline.tracing import configure_tracing_from_env
+from pipeline.stages.stage1_input_processing import Stage1Chain, create_stage1_chain
+from pipeline.stages.stage2_signal_amplification import Stage2Chain, create_stage2_chain
+from pipeline.stages.stage3_general_translation import Stage3Chain, create_stage3_chain
+from pipeline.stages.stage4_brand_contextualization import Stage4Chain, create_stage4_chain
 from pipeline.stages.stage5_opportunity_generation import create_stage5_chain
 
 # Load environment variables
@@ -163,11 +174,238 @@ def validate_brand_id(brand_id: str, brand_profiles_dir: Path = Path("data/brand
     return True
 
 
+def cli_run_id(*parts: str) -> str:
+    """Unique run id for a CLI run, so re-runs of an input get their own trace.
+
+    Traces are keyed by run id (pipeline.tracing.trace_id_for_run); the
+    {input-id}-{brand-id} pair alone repeats on every re-run.
+
+    Example:
+        >>> cli_run_id("savannah-bananas", "lactalis-canada")
+        'savannah-bananas-lactalis-canada-20251007-142345-3f9a'
+    """
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return "-".join([*parts, timestamp, secrets.token_hex(2)])
+
+
+def attach_run_metrics(
+    metrics: RunMetrics,
+    metadata: Dict[str, Any],
+    cached: Optional[RunMetrics] = None
+) -> None:
+    """Add per-stage token/cost metrics to run metadata and save metrics.json.
+
+    Args:
+        metrics: Metrics collected for this run
+        metadata: Execution metadata dictionary (updated in place)
+        cached: Metrics from cached Stages 1-3 (batch mode), merged in
+    """
+    if cached is not None:
+        metrics.merge(cached)
+
+    totals = metrics.totals()
+    metadata['stage_metrics'] = metrics.stage_summary()
+    metadata['total_tokens'] = totals['prompt_tokens'] + totals['completion_tokens']
+    metadata['cost_usd'] = totals['cost_usd']
+
+    if metadata.get('output_dir'):
+        try:
+            metrics.export_json(Path(metadata['output_dir']) / "metrics.json")
+        except OSError as e:
+            logging.warning(f"Failed to save run metrics: {e}")
+
+
+# Stage names used in web run logs
+WEB_STAGE_TITLES = {
+    'stage1': "Input Processing",
+    'stage2': "Signal Amplification",
+    'stage3': "General Translation",
+    'stage4': "Brand Contextualization",
+    'stage5': "Opportunity Generation"
+}
+
+
+def save_cache_provenance(provenance: Dict[str, Any], output_dir: Path) -> None:
+    """Record where cached Stages 1-3 outputs came from (semantic-cache.json)."""
+    with open(output_dir / "semantic-cache.json", "w", encoding="utf-8") as f:
+        json.dump(provenance, f, indent=2)
+
+
+def stage_factories() -> Tuple[Any, ...]:
+    """Chain factories for Stages 1-5 (looked up at call time)."""
+    return (
+        create_stage1_chain,
+        create_stage2_chain,
+        create_stage3_chain,
+        create_stage4_chain,
+        create_stage5_chain
+    )
+
+
+def add_brand_nodes(dag: StageDAG, brand_id: str, progress_prefix: str = "") -> None:
+    """Add brand profile and research loaders (they run alongside Stages 1-3)."""
+    def brand_profile():
+        profile = load_brand_profile(brand_id)
+        logging.info(f"{progress_prefix}Brand profile loaded: {profile.get('company_name', 'N/A')}")
+        return profile
+
+    def research_data():
+        research = load_research_data(brand_id)
+        logging.info(f"{progress_prefix}Research data loaded: {len(research)} characters")
+        return research
+
+    dag.add("brand_profile", brand_profile)
+    dag.add("research_data", research_data)
+    dag.add("brand_name", lambda brand_profile: brand_profile.get('company_name', brand_id), ["brand_profile"])
+
+
+def add_card_nodes(dag: StageDAG, output_dir: Path, progress_prefix: str = "") -> None:
+    """Add the node rendering Stage 5 opportunity cards and the summary file."""
+    def stage5_cards(stage5, brand_name, input_source):
+        opportunities = stage5['opportunities']
+        stage5_chain = get_chain_pool().get(create_stage5_chain)
+        opportunity_files = stage5_chain.render_opportunity_cards(
+            opportunities, brand_name, input_source, output_dir
+        )
+        logging.info(f"{progress_prefix}Rendered {len(opportunity_files)} opportunity cards")
+        return stage5_chain.generate_summary_file(opportunities, output_dir)
+
+    dag.add("stage5_cards", stage5_cards, ["stage5", "brand_name", "input_source"])
+
+
+def add_track_nodes(dag: StageDAG, output_dir: Path, selected_track: int) -> None:
+    """Add sibling track branches and the node saving them (dual-track mode).
+
+    Each completed branch is saved under output_dir/tracks/track-N/ with the
+    same files as the main run; tracks.json lists every track's status.
+    """
+    tracks = add_track_branches(dag, stage_factories(), selected_track)
+    savers = (Stage2Chain, Stage3Chain, Stage4Chain)
+
+    def track_branches(brand_name, input_source, **branches):
+        manifest = {
+            'selected_track': selected_track,
+            'tracks': {str(selected_track): {'status': 'main', 'path': '.'}}
+        }
+        for branch in branches.values():
+            entry = {key: branch[key] for key in ('status', 'reason', 'cost_usd')}
+            if branch['status'] == 'completed':
+                branch_dir = output_dir / "tracks" / f"track-{branch['track']}"
+                try:
+                    branch_dir.mkdir(parents=True, exist_ok=True)
+                    for stage_num, saver in enumerate(savers, start=2):
+                        saver.save_output(branch[f'stage{stage_num}'][f'stage{stage_num}_output'], branch_dir)
+                    stage5_chain = get_chain_pool().get(create_stage5_chain)
+                    opportunities = branch['stage5']['opportunities']
+                    stage5_chain.render_opportunity_cards(opportunities, brand_name, input_source, branch_dir)
+                    stage5_chain.generate_summary_file(opportunities, branch_dir)
+                    entry['path'] = str(branch_dir.relative_to(output_dir))
+                except (OSError, KeyError, ValueError) as e:
+                    # A speculative branch never fails the run
+                    logging.warning(f"Could not save track {branch['track']} branch: {e}")
+                    entry.update(status='failed', reason=str(e))
+            manifest['tracks'][str(branch['track'])] = entry
+            logging.info(f"Track {branch['track']} branch: {branch['status']}")
+
+        with open(output_dir / "tracks.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    dag.add(
+        "track_branches",
+        track_branches,
+        ["brand_name", "input_source", *(branch_node(track) for track in tracks)]
+    )
+
+
+def run_stage_dag(
+    dag: StageDAG,
+    context: Dict[str, Any],
+    output_dir: Optional[Path] = None,
+    stage_times: Optional[Dict[str, float]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    progress_prefix: str = "",
+    selected_track: int = 1,
+    web_mode: bool = False,
+    **run_kwargs: Any
+) -> DAGResult:
+    """Run a stage DAG with CLI logging, timing and output saving.
+
+    Stage outputs are saved to output_dir as each stage completes. Outputs
+    served from the semantic cache or a checkpoint are written with the
+    static savers, so no LLM client is built for them. LLM calls run under
+    the PIPELINE_DEADLINE_S deadline (if set) and the run's retry budget.
+
+    Args:
+        dag: Graph from build_stage_dag plus entry-point nodes
+        context: External inputs (input_text, input_source, ...)
+        output_dir: Run output directory (None: don't save)
+        stage_times: Filled with per-stage seconds
+        metadata: Run metadata, gets semantic_cache provenance on a hit
+        progress_prefix: Batch progress prefix for log lines
+        selected_track: Stage 1 track selection from the UI
+        web_mode: Use the web run log format ("Starting Stage N: ...")
+        **run_kwargs: Passed to StageDAG.run (targets, precomputed, ...)
+    """
+    savers = (Stage1Chain, Stage2Chain, Stage3Chain, Stage4Chain)
+    factories = stage_factories()
+
+    def on_start(name: str) -> None:
+        if name not in STAGE_TITLES:
+            return
+        title = f"Starting Stage {name[-1]}: {WEB_STAGE_TITLES[name]}" if web_mode else (
+            f"STAGE {name[-1]}/5: {STAGE_TITLES[name]}"
+        )
+        logging.info(f"{progress_prefix}{'=' * 60}")
+        logging.info(f"{progress_prefix}{title}")
+        logging.info(f"{progress_prefix}{'=' * 60}")
+
+    def on_complete(event: NodeEvent) -> None:
+        if event.name not in STAGE_TITLES:
+            return
+        stage_num = int(event.name[-1])
+        if stage_times is not None:
+            stage_times[event.name] = event.elapsed
+
+        provenance = event.value.get('semantic_cache')
+        saved = None
+        if output_dir is not None and stage_num <= 4:
+            reused = provenance is not None or event.reused
+            saver = savers[stage_num - 1] if reused else get_chain_pool().get(factories[stage_num - 1])
+            output = event.value.get(f"stage{stage_num}_output", "")
+            args = (output, output_dir, selected_track) if stage_num == 1 else (output, output_dir)
+            saved = saver.save_output(*args)
+
+        if provenance and stage_num == 1:
+            logging.info(f"{progress_prefix}Stages 1-3 served from semantic cache: {provenance['note']}")
+            if output_dir is not None:
+                save_cache_provenance(provenance, output_dir)
+            if metadata is not None:
+                metadata['semantic_cache'] = provenance
+        if stage_num == 5:
+            logging.info(f"{progress_prefix}Generated {len(event.value['opportunities'])} opportunities")
+
+        deadline = current_deadline()
+        remaining = deadline.remaining() if deadline is not None else None
+        left = f", {max(0.0, remaining):.0f}s left before deadline" if remaining is not None else ""
+        if web_mode:
+            logging.info(f"Stage {stage_num} execution completed ({event.elapsed:.1f}s{left})")
+            if saved:
+                logging.info(f"Output saved: {saved}")
+        else:
+            suffix = f". Output: {saved}" if saved else ""
+            logging.info(f"{progress_prefix}Stage {stage_num}/5 complete ({event.elapsed:.1f}s{left}){suffix}")
+
+    with run_deadline():
+        return dag.run(context, on_start=on_start, on_complete=on_complete, **run_kwargs)
+
+
 def execute_pipeline(
     input_id: str,
     brand_id: str,
     test_num: Optional[int] = None,
-    total_tests: Optional[int] = None
+    total_tests: Optional[int] = None,
+    force_recompute: bool = False
 ) -> Tuple[bool, Dict[str, Any]]:
     """Execute pipeline for given input and brand combination.
 
@@ -176,6 +414,7 @@ def execute_pipeline(
         brand_id: Brand profile ID
         test_num: Optional test number for progress display (e.g., 5 of 24)
         total_tests: Optional total test count for progress display
+        force_recompute: Skip the semantic cache for Stages 1-3
 
     Returns:
         Tuple of (success: bool, metadata: dict with execution details)
@@ -201,6 +440,8 @@ def execute_pipeline(
     else:
         logging.info(f"Executing pipeline for {input_id} + {brand_id}")
 
+    metrics = begin_run(cli_run_id(input_id, brand_id))
+
     try:
         # Create output directory using utils function
         output_dir = utils_create_output_dir(input_id, brand_id)
@@ -215,107 +456,21 @@ def execute_pipeline(
         input_text = load_input_document(input_id)
         logging.info(f"{progress_prefix}Input document loaded: {len(input_text)} characters")
 
-        # Stage 1: Input Processing and Inspiration Identification
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 1/5: Input Processing and Inspiration Identification")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage1_start = time.time()
-        stage1_chain = create_stage1_chain()
-        stage1_result = stage1_chain.run(input_text)
-        stage1_output = stage1_result[stage1_chain.output_key]
-
-        # Save Stage 1 output
-        stage1_file = stage1_chain.save_output(stage1_output, output_dir)
-        stage1_time = time.time() - stage1_start
-        stage_times['stage1'] = stage1_time
-        logging.info(f"{progress_prefix}Stage 1/5 complete ({stage1_time:.1f}s). Output: {stage1_file}")
-
-        # Stage 2: Signal Amplification and Trend Extraction
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 2/5: Signal Amplification and Trend Extraction")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage2_start = time.time()
-        stage2_chain = create_stage2_chain()
-        stage2_result = stage2_chain.run(stage1_output)
-        stage2_output = stage2_result[stage2_chain.output_key]
-
-        # Save Stage 2 output
-        stage2_file = stage2_chain.save_output(stage2_output, output_dir)
-        stage2_time = time.time() - stage2_start
-        stage_times['stage2'] = stage2_time
-        logging.info(f"{progress_prefix}Stage 2/5 complete ({stage2_time:.1f}s). Output: {stage2_file}")
-
-        # Stage 3: General Translation to Universal Lessons
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 3/5: General Translation to Universal Lessons")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage3_start = time.time()
-        stage3_chain = create_stage3_chain()
-        stage3_result = stage3_chain.run(stage1_output, stage2_output)
-        stage3_output = stage3_result[stage3_chain.output_key]
-
-        # Save Stage 3 output
-        stage3_file = stage3_chain.save_output(stage3_output, output_dir)
-        stage3_time = time.time() - stage3_start
-        stage_times['stage3'] = stage3_time
-        logging.info(f"{progress_prefix}Stage 3/5 complete ({stage3_time:.1f}s). Output: {stage3_file}")
-
-        # Stage 4: Brand Contextualization with Research Data
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 4/5: Brand Contextualization with Research Data")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage4_start = time.time()
-        # Load brand profile and research data
-        logging.info(f"{progress_prefix}Loading brand profile: {brand_id}")
-        brand_profile = load_brand_profile(brand_id)
-        logging.info(f"{progress_prefix}Brand profile loaded: {brand_profile.get('company_name', 'N/A')}")
-
-        logging.info(f"{progress_prefix}Loading research data: {brand_id}")
-        research_data = load_research_data(brand_id)
-        logging.info(f"{progress_prefix}Research data loaded: {len(research_data)} characters")
-
-        stage4_chain = create_stage4_chain()
-        stage4_result = stage4_chain.run(stage3_output, brand_profile, research_data)
-        stage4_output = stage4_result[stage4_chain.output_key]
-
-        # Save Stage 4 output
-        stage4_file = stage4_chain.save_output(stage4_output, output_dir)
-        stage4_time = time.time() - stage4_start
-        stage_times['stage4'] = stage4_time
-        logging.info(f"{progress_prefix}Stage 4/5 complete ({stage4_time:.1f}s). Output: {stage4_file}")
-
-        # Stage 5: Opportunity Generation Chain
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 5/5: Opportunity Generation Chain")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage5_start = time.time()
-        # Extract brand name from brand profile
-        brand_name = brand_profile.get('company_name', brand_id)
-        logging.info(f"{progress_prefix}Generating opportunities for brand: {brand_name}")
-        logging.info(f"{progress_prefix}Based on input source: {input_id}")
-
-        stage5_chain = create_stage5_chain()
-        stage5_result = stage5_chain.run(stage4_output, brand_name, input_id)
-        opportunities = stage5_result['opportunities']
-
-        logging.info(f"{progress_prefix}Generated {len(opportunities)} opportunities")
-
-        # Render opportunity cards using Jinja2 template
-        opportunity_files = stage5_chain.render_opportunity_cards(
-            opportunities, brand_name, input_id, output_dir
+        # Stages 1-5 plus brand loaders and card rendering
+        dag = build_stage_dag(
+            stage_factories(), get_semantic_cache(), force_recompute, cache_source=output_dir.name
         )
-        logging.info(f"{progress_prefix}Rendered {len(opportunity_files)} opportunity cards")
-
-        # Generate summary file
-        summary_file = stage5_chain.generate_summary_file(opportunities, output_dir)
-        stage5_time = time.time() - stage5_start
-        stage_times['stage5'] = stage5_time
-        logging.info(f"{progress_prefix}Stage 5/5 complete ({stage5_time:.1f}s). Summary: {summary_file}")
+        add_brand_nodes(dag, brand_id, progress_prefix)
+        add_card_nodes(dag, output_dir, progress_prefix)
+        result = run_stage_dag(
+            dag,
+            {'input_text': input_text, 'input_source': input_id},
+            output_dir=output_dir,
+            stage_times=stage_times,
+            metadata=metadata,
+            progress_prefix=progress_prefix
+        )
+        opportunities = result.values['stage5']['opportunities']
 
         # Update metadata
         total_time = time.time() - start_time
@@ -337,30 +492,50 @@ def execute_pipeline(
         metadata['success'] = False
         metadata['error'] = str(e)
         metadata['total_time'] = total_time
+        metrics.mark_failed(str(e))
 
         logging.error(f"{progress_prefix}Pipeline execution failed: {e}", exc_info=True)
         return False, metadata
 
+    finally:
+        end_run(metrics)
+        attach_run_metrics(metrics, metadata)
+
 
 def run_from_uploaded_file(
     input_file_path: str,
     brand_id: str,
     run_id: str,
-    selected_track: int = 1
+    selected_track: int = 1,
+    force_recompute: bool = False,
+    resume: bool = False,
+    dual_track: Optional[bool] = None
 ) -> int:
     """Execute pipeline from uploaded PDF file for web interface.
 
+    Completed stages are checkpointed under the output directory; with
+    resume=True a re-run of the same run_id continues after the last
+    completed stage.
+
+    In dual-track mode Stages 2-5 run on the selected track and, as a
+    sibling branch saved under tracks/, on the other track at the same time.
+
     Args:
         input_file_path: Direct path to uploaded PDF file
         brand_id: Brand profile ID
         run_id: Unique run identifier
         selected_track: Track selection (1 or 2) from UI
+        force_recompute: Skip the semantic cache for Stages 1-3
+        resume: Reuse stage checkpoints from an earlier attempt
+        dual_track: Run both tracks (default: DUAL_TRACK_MODE)
 
     Returns:
         Exit code (0 for success, 1 for failure)
     """
     start_time = time.time()
     logger = logging.getLogger(__name__)
+    metrics = begin_run(run_id)
+    metadata = {'output_dir': None}
 
     try:
         # Validate brand exists
@@ -370,6 +545,7 @@ def run_from_uploaded_file(
         # Create output directory using run_id
         output_dir = Path(f"data/test-outputs/{run_id}")
         output_dir.mkdir(parents=True, exist_ok=True)
+        metadata['output_dir'] = str(output_dir)
         logger.info(f"Output directory created: {output_dir}")
 
         # Setup pipeline logging
@@ -377,86 +553,29 @@ def run_from_uploaded_file(
 
         # Read PDF file
         logger.info(f"Reading PDF file: {input_file_path}")
-        reader = PdfReader(input_file_path)
-        input_text = "".join(page.extract_text() for page in reader.pages)
-        logger.info(f"PDF extracted: {len(input_text)} characters from {len(reader.pages)} pages")
-
-        # Load brand profile and research data
-        logger.info(f"Loading brand profile: {brand_id}")
-        brand_profile = load_brand_profile(brand_id)
-        brand_name = brand_profile.get('company_name', brand_id)
-        logger.info(f"Brand profile loaded: {brand_name}")
-
-        logger.info(f"Loading research data: {brand_id}")
-        research_data = load_research_data(brand_id)
-        logger.info(f"Research data loaded: {len(research_data)} characters")
-
-        # Stage 1: Input Processing
-        logger.info("=" * 60)
-        logger.info("Starting Stage 1: Input Processing")
-        logger.info("=" * 60)
-        stage1_start = time.time()
-        stage1_chain = create_stage1_chain()
-        stage1_result = stage1_chain.run(input_text)
-        stage1_output = stage1_result[stage1_chain.output_key]
-        stage1_file = stage1_chain.save_output(stage1_output, output_dir, selected_track)
-        logger.info(f"Stage 1 execution completed ({time.time() - stage1_start:.1f}s)")
-        logger.info(f"Output saved: {stage1_file}")
-
-        # Stage 2: Signal Amplification
-        logger.info("=" * 60)
-        logger.info("Starting Stage 2: Signal Amplification")
-        logger.info("=" * 60)
-        stage2_start = time.time()
-        stage2_chain = create_stage2_chain()
-        stage2_result = stage2_chain.run(stage1_output)
-        stage2_output = stage2_result[stage2_chain.output_key]
-        stage2_file = stage2_chain.save_output(stage2_output, output_dir)
-        logger.info(f"Stage 2 execution completed ({time.time() - stage2_start:.1f}s)")
-        logger.info(f"Output saved: {stage2_file}")
-
-        # Stage 3: General Translation
-        logger.info("=" * 60)
-        logger.info("Starting Stage 3: General Translation")
-        logger.info("=" * 60)
-        stage3_start = time.time()
-        stage3_chain = create_stage3_chain()
-        stage3_result = stage3_chain.run(stage1_output, stage2_output)
-        stage3_output = stage3_result[stage3_chain.output_key]
-        stage3_file = stage3_chain.save_output(stage3_output, output_dir)
-        logger.info(f"Stage 3 execution completed ({time.time() - stage3_start:.1f}s)")
-        logger.info(f"Output saved: {stage3_file}")
-
-        # Stage 4: Brand Contextualization
-        logger.info("=" * 60)
-        logger.info("Starting Stage 4: Brand Contextualization")
-        logger.info("=" * 60)
-        stage4_start = time.time()
-        stage4_chain = create_stage4_chain()
-        stage4_result = stage4_chain.run(stage3_output, brand_profile, research_data)
-        stage4_output = stage4_result[stage4_chain.output_key]
-        stage4_file = stage4_chain.save_output(stage4_output, output_dir)
-        logger.info(f"Stage 4 execution completed ({time.time() - stage4_start:.1f}s)")
-        logger.info(f"Output saved: {stage4_file}")
-
-        # Stage 5: Opportunity Generation
-        logger.info("=" * 60)
-        logger.info("Starting Stage 5: Opportunity Generation")
-        logger.info("=" * 60)
-        stage5_start = time.time()
-        stage5_chain = create_stage5_chain()
-        stage5_result = stage5_chain.run(stage4_output, brand_name, run_id)
-        opportunities = stage5_result['opportunities']
-        logger.info(f"Generated {len(opportunities)} opportunities")
+        input_text = read_pdf_text(input_file_path, reader=PdfReader)
+        logger.info(f"PDF extracted: {len(input_text)} characters")
 
-        opportunity_files = stage5_chain.render_opportunity_cards(
-            opportunities, brand_name, run_id, output_dir
+        dual_track = dual_track_enabled(dual_track)
+        dag = build_stage_dag(
+            stage_factories(), get_semantic_cache(), force_recompute, cache_source=run_id,
+            track=selected_track if dual_track else None
         )
-        logger.info(f"Rendered {len(opportunity_files)} opportunity cards")
-
-        summary_file = stage5_chain.generate_summary_file(opportunities, output_dir)
-        logger.info(f"Stage 5 execution completed ({time.time() - stage5_start:.1f}s)")
-        logger.info(f"Summary saved: {summary_file}")
+        add_brand_nodes(dag, brand_id)
+        add_card_nodes(dag, output_dir)
+        if dual_track:
+            add_track_nodes(dag, output_dir, selected_track)
+        result = run_stage_dag(
+            dag,
+            {'input_text': input_text, 'input_source': run_id},
+            output_dir=output_dir,
+            metadata=metadata,
+            selected_track=selected_track,
+            web_mode=True,
+            checkpoint_dir=output_dir / "checkpoints",
+            resume=resume
+        )
+        logger.info(f"Summary saved: {result.values['stage5_cards']}")
 
         total_time = time.time() - start_time
         logger.info("=" * 60)
@@ -468,17 +587,28 @@ def run_from_uploaded_file(
         return 0
 
     except Exception as e:
+        metrics.mark_failed(str(e))
         logger.error(f"Pipeline execution failed: {e}", exc_info=True)
         return 1
 
+    finally:
+        end_run(metrics)
+        attach_run_metrics(metrics, metadata)
+
 
-def run_single(input_id: str, brand_id: str, manifest: Dict[str, Any]) -> int:
+def run_single(
+    input_id: str,
+    brand_id: str,
+    manifest: Dict[str, Any],
+    force_recompute: bool = False
+) -> int:
     """Run pipeline for single input-brand combination.
 
     Args:
         input_id: Input document ID
         brand_id: Brand profile ID
         manifest: Input manifest dictionary
+        force_recompute: Skip the semantic cache for Stages 1-3
 
     Returns:
         Exit code (0 for success, 1 for failure)
@@ -491,15 +621,16 @@ def run_single(input_id: str, brand_id: str, manifest: Dict[str, Any]) -> int:
         return 1
 
     # Execute pipeline
-    success, metadata = execute_pipeline(input_id, brand_id)
+    success, metadata = execute_pipeline(input_id, brand_id, force_recompute=force_recompute)
     return 0 if success else 1
 
 
-def run_stages_1_to_3(input_id: str) -> Dict[str, Any]:
+def run_stages_1_to_3(input_id: str, force_recompute: bool = False) -> Dict[str, Any]:
     """Run Stages 1-3 (input-dependent only) and return outputs.
 
     Args:
         input_id: Input document ID
+        force_recompute: Skip the semantic cache
 
     Returns:
         Dictionary with stage outputs and timing
@@ -510,45 +641,16 @@ def run_stages_1_to_3(input_id: str) -> Dict[str, Any]:
         'stage2_output': None,
         'stage3_output': None,
         'stage_times': {},
-        'input_text': None
+        'input_text': None,
+        'metrics': None,
+        'semantic_cache': None
     }
 
     logging.info(f"Running Stages 1-3 for input: {input_id}")
 
-    # Load input document
-    input_text = load_input_document(input_id)
-    result['input_text'] = input_text
-    logging.info(f"Input document loaded: {len(input_text)} characters")
-
-    # Stage 1
-    logging.info("STAGE 1/5: Input Processing and Inspiration Identification")
-    stage1_start = time.time()
-    stage1_chain = create_stage1_chain()
-    stage1_result = stage1_chain.run(input_text)
-    stage1_output = stage1_result[stage1_chain.output_key]
-    result['stage1_output'] = stage1_output
-    result['stage_times']['stage1'] = time.time() - stage1_start
-    logging.info(f"Stage 1/5 complete ({result['stage_times']['stage1']:.1f}s)")
-
-    # Stage 2
-    logging.info("STAGE 2/5: Signal Amplification and Trend Extraction")
-    stage2_start = time.time()
-    stage2_chain = create_stage2_chain()
-    stage2_result = stage2_chain.run(stage1_output)
-    stage2_output = stage2_result[stage2_chain.output_key]
-    result['stage2_output'] = stage2_output
-    result['stage_times']['stage2'] = time.time() - stage2_start
-    logging.info(f"Stage 2/5 complete ({result['stage_times']['stage2']:.1f}s)")
-
-    # Stage 3
-    logging.info("STAGE 3/5: General Translation to Universal Lessons")
-    stage3_start = time.time()
-    stage3_chain = create_stage3_chain()
-    stage3_result = stage3_chain.run(stage1_output, stage2_output)
-    stage3_output = stage3_result[stage3_chain.output_key]
-    result['stage3_output'] = stage3_output
-    result['stage_times']['stage3'] = time.time() - stage3_start
-    logging.info(f"Stage 3/5 complete ({result['stage_times']['stage3']:.1f}s)")
+    with track_run(cli_run_id(input_id, "stages-1-3")) as metrics:
+        _run_stages_1_to_3(input_id, result, force_recompute)
+    result['metrics'] = metrics
 
     total_time = time.time() - start_time
     logging.info(f"✓ Stages 1-3 completed in {total_time:.1f}s")
@@ -556,6 +658,26 @@ def run_stages_1_to_3(input_id: str) -> Dict[str, Any]:
     return result
 
 
+def _run_stages_1_to_3(input_id: str, result: Dict[str, Any], force_recompute: bool = False) -> None:
+    """Run Stages 1-3, filling outputs and timings into result."""
+
+    # Load input document
+    input_text = load_input_document(input_id)
+    result['input_text'] = input_text
+    logging.info(f"Input document loaded: {len(input_text)} characters")
+
+    dag = build_stage_dag(stage_factories(), get_semantic_cache(), force_recompute, cache_source=input_id)
+    run = run_stage_dag(
+        dag,
+        {'input_text': input_text},
+        stage_times=result['stage_times'],
+        metadata=result,
+        targets=('stage3', 'semantic_cache_store')
+    )
+    for stage in ('stage1', 'stage2', 'stage3'):
+        result[f'{stage}_output'] = run.values[stage].get(f'{stage}_output', '')
+
+
 def execute_pipeline_stages_4_5(
     input_id: str,
     brand_id: str,
@@ -589,6 +711,7 @@ def execute_pipeline_stages_4_5(
     }
 
     progress_prefix = f"[Test {test_num}/{total_tests}] " if test_num and total_tests else ""
+    metrics = begin_run(cli_run_id(input_id, brand_id))
 
     try:
         # Create output directory
@@ -604,64 +727,30 @@ def execute_pipeline_stages_4_5(
         stage2_output = stages_123_result['stage2_output']
         stage3_output = stages_123_result['stage3_output']
 
-        # Save Stage 1-3 outputs (from cache)
-        stage1_chain = create_stage1_chain()
-        stage1_chain.save_output(stage1_output, output_dir)
-
-        stage2_chain = create_stage2_chain()
-        stage2_chain.save_output(stage2_output, output_dir)
-
-        stage3_chain = create_stage3_chain()
-        stage3_chain.save_output(stage3_output, output_dir)
+        # Save Stage 1-3 outputs (from cache) - no chains needed to write files
+        Stage1Chain.save_output(stage1_output, output_dir)
+        Stage2Chain.save_output(stage2_output, output_dir)
+        Stage3Chain.save_output(stage3_output, output_dir)
+        if stages_123_result.get('semantic_cache'):
+            save_cache_provenance(stages_123_result['semantic_cache'], output_dir)
+            metadata['semantic_cache'] = stages_123_result['semantic_cache']
 
         logging.info(f"{progress_prefix}Stages 1-3 outputs saved (from cache)")
 
-        # Stage 4: Brand Contextualization
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 4/5: Brand Contextualization with Research Data")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage4_start = time.time()
-        brand_profile = load_brand_profile(brand_id)
-        logging.info(f"{progress_prefix}Brand profile loaded: {brand_profile.get('company_name', 'N/A')}")
-
-        research_data = load_research_data(brand_id)
-        logging.info(f"{progress_prefix}Research data loaded: {len(research_data)} characters")
-
-        stage4_chain = create_stage4_chain()
-        stage4_result = stage4_chain.run(stage3_output, brand_profile, research_data)
-        stage4_output = stage4_result[stage4_chain.output_key]
-
-        stage4_file = stage4_chain.save_output(stage4_output, output_dir)
-        stage4_time = time.time() - stage4_start
-        stage_times['stage4'] = stage4_time
-        logging.info(f"{progress_prefix}Stage 4/5 complete ({stage4_time:.1f}s). Output: {stage4_file}")
-
-        # Stage 5: Opportunity Generation
-        logging.info(f"{progress_prefix}{'=' * 60}")
-        logging.info(f"{progress_prefix}STAGE 5/5: Opportunity Generation Chain")
-        logging.info(f"{progress_prefix}{'=' * 60}")
-
-        stage5_start = time.time()
-        brand_name = brand_profile.get('company_name', brand_id)
-        logging.info(f"{progress_prefix}Generating opportunities for brand: {brand_name}")
-        logging.info(f"{progress_prefix}Based on input source: {input_id}")
-
-        stage5_chain = create_stage5_chain()
-        stage5_result = stage5_chain.run(stage4_output, brand_name, input_id)
-        opportunities = stage5_result['opportunities']
-
-        logging.info(f"{progress_prefix}Generated {len(opportunities)} opportunities")
-
-        opportunity_files = stage5_chain.render_opportunity_cards(
-            opportunities, brand_name, input_id, output_dir
+        # Stages 4-5 on the precomputed Stage 3 output
+        dag = build_stage_dag(stage_factories())
+        add_brand_nodes(dag, brand_id, progress_prefix)
+        add_card_nodes(dag, output_dir, progress_prefix)
+        result = run_stage_dag(
+            dag,
+            {'input_source': input_id},
+            output_dir=output_dir,
+            stage_times=stage_times,
+            progress_prefix=progress_prefix,
+            targets=('stage5_cards',),
+            precomputed={'stage3': {'stage3_output': stage3_output}}
         )
-        logging.info(f"{progress_prefix}Rendered {len(opportunity_files)} opportunity cards")
-
-        summary_file = stage5_chain.generate_summary_file(opportunities, output_dir)
-        stage5_time = time.time() - stage5_start
-        stage_times['stage5'] = stage5_time
-        logging.info(f"{progress_prefix}Stage 5/5 complete ({stage5_time:.1f}s). Summary: {summary_file}")
+        opportunities = result.values['stage5']['opportunities']
 
         # Update metadata
         total_time = time.time() - start_time
@@ -680,10 +769,15 @@ def execute_pipeline_stages_4_5(
         metadata['success'] = False
         metadata['error'] = str(e)
         metadata['total_time'] = total_time
+        metrics.mark_failed(str(e))
 
         logging.error(f"{progress_prefix}Stages 4-5 execution failed: {e}", exc_info=True)
         return False, metadata
 
+    finally:
+        end_run(metrics)
+        attach_run_metrics(metrics, metadata, cached=stages_123_result.get('metrics'))
+
 
 def generate_batch_summary(
     results: List[Dict[str, Any]],
@@ -710,8 +804,10 @@ def generate_batch_summary(
     success_rate = (success_count / total_tests * 100) if total_tests > 0 else 0
     avg_time_per_scenario = batch_total_time / total_tests if total_tests > 0 else 0
 
-    # Calculate average stage times
+    # Calculate average stage times, tokens and cost
     stage_times = {'stage1': [], 'stage2': [], 'stage3': [], 'stage4': [], 'stage5': []}
+    stage_tokens = {stage: [] for stage in stage_times}
+    stage_costs = {stage: [] for stage in stage_times}
     total_opportunities = 0
 
     for result in results:
@@ -719,11 +815,23 @@ def generate_batch_summary(
             total_opportunities += result.get('opportunities_generated', 0)
             for stage, time_val in result.get('stage_times', {}).items():
                 stage_times[stage].append(time_val)
+            for stage, stats in result.get('stage_metrics', {}).items():
+                if stage in stage_tokens:
+                    stage_tokens[stage].append(stats['prompt_tokens'] + stats['completion_tokens'])
+                    stage_costs[stage].append(stats['cost_usd'])
 
     avg_stage_times = {
         stage: sum(times) / len(times) if times else 0
         for stage, times in stage_times.items()
     }
+    avg_stage_tokens = {
+        stage: sum(tokens) / len(tokens) if tokens else 0
+        for stage, tokens in stage_tokens.items()
+    }
+    avg_stage_costs = {
+        stage: sum(costs) / len(costs) if costs else 0
+        for stage, costs in stage_costs.items()
+    }
 
     # Generate markdown report
     with open(summary_file, 'w', encoding='utf-8') as f:
@@ -741,17 +849,26 @@ def generate_batch_summary(
 
         f.write("## Stage Performance\n\n")
         f.write("Average execution time per stage:\n\n")
-        f.write("| Stage | Average Time (s) | Description |\n")
-        f.write("|-------|------------------|-------------|\n")
-        f.write(f"| Stage 1 | {avg_stage_times.get('stage1', 0):.1f}s | Input Processing |\n")
-        f.write(f"| Stage 2 | {avg_stage_times.get('stage2', 0):.1f}s | Signal Amplification |\n")
-        f.write(f"| Stage 3 | {avg_stage_times.get('stage3', 0):.1f}s | General Translation |\n")
-        f.write(f"| Stage 4 | {avg_stage_times.get('stage4', 0):.1f}s | Brand Contextualization |\n")
-        f.write(f"| Stage 5 | {avg_stage_times.get('stage5', 0):.1f}s | Opportunity Generation |\n\n")
+        f.write("| Stage | Average Time (s) | Avg Tokens | Avg Est. Cost | Description |\n")
+        f.write("|-------|------------------|------------|---------------|-------------|\n")
+        stage_descriptions = [
+            ('stage1', "Input Processing"),
+            ('stage2', "Signal Amplification"),
+            ('stage3', "General Translation"),
+            ('stage4', "Brand Contextualization"),
+            ('stage5', "Opportunity Generation"),
+        ]
+        for num, (stage, description) in enumerate(stage_descriptions, start=1):
+            f.write(
+                f"| Stage {num} | {avg_stage_times.get(stage, 0):.1f}s | "
+                f"{avg_stage_tokens.get(stage, 0):,.0f} | ${avg_stage_costs.get(stage, 0):.4f} | "
+                f"{description} |\n"
+            )
+        f.write("\n")
 
         f.write("## Detailed Results\n\n")
-        f.write("| # | Input ID | Brand ID | Status | Time (s) | Opportunities | Output Dir |\n")
-        f.write("|---|----------|----------|--------|----------|---------------|------------|\n")
+        f.write("| # | Input ID | Brand ID | Status | Time (s) | Tokens | Est. Cost | Opportunities | Output Dir |\n")
+        f.write("|---|----------|----------|--------|----------|--------|-----------|---------------|------------|\n")
 
         for idx, result in enumerate(results, start=1):
             status = "✅ Success" if result['success'] else "❌ Failed"
@@ -759,9 +876,11 @@ def generate_batch_summary(
             brand_id = result.get('brand_id', 'N/A')
             total_time = result.get('total_time', 0)
             opportunities = result.get('opportunities_generated', 0)
+            tokens = result.get('total_tokens', 0)
+            cost = result.get('cost_usd', 0)
             output_dir = Path(result.get('output_dir', '')).name if result.get('output_dir') else 'N/A'
 
-            f.write(f"| {idx} | {input_id} | {brand_id} | {status} | {total_time:.1f}s | {opportunities} | {output_dir} |\n")
+            f.write(f"| {idx} | {input_id} | {brand_id} | {status} | {total_time:.1f}s | {tokens:,} | ${cost:.4f} | {opportunities} | {output_dir} |\n")
 
         f.write("\n## Failed Scenarios\n\n")
         if failure_count > 0:
@@ -784,7 +903,11 @@ def generate_batch_summary(
     logging.info(f"Batch summary report generated: {summary_file}")
 
 
-def run_batch(manifest: Dict[str, Any], retry_failed: bool = False) -> int:
+def run_batch(
+    manifest: Dict[str, Any],
+    retry_failed: bool = False,
+    force_recompute: bool = False
+) -> int:
     """Run pipeline for all input-brand combinations with optimized caching.
 
     Optimization: Stages 1-3 only depend on input document, so we cache them
@@ -793,6 +916,7 @@ def run_batch(manifest: Dict[str, Any], retry_failed: bool = False) -> int:
     Args:
         manifest: Input manifest dictionary
         retry_failed: If True, only retry previously failed scenarios
+        force_recompute: Skip the semantic cache for Stages 1-3
 
     Returns:
         Exit code (0 for success, 1 if any failures)
@@ -837,7 +961,7 @@ def run_batch(manifest: Dict[str, Any], retry_failed: bool = False) -> int:
 
         # Run Stages 1-3 once for this input
         try:
-            stages_123_result = run_stages_1_to_3(input_id)
+            stages_123_result = run_stages_1_to_3(input_id, force_recompute)
             input_cache[input_id] = stages_123_result
             logging.info(f"✓ Stages 1-3 cached for {input_id}")
         except Exception as e:
@@ -975,6 +1099,13 @@ Examples:
   # Batch mode with verbose logging
   %(prog)s --batch --verbose
 
+  # Ignore cached Stages 1-3 (SEMANTIC_CACHE_PATH) for near-identical inputs
+  %(prog)s --input savannah-bananas --brand lactalis-canada --force-recompute
+
+  # Try a faster model for Stages 1-2 (overrides LLM_ROUTING_CONFIG)
+  %(prog)s --input savannah-bananas --brand lactalis-canada \\
+      --route stage1=openai/gpt-4o-mini --route stage2=openai/gpt-4o-mini,deepseek/deepseek-chat
+
 For more information, see: docs/architecture.md
         """
     )
@@ -1006,6 +1137,13 @@ For more information, see: docs/architecture.md
         help='Retry only failed scenarios from previous batch execution. Must be used with --batch.'
     )
 
+    # Semantic cache override
+    parser.add_argument(
+        '--force-recompute',
+        action='store_true',
+        help='Run Stages 1-3 even if SEMANTIC_CACHE_PATH has a near-identical input cached'
+    )
+
     # Verbose logging flag
     parser.add_argument(
         '--verbose',
@@ -1026,6 +1164,12 @@ For more information, see: docs/architecture.md
         help='Unique run identifier for web execution (e.g., run-123456)'
     )
 
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted web run from its stage checkpoints (with --input-file and --run-id)'
+    )
+
     parser.add_argument(
         '--selected-track',
         type=int,
@@ -1033,6 +1177,20 @@ For more information, see: docs/architecture.md
         help='Track selection (1 or 2) from Story 2.2 UI'
     )
 
+    parser.add_argument(
+        '--route',
+        action='append',
+        metavar='STAGE=MODEL[,FALLBACK...]',
+        help='Route a stage to other models for this run (repeatable), e.g. stage1=openai/gpt-4o-mini'
+    )
+
+    parser.add_argument(
+        '--dual-track',
+        action='store_true',
+        default=None,
+        help='Also run Stages 2-5 for the other track as a sibling branch (web execution; default: DUAL_TRACK_MODE)'
+    )
+
     return parser.parse_args()
 
 
@@ -1050,53 +1208,67 @@ def main() -> int:
 
     logging.info("Innovation Intelligence Pipeline - Starting")
 
-    try:
-        # Check for web execution mode first
-        if args.input_file and args.brand and args.run_id:
-            logging.info("Execution mode: WEB (Uploaded File)")
-            selected_track = args.selected_track if args.selected_track else 1
-            return run_from_uploaded_file(
-                args.input_file,
-                args.brand,
-                args.run_id,
-                selected_track
-            )
+    # Span exporters (OTLP collector / JSONL file) if configured
+    configure_tracing_from_env()
 
-        # Validate retry-failed flag
-        if args.retry_failed and not args.batch:
-            logging.error("Error: --retry-failed must be used with --batch")
-            logging.error("Run with --help for usage information")
-            return 1
+    # Per-run model routes (--route stage1=model[,fallback])
+    try:
+        overrides = parse_route_overrides(args.route)
+    except ValueError as e:
+        logging.error(f"Validation error: {e}")
+        return 1
 
-        # Load input manifest
-        manifest = load_input_manifest()
+    with route_overrides(overrides):
+        try:
+            # Check for web execution mode first
+            if args.input_file and args.brand and args.run_id:
+                logging.info("Execution mode: WEB (Uploaded File)")
+                selected_track = args.selected_track if args.selected_track else 1
+                return run_from_uploaded_file(
+                    args.input_file,
+                    args.brand,
+                    args.run_id,
+                    selected_track,
+                    force_recompute=args.force_recompute,
+                    resume=args.resume,
+                    dual_track=args.dual_track
+                )
 
-        # Determine execution mode
-        if args.batch:
-            # Batch mode
-            mode = "BATCH (RETRY FAILED)" if args.retry_failed else "BATCH"
-            logging.info(f"Execution mode: {mode}")
-            return run_batch(manifest, retry_failed=args.retry_failed)
-        else:
-            # Single run mode - validate required arguments
-            if not args.input or not args.brand:
-                logging.error("Error: --input and --brand are required for single run mode")
-                logging.error("Use --batch for batch mode, or provide both --input and --brand")
+            # Validate retry-failed flag
+            if args.retry_failed and not args.batch:
+                logging.error("Error: --retry-failed must be used with --batch")
                 logging.error("Run with --help for usage information")
                 return 1
 
-            logging.info("Execution mode: SINGLE RUN")
-            return run_single(args.input, args.brand, manifest)
-
-    except FileNotFoundError as e:
-        logging.error(f"File not found: {e}")
-        return 1
-    except ValueError as e:
-        logging.error(f"Validation error: {e}")
-        return 1
-    except Exception as e:
-        logging.error(f"Unexpected error: {e}", exc_info=True)
-        return 1
+            # Load input manifest
+            manifest = load_input_manifest()
+
+            # Determine execution mode
+            if args.batch:
+                # Batch mode
+                mode = "BATCH (RETRY FAILED)" if args.retry_failed else "BATCH"
+                logging.info(f"Execution mode: {mode}")
+                return run_batch(manifest, retry_failed=args.retry_failed, force_recompute=args.force_recompute)
+            else:
+                # Single run mode - validate required arguments
+                if not args.input or not args.brand:
+                    logging.error("Error: --input and --brand are required for single run mode")
+                    logging.error("Use --batch for batch mode, or provide both --input and --brand")
+                    logging.error("Run with --help for usage information")
+                    return 1
+
+                logging.info("Execution mode: SINGLE RUN")
+                return run_single(args.input, args.brand, manifest, force_recompute=args.force_recompute)
+
+        except FileNotFoundError as e:
+            logging.error(f"File not found: {e}")
+            return 1
+        except ValueError as e:
+            logging.error(f"Validation error: {e}")
+            return 1
+        except Exception as e:
+            logging.error(f"Unexpected error: {e}", exc_info=True)
+            return 1
 
 
 if __name__ == "__main__":
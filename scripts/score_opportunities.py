@@ -6,15 +6,18 @@ Guides PM through manual scoring of each opportunity using the rubric.
 
 import csv
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from opportunity_corpus import load_opportunity_files
+
 def read_opportunity_content(file_path):
     """Read and display opportunity content."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-    return content
+    return load_opportunity_files([file_path])[str(file_path)]['full_content']
 
-def display_opportunity(opp_num, total, scenario_id, brand, input_source, file_path):
+def display_opportunity(opp_num, total, scenario_id, brand, input_source, file_path, content=None):
     """Display opportunity card for scoring."""
     print("\n" + "="*80)
     print(f"OPPORTUNITY {opp_num}/{total}")
@@ -25,7 +28,8 @@ def display_opportunity(opp_num, total, scenario_id, brand, input_source, file_p
     print(f"File: {file_path}")
     print("-"*80)
 
-    content = read_opportunity_content(file_path)
+    if content is None:
+        content = read_opportunity_content(file_path)
     print(content)
     print("-"*80)
 
@@ -76,6 +80,12 @@ def score_opportunities():
                 if row['novelty']:  # If already scored
                     existing_scores[row['scenario_id']] = row
 
+    # Load unscored cards up front from the shared corpus cache
+    cards = load_opportunity_files(
+        opp['opportunity_file'] for opp in opportunities
+        if opp['scenario_id'] not in existing_scores
+    )
+
     # Track new scores
     new_scores = []
     scored_count = len(existing_scores)
@@ -94,7 +104,8 @@ def score_opportunities():
             scenario_id,
             opp['brand'],
             opp['input_source'],
-            opp['opportunity_file']
+            opp['opportunity_file'],
+            cards[opp['opportunity_file']]['full_content']
         )
 
         # Get scores
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Add batch-run opportunity cards to the MinHash novelty index.
+
+Indexes every stage5/opportunity-*.md card under data/test-outputs that is
+not already in the history file, so Stage 5 novelty scores cover earlier
+runs. Cards are keyed by absolute file path, as Stage 5 keys the cards it
+saves; re-running only adds new cards.
+
+Usage:
+    python scripts/update_novelty_index.py
+    python scripts/update_novelty_index.py --index data/novelty-index.jsonl --report
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from opportunity_corpus import TEST_OUTPUTS_DIR, load_corpus
+from pipeline.novelty_index import DEFAULT_THRESHOLD, NoveltyIndex, card_key, index_cards
+
+DEFAULT_INDEX_PATH = "data/novelty-index.jsonl"
+
+
+def near_duplicates(index, cards):
+    """Return (card, other_key, similarity) for each near-duplicate pair, once per pair."""
+    reported = set()
+    pairs = []
+    for card in cards:
+        path = card_key(card['path'])
+        for key, similarity in index.query(card['description'], exclude=path):
+            pair = tuple(sorted((path, key)))
+            if pair not in reported:
+                reported.add(pair)
+                pairs.append((card, key, similarity))
+    return pairs
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description="Update the opportunity novelty index")
+    parser.add_argument(
+        "--index",
+        default=os.getenv("NOVELTY_INDEX_PATH", DEFAULT_INDEX_PATH),
+        help=f"History file (default: NOVELTY_INDEX_PATH or {DEFAULT_INDEX_PATH})"
+    )
+    parser.add_argument("--outputs", default=str(TEST_OUTPUTS_DIR), help="Batch run output directory")
+    parser.add_argument("--report", action="store_true", help="List near-duplicate cards after updating")
+    args = parser.parse_args()
+
+    print(f"🔍 Loading novelty index: {args.index}")
+    index = NoveltyIndex(Path(args.index))
+    print(f"   {len(index)} cards already indexed")
+
+    cards = load_corpus(Path(args.outputs))
+    added = index_cards(index, cards)
+    print(f"✅ Added {added} new cards ({len(index)} total)")
+
+    if args.report:
+        print(f"\n📋 Near-duplicates (≥{DEFAULT_THRESHOLD:.1f} Jaccard):")
+        pairs = near_duplicates(index, cards)
+        for card, key, similarity in pairs:
+            other = index.get_metadata(key)
+            print(f"   {similarity:.2f}  {card['title']} ({card['brand']})")
+            print(f"         ↔ {other.get('title', key)} ({other.get('brand', '?')})")
+        if not pairs:
+            print("   None found")
+
+
+if __name__ == "__main__":
+    main()
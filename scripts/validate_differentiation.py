@@ -5,34 +5,23 @@ Analyzes whether opportunities meaningfully vary by brand context.
 """
 
 import json
-import re
+import sys
 from pathlib import Path
 
-def parse_opportunity(file_path):
-    """Extract opportunity details from markdown file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
+sys.path.insert(0, str(Path(__file__).parent))
 
-    # Extract title
-    title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else ""
+from brand_similarity import BrandSimilarityEngine, load_brand_documents
+from opportunity_corpus import load_opportunity_files
 
-    # Extract description
-    desc_match = re.search(r'## Description\n\n(.+?)(?=\n##|$)', content, re.DOTALL)
-    description = desc_match.group(1).strip() if desc_match else ""
+def compare_opportunities_for_input(input_source, opportunities_data, cards=None, engine=None):
+    """Compare opportunities from same input across different brands.
 
-    # Extract actionability
-    action_match = re.search(r'## Actionability\n\n(.+?)(?=\n##|$)', content, re.DOTALL)
-    actionability = action_match.group(1).strip() if action_match else ""
-
-    return {
-        'title': title,
-        'description': description,
-        'actionability': actionability
-    }
-
-def compare_opportunities_for_input(input_source, opportunities_data):
-    """Compare opportunities from same input across different brands."""
+    Args:
+        input_source: Input source to compare brands for
+        opportunities_data: Collected opportunity records
+        cards: Parsed cards keyed by opportunity_file (loaded on demand if omitted)
+        engine: BrandSimilarityEngine (built from data/brand-profiles if omitted)
+    """
     # Filter opportunities for this input source
     relevant_opps = [opp for opp in opportunities_data if opp['input_source'] == input_source]
 
@@ -45,10 +34,13 @@ def compare_opportunities_for_input(input_source, opportunities_data):
     print(f"Brands analyzed: {len(relevant_opps)}")
     print()
 
+    if cards is None:
+        cards = load_opportunity_files(opp['opportunity_file'] for opp in relevant_opps)
+
     # Parse each opportunity
     parsed_opps = []
     for opp in relevant_opps:
-        parsed = parse_opportunity(opp['opportunity_file'])
+        parsed = dict(cards[opp['opportunity_file']])
         parsed['brand'] = opp['brand']
         parsed_opps.append(parsed)
 
@@ -70,45 +62,29 @@ def compare_opportunities_for_input(input_source, opportunities_data):
     else:
         print("   ⚠️  Some brands received similar concepts")
 
-    # 2. Content analysis
-    print(f"\n**Content Differentiation:**")
-    for opp in parsed_opps:
-        brand_mentions = opp['description'].count(opp['brand'].replace('-', ' ').title())
-        brand_mentions += opp['description'].count(opp['brand'].replace('-', ' '))
-
-        # Check for brand-specific elements
-        brand_specific_indicators = 0
-
-        # Lactalis-specific
-        if opp['brand'] == 'lactalis-canada':
-            lactalis_terms = ['dairy', 'milk', 'cheese', 'yogurt', 'lactalis', 'whey', 'lactose']
-            brand_specific_indicators = sum(1 for term in lactalis_terms if term in opp['description'].lower())
-
-        # Columbia-specific
-        elif opp['brand'] == 'columbia-sportswear':
-            columbia_terms = ['outdoor', 'apparel', 'gear', 'columbia', 'hiking', 'fabric', 'garment']
-            brand_specific_indicators = sum(1 for term in columbia_terms if term in opp['description'].lower())
-
-        # Decathlon-specific
-        elif opp['brand'] == 'decathlon':
-            decathlon_terms = ['sport', 'athletic', 'fitness', 'decathlon', 'equipment', 'training']
-            brand_specific_indicators = sum(1 for term in decathlon_terms if term in opp['description'].lower())
-
-        # McCormick-specific
-        elif opp['brand'] == 'mccormick-usa':
-            mccormick_terms = ['spice', 'flavor', 'seasoning', 'mccormick', 'culinary', 'recipe', 'taste']
-            brand_specific_indicators = sum(1 for term in mccormick_terms if term in opp['description'].lower())
+    # 2. Content analysis: TF-IDF similarity to every brand profile
+    if engine is None:
+        engine = BrandSimilarityEngine(load_brand_documents())
+    report = engine.analyze(parsed_opps)
 
+    print(f"\n**Content Differentiation:**")
+    for i, opp in enumerate(parsed_opps):
         print(f"\n   {opp['brand']}:")
         print(f"      Title: {opp['title']}")
-        print(f"      Brand-specific terms: {brand_specific_indicators}")
-        if brand_specific_indicators >= 2:
+        print(f"      Own-brand similarity: {report.own_brand_similarity[i]:.2f} "
+              f"(closest brand: {report.best_brand[i]})")
+        if report.contextualized[i]:
             print(f"      ✅ Strong brand contextualization")
-        elif brand_specific_indicators >= 1:
+        elif report.moderate[i]:
             print(f"      ⚠️  Moderate brand contextualization")
         else:
             print(f"      ❌ Weak brand contextualization")
 
+    if report.duplicate_pairs:
+        print(f"\n**Near-Duplicates Across Brands:**")
+        for i, j, score in report.duplicate_pairs:
+            print(f"   ⚠️  {parsed_opps[i]['brand']} ↔ {parsed_opps[j]['brand']}: {score:.2f} similarity")
+
     # 3. Overall assessment
     print(f"\n## OVERALL DIFFERENTIATION ASSESSMENT\n")
 
@@ -117,8 +93,7 @@ def compare_opportunities_for_input(input_source, opportunities_data):
     else:
         print("⚠️  **Concept Differentiation:** Some overlap in opportunity concepts")
 
-    total_brand_specific = sum(1 for opp in parsed_opps
-                               if check_brand_contextualization(opp['description'], opp['brand']))
+    total_brand_specific = int(report.contextualized.sum())
 
     contextualization_pct = (total_brand_specific / len(parsed_opps)) * 100
 
@@ -138,25 +113,10 @@ def compare_opportunities_for_input(input_source, opportunities_data):
         'unique_titles': unique_titles,
         'total_titles': len(titles),
         'contextualization_pct': contextualization_pct,
+        'near_duplicate_pairs': len(report.duplicate_pairs),
         'differentiation_quality': 'Strong' if contextualization_pct >= 75 else 'Moderate' if contextualization_pct >= 50 else 'Weak'
     }
 
-def check_brand_contextualization(description, brand):
-    """Check if description shows strong brand contextualization."""
-    desc_lower = description.lower()
-
-    brand_terms = {
-        'lactalis-canada': ['dairy', 'milk', 'cheese', 'yogurt', 'lactalis', 'whey', 'lactose', 'canadian'],
-        'columbia-sportswear': ['outdoor', 'apparel', 'gear', 'columbia', 'hiking', 'fabric', 'garment', 'clothing'],
-        'decathlon': ['sport', 'athletic', 'fitness', 'decathlon', 'equipment', 'training', 'performance'],
-        'mccormick-usa': ['spice', 'flavor', 'seasoning', 'mccormick', 'culinary', 'recipe', 'taste', 'herb']
-    }
-
-    terms = brand_terms.get(brand, [])
-    matches = sum(1 for term in terms if term in desc_lower)
-
-    return matches >= 2  # Strong if at least 2 brand-specific terms
-
 def main():
     """Main differentiation validation."""
     print("🔍 BRAND DIFFERENTIATION VALIDATION")
@@ -182,8 +142,13 @@ def main():
 
     # Analyze differentiation for each
     results = []
-    for input_source, opps in list(complete_inputs.items())[:3]:  # Analyze top 3
-        result = compare_opportunities_for_input(input_source, opportunities)
+    analyzed = dict(list(complete_inputs.items())[:3])  # Analyze top 3
+    cards = load_opportunity_files(
+        opp['opportunity_file'] for opps in analyzed.values() for opp in opps
+    )
+    engine = BrandSimilarityEngine(load_brand_documents())
+    for input_source in analyzed:
+        result = compare_opportunities_for_input(input_source, opportunities, cards, engine)
         if result:
             results.append(result)
 
@@ -0,0 +1,14 @@
+"""Shared fixtures for the pipeline tests"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def text_cache_dir(tmp_path, monkeypatch):
+    """Keep each test's extracted-text cache out of data/text-cache.
+
+    Tests mock PdfReader over empty temp files, which all hash alike.
+    """
+    directory = tmp_path / "text-cache"
+    monkeypatch.setenv("INPUT_TEXT_CACHE_DIR", str(directory))
+    return directory
@@ -0,0 +1,91 @@
+"""
+Unit tests for the streaming quality-analysis aggregator.
+Tests that single-pass metrics and bounded heaps match full-list results.
+"""
+
+import csv
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.analyze_quality_results import (
+    aggregate_assessment_data,
+    analyze_by_brand,
+    calculate_dimension_breakdown,
+    calculate_overall_metrics,
+    stream_assessment_data,
+)
+
+FIELDS = ['scenario_id', 'brand', 'input_source', 'novelty', 'actionability',
+          'relevance', 'specificity', 'overall_score', 'notes']
+
+
+def make_rows(n, seed=11):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        scores = [rng.randint(1, 5) for _ in range(4)]
+        rows.append({
+            'scenario_id': f"scenario-{i}",
+            'brand': rng.choice(['lactalis-canada', 'decathlon', 'mccormick-usa']),
+            'input_source': rng.choice(['savannah-bananas', 'cat-dad']),
+            'novelty': scores[0],
+            'actionability': scores[1],
+            'relevance': scores[2],
+            'specificity': scores[3],
+            'overall_score': round(sum(scores) / 4, 1),
+            'notes': "",
+        })
+    return rows
+
+
+def test_metrics_match_full_pass():
+    rows = make_rows(400)
+    aggregator = aggregate_assessment_data(iter(rows))
+    scores = [r['overall_score'] for r in rows]
+
+    overall = calculate_overall_metrics(aggregator)
+    assert overall['total_assessed'] == 400
+    assert overall['avg_overall_score'] == round(sum(scores) / len(scores), 2)
+    assert overall['std_overall_score'] == round(statistics.stdev(scores), 2)
+    assert overall['passing_count'] == sum(1 for s in scores if s >= 3.0)
+
+    novelty = calculate_dimension_breakdown(aggregator)['novelty']
+    assert novelty['count_5'] == sum(1 for r in rows if r['novelty'] == 5)
+    assert (novelty['min'], novelty['max']) == (1, 5)
+
+    decathlon = [r['overall_score'] for r in rows if r['brand'] == 'decathlon']
+    assert analyze_by_brand(aggregator)['decathlon'] == {
+        'count': len(decathlon),
+        'avg_score': round(sum(decathlon) / len(decathlon), 2),
+        'std': round(statistics.stdev(decathlon), 2),
+        'min': min(decathlon),
+        'max': max(decathlon),
+    }
+
+
+def test_top_and_bottom_match_stable_sort():
+    rows = make_rows(400)
+    aggregator = aggregate_assessment_data(iter(rows), n=5)
+
+    expected_top = sorted(rows, key=lambda r: r['overall_score'], reverse=True)[:5]
+    expected_bottom = sorted(rows, key=lambda r: r['overall_score'])[:5]
+    assert [r['scenario_id'] for r in aggregator.top()] == [r['scenario_id'] for r in expected_top]
+    assert [r['scenario_id'] for r in aggregator.bottom()] == [r['scenario_id'] for r in expected_bottom]
+
+
+def test_stream_converts_scores(tmp_path):
+    csv_path = tmp_path / "quality-assessment.csv"
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(make_rows(3))
+
+    stream = stream_assessment_data(csv_path)
+    first = next(stream)
+    assert first['novelty'] in range(1, 6)
+    assert isinstance(first['overall_score'], float)
+    assert len(list(stream)) == 2
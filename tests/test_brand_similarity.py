@@ -0,0 +1,82 @@
+"""
+Unit tests for TF-IDF brand similarity.
+Tests brand matching, ambiguity and cross-brand duplicate detection.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.brand_similarity import BrandSimilarityEngine, load_brand_documents
+
+
+BRANDS = {
+    'dairy-co': "Dairy cooperative selling milk, cheese and yogurt to grocery retailers.",
+    'trail-gear': "Outdoor apparel for hiking and camping with waterproof fabric jackets.",
+    'spice-house': "Spice and seasoning blends for home cooks, recipes and culinary flavor.",
+}
+
+
+def card(brand, title, description):
+    return {'brand': brand, 'title': title, 'description': description, 'actionability': ""}
+
+
+def test_opportunities_match_their_brand():
+    engine = BrandSimilarityEngine(BRANDS)
+    report = engine.analyze([
+        card('dairy-co', "Cheese tasting nights", "Pop-up yogurt and cheese tastings with local milk farms."),
+        card('trail-gear', "Trail jacket swaps", "Hiking clubs trade waterproof jackets at camping weekends."),
+        card('spice-house', "Recipe remix", "Home cooks share a seasoning recipe for every spice blend."),
+        card('unlisted-brand', "Mystery", "Cheese and milk."),
+    ])
+
+    assert report.similarity.shape == (4, 3)
+    assert report.best_brand[:3] == ['dairy-co', 'trail-gear', 'spice-house']
+    assert report.contextualized.tolist() == [True, True, True, False]
+    assert report.own_brand_similarity[3] == 0.0
+    assert not report.moderate.any()
+
+
+def test_moderate_contextualization_needs_close_own_brand_score():
+    engine = BrandSimilarityEngine(BRANDS)
+    report = engine.analyze([
+        # Mostly about spices, with a passing mention of the card's own brand (cheese)
+        card('dairy-co', "Seasoning blends", "Spice seasoning recipes and culinary flavor blends for cheese."),
+        # Split between its own brand and another
+        card('dairy-co', "Seasoned cheese", "Cheese and yogurt with spice seasoning blends."),
+    ])
+
+    assert report.contextualized.tolist() == [False, False]
+    assert report.own_brand_similarity[0] > 0
+    assert report.moderate.tolist() == [False, True]
+
+
+def test_near_duplicates_across_brands_are_flagged():
+    engine = BrandSimilarityEngine(BRANDS)
+    same = "Fans join a halftime dance challenge and share the video with friends."
+    report = engine.analyze([
+        card('dairy-co', "Dance challenge", same),
+        card('trail-gear', "Dance challenge", same),
+        card('spice-house', "Recipe remix", "Home cooks share a seasoning recipe for every spice blend."),
+    ])
+
+    assert [(i, j) for i, j, _ in report.duplicate_pairs] == [(0, 1)]
+    assert report.duplicate_pairs[0][2] > 0.99
+
+
+def test_load_brand_documents_includes_research(tmp_path):
+    profiles = tmp_path / "profiles"
+    research = tmp_path / "research"
+    profiles.mkdir()
+    research.mkdir()
+    (profiles / "new-brand.yaml").write_text(
+        "brand_name: New Brand\nproduct_portfolio:\n  - Kombucha\n", encoding="utf-8"
+    )
+    (research / "new-brand-research.md").write_text("Fermented tea research", encoding="utf-8")
+
+    documents = load_brand_documents(profiles, research)
+
+    assert list(documents) == ['new-brand']
+    assert "Kombucha" in documents['new-brand']
+    assert "Fermented tea" in documents['new-brand']
@@ -0,0 +1,91 @@
+"""
+Unit tests for the warm chain pool and static stage output savers.
+Tests that chains are built once and shared, and outputs save without an LLM client.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.chain_pool import ChainPool
+from pipeline.stages.stage1_input_processing import Stage1Chain
+from pipeline.stages.stage2_signal_amplification import Stage2Chain
+
+
+class CountingFactory:
+    """Factory that records how many chains it built."""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        return object()
+
+
+def test_pool_reuses_instance_per_factory():
+    pool = ChainPool()
+    factory_a = CountingFactory()
+    factory_b = CountingFactory()
+
+    first = pool.get(factory_a)
+    second = pool.get(factory_a)
+    other = pool.get(factory_b)
+
+    assert first is second
+    assert first is not other
+    assert factory_a.calls == 1
+    assert factory_b.calls == 1
+    assert len(pool) == 2
+
+
+def test_pool_builds_once_under_concurrency():
+    pool = ChainPool()
+    factory = CountingFactory()
+    results = []
+
+    def borrow():
+        results.append(pool.get(factory))
+
+    threads = [threading.Thread(target=borrow) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert factory.calls == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_pool_warm_and_clear():
+    pool = ChainPool()
+    factory = CountingFactory()
+
+    assert pool.warm([factory]) == 1
+    pool.clear()
+    assert len(pool) == 0
+
+    pool.get(factory)
+    assert factory.calls == 2
+
+
+def test_save_output_needs_no_chain_instance(tmp_path, monkeypatch):
+    # No API credentials: constructing a chain would raise ValueError
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+
+    stage1_text = "## Track 1: Experience Theater\n\nFans become performers.\n\n## Track 2: Radical Access\n\nNo fees."
+    stage1_file = Stage1Chain.save_output(stage1_text, tmp_path, selected_track=2)
+    stage2_file = Stage2Chain.save_output("Trend analysis", tmp_path)
+
+    assert stage1_file.read_text(encoding="utf-8") == stage1_text
+    assert stage2_file.read_text(encoding="utf-8") == "Trend analysis"
+
+    inspirations = json.loads((tmp_path / "stage1" / "inspirations.json").read_text())
+    assert inspirations["selected_track"] == 2
+    assert inspirations["track_1"]["title"] == "Experience Theater"
+    assert inspirations["track_2"]["title"] == "Radical Access"
@@ -0,0 +1,88 @@
+"""
+Unit tests for the stage DAG executor.
+Tests concurrency, targets, failures and checkpoint resume.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.dag import NodeFailed, StageDAG
+
+
+def test_independent_branches_run_concurrently():
+    barrier = threading.Barrier(2, timeout=2)
+    events = []
+
+    def branch(value):
+        def run(x):
+            barrier.wait()  # Deadlocks (times out) unless both run at once
+            return x + value
+        return run
+
+    dag = (
+        StageDAG()
+        .add("left", branch(1), ["x"])
+        .add("right", branch(2), ["x"])
+        .add("total", lambda left, right: left + right, ["left", "right"])
+    )
+    result = dag.run({"x": 10}, on_start=events.append, on_complete=lambda e: events.append(f"{e.name} done"))
+
+    assert result.values["total"] == 23
+    assert events[-2:] == ["total", "total done"]
+    assert set(result.timings) == {"left", "right", "total"}
+
+
+def test_targets_precomputed_and_failures():
+    calls = []
+
+    def node(name, value=None, error=None):
+        def run(**inputs):
+            calls.append(name)
+            if error:
+                raise error
+            return value
+        return run
+
+    dag = (
+        StageDAG()
+        .add("a", node("a", 1))
+        .add("b", node("b", 2), ["a"])
+        .add("c", node("c", 3), ["b"])
+        .add("d", node("d", error=RuntimeError("boom")), ["b"])
+    )
+    assert dag.run(targets=["c"], precomputed={"b": 5}).values["c"] == 3
+    assert calls == ["c"]
+
+    with pytest.raises(NodeFailed, match="boom") as excinfo:
+        dag.run()
+    assert excinfo.value.node == "d"
+
+    with pytest.raises(ValueError):
+        StageDAG().add("x", node("x"), ["missing"]).run()
+
+
+def test_checkpoints_resume(tmp_path):
+    calls = []
+
+    def make_dag():
+        return (
+            StageDAG()
+            .add("first", lambda: calls.append("first") or {"text": "one"}, checkpoint=True)
+            .add("second", lambda first: calls.append("second") or first["text"] + "+two", ["first"])
+        )
+
+    make_dag().run(checkpoint_dir=tmp_path)
+    assert (tmp_path / "first.json").exists()
+
+    calls.clear()
+    reused = []
+    result = make_dag().run(checkpoint_dir=tmp_path, resume=True, on_complete=lambda e: e.reused and reused.append(e.name))
+    assert calls == ["second"]
+    assert reused == ["first"]
+    assert result.values["second"] == "one+two"
@@ -0,0 +1,101 @@
+"""
+Unit tests for run deadlines, LLM call timeouts and retry budgets.
+Tests per-stage deadline splits, retries and attempt timeouts.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import HumanMessage
+
+from pipeline import deadlines, model_routing
+from pipeline.deadlines import DeadlineExceeded, RunDeadline, call_with_deadline, run_deadline
+from pipeline.instrumentation import span
+from pipeline.model_routing import RoutedChatModel, RoutingConfig, route_overrides
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_is_split_across_remaining_stages():
+    clock = FakeClock()
+    deadline = RunDeadline(170, clock=clock)
+
+    # Shares follow max_tokens: 2500/17000 of the run for Stage 1
+    assert deadline.stage_remaining("stage1") == pytest.approx(25)
+    clock.now = 5  # Stage 1 finished 20s early
+    # Stage 2 gets 3000/14500 of the 165s left
+    assert deadline.stage_remaining("stage2") == pytest.approx(165 * 3000 / 14500)
+    assert deadline.stage_remaining("stage2") == deadline.stage_remaining("stage2")
+
+    # Cached stages take no share: Stage 4 splits the rest with Stage 5 only
+    cached = RunDeadline(80, clock=clock)
+    clock.now = 5
+    assert cached.stage_remaining("stage4") == pytest.approx(40)
+    assert RunDeadline(None).stage_remaining("stage4") is None
+
+
+def test_transient_errors_retry_within_budget():
+    attempts = []
+
+    def flaky(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise httpx.ReadTimeout("upstream hung")
+        return "ok"
+
+    with patch.object(deadlines.time, "sleep"), run_deadline() as deadline:
+        assert call_with_deadline(flaky, "stage2 test-model") == "ok"
+        assert deadline.budget.remaining == deadlines.DEFAULT_RETRY_BUDGET - 2
+
+        # A spent budget stops retries; non-transient errors are never retried
+        deadline.budget.remaining = 0
+        attempts.clear()
+        with pytest.raises(httpx.ReadTimeout):
+            call_with_deadline(flaky, "stage2 test-model")
+        assert len(attempts) == 1
+
+        def bad_request(timeout):
+            attempts.append(timeout)
+            raise ValueError("invalid prompt")
+
+        deadline.budget.remaining = 5
+        attempts.clear()
+        with pytest.raises(ValueError):
+            call_with_deadline(bad_request, "stage2 test-model")
+        assert len(attempts) == 1
+
+
+def test_timeouts_capped_at_stage_deadline_without_fallback():
+    timeouts = []
+
+    class SlowClient:
+        def __init__(self, model, endpoint, temperature, max_tokens):
+            self.model = model
+
+        def _generate(self, messages, stop=None, run_manager=None, timeout=None, **kwargs):
+            timeouts.append((self.model, timeout))
+            raise httpx.ReadTimeout("no response")
+
+    with patch.object(model_routing, "_config", RoutingConfig()), patch.dict(model_routing._clients, clear=True):
+        llm = RoutedChatModel(stage="stage5", default_model="slow-model", client_factory=SlowClient)
+        with run_deadline(60) as deadline, route_overrides({"stage5": ["slow-model", "backup-model"]}):
+            deadline.expires_at = deadline._clock() + 4  # Stage 5 runs last: all 4s left
+            with span("stage5", kind="stage"), pytest.raises(DeadlineExceeded):
+                llm.invoke([HumanMessage(content="hello")])
+
+    # One attempt, timed out at the stage deadline; the fallback never ran
+    assert [model for model, _ in timeouts] == ["slow-model"]
+    assert timeouts[0][1].read <= 4
+    assert timeouts[0][1].connect <= 4
@@ -0,0 +1,81 @@
+"""
+Unit tests for the local embedding service.
+Tests hashed vectors, the on-disk cache and splitting stage artifacts into texts.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.embeddings import (
+    EmbeddingService,
+    HashingEmbedder,
+    load_run_artifacts,
+    stage1_inspirations,
+    stage3_lessons,
+    stage5_opportunities,
+)
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dim=256)
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64):
+        self.encoded.append(list(texts))
+        return super().encode(texts, batch_size)
+
+
+def test_search_ranks_related_text_first():
+    service = EmbeddingService(HashingEmbedder())
+    corpus = [
+        "Subscription meal kits delivered weekly with seasonal recipes",
+        "Loyalty program rewarding repeat store visits with points",
+        "Electric scooter sharing for downtown commuters",
+    ]
+    vectors = service.encode(corpus)
+
+    assert vectors.shape == (3, 1024)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    hits = service.search("points for repeat visits in a loyalty program", vectors, k=2)
+    assert hits[0][0] == 1
+    assert hits[0][1] > hits[1][1]
+    assert service.deduplicate(corpus + [corpus[0].lower()]) == [0, 1, 2]
+
+
+def test_cache_reuses_vectors(tmp_path):
+    embedder = CountingEmbedder()
+    service = EmbeddingService(embedder, cache_dir=tmp_path)
+    first = service.encode(["alpha beta", "gamma delta", "alpha beta"], batch_size=1)
+
+    assert embedder.encoded == [["alpha beta"], ["gamma delta"]]
+    assert np.array_equal(first[0], first[2])
+
+    reloaded = CountingEmbedder()
+    second = EmbeddingService(reloaded, cache_dir=tmp_path).encode(["gamma delta", "epsilon"])
+    assert reloaded.encoded == [["epsilon"]]
+    assert np.allclose(second[0], first[1])
+
+
+def test_artifact_extraction(tmp_path):
+    stage1 = "# Analysis\n\n## Track 1: Rituals\n\nMorning habits.\n\n## Track 2: Access\n\nOpen doors.\n"
+    stage3 = "# Lessons\n\n## 1. Reduce friction\n\n**The Principle:** Fewer steps.\n\n---\n\n## 2. Belonging\n\nCommunity.\n"
+
+    assert stage1_inspirations(stage1) == ["Track 1: Rituals\nMorning habits.", "Track 2: Access\nOpen doors."]
+    assert stage3_lessons(stage3) == ["1. Reduce friction\n**The Principle:** Fewer steps.", "2. Belonging\nCommunity."]
+    assert stage5_opportunities([{"title": "Kit", "description": "Weekly box"}]) == ["Kit\nWeekly box"]
+
+    (tmp_path / "stage1").mkdir()
+    (tmp_path / "stage1" / "inspiration-analysis.md").write_text(stage1)
+    (tmp_path / "stage5").mkdir()
+    (tmp_path / "stage5" / "opportunity-1.md").write_text(
+        "---\nbrand: x\n---\n\n# Kit\n\n## Description\n\nWeekly box\n\n## Actionability\n\n- Ship\n"
+    )
+    artifacts = load_run_artifacts(tmp_path)
+    assert len(artifacts["inspirations"]) == 2
+    assert artifacts["lessons"] == []
+    assert artifacts["opportunities"] == ["Kit\nWeekly box"]
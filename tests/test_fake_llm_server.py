@@ -0,0 +1,60 @@
+"""
+Integration tests for the benchmark fake LLM server.
+Tests that stage chains and callbacks run against it, and the report helpers.
+"""
+
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fake_llm_server import FakeLLMServer
+from benchmarks.harness import BenchmarkResult, format_table, percentile
+from pipeline.stages.stage1_input_processing import Stage1Chain
+from pipeline.stages.stage5_opportunity_generation import Stage5Chain
+
+
+def test_stage_chains_against_fake_server(monkeypatch):
+    with FakeLLMServer(latency_s=0.0, tokens_per_s=1e6) as server:
+        for key, value in server.environment().items():
+            monkeypatch.setenv(key, value)
+
+        stage1 = Stage1Chain().run("Savannah Bananas turned baseball into interactive theater.")
+        assert "Mechanism 1" in stage1["stage1_output"]
+
+        monkeypatch.setenv("LLM_STREAMING", "true")
+        # Raw output debug files would land in data/test-outputs/Savannah Bananas
+        monkeypatch.setattr(Stage5Chain, "_save_raw_output_debug", lambda *args, **kwargs: None)
+        stage5 = Stage5Chain().run("Brand-specific insights. " * 40, "Lactalis Canada", "Savannah Bananas")
+        assert len(stage5["opportunities"]) == 5
+
+        assert server.stats() == {"llm.stage1": 1, "llm.stage5": 1}
+
+
+def test_pipeline_callbacks_recorded():
+    with FakeLLMServer() as server:
+        requests.post(f"{server.url}/api/pipeline/run-ok/complete", json={"status": "COMPLETED"})
+        requests.post(
+            f"{server.url}/api/pipeline/run-bad/stage-update",
+            json={"stageNumber": 2, "status": "FAILED", "output": "boom"},
+        )
+
+        assert server.wait_for_completion("run-ok", timeout=1) is not None
+        assert server.run_error("run-ok") is None
+        assert server.wait_for_completion("run-bad", timeout=1) is not None
+        assert server.run_error("run-bad") == "boom"
+        assert server.wait_for_completion("run-missing", timeout=0.01) is None
+
+
+def test_percentiles_and_table():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 99) == 99.01
+    assert percentile([], 95) == 0.0
+
+    result = BenchmarkResult(name="runner-c4", concurrency=4, latencies_s=[1.0, 2.0], wall_time_s=1.0)
+    baseline = {"results": [{"summary": {**result.summary(), "throughput_per_s": 1.0}}]}
+    table = format_table([result], baseline)
+    assert "| runner-c4 | 4 | 2 | 0 | 2.0 (+100.0%) |" in table
@@ -0,0 +1,123 @@
+"""
+Unit tests for hedged LLM requests.
+Tests the hedge threshold, the hedge budget and which answer wins.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from pipeline import hedging
+from pipeline.hedging import HedgeBudget, HedgedChatOpenAI, LatencyTracker
+
+LATENCIES = {"primary-model": 0.5, "fallback-model": 0.01}
+
+
+def fake_generate(llm, messages, stop=None, run_manager=None, **kwargs):
+    time.sleep(LATENCIES[llm.model_name])
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=llm.model_name))])
+
+
+def make_llm():
+    settings = dict(openai_api_key="test-key", base_url="http://localhost:9")
+    return HedgedChatOpenAI(
+        model="primary-model",
+        hedge_fallback=ChatOpenAI(model="fallback-model", **settings),
+        **settings
+    )
+
+
+def warm_tracker(latency_s=0.02):
+    tracker = LatencyTracker(min_delay_s=0.05)
+    for _ in range(hedging.MIN_SAMPLES):
+        tracker.record("unattributed", latency_s)
+    return tracker
+
+
+def test_threshold_is_bounded_p90_of_history():
+    tracker = LatencyTracker(min_delay_s=1.0)
+    for latency in range(1, hedging.MIN_SAMPLES):
+        tracker.record("stage2", float(latency))
+    assert tracker.threshold("stage2") is None
+
+    tracker.record("stage2", 20.0)
+    assert tracker.threshold("stage2") == 9.0
+    assert tracker.threshold("stage3") is None
+
+    fast = LatencyTracker(min_delay_s=1.0)
+    for _ in range(hedging.MIN_SAMPLES):
+        fast.record("stage2", 0.1)
+    assert fast.threshold("stage2") == 1.0
+
+
+def test_slow_call_is_hedged_to_fallback():
+    with patch.object(ChatOpenAI, "_generate", fake_generate), \
+         patch.object(hedging, "_tracker", warm_tracker()), \
+         patch.object(hedging, "_budget", HedgeBudget(ratio=1.0)):
+        result = make_llm().invoke([HumanMessage(content="hello")])
+
+    # The primary would have answered "primary-model" after 0.5s
+    assert result.content == "fallback-model"
+
+
+def test_budget_bounds_hedges():
+    budget = HedgeBudget(ratio=0.5, burst=1.0)
+    assert budget.try_spend()
+    budget.finish()
+    assert not budget.try_spend()
+    budget.on_request()
+    assert not budget.try_spend()
+    budget.on_request()
+    assert budget.try_spend()
+
+    # One hedge in flight at burst 1, even with tokens to spare
+    budget.on_request()
+    budget.on_request()
+    assert not budget.try_spend()
+    budget.finish()
+    assert budget.try_spend()
+
+    with patch.object(ChatOpenAI, "_generate", fake_generate), \
+         patch.object(hedging, "_tracker", warm_tracker()), \
+         patch.object(hedging, "_budget", HedgeBudget(ratio=0.0)):
+        result = make_llm().invoke([HumanMessage(content="hello")])
+
+    assert result.content == "primary-model"
+
+
+def test_unhedged_calls_run_inline_without_queueing():
+    threads = set()
+
+    def slow_generate(llm, messages, stop=None, run_manager=None, **kwargs):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.3)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=llm.model_name))])
+
+    llm = make_llm()
+    results = []
+
+    def call():
+        results.append(llm.invoke([HumanMessage(content="hello")]).content)
+
+    callers = [threading.Thread(target=call, name=f"caller-{i}") for i in range(40)]
+    with patch.object(ChatOpenAI, "_generate", slow_generate), \
+         patch.object(hedging, "_tracker", LatencyTracker()):
+        started = time.perf_counter()
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join(timeout=5)
+        elapsed = time.perf_counter() - started
+
+    # 40 concurrent 0.3s calls finish together, each on its own caller thread
+    assert results == ["primary-model"] * 40
+    assert elapsed < 0.6
+    assert threads == {caller.name for caller in callers}
@@ -0,0 +1,101 @@
+"""
+Unit tests for per-run timing, token and cost instrumentation.
+Tests that stage spans collect their LLM calls and export to JSON and Prometheus.
+"""
+
+import json
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.messages import AIMessage
+
+from pipeline.instrumentation import (
+    REGISTRY,
+    LLMMetricsCallback,
+    estimate_cost,
+    instrument_stage,
+    record_retry,
+    span,
+    track_run,
+)
+
+
+def fake_llm_result(text, prompt_tokens=None, completion_tokens=None, model="deepseek/deepseek-chat"):
+    llm_output = {"model_name": model}
+    if prompt_tokens is not None:
+        llm_output["token_usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+    return LLMResult(
+        generations=[[ChatGeneration(message=AIMessage(content=text))]],
+        llm_output=llm_output,
+    )
+
+
+def test_llm_calls_attributed_to_stage():
+    callback = LLMMetricsCallback()
+
+    @instrument_stage("stage2")
+    def run_stage():
+        run_id = uuid4()
+        callback.on_chat_model_start({}, [[HumanMessage(content="prompt")]], run_id=run_id)
+        callback.on_llm_end(fake_llm_result("answer", 1000, 500), run_id=run_id)
+        record_retry("stage2", reason="parse error")
+
+    with track_run("test-run") as metrics:
+        run_stage()
+
+    stats = metrics.stage_summary()["stage2"]
+    assert stats["llm_calls"] == 1
+    assert stats["prompt_tokens"] == 1000
+    assert stats["completion_tokens"] == 500
+    assert stats["retries"] == 1
+    assert stats["wall_time_s"] >= 0
+    assert abs(stats["cost_usd"] - estimate_cost("deepseek/deepseek-chat", 1000, 500)) < 1e-9
+    assert metrics.status == "completed"
+
+
+def test_missing_usage_is_estimated():
+    llm = FakeListChatModel(responses=["x" * 400], callbacks=[LLMMetricsCallback()])
+
+    with track_run("estimated-run") as metrics:
+        with span("stage1", kind="stage"):
+            llm.invoke("y" * 400)
+
+    llm_spans = [s for s in metrics.spans if s.kind == "llm"]
+    assert len(llm_spans) == 1
+    assert llm_spans[0].stage == "stage1"
+    assert llm_spans[0].attributes["tokens_estimated"] is True
+    assert llm_spans[0].attributes["completion_tokens"] > 0
+
+
+def test_failed_run_export_and_prometheus(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_PRICING", json.dumps({"test/model": [1.0, 2.0]}))
+    assert estimate_cost("test/model", 1_000_000, 1_000_000) == 3.0
+    assert estimate_cost("unknown/model", 10, 10) is None
+
+    try:
+        with track_run("failing-run") as metrics:
+            with span("pdf_extraction", kind="io"):
+                raise RuntimeError("corrupt PDF")
+    except RuntimeError:
+        pass
+
+    metrics.annotations["semantic_cache"] = {"cached": True, "source_run": "run-1"}
+    metrics_file = metrics.export_json(tmp_path / "metrics.json")
+    data = json.loads(metrics_file.read_text())
+    assert data["status"] == "failed"
+    assert data["annotations"]["semantic_cache"]["source_run"] == "run-1"
+    assert data["spans"][0]["error"] == "RuntimeError: corrupt PDF"
+
+    text = REGISTRY.render_prometheus()
+    assert "# TYPE pipeline_span_duration_seconds histogram" in text
+    assert 'pipeline_runs_total{status="failed"}' in text
+    assert 'pipeline_span_errors_total{kind="io",name="pdf_extraction"}' in text
@@ -0,0 +1,38 @@
+"""
+Unit tests for append-only JSONL files shared between processes.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.jsonl_log import AppendOnlyJsonl
+
+
+def test_reads_resume_and_wait_for_partial_lines(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"key": "a"}\nnot json\n{"key": "b"')
+    log = AppendOnlyJsonl(path, "test log")
+
+    assert log.read_new() == [{"key": "a"}]
+
+    with open(path, "ab") as f:
+        f.write(b', "done": true}\n')
+    assert log.read_new() == [{"key": "b", "done": True}]
+    assert log.read_new() == []
+
+
+def test_own_appends_skipped_and_other_writers_read(tmp_path):
+    path = tmp_path / "nested" / "log.jsonl"
+    first, second = AppendOnlyJsonl(path), AppendOnlyJsonl(path)
+    assert first.read_new() == []
+
+    first.append({"key": "from-first", "text": "café"})
+    assert first.read_new() == []
+    assert second.read_new() == [{"key": "from-first", "text": "café"}]
+
+    # Another writer appended first, so our own line is read back too
+    second.append({"key": "from-second"})
+    first.append({"key": "first-again"})
+    assert first.read_new() == [{"key": "from-second"}, {"key": "first-again"}]
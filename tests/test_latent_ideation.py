@@ -0,0 +1,81 @@
+"""
+Tests for the batched latent ideation swarm (notebook/latent_ideation.py).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "notebook"))
+
+from latent_ideation import Swarm, SwarmAgent, SwarmQueen, VectorHistory, explore_batch
+
+
+def test_explore_batch_matches_per_agent_loop():
+    torch.manual_seed(0)
+    queen_pool, peer_pool, guidance = torch.randn(5, 16), torch.randn(30, 16), torch.randn(16)
+    alpha = torch.linspace(0.2, 0.9, 8)
+    noise_scale = torch.linspace(0.0, 0.1, 8)
+
+    batched = explore_batch(queen_pool, peer_pool, guidance, alpha, noise_scale, torch.Generator().manual_seed(7))
+
+    # Same random draws, applied one agent at a time as the original loop did
+    generator = torch.Generator().manual_seed(7)
+    queen_idx = torch.randint(len(queen_pool), (8,), generator=generator)
+    peer_idx = torch.randint(len(peer_pool), (8,), generator=generator)
+    noise = torch.randn((8, 16), generator=generator)
+    for i in range(8):
+        primary = alpha[i] * queen_pool[queen_idx[i]] + (1 - alpha[i]) * peer_pool[peer_idx[i]]
+        expected = 0.8 * primary + 0.2 * guidance + noise_scale[i] * noise[i]
+        assert torch.allclose(batched[i], expected, atol=1e-6)
+
+    swarm = Swarm(8, seed=3)
+    assert swarm.explore(queen_pool, peer_pool, guidance).shape == (8, 16)
+    assert SwarmAgent(0).explore(queen_pool, peer_pool, guidance).shape == (16,)
+
+
+def test_queen_feedback_matches_per_agent_loop():
+    torch.manual_seed(1)
+    vectors = torch.randn(4, 8)
+    scores = [5.0, 3.0, 4.0, 3.5]
+    queen = SwarmQueen(num_agents=4, vector_dim=8, device=torch.device("cpu"))
+
+    queen.process_feedback(vectors, scores)
+
+    reward = sum(scores) / len(scores)
+    weights = [min(1.5, 1.0 * (1 + reward * 0.1)) for _ in scores]
+    assert torch.allclose(queen.agent_weights, torch.tensor(weights))
+
+    influence = torch.tensor([score / 5.0 * weight for score, weight in zip(scores, weights)])
+    coefficients = torch.softmax(influence / queen.temperature, dim=0)
+    expected = sum(0.1 * coefficients[i] * vectors[i] for i in range(4))
+    assert torch.allclose(queen.get_guidance(), expected / torch.linalg.norm(expected), atol=1e-6)
+
+    # Dict input (agent id -> vector) gives the same update
+    by_agent = SwarmQueen(num_agents=4, vector_dim=8, device=torch.device("cpu"))
+    by_agent.process_feedback({i: vectors[i] for i in reversed(range(4))}, scores)
+    assert torch.allclose(by_agent.get_guidance(), queen.get_guidance())
+
+    # A drop in average score lowers the weights, never below 0.5
+    queen.process_feedback(vectors, [0.0] * 4)
+    assert torch.allclose(queen.agent_weights, torch.tensor(weights) * (1 - reward * 0.1))
+    by_agent.process_feedback(vectors, [-10.0] * 4)
+    assert torch.all(by_agent.agent_weights == 0.5)
+
+
+def test_vector_history_wraps_around():
+    history = VectorHistory(capacity=4, dim=2)
+    history.extend(torch.tensor([[0.0, 0.0], [1.0, 1.0], [2.0, 2.0]]), [0.0, 1.0, 2.0])
+    assert history.size == 3
+
+    history.extend(torch.tensor([[3.0, 3.0], [4.0, 4.0]]), [3.0, 4.0])
+    assert history.size == 4
+    assert history.scores.tolist() == [4.0, 1.0, 2.0, 3.0]  # Oldest entry overwritten
+    assert history.vectors[:, 0].tolist() == [4.0, 1.0, 2.0, 3.0]
+
+    # A batch larger than the buffer keeps its newest rows
+    history.extend(torch.arange(12.0).reshape(6, 2), [10.0, 11.0, 12.0, 13.0, 14.0, 15.0])
+    assert sorted(history.scores.tolist()) == [12.0, 13.0, 14.0, 15.0]
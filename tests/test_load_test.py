@@ -0,0 +1,65 @@
+"""
+Unit tests for the backend load test's report analysis.
+Tests saturation detection, event-loop lag parsing and the fake server.
+"""
+
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fake_llm_server import FakeLLMServer
+from benchmarks.load_test import find_saturation, parse_histogram
+from pipeline.instrumentation import MetricsRegistry
+
+
+def step(concurrency, throughput, p95, error_rate=0.0):
+    return {
+        "concurrency": concurrency,
+        "throughput_per_min": throughput,
+        "latency_p95_s": p95,
+        "error_rate": error_rate,
+    }
+
+
+def test_find_saturation():
+    ramp = [step(1, 10, 5.0), step(2, 19, 5.5), step(4, 36, 6.0), step(8, 37, 9.0)]
+    result = find_saturation(ramp)
+    assert result["max_sustainable_concurrency"] == 4
+    assert result["saturated_at"] == 8
+    assert "throughput" in result["reason"]
+
+    errors = find_saturation([step(1, 10, 5.0), step(2, 19, 5.5, error_rate=0.05)])
+    assert errors["saturated_at"] == 2
+    assert "error rate" in errors["reason"]
+
+    latency = find_saturation([step(1, 10, 5.0), step(2, 19, 11.0)])
+    assert latency["saturated_at"] == 2
+
+    assert find_saturation([step(1, 10, 5.0), step(2, 19, 5.5)])["saturated_at"] is None
+
+
+def test_parse_histogram():
+    registry = MetricsRegistry()
+    for lag in (0.01, 0.02, 0.3):
+        registry.observe("api_event_loop_lag_seconds", lag, "Event loop wake-up delay")
+
+    values = parse_histogram(registry.render_prometheus(), "api_event_loop_lag_seconds")
+    assert values["count"] == 3
+    assert round(values["sum"], 2) == 0.33
+    assert values["0.1"] == 2
+
+
+def test_blob_and_first_callback():
+    with FakeLLMServer() as server:
+        blob_url = server.add_blob("input.pdf", b"%PDF-1.4 test")
+        assert requests.get(blob_url).content == b"%PDF-1.4 test"
+        assert requests.get(f"{server.url}/blob/missing.pdf").status_code == 404
+
+        assert server.first_callback_at("run-1") is None
+        requests.post(f"{server.url}/api/pipeline/run-1/stage-update", json={"stageNumber": 1, "status": "PROCESSING"})
+        first = server.first_callback_at("run-1")
+        requests.post(f"{server.url}/api/pipeline/run-1/complete", json={"status": "COMPLETED"})
+        assert server.first_callback_at("run-1") == first
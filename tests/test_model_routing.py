@@ -0,0 +1,118 @@
+"""
+Unit tests for per-stage model routing.
+Tests routing files, model fallback and the routing report.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from pipeline import model_routing
+from pipeline.model_routing import (
+    RoutedChatModel,
+    RoutingConfig,
+    parse_route_overrides,
+    route_overrides,
+    split_model,
+)
+from scripts.routing_report import find_metrics_files, summarize
+
+ROUTING_YAML = """
+endpoints:
+  local:
+    base_url: http://localhost:11434/v1
+stages:
+  stage1:
+    models: [openai/gpt-4o-mini, deepseek/deepseek-chat]
+  stage2:
+    model: local:qwen2.5:14b
+    max_tokens: 2000
+"""
+
+
+def test_routes_endpoints_and_overrides(tmp_path):
+    path = tmp_path / "routing.yaml"
+    path.write_text(ROUTING_YAML)
+    config = RoutingConfig.load(path)
+
+    assert config.route("stage1", "default-model").models == ["openai/gpt-4o-mini", "deepseek/deepseek-chat"]
+    assert config.route("stage5", "default-model").models == ["default-model"]
+    endpoint, model = split_model(config.route("stage2", "default-model").models[0], config.endpoints)
+    assert (endpoint.base_url, model) == ("http://localhost:11434/v1", "qwen2.5:14b")
+    assert split_model("meta/llama:free", config.endpoints) == (None, "meta/llama:free")
+
+    overrides = parse_route_overrides(["stage2=fast-model,slow-model"])
+    with route_overrides(overrides):
+        route = config.route("stage2", "default-model")
+        assert route.models == ["fast-model", "slow-model"]
+        assert route.max_tokens == 2000
+    assert config.route("stage2", "default-model").models == ["local:qwen2.5:14b"]
+
+    with pytest.raises(ValueError):
+        parse_route_overrides(["stage2"])
+
+
+def test_failing_model_falls_back_to_next():
+    built = []
+
+    class FakeClient:
+        def __init__(self, model, endpoint, temperature, max_tokens):
+            self.model = model
+            built.append((model, temperature, max_tokens))
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            if self.model == "down-model":
+                raise ConnectionError("upstream unavailable")
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.model))])
+
+    config = RoutingConfig()
+    with patch.object(model_routing, "_config", config), patch.dict(model_routing._clients, clear=True):
+        llm = RoutedChatModel(
+            stage="stage3", temperature=0.5, max_tokens=3500,
+            default_model="default-model", client_factory=FakeClient
+        )
+        with route_overrides({"stage3": ["down-model", "backup-model"]}):
+            result = llm.invoke([HumanMessage(content="hello")])
+        assert llm.invoke([HumanMessage(content="hello")]).content == "default-model"
+
+    assert result.content == "backup-model"
+    assert built[:2] == [("down-model", 0.5, 3500), ("backup-model", 0.5, 3500)]
+
+
+def test_report_groups_spans_by_stage_and_model():
+    def llm_span(stage, model, duration, cost, error=None):
+        return {
+            "kind": "llm", "stage": stage, "duration_s": duration, "error": error,
+            "attributes": {"model": model, "cost_usd": cost, "prompt_tokens": 100, "completion_tokens": 50},
+        }
+
+    summary = summarize([
+        llm_span("stage1", "fast", 2.0, 0.001),
+        llm_span("stage1", "fast", 4.0, 0.003),
+        llm_span("stage1", "slow", 20.0, 0.02),
+        llm_span("stage1", "slow", 60.0, None, error="Timeout"),
+        {"kind": "stage", "stage": "stage1", "duration_s": 90.0, "attributes": {}},
+    ])
+
+    assert set(summary["stage1"]) == {"fast", "slow"}
+    assert summary["stage1"]["fast"]["p50_latency_s"] == 3.0  # Same percentile as the benchmarks
+    assert summary["stage1"]["fast"]["total_cost_usd"] == 0.004
+    assert summary["stage1"]["slow"]["failures"] == 1
+    assert summary["stage1"]["slow"]["p90_latency_s"] == 20.0
+
+
+def test_report_finds_batch_and_nested_web_runs(tmp_path):
+    batch = tmp_path / "savannah-bananas-lactalis-canada-20251007-160745" / "metrics.json"
+    web = tmp_path / "savannah-bananas" / "run-1760000000" / "metrics.json"
+    for path in (batch, web):
+        path.parent.mkdir(parents=True)
+        path.write_text("{}")
+
+    assert set(find_metrics_files([str(tmp_path), str(tmp_path / "missing")])) == {batch, web}
@@ -0,0 +1,95 @@
+"""
+Unit tests for the MinHash/LSH novelty index.
+Tests near-duplicate lookup, persistence and Stage 5 novelty scoring.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline import novelty_index
+from pipeline.novelty_index import NoveltyIndex, card_key, index_cards
+from pipeline.stages.stage5_opportunity_generation import Stage5Chain
+from scripts.opportunity_corpus import load_corpus
+from scripts.update_novelty_index import near_duplicates
+
+
+def random_text(rng, n_words=120):
+    return " ".join(f"word{rng.randint(0, 5000)}" for _ in range(n_words))
+
+
+def test_query_finds_near_duplicates_only():
+    rng = random.Random(3)
+    index = NoveltyIndex()
+    texts = [random_text(rng) for _ in range(500)]
+    for i, text in enumerate(texts):
+        index.add(f"card-{i}", text)
+
+    words = texts[7].split()
+    words[40] = "changed"
+    matches = index.query(" ".join(words))
+
+    assert [key for key, _ in matches] == ["card-7"]
+    assert matches[0][1] >= 0.8
+    assert index.query(random_text(rng)) == []
+    assert index.novelty(texts[7], exclude="card-7") == 1.0
+    assert index.add("card-7", texts[7]) is False
+
+
+def test_history_file_reload_and_refresh(tmp_path):
+    path = tmp_path / "history.jsonl"
+    writer = NoveltyIndex(path)
+    writer.add("a", "fans dance on the dugout roof during the seventh inning", {"title": "Dance"})
+
+    reader = NoveltyIndex(path)
+    assert len(reader) == 1
+    assert reader.get_metadata("a") == {"title": "Dance"}
+
+    writer.add("b", "a second unrelated card about recyclable spice jars and refills")
+    assert reader.refresh() == 1
+    assert "b" in reader
+    assert reader.refresh() == 0
+
+
+def test_stage5_annotates_novelty_against_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOVELTY_INDEX_PATH", str(tmp_path / "history.jsonl"))
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setenv("OPENROUTER_BASE_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(novelty_index, "_indexes", {})
+    seen = "Turn every grocery aisle into a mini stadium with cheering cheese samples and live commentary"
+    opportunities = [{"title": "Stadium aisle", "description": seen}] + [
+        {"title": f"Other {i}", "description": f"Subscription spice refills number {i} delivered with seasonal recipe cards"}
+        for i in range(4)
+    ]
+
+    run_1, run_2 = "savannah-bananas-lactalis-canada-20251007-160745", "savannah-bananas-decathlon-20251008-091200"
+    chain = Stage5Chain()
+    first = [dict(o) for o in opportunities]
+    chain._annotate_novelty(first, "lactalis-canada", "savannah-bananas")
+    chain.render_opportunity_cards(first, "lactalis-canada", "savannah-bananas", tmp_path / run_1)
+    assert len(novelty_index.get_history_index()) == 5
+
+    chain._annotate_novelty(opportunities, "Decathlon", "savannah-bananas")
+    chain.render_opportunity_cards(opportunities, "Decathlon", "savannah-bananas", tmp_path / run_2)
+
+    assert opportunities[0]["novelty_score"] == 0.0
+    assert opportunities[0]["similar_opportunities"][0]["brand"] == "lactalis-canada"
+    assert opportunities[1]["similar_opportunities"][0]["title"] == "Other 0"
+
+    # The batch script sees the same saved cards: nothing is indexed twice and
+    # no card is reported as a duplicate of itself
+    index = novelty_index.get_history_index()
+    assert len(index) == 10
+    cards = load_corpus(tmp_path, cache_path=None)
+    assert index_cards(index, cards) == 0
+    assert index_cards(NoveltyIndex(tmp_path / "history.jsonl"), cards) == 0
+    assert {index.get_metadata(card_key(card["path"]))["brand"] for card in cards} == {"lactalis-canada", "decathlon"}
+    assert all(index.get_metadata(card_key(card["path"]))["brand"] == card["brand"] for card in cards)
+
+    pairs = near_duplicates(index, cards)
+    assert len(pairs) == 5
+    for card, key, _ in pairs:
+        assert index.get_metadata(key)["title"] == card["title"]
+        assert key != card_key(card["path"])
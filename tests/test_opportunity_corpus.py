@@ -0,0 +1,79 @@
+"""
+Unit tests for the shared opportunity corpus loader.
+Tests card discovery, caching and the section layout the scoring scripts expect.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.opportunity_corpus import (
+    load_corpus,
+    load_opportunity_files,
+    parse_opportunity_text,
+    scan_opportunity_files,
+)
+
+
+CARD = "# {title}\n\n## Description\n\n{description}\n\n## Actionability\n\n- Pilot in Q1\n"
+
+
+def write_card(run_dir, number, title):
+    stage5 = run_dir / "stage5"
+    stage5.mkdir(parents=True, exist_ok=True)
+    path = stage5 / f"opportunity-{number}.md"
+    path.write_text(CARD.format(title=title, description=f"About {title}."), encoding="utf-8")
+    return path
+
+
+def test_scan_finds_cards_with_scenario_info(tmp_path):
+    write_card(tmp_path / "savannah-bananas-decathlon-20251007-160745", 2, "B")
+    write_card(tmp_path / "savannah-bananas-decathlon-20251007-160745", 1, "A")
+    (tmp_path / "empty-run" / "stage5").mkdir(parents=True)
+    (tmp_path / "stray.txt").write_text("", encoding="utf-8")
+
+    entries = scan_opportunity_files(tmp_path)
+
+    assert [e['opportunity_number'] for e in entries] == [1, 2]
+    assert entries[0]['input_source'] == "savannah-bananas"
+    assert entries[0]['brand'] == "decathlon"
+    assert scan_opportunity_files(tmp_path / "missing") == []
+
+
+def test_cache_reparses_only_changed_cards(tmp_path, monkeypatch):
+    from scripts import opportunity_corpus
+
+    run_dir = tmp_path / "outputs" / "cat-dad-mccormick-usa-20251007-165319"
+    first = write_card(run_dir, 1, "First")
+    second = write_card(run_dir, 2, "Second")
+    cache_path = tmp_path / "cache.jsonl"
+
+    parsed_paths = []
+    original = opportunity_corpus._parse_file
+    monkeypatch.setattr(opportunity_corpus, "_parse_file", lambda p: parsed_paths.append(p) or original(p))
+
+    cards = load_corpus(tmp_path / "outputs", cache_path=cache_path)
+    assert [c['title'] for c in cards] == ["First", "Second"]
+    assert len(parsed_paths) == 2
+
+    parsed_paths.clear()
+    load_corpus(tmp_path / "outputs", cache_path=cache_path)
+    assert parsed_paths == []
+
+    second.write_text(CARD.format(title="Second v2", description="Changed."), encoding="utf-8")
+    os.utime(second, ns=(second.stat().st_atime_ns, second.stat().st_mtime_ns + 10**9))
+    cards = load_opportunity_files([first, second], cache_path=cache_path)
+    assert parsed_paths == [str(second)]
+    assert cards[str(second)]['title'] == "Second v2"
+    assert cards[str(first)]['title'] == "First"
+
+
+def test_parse_extracts_sections():
+    card = parse_opportunity_text(CARD.format(title="Title", description="Body text."))
+
+    assert card['title'] == "Title"
+    assert card['description'] == "Body text."
+    assert card['actionability'] == "- Pilot in Q1"
+    assert card['full_content'].startswith("# Title")
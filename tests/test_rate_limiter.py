@@ -0,0 +1,120 @@
+"""
+Unit tests for the shared OpenRouter rate limiter.
+Tests token buckets, cross-process sharing and 429 handling.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.deadlines import DeadlineExceeded, call_with_deadline, run_deadline
+from pipeline.rate_limiter import RateLimitedTransport, RateLimiter
+
+
+def test_tokens_refill_and_waiters_are_fifo():
+    limiter = RateLimiter(tpm=60_000)  # 1000 tokens/s
+    assert limiter.acquire(60_000) < 0.05
+
+    order = []
+
+    def caller(name, tokens):
+        limiter.acquire(tokens)
+        order.append(name)
+
+    large = threading.Thread(target=caller, args=("large", 200))
+    small = threading.Thread(target=caller, args=("small", 10))
+    large.start()
+    time.sleep(0.02)
+    small.start()
+    large.join(timeout=5)
+    small.join(timeout=5)
+
+    # The small request would fit sooner but queued behind the large one
+    assert order == ["large", "small"]
+
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    db_path = tmp_path / "limits.db"
+    worker_a = RateLimiter(rpm=2, db_path=db_path)
+    worker_b = RateLimiter(rpm=2, db_path=db_path)
+
+    assert worker_a._buckets.reserve(0) == 0
+    assert worker_a._buckets.reserve(0) == 0
+    assert worker_b._buckets.reserve(0) > 25  # Next slot in ~30s
+
+    worker_b.pause(120)
+    assert worker_a._buckets.reserve(0) > 100
+
+
+def test_transport_honors_retry_after_and_usage():
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"}, json={"error": "rate limited"})
+        return httpx.Response(200, json={
+            "id": "1", "object": "chat.completion", "created": 0, "model": "test",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    limiter = RateLimiter(tpm=100_000)
+    transport = RateLimitedTransport(limiter, httpx.MockTransport(handler))
+    client = openai.OpenAI(
+        api_key="test", base_url="http://openrouter.test/v1", max_retries=0,
+        http_client=httpx.Client(transport=transport)
+    )
+
+    response = client.chat.completions.create(
+        model="test", max_tokens=1000, messages=[{"role": "user", "content": "hello"}]
+    )
+
+    assert response.choices[0].message.content == "ok"
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.2
+    # ~1000 tokens reserved up front, refunded down to the 15 used
+    assert limiter._buckets._tokens > 100_000 - 100
+
+
+def test_waits_bounded_by_deadline_and_429s_retried_once():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "0.01"}, json={"error": "rate limited"})
+
+    def client_for(limiter):
+        transport = RateLimitedTransport(limiter, httpx.MockTransport(handler), max_retries=1)
+        return openai.OpenAI(
+            api_key="test", base_url="http://openrouter.test/v1", max_retries=0,
+            http_client=httpx.Client(transport=transport)
+        )
+
+    def complete(client):
+        return call_with_deadline(
+            lambda timeout: client.chat.completions.create(
+                model="test", max_tokens=10, messages=[{"role": "user", "content": "hello"}], timeout=timeout
+            ),
+            "test call"
+        )
+
+    # Next request slot is ~60s away, past the run's 2s deadline
+    drained = RateLimiter(rpm=1)
+    drained.acquire()
+    started = time.monotonic()
+    with run_deadline(2), pytest.raises(DeadlineExceeded):
+        complete(client_for(drained))
+    assert time.monotonic() - started < 1 and not calls
+
+    # The transport's own retry is the only one: 2 requests, not 2 per call_with_deadline attempt
+    with run_deadline(30), pytest.raises(openai.RateLimitError):
+        complete(client_for(RateLimiter(rpm=6000)))
+    assert len(calls) == 2
@@ -0,0 +1,86 @@
+"""
+Unit tests for the vectorized rubric scoring engine.
+Tests that it scores cards exactly like the per-card scoring functions.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.auto_score_opportunities import (
+    parse_opportunity,
+    score_actionability,
+    score_novelty,
+    score_relevance,
+    score_specificity,
+)
+from scripts.rubric_engine import BRAND_ALIGNMENT_TERMS, RubricEngine, TermMatcher
+
+
+EXAMPLE_CARDS = Path(__file__).parent.parent / "data" / "examples" / "opportunity-cards"
+
+
+def reference_scores(opportunity, brand):
+    return [
+        score_novelty(opportunity, brand, ""),
+        score_actionability(opportunity),
+        score_relevance(opportunity, brand),
+        score_specificity(opportunity),
+    ]
+
+
+def synthetic_card(rng, vocabulary):
+    def phrase(count):
+        words = rng.choices(vocabulary + ["the", "brand", "new", "AND", "İstanbul", "-"], k=count)
+        return " ".join(w.upper() if rng.random() < 0.1 else w for w in words)
+
+    bullets = "".join(f"\n- {phrase(rng.randint(2, 8))}" for _ in range(rng.randint(0, 5)))
+    actionability = f"{phrase(rng.randint(0, 6))}{bullets}" if rng.random() < 0.9 else ""
+    content = (
+        f"# {phrase(4)}\n\n## Description\n\n{phrase(rng.randint(10, 120))}\n\n"
+        + (f"## Actionability\n\n{actionability}\n\n" if actionability else "")
+        + f"## Visual\n\n{phrase(rng.randint(0, 20))}\n"
+    )
+    return content
+
+
+def test_term_matcher_overlapping_counts():
+    matcher = TermMatcher(["q1", "q", "month", "months", "on"])
+    counts = matcher.count_matrix(["Q1 and q2 over six MONTHS, month on month"])
+    by_term = dict(zip(matcher.vocabulary, counts[0]))
+    assert by_term == {"month": 3, "months": 1, "on": 4, "q": 2, "q1": 1}
+
+
+def test_engine_matches_reference_on_example_cards(tmp_path):
+    cards, brands = [], []
+    for path in sorted(EXAMPLE_CARDS.glob("*.md")):
+        for brand in BRAND_ALIGNMENT_TERMS:
+            cards.append(parse_opportunity(path))
+            brands.append(brand)
+
+    scores = RubricEngine().score(cards, brands)
+    expected = [reference_scores(card, brand) for card, brand in zip(cards, brands)]
+    assert scores.tolist() == expected
+
+
+def test_engine_matches_reference_on_synthetic_cards(tmp_path):
+    rng = random.Random(7)
+    engine = RubricEngine()
+    vocabulary = engine.matcher.vocabulary + ["by", "q", "mon", "plat"]
+    brands = list(BRAND_ALIGNMENT_TERMS) + ["unknown-brand"]
+
+    cards, card_brands = [], []
+    for i in range(300):
+        path = tmp_path / f"opportunity-{i}.md"
+        path.write_text(synthetic_card(rng, vocabulary), encoding="utf-8")
+        cards.append(parse_opportunity(path))
+        card_brands.append(rng.choice(brands))
+
+    scores = engine.score(cards, card_brands)
+    expected = np.array([reference_scores(card, brand) for card, brand in zip(cards, card_brands)])
+    assert (scores == expected).all()
+    assert np.array_equal(engine.overall(scores), [round(sum(row) / 4, 1) for row in expected])
@@ -0,0 +1,91 @@
+"""
+Unit tests for the Stage 1-3 semantic cache.
+Tests hits and misses, persistence across instances and cached stage outputs.
+"""
+
+import random
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.embeddings import EmbeddingService, HashingEmbedder
+from pipeline.instrumentation import REGISTRY
+from pipeline.semantic_cache import SemanticStageCache
+from scripts import run_pipeline
+
+OUTPUTS = {"stage1_output": "inspirations", "stage2_output": "trends", "stage3_output": "lessons"}
+
+
+def report(seed, n_words=3000):
+    rng = random.Random(seed)
+    return " ".join(f"term{rng.randint(0, 4000)}" for _ in range(n_words))
+
+
+def make_cache(path, dim=1024, threshold=0.98):
+    return SemanticStageCache(path, EmbeddingService(HashingEmbedder(dim)), threshold=threshold)
+
+
+def test_lookup_matches_near_identical_documents(tmp_path):
+    cache = make_cache(tmp_path / "cache.jsonl")
+    original = report(1)
+    cache.store(original, OUTPUTS, source="run-1")
+
+    reexport = "Exported 2026-10-19 " + original.replace("term12 ", "term12, ", 1) + " Page 1 of 40"
+    hit = cache.lookup(reexport)
+    assert hit is not None and not hit.exact
+    assert hit.outputs == OUTPUTS
+    assert hit.similarity >= 0.98
+    assert hit.provenance()["source_run"] == "run-1"
+
+    assert cache.lookup(original).exact
+    assert cache.lookup(report(2)) is None
+    assert cache.lookup(original, force_recompute=True) is None
+
+    text = REGISTRY.render_prometheus()
+    assert 'pipeline_semantic_cache_lookups_total{result="hit"}' in text
+    assert 'pipeline_semantic_cache_lookups_total{result="miss"}' in text
+
+
+def test_entries_persist_and_respect_model(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    writer = make_cache(path)
+    reader = make_cache(path)
+    writer.store(report(3), OUTPUTS, source="run-3")
+
+    assert reader.lookup(report(3)).source == "run-3"
+    assert len(make_cache(path)) == 1
+    assert len(make_cache(path, dim=256)) == 0
+
+
+def test_vector_buffer_grows_by_doubling(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    cache = make_cache(path, dim=256)
+    for seed in range(100):
+        cache.store(report(seed, n_words=200), OUTPUTS, source=f"run-{seed}")
+    cache.store(report(5, n_words=200), OUTPUTS, source="run-5-again")  # Supersedes in place
+
+    assert len(cache) == 100
+    assert len(cache._vectors) == 128
+    assert cache.lookup(report(99, n_words=200)).source == "run-99"
+    assert cache.lookup(report(5, n_words=200)).source == "run-5-again"
+    assert make_cache(path, dim=256).lookup(report(70, n_words=200) + " term1").source == "run-70"
+
+
+def test_run_stages_1_to_3_serves_cached_outputs(tmp_path):
+    cache = make_cache(tmp_path / "cache.jsonl")
+    document = report(4)
+    cache.store(document, OUTPUTS, source="earlier-input")
+
+    with patch.object(run_pipeline, "get_semantic_cache", return_value=cache), \
+         patch.object(run_pipeline, "load_input_document", return_value=document + " (revised)"), \
+         patch.object(run_pipeline, "create_stage1_chain") as stage1, \
+         patch.object(run_pipeline, "create_stage2_chain") as stage2, \
+         patch.object(run_pipeline, "create_stage3_chain") as stage3:
+        result = run_pipeline.run_stages_1_to_3("new-input")
+
+    for factory in (stage1, stage2, stage3):
+        factory.assert_not_called()
+    assert result["stage3_output"] == "lessons"
+    assert result["semantic_cache"]["source_run"] == "earlier-input"
@@ -0,0 +1,76 @@
+"""
+Tests for the persistent solution space and its IVF index (notebook/solution_space.py).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "notebook"))
+
+from solution_space import IVFIndex, SolutionSpace
+
+
+def clustered_vectors(count=3000, dim=32, clusters=40, seed=0):
+    """Normalized vectors scattered around random cluster centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=count)] + 0.3 * rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def brute_force(vectors, query, k):
+    scores = vectors @ (query / np.linalg.norm(query))
+    return np.argsort(-scores, kind="stable")[:k], np.sort(scores)[::-1][:k]
+
+
+def test_build_save_load_round_trip(tmp_path):
+    vectors = clustered_vectors(count=500)
+    texts = [f"concept {i}" for i in range(len(vectors))]
+    encode_calls = []
+
+    def encode(batch):
+        encode_calls.append(len(batch))
+        return vectors[[int(text.split()[1]) for text in batch]] * 3.0  # Unnormalized on purpose
+
+    built = SolutionSpace.build(tmp_path / "space", texts, encode, batch_size=128, n_lists=20)
+    loaded = SolutionSpace.load(tmp_path / "space")
+
+    assert encode_calls == [128, 128, 128, 116]
+    assert loaded.texts == texts and len(loaded) == 500
+    assert np.allclose(np.asarray(loaded.vectors), vectors, atol=1e-6)
+    for name in ("centroids", "offsets", "ids"):
+        assert np.array_equal(getattr(loaded.index, name), getattr(built.index, name))
+    query = vectors[42] + 0.05
+    assert loaded.search(query, k=5) == built.search(query, k=5)
+    assert loaded.search(vectors[42], k=1)[0][0] == "concept 42"
+
+
+def test_search_is_exact_when_probing_every_list():
+    vectors = clustered_vectors()
+    index = IVFIndex.train(vectors, n_lists=50)
+    assert index.offsets[-1] == len(vectors)
+    assert np.array_equal(np.sort(index.ids), np.arange(len(vectors)))
+
+    rng = np.random.default_rng(1)
+    for query in rng.normal(size=(20, vectors.shape[1])).astype(np.float32):
+        ids, scores = index.search(vectors, query, k=10, nprobe=50)
+        expected_ids, expected_scores = brute_force(vectors, query, 10)
+        assert np.array_equal(ids, expected_ids)
+        assert np.allclose(scores, expected_scores, atol=1e-5)
+
+
+def test_recall_against_brute_force():
+    vectors = clustered_vectors()
+    index = IVFIndex.train(vectors, n_lists=50)
+
+    rng = np.random.default_rng(2)
+    queries = vectors[rng.choice(len(vectors), size=100, replace=False)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+    found = 0
+    for query in queries:
+        ids, _ = index.search(vectors, query, k=10, nprobe=2)
+        found += len(set(ids) & set(brute_force(vectors, query, 10)[0]))
+
+    assert found / (10 * len(queries)) >= 0.95
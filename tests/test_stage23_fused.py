@@ -0,0 +1,92 @@
+"""
+Unit tests for the fused Stage 2+3 mode.
+Tests splitting the fused response and falling back to separate calls.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline import dag as dag_module
+from pipeline.chain_pool import ChainPool
+from pipeline.dag import build_stage_dag
+from pipeline.stages.stage23_fused_analysis import split_fused_output
+
+STAGE2 = "## Innovation Type Analysis\n\n### Primary Innovation Types Activated\n\nCustomer Engagement."
+STAGE3 = "## Job Architecture Mapping\n\n### Core Jobs Being Served\n\nBe entertained without planning."
+
+
+class FakeChain:
+    def __init__(self, calls, name, result):
+        self.calls, self.name, self.result = calls, name, result
+
+    def run(self, *args):
+        self.calls.append((self.name, args))
+        return self.result(*args)
+
+
+def run_dag(calls, fused_output):
+    def factory(name, result):
+        return lambda: FakeChain(calls, name, result)
+
+    factories = (
+        factory("stage1", lambda text: {"stage1_output": f"Mechanisms from {text}"}),
+        factory("stage2", lambda s1: {"stage2_output": STAGE2}),
+        factory("stage3", lambda s1, s2: {"stage3_output": STAGE3, "stage2_output": s2}),
+        factory("stage4", lambda s3, profile, research: {"stage4_output": f"Brand view of {s3}"}),
+        factory("stage5", lambda s4, brand, source: {"opportunities": []}),
+    )
+
+    def fused_run(text):
+        calls.append(("stage23", (text,)))
+        stage2_output, stage3_output = split_fused_output(fused_output)
+        return {"stage2_output": stage2_output, "stage3_output": stage3_output}
+
+    fused_chain = type("FusedChain", (), {"run": staticmethod(fused_run)})
+    with patch.object(dag_module, "get_chain_pool", return_value=ChainPool()), \
+            patch.object(dag_module, "create_stage23_chain", fused_chain):
+        dag = build_stage_dag(factories, fused=True)
+        return dag.run({
+            "input_text": "a report", "brand_profile": {}, "research_data": "",
+            "brand_name": "Brand", "input_source": "test",
+        }).values
+
+
+def test_fused_output_is_split_into_stage_outputs():
+    assert split_fused_output(f"<stage2>\n{STAGE2}\n</stage2>\n<stage3>\n{STAGE3}\n</stage3>") == (STAGE2, STAGE3)
+
+    # Cut off at max_tokens: the last part has no closing tag
+    assert split_fused_output(f"<stage2>{STAGE2}</stage2>\n<stage3>\n{STAGE3}") == (STAGE2, STAGE3)
+
+    # Tags dropped: split at the Stage 3 heading
+    assert split_fused_output(f"{STAGE2}\n\n{STAGE3}") == (STAGE2, STAGE3)
+
+    with pytest.raises(ValueError):
+        split_fused_output(STAGE2)
+    with pytest.raises(ValueError):
+        split_fused_output(f"<stage2>{STAGE2}</stage2><stage3></stage3>")
+
+
+def test_fused_dag_makes_one_call_for_stages_2_and_3():
+    calls = []
+    values = run_dag(calls, f"<stage2>{STAGE2}</stage2><stage3>{STAGE3}</stage3>")
+
+    assert [name for name, _ in calls] == ["stage1", "stage23", "stage4", "stage5"]
+    assert calls[1][1] == ("Mechanisms from a report",)
+    assert values["stage2"] == {"stage2_output": STAGE2}
+    assert values["stage3"] == {"stage3_output": STAGE3}
+    assert values["stage4"]["stage4_output"] == f"Brand view of {STAGE3}"
+
+
+def test_unsplittable_response_falls_back_to_separate_stages():
+    calls = []
+    values = run_dag(calls, "Sorry, I can only answer one question at a time.")
+
+    assert [name for name, _ in calls] == ["stage1", "stage23", "stage2", "stage3", "stage4", "stage5"]
+    assert calls[3][1] == ("Mechanisms from a report", STAGE2)
+    assert values["stage2"] == {"stage2_output": STAGE2}
+    assert values["stage3"] == {"stage3_output": STAGE3}
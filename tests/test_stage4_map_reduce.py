@@ -0,0 +1,168 @@
+"""
+Unit tests for map-reduce Stage 4 contextualization.
+Tests concurrent lessons, per-lesson research and failed lessons.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline import embeddings
+from pipeline.embeddings import HASHING_MODEL_ID, EmbeddingService, HashingEmbedder
+from pipeline.stages import stage4_brand_contextualization
+from pipeline.stages.stage4_brand_contextualization import Stage4Chain, research_snippets, split_lessons
+
+BRAND_PROFILE = {"brand_name": "Test Dairy", "products": ["milk", "cheese", "yogurt"]}
+
+STAGE3_OUTPUT = """## Job Architecture Mapping
+
+### Core Jobs Being Served
+
+Customers want to be entertained without planning effort or hidden costs.
+
+### Constraint Elimination Mapping
+
+Hidden fees removed; dead time between plays eliminated with fan-led shows.
+
+### Cross-Industry Transfer
+
+Subscription refills delivered on a schedule remove the need to remember to reorder.
+"""
+
+RESEARCH = """# Test Dairy Research
+
+## Pricing
+
+Shoppers complain about hidden fees and surprise price increases on dairy staples.
+
+## Retail Distribution
+
+The brand is stocked in national grocery chains with strong endcap presence.
+
+## Subscription Commerce
+
+Direct-to-consumer subscription refills and scheduled delivery are growing fast.
+
+## Sustainability
+
+Recyclable packaging commitments for 2030 across the portfolio.
+
+## Manufacturing
+
+Co-packer network with spare capacity for cheese and cultured products.
+"""
+
+
+class FakeChain:
+    """Stands in for an LLMChain; respond(inputs) gives the raw output."""
+
+    def __init__(self, respond, delay=0.0):
+        self.respond = respond
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def invoke(self, inputs):
+        with self.lock:
+            self.calls.append(inputs)
+        time.sleep(self.delay)
+        return {"stage4_output": self.respond(inputs)}
+
+
+def translation(inputs):
+    return f"#### Lesson {inputs['lesson_number']}: {inputs['lesson'].splitlines()[0].lstrip('# ')}"
+
+
+def make_stage4(lesson_chain, merge_chain=None):
+    stage4 = Stage4Chain.__new__(Stage4Chain)
+    stage4.output_key = "stage4_output"
+    stage4.chain = None  # The single-call chain must not be used
+    stage4.lesson_chain = lesson_chain
+    stage4.merge_chain = merge_chain or FakeChain(lambda inputs: "### Top 3 Brand-Specific Opportunities\n\n1. Refill")
+    return stage4
+
+
+def run_map_reduce(stage4, research=RESEARCH):
+    service = EmbeddingService(HashingEmbedder())
+    with patch.object(stage4_brand_contextualization, "get_embedding_service", return_value=service):
+        return stage4.run(STAGE3_OUTPUT, BRAND_PROFILE, research, map_reduce=True)
+
+
+def test_lessons_are_contextualized_concurrently_and_merged():
+    lesson_chain = FakeChain(translation, delay=0.3)
+    merge_chain = FakeChain(lambda inputs: "### Top 3 Brand-Specific Opportunities\n\n1. Refill")
+
+    started = time.perf_counter()
+    result = run_map_reduce(make_stage4(lesson_chain, merge_chain))
+    elapsed = time.perf_counter() - started
+
+    assert len(lesson_chain.calls) == 3
+    assert elapsed < 0.3 * 2  # About one lesson's latency, not three
+    assert all(call["lesson_count"] == 3 for call in lesson_chain.calls)
+
+    output = result["stage4_output"]
+    assert output.startswith("## Brand-Specific CPG Translation\n\n### Mechanism-to-CPG Pattern Mapping")
+    assert output.index("Lesson 1: Core Jobs") < output.index("Lesson 3: Cross-Industry") < output.index("### Top 3")
+    assert "Lesson 2: Constraint Elimination" in merge_chain.calls[0]["lesson_translations"]
+    assert "Test Dairy" in merge_chain.calls[0]["brand_profile"]
+
+
+def test_each_lesson_gets_its_relevant_research():
+    assert len(split_lessons(STAGE3_OUTPUT)) == 3
+    assert len(split_lessons("## 1. First\nA\n\n## 2. Second\nB\n\n## 3. Third\nC", max_lessons=2)) == 2
+    assert all(len(snippet) < 200 for snippet in research_snippets(RESEARCH, max_chars=150))
+
+    lesson_chain = FakeChain(translation)
+    run_map_reduce(make_stage4(lesson_chain))
+
+    excerpts = {call["lesson_number"]: call["research_snippets"] for call in lesson_chain.calls}
+    assert "hidden fees" in excerpts[2]
+    assert "subscription refills" in excerpts[3]
+    assert all(excerpt.count("## ") < RESEARCH.count("## ") for excerpt in excerpts.values())
+
+    # Without research, every lesson gets the placeholder
+    lesson_chain = FakeChain(translation)
+    run_map_reduce(make_stage4(lesson_chain), research="")
+    assert all("No research data available" in call["research_snippets"] for call in lesson_chain.calls)
+
+
+def test_failing_lesson_is_left_out():
+    def respond(inputs):
+        if inputs["lesson_number"] == 2:
+            raise ConnectionError("upstream unavailable")
+        return translation(inputs)
+
+    result = run_map_reduce(make_stage4(FakeChain(respond)))
+    assert "Lesson 1" in result["stage4_output"] and "Lesson 3" in result["stage4_output"]
+    assert "Lesson 2" not in result["stage4_output"]
+
+    def always_fail(inputs):
+        raise ConnectionError("upstream unavailable")
+
+    with pytest.raises(ConnectionError):
+        run_map_reduce(make_stage4(FakeChain(always_fail)))
+
+
+def test_map_reduce_chains_and_embedder_are_built_on_first_use(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setenv("OPENROUTER_BASE_URL", "http://127.0.0.1:9")
+    monkeypatch.setenv("EMBEDDING_CACHE_DIR", "")
+    monkeypatch.delenv("EMBEDDING_MODEL", raising=False)
+    monkeypatch.setattr(embeddings, "_services", {})
+
+    def no_model(model_name):
+        raise AssertionError(f"{model_name} loaded on the request path")
+
+    monkeypatch.setattr(embeddings, "SentenceTransformerEmbedder", no_model)
+    assert stage4_brand_contextualization.research_embedding_service().model_id.startswith(HASHING_MODEL_ID)
+
+    stage4 = Stage4Chain()
+    assert "lesson_chain" not in vars(stage4) and "merge_chain" not in vars(stage4)
+    assert stage4.lesson_chain is stage4.lesson_chain
+    assert stage4.merge_chain.llm.max_tokens == stage4_brand_contextualization.MERGE_MAX_TOKENS
@@ -0,0 +1,111 @@
+"""
+Unit tests for parallel per-pattern Stage 5 generation.
+Tests concurrent card generation, retries and duplicate regeneration.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.prompts.stage5_prompt import OPPORTUNITY_PATTERNS
+from pipeline.stages.stage5_opportunity_generation import Stage5Chain, is_duplicate_card
+
+STAGE4_OUTPUT = "Brand-specific insight. " * 40
+
+
+def card_json(title, description):
+    return "```json\n" + json.dumps({"opportunity": {"title": title, "description": description}}) + "\n```"
+
+
+CARDS = {
+    "Better-For-You": ("Zero-sugar oat yogurt", "Plant-based yogurt sweetened with fruit, clean label and high fiber."),
+    "Premium": ("Cave-aged reserve cheddar", "A two-year aged cheddar with a farm origin story at double the price."),
+    "Convenience": ("Grab-and-go cheese snack trays", "Portable trays of cheese cubes and crackers that need no prep."),
+    "Format": ("Spreadable butter sticks", "Butter in a twist-up stick for spreading straight onto toast."),
+    "Occasion": ("Late-night warm milk ritual", "A calming bedtime milk drink positioned for evening wind-down routines."),
+}
+
+
+def distinct_card(pattern):
+    return card_json(*CARDS[pattern])
+
+
+class FakeCardChain:
+    """Stands in for the card LLMChain; respond(inputs, call_number) gives the raw output."""
+
+    def __init__(self, respond, delay=0.0):
+        self.respond = respond
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def invoke(self, inputs):
+        with self.lock:
+            self.calls.append(inputs)
+            number = sum(1 for call in self.calls if call["pattern"] == inputs["pattern"])
+        time.sleep(self.delay)
+        return {"stage5_output": self.respond(inputs, number)}
+
+
+def make_stage5(card_chain):
+    stage5 = Stage5Chain.__new__(Stage5Chain)
+    stage5.output_key = "stage5_output"
+    stage5.card_chain = card_chain
+    return stage5
+
+
+def run_parallel(stage5):
+    with patch.object(Stage5Chain, "_save_raw_output_debug"):
+        return stage5.run(STAGE4_OUTPUT, "Test Brand", "test-input", parallel=True)
+
+
+def test_cards_are_generated_concurrently_in_pattern_order():
+    chain = FakeCardChain(lambda inputs, number: distinct_card(inputs["pattern"]), delay=0.3)
+
+    started = time.perf_counter()
+    result = run_parallel(make_stage5(chain))
+    elapsed = time.perf_counter() - started
+
+    patterns = [pattern for pattern, _ in OPPORTUNITY_PATTERNS]
+    assert [o["innovation_type"] for o in result["opportunities"]] == patterns
+    assert elapsed < 0.3 * len(patterns) / 2  # About one card's latency, not five
+    assert json.loads(result["stage5_output"].strip("`").removeprefix("json"))["opportunities"] == result["opportunities"]
+
+
+def test_malformed_card_is_retried_alone():
+    def respond(inputs, number):
+        if inputs["pattern"] == "Format" and number == 1:
+            return '```json\n{"opportunity": {"title": "Cut off mid'
+        return distinct_card(inputs["pattern"])
+
+    chain = FakeCardChain(respond)
+    result = run_parallel(make_stage5(chain))
+
+    calls = Counter(call["pattern"] for call in chain.calls)
+    assert calls["Format"] == 2
+    assert all(calls[pattern] == 1 for pattern, _ in OPPORTUNITY_PATTERNS if pattern != "Format")
+    assert len(result["opportunities"]) == 5
+
+
+def test_duplicate_card_is_regenerated_with_titles_to_avoid():
+    duplicate = card_json("Protein snack bites", "Bite-size protein snack bites in a resealable pouch for the checkout lane.")
+
+    def respond(inputs, number):
+        if inputs["pattern"] in ("Better-For-You", "Convenience") and number == 1:
+            return duplicate
+        return distinct_card(inputs["pattern"])
+
+    chain = FakeCardChain(respond)
+    result = run_parallel(make_stage5(chain))
+
+    regenerated = [call for call in chain.calls if call["pattern"] == "Convenience"]
+    assert len(regenerated) == 2
+    assert "Protein snack bites" in regenerated[1]["avoid"]
+    cards = result["opportunities"]
+    assert not any(is_duplicate_card(a, b) for i, a in enumerate(cards) for b in cards[i + 1:])
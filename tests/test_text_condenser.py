@@ -0,0 +1,106 @@
+"""
+Unit tests for input text condensation before Stage 1.
+Tests boilerplate removal, hyphenation, deduplication and the extraction cache.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.text_condenser import condense_text, read_pdf_text
+
+QUOTE = "Consumers want brands that make everyday moments feel like events."
+
+
+def report_page(number: int, body: str) -> str:
+    return f"Mintel Trends 2025 | Confidential\n\n{body}\n\nPage {number} of 5\n"
+
+
+def test_headers_footers_page_numbers_and_contents_removed():
+    pages = [
+        report_page(1, "Contents\nExperiential retail ........ 3\nLimited drops . . . . . 4"),
+        report_page(2, "Experiential retail grows fastest in urban markets."),
+        report_page(3, "Pop-up stores now run for weeks rather than days."),
+        report_page(4, "Limited drops create urgency.\n12"),
+        report_page(5, "Brands pair drops with live events."),
+    ]
+
+    result = condense_text(pages)
+
+    assert "Mintel Trends" not in result.text
+    assert "Page" not in result.text
+    assert "...." not in result.text and ". . ." not in result.text
+    assert "Experiential retail grows fastest in urban markets." in result.text
+    assert "Limited drops create urgency." in result.text
+    assert result.stats.boilerplate_lines == 5
+    assert result.stats.page_numbers == 6
+    assert result.stats.toc_lines == 2
+
+
+def test_mid_page_numbers_kept():
+    page = (
+        "Gen Z snacking\nValues-led brands win the snack aisle.\nPurpose is now table stakes.\n"
+        "By\n2030\nhalf of Gen Z will shop by values.\nShare of shoppers:\n64\npercent\n"
+        "Brands must prove their claims.\nSource: Mintel\n7"
+    )
+
+    result = condense_text([page])
+
+    assert "By\n2030\nhalf" in result.text
+    assert "Share of shoppers:\n64\npercent" in result.text
+    assert not result.text.endswith("7")
+    assert result.stats.page_numbers == 1
+
+
+def test_hyphenation_and_duplicate_paragraphs_with_stats():
+    text = (
+        f"Shoppers want plant-\nbased and better-for-\nyou snacks   with\tlive events.\n\n"
+        f"A well-\nknown innova-\ntion in snacking.\n\n{QUOTE}\n\n"
+        f"Retailers respond with pop-up formats.\n\n{QUOTE}\n\nKey Insight\n\nKey Insight"
+    )
+
+    result = condense_text(text)
+
+    assert "Shoppers want plant-based and better-for-you snacks with live events." in result.text
+    assert "A well-known innovation in snacking." in result.text
+    assert "pop-up formats" in result.text
+    assert result.text.count(QUOTE) == 1
+    assert result.text.count("Key Insight") == 2  # Short headings are kept
+    stats = result.stats
+    assert (stats.hyphenations, stats.duplicate_paragraphs) == (1, 1)
+    assert stats.chars_saved == len(text) - len(result.text) > 0
+    assert stats.tokens_saved > 0
+    assert stats.to_dict()["chars_saved"] == stats.chars_saved
+
+
+def test_extracted_text_cached_by_file_hash(tmp_path, text_cache_dir):
+    calls = []
+
+    class FakePage:
+        def __init__(self, text):
+            self.text = text
+
+        def extract_text(self):
+            return self.text
+
+    class FakeReader:
+        def __init__(self, path):
+            calls.append(path)
+            self.pages = [FakePage(f"{QUOTE}\n\n"), FakePage(f"{QUOTE}\n\nSecond page.")]
+
+    pdf_path = tmp_path / "report.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 report")
+
+    condensed = read_pdf_text(pdf_path, reader=FakeReader)
+    assert condensed == f"{QUOTE}\n\nSecond page."
+    assert len(list(text_cache_dir.glob("*.json"))) == 1
+
+    assert read_pdf_text(pdf_path, reader=FakeReader) == condensed
+    assert read_pdf_text(pdf_path, condense=False, reader=FakeReader) == f"{QUOTE}\n\n{QUOTE}\n\nSecond page."
+    assert calls == [pdf_path]
+
+    # A changed file is extracted again
+    pdf_path.write_bytes(b"%PDF-1.4 revised report")
+    read_pdf_text(pdf_path, reader=FakeReader)
+    assert len(calls) == 2
@@ -0,0 +1,110 @@
+"""
+Unit tests for trace context propagation and span exporters.
+Tests that a run's spans share one trace and export in OTLP format.
+"""
+
+import contextvars
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.instrumentation import span, track_run
+from pipeline.tracing import (
+    JsonlSpanExporter,
+    OtlpHttpSpanExporter,
+    add_span_exporter,
+    clear_span_exporters,
+    run_trace,
+    trace_headers,
+    trace_id_for_run,
+)
+from scripts.run_pipeline import cli_run_id
+
+
+def test_run_spans_share_trace_and_parent():
+    with track_run("run-123") as metrics:
+        with span("stage1", kind="stage"):
+            headers = trace_headers()
+            with span("llm_call", kind="llm"):
+                pass
+
+    by_name = {s.name: s for s in metrics.spans}
+    trace_id = trace_id_for_run("run-123")
+
+    assert metrics.trace_id == trace_id
+    assert all(s.trace_id == trace_id for s in metrics.spans)
+    assert by_name["pipeline_run"].parent_span_id is None
+    assert by_name["stage1"].parent_span_id == by_name["pipeline_run"].span_id
+    assert by_name["llm_call"].parent_span_id == by_name["stage1"].span_id
+    assert headers["traceparent"] == f"00-{trace_id}-{by_name['stage1'].span_id}-01"
+
+
+def test_context_propagates_into_background_thread():
+    results = {}
+
+    def background():
+        with track_run("run-456") as metrics:
+            pass
+        results["metrics"] = metrics
+
+    with run_trace("run-456"):
+        with span("POST /run", kind="server"):
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run, args=(background,))
+            thread.start()
+            thread.join()
+
+    root = next(s for s in results["metrics"].spans if s.name == "pipeline_run")
+    assert root.trace_id == trace_id_for_run("run-456")
+    assert root.parent_span_id is not None
+
+
+def test_jsonl_and_otlp_exporters(tmp_path):
+    received = []
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), CollectorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    trace_file = tmp_path / "traces.jsonl"
+    add_span_exporter(JsonlSpanExporter(trace_file))
+    add_span_exporter(OtlpHttpSpanExporter(f"http://127.0.0.1:{server.server_port}"))
+
+    try:
+        with track_run("run-789"):
+            with span("stage2", kind="stage"):
+                pass
+    finally:
+        clear_span_exporters()
+        server.shutdown()
+
+    lines = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["stage2", "pipeline_run"]
+    assert all(line["traceId"] == trace_id_for_run("run-789") for line in lines)
+
+    path, payload = received[0]
+    assert path == "/v1/traces"
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {s["name"] for s in spans} == {"stage2", "pipeline_run"}
+
+
+def test_cli_reruns_get_their_own_trace():
+    first = cli_run_id("savannah-bananas", "lactalis-canada")
+    second = cli_run_id("savannah-bananas", "lactalis-canada")
+
+    assert first.startswith("savannah-bananas-lactalis-canada-")
+    assert first != second
+    assert trace_id_for_run(first) != trace_id_for_run(second)
@@ -0,0 +1,148 @@
+"""
+Unit tests for dual-track speculative branches.
+Tests that sibling branches run concurrently, within budget, without failing the run.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline import dag as dag_module
+from pipeline.dag import build_stage_dag
+from pipeline.stages.stage1_input_processing import Stage1Chain
+from pipeline.track_branches import SpeculationBudget, add_track_branches
+
+STAGE1_OUTPUT = (
+    "# Inspiration Analysis\n\nShared context.\n\n"
+    "## Track 1: Fan Rituals\n\nalpha\n\n"
+    "## Track 2: Live Theatre\n\nbeta\n"
+)
+CONTEXT = {
+    "input_text": "report",
+    "brand_profile": {},
+    "research_data": "",
+    "brand_name": "Brand",
+    "input_source": "report",
+}
+
+
+def make_factories(seen, barrier=None, fail_stage=None, interrupt_stage=None):
+    """Fake Stage 1-5 chains recording the Stage 2 input."""
+    class Stage1:
+        def run(self, input_text):
+            return {"stage1_output": STAGE1_OUTPUT}
+
+    class Stage2:
+        def run(self, stage1_output):
+            seen.append(stage1_output)
+            if barrier:
+                barrier.wait()  # Both branches must be in Stage 2 at once
+            if fail_stage == 2 and "Live Theatre" in stage1_output:
+                raise RuntimeError("rate limited")
+            return {"stage2_output": "trends: " + ("alpha" if "alpha" in stage1_output else "beta")}
+
+    class Stage3:
+        def run(self, stage1_output, stage2_output):
+            return {"stage3_output": stage2_output}
+
+    class Stage4:
+        def run(self, stage3_output, brand_profile, research_data):
+            if interrupt_stage == 4 and "beta" in stage3_output:
+                raise KeyboardInterrupt
+            return {"stage4_output": stage3_output}
+
+    class Stage5:
+        def run(self, stage4_output, brand_name, input_source):
+            return {"opportunities": [{"title": stage4_output}]}
+
+    return (Stage1, Stage2, Stage3, Stage4, Stage5)
+
+
+def test_tracks_run_concurrently_on_their_own_track():
+    seen = []
+    factories = make_factories(seen, barrier=threading.Barrier(2, timeout=2))
+    dag = build_stage_dag(factories, track=1)
+    tracks = add_track_branches(dag, factories, selected_track=1, budget=SpeculationBudget(max_concurrent=1))
+
+    result = dag.run(CONTEXT)
+
+    assert tracks == [2]
+    assert result.values["stage5"]["opportunities"] == [{"title": "trends: alpha"}]
+    branch = result.values["track2"]
+    assert branch["status"] == "completed"
+    assert branch["stage5"]["opportunities"] == [{"title": "trends: beta"}]
+    assert all("## Track 1" in text and "## Track 2" not in text for text in seen if "alpha" in text)
+    assert Stage1Chain.track_output(STAGE1_OUTPUT, 2).startswith("# Inspiration Analysis\n\nShared context.")
+
+
+def test_budget_caps_concurrency_and_hourly_spend():
+    budget = SpeculationBudget(max_concurrent=1, hourly_cost_cap_usd=0.10)
+    assert budget.try_acquire() == (True, "")
+    admitted, reason = budget.try_acquire()
+    assert not admitted and "running" in reason
+
+    budget.release(cost_usd=0.12)
+    admitted, reason = budget.try_acquire()
+    assert not admitted and "hourly cap" in reason
+    assert budget.spent_last_hour() == 0.12
+
+    assert SpeculationBudget(max_concurrent=0).try_acquire()[0] is False
+
+
+def test_skipped_and_failed_branches_do_not_fail_the_run():
+    factories = make_factories([], fail_stage=2)
+
+    dag = build_stage_dag(factories, track=1)
+    budget = SpeculationBudget()
+    add_track_branches(dag, factories, selected_track=1, budget=budget)
+    result = dag.run(CONTEXT)
+    assert result.values["track2"]["status"] == "failed"
+    assert result.values["track2"]["reason"] == "rate limited"
+    assert result.values["stage5"]["opportunities"] == [{"title": "trends: alpha"}]
+    assert budget.try_acquire()[0]  # Slot released after the failure
+
+    dag = build_stage_dag(factories, track=1)
+    add_track_branches(dag, factories, selected_track=1, budget=SpeculationBudget(max_concurrent=0))
+    result = dag.run(CONTEXT)
+    assert result.values["track2"]["status"] == "skipped"
+    assert "stage5" in result.values
+
+
+def test_interrupted_branch_releases_its_slot():
+    factories = make_factories([], interrupt_stage=4)
+    dag = build_stage_dag(factories, track=1)
+    budget = SpeculationBudget(max_concurrent=1)
+    add_track_branches(dag, factories, selected_track=1, budget=budget)
+
+    with pytest.raises(KeyboardInterrupt):
+        dag.nodes["track2"].fn(stage1={"stage1_output": STAGE1_OUTPUT}, **{
+            key: CONTEXT[key] for key in ("brand_profile", "research_data", "brand_name", "input_source")
+        })
+    assert budget.try_acquire()[0]
+
+
+def test_branches_follow_fused_stage_selection(monkeypatch):
+    seen = []
+
+    class Stage23:
+        def run(self, stage1_output):
+            seen.append(stage1_output)
+            track = "alpha" if "alpha" in stage1_output else "beta"
+            return {"stage2_output": f"fused trends: {track}", "stage3_output": f"fused lessons: {track}"}
+
+    monkeypatch.setattr(dag_module, "create_stage23_chain", Stage23)
+    factories = make_factories(seen)
+    dag = build_stage_dag(factories, track=1, fused=True)
+    add_track_branches(dag, factories, selected_track=1, budget=SpeculationBudget(), fused=True)
+
+    result = dag.run(CONTEXT)
+
+    branch = result.values["track2"]
+    assert branch["stage2"] == {"stage2_output": "fused trends: beta"}
+    assert branch["stage5"]["opportunities"] == [{"title": "fused lessons: beta"}]
+    assert result.values["stage5"]["opportunities"] == [{"title": "fused lessons: alpha"}]
+    assert len(seen) == 2  # One fused call per track, no separate Stage 2 calls